@@ -11,6 +11,11 @@ Alternativas al gráfico comparacion_todas.png (demasiado denso en eje Y):
 Uso:
   python generar_graficos_comparativos_alternativos.py
   python generar_graficos_comparativos_alternativos.py --output benchmark_10_anos
+  python generar_graficos_comparativos_alternativos.py --desde-almacen  # lee solo beneficio_final del almacen/
+  python generar_graficos_comparativos_alternativos.py --forzar  # regenerar aunque no haya cambios
+
+Los gráficos se renderizan con simulacion.render: si los datos y este script
+no cambiaron desde la última corrida, el PNG existente se conserva.
 """
 
 import argparse
@@ -40,19 +45,58 @@ def cargar_resultados(json_path: Path) -> list:
     return data["resultados"]
 
 
-def generar_heatmaps_beneficio(resultados: list, output_dir: str) -> None:
+def cargar_resultados_almacen(output_dir: Path) -> list:
+    """
+    Reconstruye la lista de resultados desde almacen/<config>/ (run_benchmark_completo --almacen).
+    Solo lee la columna beneficio_final de cada configuración; no parsea el resto.
+    """
+    from simulacion.almacen import cargar_escalares, leer_meta
+
+    resultados = []
+    for meta_path in sorted((output_dir / "almacen").glob("*/meta.json")):
+        meta = leer_meta(meta_path.parent)
+        cfg = meta["parametros"]["config"]
+        col = cargar_escalares(meta_path.parent, ["beneficio_final"])["beneficio_final"]
+        resultados.append({
+            "config": cfg,
+            "estadisticas": {"beneficio_final": {"media": float(np.nanmean(col))}},
+        })
+
+    def _orden(r):
+        c = r["config"]
+        return (
+            AB_LABELS.index(c["ab_label"]) if c["ab_label"] in AB_LABELS else len(AB_LABELS),
+            RELEASES_LABELS.index(c["releases_label"]) if c["releases_label"] in RELEASES_LABELS else len(RELEASES_LABELS),
+            MARKETING_LABELS.index(c["marketing_label"]) if c["marketing_label"] in MARKETING_LABELS else len(MARKETING_LABELS),
+        )
+    return sorted(resultados, key=_orden)
+
+
+def _beneficio_m(r) -> float:
+    """Beneficio final medio en millones de créditos."""
+    return r["estadisticas"].get("beneficio_final", {}).get("media", 0) / 1e6
+
+
+def trabajo_heatmaps_beneficio(resultados: list, output_dir: str):
     """
     Heatmaps AB × Releases, uno por cada presupuesto de Marketing.
     Cada celda muestra el beneficio medio en millones de créditos.
     """
+    from simulacion.render import trabajo
+
     beneficio_dict = {}
     for r in resultados:
         ab = r["config"]["ab_label"]
         rel = r["config"]["releases_label"]
         mkt = r["config"]["marketing_label"]
-        bf = r["estadisticas"].get("beneficio_final", {}).get("media", 0)
-        beneficio_dict[(ab, rel, mkt)] = bf / 1e6  # en millones
+        beneficio_dict[(ab, rel, mkt)] = _beneficio_m(r)  # en millones
+    return trabajo(
+        _grafico_heatmaps_beneficio, os.path.join(output_dir, "comparacion_heatmap_beneficio.png"),
+        beneficio_dict=beneficio_dict,
+    )
 
+
+def _grafico_heatmaps_beneficio(beneficio_dict: dict):
     fig, axes = plt.subplots(1, 3, figsize=(14, 5), sharey=True)
     vmin = min(beneficio_dict.values())
     vmax = max(beneficio_dict.values())
@@ -86,16 +130,16 @@ def generar_heatmaps_beneficio(resultados: list, output_dir: str) -> None:
     fig.suptitle("Beneficio final (millones de créditos) por configuración", fontsize=12, y=1.02)
     fig.colorbar(im, ax=axes, shrink=0.6, label="Beneficio (M créditos)")
     plt.subplots_adjust(top=0.88)
-    fig.savefig(os.path.join(output_dir, "comparacion_heatmap_beneficio.png"), dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  -> comparacion_heatmap_beneficio.png")
+    return fig
 
 
-def generar_top_bottom(resultados: list, output_dir: str, n: int = 10) -> None:
+def trabajo_top_bottom(resultados: list, output_dir: str, n: int = 10):
     """
     Gráfico de barras horizontales: Top N y Bottom N configuraciones.
     Etiquetas legibles porque solo hay 2*N barras.
     """
+    from simulacion.render import trabajo
+
     sorted_res = sorted(
         resultados,
         key=lambda r: r["estadisticas"].get("beneficio_final", {}).get("media", 0),
@@ -108,14 +152,21 @@ def generar_top_bottom(resultados: list, output_dir: str, n: int = 10) -> None:
         c = r["config"]
         return f"{c['ab_label']} / {c['releases_label']} / MKT{c['marketing_label']}"
 
+    return trabajo(
+        _grafico_top_bottom, os.path.join(output_dir, "comparacion_top_bottom.png"),
+        n=n,
+        labels_top=[_label(r) for r in top], vals_top=[_beneficio_m(r) for r in top],
+        labels_bot=[_label(r) for r in bottom], vals_bot=[_beneficio_m(r) for r in bottom],
+    )
+
+
+def _grafico_top_bottom(n: int, labels_top: list, vals_top: list, labels_bot: list, vals_bot: list):
     fig, axes = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
     colors_top = plt.cm.Greens(np.linspace(0.4, 0.9, n))
     colors_bot = plt.cm.Reds(np.linspace(0.4, 0.9, n))
 
     # Top N
     ax1 = axes[0]
-    labels_top = [_label(r) for r in top]
-    vals_top = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) / 1e6 for r in top]
     y_pos = np.arange(len(labels_top))
     ax1.barh(y_pos, vals_top, color=colors_top, alpha=0.85)
     ax1.set_yticks(y_pos)
@@ -127,8 +178,6 @@ def generar_top_bottom(resultados: list, output_dir: str, n: int = 10) -> None:
 
     # Bottom N
     ax2 = axes[1]
-    labels_bot = [_label(r) for r in bottom]
-    vals_bot = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) / 1e6 for r in bottom]
     y_pos = np.arange(len(labels_bot))
     ax2.barh(y_pos, vals_bot, color=colors_bot, alpha=0.85)
     ax2.set_yticks(y_pos)
@@ -139,65 +188,70 @@ def generar_top_bottom(resultados: list, output_dir: str, n: int = 10) -> None:
     ax2.axvline(0, color="black", linewidth=0.5)
 
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_top_bottom.png"), dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  -> comparacion_top_bottom.png")
+    return fig
 
 
-def generar_por_marketing(resultados: list, output_dir: str) -> None:
+def trabajo_por_marketing(resultados: list, output_dir: str):
     """
     Tres gráficos: uno por presupuesto Marketing.
     Cada uno muestra AB × Releases (9 barras) con etiquetas legibles.
     """
-    fig, axes = plt.subplots(1, 3, figsize=(14, 5), sharey=True)
-    for idx, mkt in enumerate(MARKETING_LABELS):
-        ax = axes[idx]
-        vals = [r for r in resultados if r["config"]["marketing_label"] == mkt]
-        labels = [f"{r['config']['ab_label']}\n{r['config']['releases_label']}" for r in vals]
-        beneficios = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) / 1e6 for r in vals]
-        colors = ["#2ecc71" if b >= 0 else "#e74c3c" for b in beneficios]
-        x = np.arange(len(labels))
-        ax.bar(x, beneficios, color=colors, alpha=0.85)
-        ax.set_xticks(x)
-        ax.set_xticklabels(labels, fontsize=8, rotation=15)
-        ax.set_ylabel("Beneficio (M créditos)")
-        ax.set_title(f"Marketing {mkt} créditos/mes")
-        ax.axhline(0, color="black", linewidth=0.5)
-        ax.grid(True, alpha=0.3, axis="y")
+    from simulacion.render import trabajo
 
-    fig.suptitle("Beneficio final por AB × Releases (desglose por Marketing)", fontsize=12, y=1.02)
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_por_marketing.png"), dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  -> comparacion_por_marketing.png")
+    paneles = []
+    for mkt in MARKETING_LABELS:
+        vals = [r for r in resultados if r["config"]["marketing_label"] == mkt]
+        paneles.append({
+            "titulo": f"Marketing {mkt} créditos/mes",
+            "labels": [f"{r['config']['ab_label']}\n{r['config']['releases_label']}" for r in vals],
+            "beneficios": [_beneficio_m(r) for r in vals],
+        })
+    return trabajo(
+        _grafico_paneles_beneficio, os.path.join(output_dir, "comparacion_por_marketing.png"),
+        paneles=paneles, titulo="Beneficio final por AB × Releases (desglose por Marketing)",
+    )
 
 
-def generar_por_releases(resultados: list, output_dir: str) -> None:
+def trabajo_por_releases(resultados: list, output_dir: str):
     """
     Tres gráficos: uno por frecuencia de releases.
     Cada uno muestra AB × Marketing (9 barras).
     """
-    fig, axes = plt.subplots(1, 3, figsize=(14, 5), sharey=True)
-    for idx, rel in enumerate(RELEASES_LABELS):
-        ax = axes[idx]
+    from simulacion.render import trabajo
+
+    paneles = []
+    for rel in RELEASES_LABELS:
         vals = [r for r in resultados if r["config"]["releases_label"] == rel]
-        labels = [f"{r['config']['ab_label']}\nMKT{r['config']['marketing_label']}" for r in vals]
-        beneficios = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) / 1e6 for r in vals]
+        paneles.append({
+            "titulo": f"Releases {rel}",
+            "labels": [f"{r['config']['ab_label']}\nMKT{r['config']['marketing_label']}" for r in vals],
+            "beneficios": [_beneficio_m(r) for r in vals],
+        })
+    return trabajo(
+        _grafico_paneles_beneficio, os.path.join(output_dir, "comparacion_por_releases.png"),
+        paneles=paneles, titulo="Beneficio final por AB × Marketing (desglose por Releases)",
+    )
+
+
+def _grafico_paneles_beneficio(paneles: list, titulo: str):
+    """Tres paneles de barras (verde >= 0, rojo < 0) con beneficio en millones."""
+    fig, axes = plt.subplots(1, 3, figsize=(14, 5), sharey=True)
+    for ax, panel in zip(axes, paneles):
+        labels = panel["labels"]
+        beneficios = panel["beneficios"]
         colors = ["#2ecc71" if b >= 0 else "#e74c3c" for b in beneficios]
         x = np.arange(len(labels))
         ax.bar(x, beneficios, color=colors, alpha=0.85)
         ax.set_xticks(x)
         ax.set_xticklabels(labels, fontsize=8, rotation=15)
         ax.set_ylabel("Beneficio (M créditos)")
-        ax.set_title(f"Releases {rel}")
+        ax.set_title(panel["titulo"])
         ax.axhline(0, color="black", linewidth=0.5)
         ax.grid(True, alpha=0.3, axis="y")
 
-    fig.suptitle("Beneficio final por AB × Marketing (desglose por Releases)", fontsize=12, y=1.02)
+    fig.suptitle(titulo, fontsize=12, y=1.02)
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_por_releases.png"), dpi=150, bbox_inches="tight")
-    plt.close()
-    print(f"  -> comparacion_por_releases.png")
+    return fig
 
 
 def main():
@@ -208,11 +262,20 @@ def main():
                         help="Directorio con resultados_benchmark.json y salida de gráficos")
     parser.add_argument("--top-n", type=int, default=10,
                         help="Número de configs en Top/Bottom (default: 10)")
+    parser.add_argument("--desde-almacen", action="store_true",
+                        help="Leer beneficio_final desde almacen/<config>/ en lugar del JSON")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Regenerar los gráficos aunque datos y código no hayan cambiado")
     args = parser.parse_args()
 
     output_dir = Path(args.output)
     json_path = output_dir / "resultados_benchmark.json"
-    if not json_path.exists():
+    if args.desde_almacen:
+        if not (output_dir / "almacen").is_dir():
+            print(f"Error: No existe {output_dir / 'almacen'}")
+            print("Ejecuta run_benchmark_completo.py --almacen o indica el directorio con --output")
+            return 1
+    elif not json_path.exists():
         print(f"Error: No existe {json_path}")
         print("Ejecuta primero el benchmark o indica el directorio correcto con --output")
         return 1
@@ -222,14 +285,25 @@ def main():
         return 1
 
     print("Cargando resultados...")
-    resultados = cargar_resultados(json_path)
+    if args.desde_almacen:
+        resultados = cargar_resultados_almacen(output_dir)
+    else:
+        resultados = cargar_resultados(json_path)
     print(f"  {len(resultados)} configuraciones cargadas")
     print("\nGenerando gráficos alternativos:")
 
-    generar_heatmaps_beneficio(resultados, str(output_dir))
-    generar_top_bottom(resultados, str(output_dir), n=args.top_n)
-    generar_por_marketing(resultados, str(output_dir))
-    generar_por_releases(resultados, str(output_dir))
+    from simulacion.render import renderizar
+
+    trabajos = [
+        trabajo_heatmaps_beneficio(resultados, str(output_dir)),
+        trabajo_top_bottom(resultados, str(output_dir), n=args.top_n),
+        trabajo_por_marketing(resultados, str(output_dir)),
+        trabajo_por_releases(resultados, str(output_dir)),
+    ]
+    generados = set(renderizar(trabajos, forzar=args.forzar))
+    for t in trabajos:
+        estado = "" if t.path in generados else " (sin cambios)"
+        print(f"  -> {os.path.basename(t.path)}{estado}")
 
     print(f"\nGráficos guardados en: {output_dir}/")
     return 0
@@ -7,9 +7,16 @@ Cada slide queda en una pagina 16:9 con fondo completo.
 
 Uso:
     python generar_pdf_v3.py
+    python generar_pdf_v3.py --forzar   # re-renderizar todas las paginas
     Genera: presentacion_saas_v3.pdf
+
+Con pypdf instalado cada slide se imprime como pagina independiente y se
+guarda en .cache_build/paginas/ por huella de su HTML: al cambiar un slide
+solo se re-renderiza esa pagina. Sin pypdf se imprime el documento completo,
+salvo que nada haya cambiado desde el ultimo PDF.
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -23,6 +30,8 @@ except ImportError as e:
     print(f"Error importando v3: {e}")
     sys.exit(1)
 
+from simulacion.cache_build import huella_archivos, huella_texto
+
 # ──────────────────────────────────────────────────────────────────────────────
 # CSS que sobreescribe el layout de presentacion para impresion plana
 # ──────────────────────────────────────────────────────────────────────────────
@@ -78,20 +87,8 @@ html, body {
 """
 
 
-async def main():
-    try:
-        from playwright.async_api import async_playwright
-    except ImportError:
-        print("Error: playwright no instalado. Ejecutar: pip install playwright")
-        print("       playwright install chromium")
-        sys.exit(1)
-
-    print("Generando HTML de impresion...")
-    slides = v3.build_slides()
-    slides_html = "\n".join(slides)
-    n_slides = len(slides)
-
-    html = f"""<!DOCTYPE html>
+def _html_impresion(slides_html: str) -> str:
+    return f"""<!DOCTYPE html>
 <html lang="es">
 <head>
   <meta charset="UTF-8">
@@ -106,39 +103,90 @@ async def main():
 </body>
 </html>"""
 
-    # Archivo HTML intermedio (se borra al final)
+
+async def _imprimir(page, html: str, destino: Path) -> None:
+    """Carga el HTML (via archivo intermedio) e imprime a PDF 1280x720."""
     tmp = BASE_DIR / "_tmp_pdf_print.html"
     tmp.write_text(html, encoding="utf-8")
+    try:
+        await page.goto(tmp.as_uri())
+        # Esperar que las imagenes base64 terminen de renderizar
+        await page.wait_for_load_state("networkidle")
+        await page.wait_for_timeout(800)
+        await page.pdf(
+            path=str(destino),
+            width="1280px",
+            height="720px",
+            print_background=True,
+            margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
+        )
+    finally:
+        tmp.unlink(missing_ok=True)
 
-    out = BASE_DIR / "presentacion_saas_v3.pdf"
 
-    print(f"Iniciando Chromium ({n_slides} slides)...")
+async def main():
+    parser = argparse.ArgumentParser(description="Convierte la presentacion v3 a PDF.")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Re-renderizar todas las paginas aunque no haya cambios")
+    args = parser.parse_args()
+
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        print("Error: playwright no instalado. Ejecutar: pip install playwright")
+        print("       playwright install chromium")
+        sys.exit(1)
     try:
+        from pypdf import PdfWriter  # opcional: permite re-renderizar solo slides cambiados
+    except ImportError:
+        PdfWriter = None
+
+    print("Generando HTML de impresion...")
+    slides = v3.build_slides()
+    n_slides = len(slides)
+    out = BASE_DIR / "presentacion_saas_v3.pdf"
+
+    # Huella por slide: su HTML + estilos + codigo de este script
+    cache = v3.cache_build()
+    codigo = huella_archivos([Path(__file__)])
+    huellas = [huella_texto(codigo, v3.CSS, PRINT_CSS, s) for s in slides]
+    huella_pdf = huella_texto(*huellas)
+    if not args.forzar and cache.vigente("presentacion_pdf", huella_pdf, out):
+        print(f"OK - Sin cambios: {out}")
+        return
+
+    por_pagina = PdfWriter is not None
+    pendientes = [
+        i for i, h in enumerate(huellas)
+        if args.forzar or not cache.pagina(h).exists()
+    ] if por_pagina else list(range(n_slides))
+
+    if pendientes:
+        print(f"Iniciando Chromium ({len(pendientes)} de {n_slides} slides)...")
         async with async_playwright() as p:
             browser = await p.chromium.launch()
             # viewport igual al tamano de pagina para que 100vw/vh den bien
             page = await browser.new_page(
                 viewport={"width": 1280, "height": 720}
             )
-            await page.goto(tmp.as_uri())
-            # Esperar que las imagenes base64 terminen de renderizar
-            await page.wait_for_load_state("networkidle")
-            await page.wait_for_timeout(800)
-
-            await page.pdf(
-                path=str(out),
-                width="1280px",
-                height="720px",
-                print_background=True,
-                margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
-            )
+            if por_pagina:
+                for i in pendientes:
+                    await _imprimir(page, _html_impresion(slides[i]), cache.pagina(huellas[i]))
+            else:
+                await _imprimir(page, _html_impresion("\n".join(slides)), out)
             await browser.close()
-    finally:
-        tmp.unlink(missing_ok=True)
+
+    if por_pagina:
+        writer = PdfWriter()
+        for h in huellas:
+            writer.append(str(cache.pagina(h)))
+        with open(out, "wb") as f:
+            writer.write(f)
+    cache.registrar("presentacion_pdf", huella_pdf)
 
     size_mb = out.stat().st_size / 1024 / 1024
     print(f"OK - PDF generado: {out}")
-    print(f"  Paginas: {n_slides}")
+    print(f"  Paginas: {n_slides} ({len(pendientes)} renderizadas)")
     print(f"  Tamano:  {size_mb:.1f} MB")
 
 
@@ -6,14 +6,32 @@ Version mejorada: fuentes grandes, espacio aprovechado, logo UTN/FRBA, titulo co
 
 Uso:
     python generar_presentacion_v3.py
+    python generar_presentacion_v3.py --forzar   # reescribir aunque nada haya cambiado
     Abrir presentacion_saas_v3.html en el navegador (F11 pantalla completa).
     Navegar con flechas <- -> o barra espaciadora.
+
+Las imagenes se embeben como data URI memoizados en .cache_build/ (simulacion.cache_build):
+un PNG sin cambios no se vuelve a codificar en base64.
 """
 
-import base64
+import argparse
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+
+from simulacion.cache_build import CacheBuild, huella_texto
+
+_CACHE = None
+
+
+def cache_build() -> CacheBuild:
+    """Cache de build compartida (data URIs, manifiesto y paginas de PDF)."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = CacheBuild(BASE_DIR)
+    return _CACHE
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Logo UTN FRBA — PNG real embebido en base64
@@ -25,7 +43,7 @@ def _logo_b64() -> str:
     if not _LOGO_PATH.exists():
         print(f"  WARN: logo no encontrado en {_LOGO_PATH}")
         return ""
-    return "data:image/png;base64," + base64.b64encode(_LOGO_PATH.read_bytes()).decode()
+    return cache_build().data_uri(_LOGO_PATH)
 
 def logo_img(height: int, style: str = "") -> str:
     """Tag <img> del logo en el tamaño pedido."""
@@ -41,11 +59,7 @@ def embed_img(rel_path: str):
     if not p.exists():
         print(f"  WARN: No encontrada: {p}")
         return None
-    data = base64.b64encode(p.read_bytes()).decode()
-    suffix = p.suffix.lower().lstrip(".")
-    mime = {"jpg": "image/jpeg", "jpeg": "image/jpeg",
-            "png": "image/png", "svg": "image/svg+xml"}.get(suffix, "image/png")
-    return f"data:{mime};base64,{data}"
+    return cache_build().data_uri(p)
 
 
 def img_tag(rel_path: str, alt: str = "") -> str:
@@ -1136,6 +1150,11 @@ def build_slides() -> list:
 # MAIN
 # ──────────────────────────────────────────────────────────────────────────────
 def main():
+    parser = argparse.ArgumentParser(description="Genera la presentacion HTML v3.")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Reescribir el HTML aunque no haya cambios")
+    args = parser.parse_args()
+
     print("Generando presentacion v3...")
     slides = build_slides()
     slides_html = "\n".join(slides)
@@ -1165,7 +1184,12 @@ def main():
 </html>"""
 
     out = BASE_DIR / "presentacion_saas_v3.html"
+    huella = huella_texto(html)
+    if not args.forzar and cache_build().vigente("presentacion_html", huella, out):
+        print(f"OK - Sin cambios: {out}")
+        return
     out.write_text(html, encoding="utf-8")
+    cache_build().registrar("presentacion_html", huella)
     size_mb = out.stat().st_size / 1024 / 1024
     print(f"OK - Generada: {out}")
     print(f"  Diapositivas: {len(slides)}")
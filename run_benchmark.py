@@ -10,18 +10,20 @@ Uso:
   python run_benchmark.py --runs 20
   python run_benchmark.py --runs 50 --dias 3653 --implementaciones 30 --marketing 2000
   python run_benchmark.py -r 10 -T 1826 -N 30 -M 2000 --seed 42 -g
+  python run_benchmark.py -r 50 --parar-tras-equilibrio 0 --umbral-ruina 500000
+  python run_benchmark.py -r 100 --output-almacen resultados/almacen --comprimir-almacen
+  python run_benchmark.py -r 200 --seed 42 --modelo-duracion lognormal  # comparar modelos de duración
+  python run_benchmark.py -r 500 --seed 42 --modo agregado  # lote vectorizado, aproximado
 """
 
 import argparse
-import json
-import sys
 from pathlib import Path
 
-# Permitir ejecutar desde la raíz del proyecto
-sys.path.insert(0, ".")
-
 
 def main():
+    from simulacion.config import MODELO_DURACION_RECORTE, MODELOS_DURACION
+    from simulacion.principal import MODO_DETALLADO, MODOS
+
     parser = argparse.ArgumentParser(
         description="Benchmark: ejecuta N corridas de la simulación y genera métricas/gráficos agregados."
     )
@@ -55,6 +57,18 @@ def main():
         default=0.50,
         help="Probabilidad de que cliente nuevo elija suscripción vs prepago (0.0-1.0, default: 0.50)",
     )
+    parser.add_argument(
+        "--modelo-duracion",
+        choices=MODELOS_DURACION,
+        default=MODELO_DURACION_RECORTE,
+        help="Duración de trabajos APPS/IT: normal recortada (default), normal truncada o lognormal",
+    )
+    parser.add_argument(
+        "--modo",
+        choices=MODOS,
+        default=MODO_DETALLADO,
+        help="Motor: detallado (llegada por llegada, default) o agregado (conteos diarios, aproximado: a varios años exagera la dispersión del beneficio y subestima pérdidas y técnicos APPS/IT; ver README)",
+    )
     parser.add_argument(
         "--seed", "-s",
         type=int,
@@ -78,6 +92,42 @@ def main():
         default=None,
         help="Archivo JSON para guardar métricas agregadas (ej: metricas.json)",
     )
+    parser.add_argument(
+        "--output-almacen",
+        type=str,
+        default=None,
+        help="Directorio del almacén binario con escalares y series semanales por corrida",
+    )
+    parser.add_argument(
+        "--output-series-diarias",
+        type=str,
+        default=None,
+        help="Archivo .npy memory-mapped (runs × días, float32) con beneficio acumulado diario por corrida",
+    )
+    parser.add_argument(
+        "--comprimir-almacen",
+        action="store_true",
+        help="Guardar el almacén como .npz comprimido en lugar de .npy por columna",
+    )
+    parser.add_argument(
+        "--parar-tras-equilibrio",
+        type=int,
+        default=None,
+        metavar="DIAS",
+        help="Terminar cada corrida DIAS días después de alcanzar el equilibrio (corrida truncada)",
+    )
+    parser.add_argument(
+        "--umbral-ruina",
+        type=float,
+        default=None,
+        metavar="CREDITOS",
+        help="Terminar la corrida cuando la pérdida acumulada supera CREDITOS",
+    )
+    parser.add_argument(
+        "--parar-sin-clientes",
+        action="store_true",
+        help="Terminar la corrida si no quedan clientes con paquete",
+    )
     parser.add_argument(
         "--silencioso", "-q",
         action="store_true",
@@ -92,16 +142,24 @@ def main():
     AB_SUSCRIPCION = max(0.0, min(1.0, args.ab_suscripcion))
 
     from simulacion.benchmark import ejecutar_benchmark, agregar_metricas, generar_graficos_benchmark
+    from simulacion.parada import construir_criterios
+
+    criterios = construir_criterios(args.parar_tras_equilibrio, args.umbral_ruina, args.parar_sin_clientes)
 
     print("=" * 60)
     print("BENCHMARK DE SIMULACIÓN")
     print("=" * 60)
     print(f"Corridas: {n_runs}")
-    print(f"Parámetros: T_FINAL={T_FINAL}, N={N}, M={M}, AB_SUSCRIPCION={AB_SUSCRIPCION}")
+    print(f"Parámetros: T_FINAL={T_FINAL}, N={N}, M={M}, AB_SUSCRIPCION={AB_SUSCRIPCION}, "
+          f"duración APPS/IT={args.modelo_duracion}, modo={args.modo}")
     if args.seed is not None:
         print(f"Seed: {args.seed} (reproducible)")
     print()
 
+    if args.output_series_diarias:
+        from simulacion.series_diarias import crear_archivo_series
+        crear_archivo_series(args.output_series_diarias, n_runs, T_FINAL)
+
     resultados = ejecutar_benchmark(
         n_runs=n_runs,
         T_FINAL=T_FINAL,
@@ -110,6 +168,10 @@ def main():
         prob_suscripcion_nuevo=AB_SUSCRIPCION,
         verbose=not args.silencioso,
         seed=args.seed,
+        archivo_series=args.output_series_diarias,
+        criterios_parada=criterios,
+        modelo_duracion=args.modelo_duracion,
+        modo=args.modo,
     )
 
     agregado = agregar_metricas(resultados)
@@ -119,6 +181,9 @@ def main():
     print()
     print("MÉTRICAS AGREGADAS")
     print("-" * 40)
+    if agregado["n_truncadas"]:
+        motivos = ", ".join(f"{k}={v}" for k, v in agregado["truncadas_por_motivo"].items())
+        print(f"Corridas truncadas: {agregado['n_truncadas']} ({motivos}); cuentan con su valor al día de parada")
     if "beneficio_final" in stats and stats["beneficio_final"]:
         s = stats["beneficio_final"]
         print(f"Beneficio final:")
@@ -139,6 +204,17 @@ def main():
     if "suscripciones_final" in stats and stats["suscripciones_final"]:
         s = stats["suscripciones_final"]
         print(f"Suscripciones finales: Media {s['media']:.1f} ± {s['std']:.1f}")
+    if stats.get("segundos_simulacion") and stats.get("eventos_llegadas"):
+        correlacion = agregado["telemetria"]["correlacion_segundos_llegadas"]
+        print(f"Telemetría: {stats['segundos_simulacion']['media']:.2f} s/corrida, "
+              f"{stats['eventos_llegadas']['media']:,.0f} llegadas/corrida, "
+              f"{stats['microsegundos_por_llegada']['media']:.1f} µs/llegada"
+              + (f", correlación s~llegadas {correlacion:.2f}" if correlacion is not None else ""))
+    telemetria = agregado["telemetria"]
+    if telemetria["segundos_lote"] is not None:
+        print(f"Telemetría (lote agregado): {telemetria['segundos_lote']:.2f} s para {agregado['n_runs']} corridas"
+              + (f", {telemetria['microsegundos_por_llegada_lote']:.2f} µs/llegada"
+                 if telemetria["microsegundos_por_llegada_lote"] is not None else ""))
     print("=" * 60)
 
     if args.graficos:
@@ -151,6 +227,7 @@ def main():
             "n_runs": agregado["n_runs"],
             "parametros": agregado["parametros"],
             "estadisticas": stats,
+            "telemetria": agregado["telemetria"],
             "metricas_por_run": [
                 {
                     "beneficio_final": m.beneficio_final,
@@ -158,15 +235,28 @@ def main():
                     "mejor_trimestre_beneficio": m.mejor_trimestre_beneficio,
                     "suscripciones_final": m.suscripciones_final,
                     "prepagos_final": m.prepagos_final,
+                    "segundos_simulacion": m.segundos_simulacion,
+                    "eventos_llegadas": m.eventos_llegadas,
                 }
                 for m in agregado["metricas_por_run"]
             ],
         }
+        import json
         Path(args.output_metricas).parent.mkdir(parents=True, exist_ok=True)
         with open(args.output_metricas, "w", encoding="utf-8") as f:
             json.dump(export, f, indent=2, ensure_ascii=False)
         print(f"Métricas exportadas a: {args.output_metricas}")
 
+    if args.output_almacen:
+        from simulacion.almacen import guardar_almacen
+        guardar_almacen(
+            args.output_almacen,
+            agregado["metricas_por_run"],
+            parametros={**agregado["parametros"], "AB_SUSCRIPCION": AB_SUSCRIPCION, "seed": args.seed},
+            comprimir=args.comprimir_almacen,
+        )
+        print(f"Almacén por corrida guardado en: {args.output_almacen}/")
+
     return agregado
 
 
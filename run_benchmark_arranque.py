@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de arranque: mide cuánto tarda en estar lista cada punto de entrada
+(sin contar la simulación en sí) y el costo de levantar workers de multiprocessing.
+
+Casos (cada uno en un proceso nuevo, --repeticiones veces; se informa mínimo y mediana):
+- python vacío (referencia del intérprete)
+- import simulacion.principal
+- run_simulacion.py --dias 1 --silencioso
+- run_benchmark.py --runs 2 --dias 1 (sin exportar)
+- Pool spawn: levantar N workers que importan simulacion.principal y corren 1 día
+
+Uso:
+  python run_benchmark_arranque.py
+  python run_benchmark_arranque.py --repeticiones 20 --workers 8
+  python run_benchmark_arranque.py --importtime   # + top de módulos más lentos (python -X importtime)
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+CASOS = [
+    ("python vacío", ["-c", "pass"]),
+    ("import simulacion.principal", ["-c", "import simulacion.principal"]),
+    ("run_simulacion --silencioso", ["run_simulacion.py", "--dias", "1", "--silencioso"]),
+    ("run_benchmark (2 corridas, 1 día)", ["run_benchmark.py", "--runs", "2", "--dias", "1"]),
+]
+
+
+def _worker_un_dia(i):
+    from simulacion.principal import ejecutar_simulacion
+    return ejecutar_simulacion(T_FINAL=1, N=30, M=2000, verbose=False).T
+
+
+def _medir_proceso(args, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=RAIZ, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return tiempos
+
+
+def _medir_pool(workers, repeticiones):
+    """Tiempo hasta que N workers 'spawn' terminaron su primera tarea (import + 1 día)."""
+    import multiprocessing
+    ctx = multiprocessing.get_context("spawn")
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        with ctx.Pool(workers) as pool:
+            pool.map(_worker_un_dia, range(workers), chunksize=1)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return tiempos
+
+
+def _top_importtime(modulo, n=10):
+    """Módulos con mayor tiempo acumulado de import (python -X importtime)."""
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                       cwd=RAIZ, capture_output=True, text=True, check=True)
+    filas = []
+    for linea in r.stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[1].strip().isdigit():
+            filas.append((int(partes[1]), partes[2].strip()))
+    return sorted(filas, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de los puntos de entrada.")
+    parser.add_argument("--repeticiones", "-n", type=int, default=10,
+                        help="Repeticiones por caso (default: 10)")
+    parser.add_argument("--workers", "-w", type=int, default=4,
+                        help="Workers para el caso Pool spawn (default: 4)")
+    parser.add_argument("--importtime", action="store_true",
+                        help="Mostrar los módulos más lentos al importar simulacion.principal")
+    args = parser.parse_args()
+    n = max(1, args.repeticiones)
+
+    print("=" * 70)
+    print("BENCHMARK DE ARRANQUE")
+    print("=" * 70)
+    print(f"{'Caso':<40} {'mín (ms)':>10} {'mediana (ms)':>14}")
+    resultados = {}
+    for nombre, cmd in CASOS:
+        t = _medir_proceso(cmd, n)
+        resultados[nombre] = t
+        print(f"{nombre:<40} {min(t):>10.1f} {statistics.median(t):>14.1f}")
+    t = _medir_pool(max(1, args.workers), max(1, n // 2))
+    print(f"{f'Pool spawn ({args.workers} workers)':<40} {min(t):>10.1f} {statistics.median(t):>14.1f}")
+
+    base = min(resultados["python vacío"])
+    print()
+    print(f"Sobre el intérprete vacío: import simulacion.principal "
+          f"+{min(resultados['import simulacion.principal']) - base:.1f} ms, "
+          f"run_simulacion --silencioso +{min(resultados['run_simulacion --silencioso']) - base:.1f} ms")
+
+    if args.importtime:
+        print("\nMódulos más lentos (import simulacion.principal, acumulado en ms):")
+        for us, modulo in _top_importtime("simulacion.principal"):
+            print(f"  {us / 1000:8.1f}  {modulo}")
+
+
+if __name__ == "__main__":
+    main()
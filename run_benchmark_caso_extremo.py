@@ -6,14 +6,13 @@ Genera serie_beneficio_acumulado.png y demás gráficos de benchmark.
 Uso:
   python run_benchmark_caso_extremo.py
   python run_benchmark_caso_extremo.py --runs 500 --workers 4  # Más rápido
+  python run_benchmark_caso_extremo.py --sin-memo  # Re-simular todo sin usar .cache_corridas/
+  python run_benchmark_caso_extremo.py --prefijos  # Reusar/extender corridas de otro horizonte (misma semilla)
 """
 
 import argparse
-import sys
 from pathlib import Path
 
-sys.path.insert(0, ".")
-
 DIAS_5_ANOS = 365 * 5  # 1825 días
 
 
@@ -21,7 +20,6 @@ def _run_single_worker(worker_args):
     """Worker para multiprocessing."""
     j, T_FINAL, N, M, prob_suscripcion, seed = worker_args
     import random
-    sys.path.insert(0, ".")
     from simulacion.principal import ejecutar_simulacion
     if seed is not None:
         random.seed(seed + j)
@@ -31,6 +29,34 @@ def _run_single_worker(worker_args):
     )
 
 
+def _metricas_worker(worker_args):
+    """Worker para multiprocessing: métricas de la corrida (lo que se agrega y se guarda en el memo)."""
+    from simulacion.benchmark import extraer_metricas
+    return extraer_metricas(_run_single_worker(worker_args))
+
+
+def _mapear(funcion, items, workers, T_FINAL=None):
+    """
+    funcion sobre items, en un Pool si workers > 1 (con progreso cada 5% en serie).
+    Con T_FINAL (workers que devuelven MetricasResumen) los resultados vuelven por memoria compartida.
+    """
+    if workers > 1 and len(items) > 1:
+        from multiprocessing import Pool
+        chunksz = max(1, len(items) // (workers * 4))
+        with Pool(workers) as pool:
+            if T_FINAL is not None:
+                from simulacion.memoria_compartida import mapear_en_buffer
+                return mapear_en_buffer(pool, funcion, items, T_FINAL, chunksize=chunksz)
+            return pool.map(funcion, items, chunksize=chunksz)
+    intervalo = max(1, len(items) // 20)
+    salida = []
+    for k, item in enumerate(items):
+        if (k + 1) % intervalo == 0:
+            print(f"  Corrida {k + 1}/{len(items)}...")
+        salida.append(funcion(item))
+    return salida
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Benchmark caso extremo: MKT 10000, 5 años."
@@ -43,6 +69,10 @@ def main():
                         help="Directorio de salida")
     parser.add_argument("--seed", "-s", type=int, default=42,
                         help="Semilla para reproducibilidad")
+    parser.add_argument("--sin-memo", action="store_true",
+                        help="No reutilizar ni guardar corridas en el memo en disco (.cache_corridas/)")
+    parser.add_argument("--prefijos", action="store_true",
+                        help="Responder desde corridas guardadas de otro horizonte (truncar o reanudar)")
     args = parser.parse_args()
 
     T_FINAL = DIAS_5_ANOS
@@ -54,10 +84,10 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
 
     from simulacion.benchmark import (
-        ejecutar_benchmark,
         agregar_metricas,
         generar_graficos_benchmark,
     )
+    from simulacion.memo import MemoCorridas, clave_corrida, con_memo, semilla_configuracion
 
     print("=" * 70)
     print("BENCHMARK CASO EXTREMO: MKT 10000, 5 AÑOS")
@@ -68,28 +98,39 @@ def main():
     print(f"Salida: {output_dir}/")
     print()
 
-    if args.workers > 1:
-        from multiprocessing import Pool
-        worker_args = [
-            (j, T_FINAL, N, M, prob_suscripcion, args.seed)
-            for j in range(args.runs)
-        ]
-        chunksz = max(1, args.runs // (args.workers * 4))
-        with Pool(args.workers) as pool:
-            resultados = list(pool.imap_unordered(_run_single_worker, worker_args, chunksize=chunksz))
-    else:
-        resultados = ejecutar_benchmark(
-            n_runs=args.runs,
-            T_FINAL=T_FINAL,
-            N=N,
-            M=M,
-            prob_suscripcion_nuevo=prob_suscripcion,
-            verbose=True,
-            seed=args.seed,
-            progress_interval=max(1, args.runs // 20),
-        )
-
-    agregado = agregar_metricas(resultados)
+    base = semilla_configuracion(args.seed, N, M, prob_suscripcion)
+    worker_args = [
+        (j, T_FINAL, N, M, prob_suscripcion, base)
+        for j in range(args.runs)
+    ]
+
+    prefijos = None
+    if args.prefijos:
+        from simulacion.prefijos import ARCHIVO_PREFIJOS, con_prefijos
+        prefijos = MemoCorridas(archivo=ARCHIVO_PREFIJOS)
+
+    def _simular(indices):
+        pendientes = [worker_args[k] for k in indices]
+        if prefijos is not None:
+            tareas = [(a[1], a[2], a[3], a[4], a[5] + a[0]) for a in pendientes]
+            return con_prefijos(prefijos, tareas, lambda f, items: _mapear(f, items, args.workers))
+        return _mapear(_metricas_worker, pendientes, args.workers, T_FINAL=T_FINAL)
+
+    memo = None if args.sin_memo else MemoCorridas()
+    claves = [clave_corrida(T_FINAL, N, M, prob_suscripcion, base + j) for j in range(args.runs)]
+    metricas = con_memo(memo, claves, _simular)
+    if memo is not None:
+        if memo.aciertos:
+            print(f"Memo: {memo.aciertos} de {args.runs} corridas reutilizadas")
+        if memo.descartadas:
+            print(f"Memo: {memo.descartadas} entradas sin guardar por superar el límite (ver python run_memo.py)")
+        memo.cerrar()
+    if prefijos is not None:
+        if prefijos.descartadas:
+            print(f"Prefijos: {prefijos.descartadas} entradas sin guardar por superar el límite (ver python run_memo.py)")
+        prefijos.cerrar()
+
+    agregado = agregar_metricas(metricas, parametros={"T_FINAL": T_FINAL, "N": N, "M": M})
     generar_graficos_benchmark(agregado, output_dir=str(output_dir))
 
     stats = agregado["estadisticas"]
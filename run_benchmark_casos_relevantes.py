@@ -12,35 +12,63 @@ Genera: boxplot, serie_beneficio_acumulado, y gráficos de ejemplo
 Uso:
   python run_benchmark_casos_relevantes.py
   python run_benchmark_casos_relevantes.py --runs 500 --workers 4  # Más rápido
+  python run_benchmark_casos_relevantes.py --parar-tras-equilibrio 30  # Solo equilibrio: corta corridas
+  python run_benchmark_casos_relevantes.py --sin-memo  # Re-simular todo sin usar .cache_corridas/
+  python run_benchmark_casos_relevantes.py --prefijos  # Reusar/extender corridas de otro horizonte (misma semilla)
 """
 
 import argparse
 import os
-import sys
 import time
 from pathlib import Path
 from datetime import datetime
 
-sys.path.insert(0, ".")
-
 # Años por defecto
 DIAS_5_ANOS = 365 * 5   # 1825 días
 DIAS_6_ANOS = 365 * 6   # 2190 días (cost-effective necesita más tiempo para capturar equilibrio tardío)
 
 def _run_single_worker(worker_args):
     """Worker para multiprocessing."""
-    j, T_FINAL, N, M, prob_suscripcion, seed = worker_args
+    j, T_FINAL, N, M, prob_suscripcion, seed, criterios = worker_args
     import random
-    sys.path.insert(0, ".")
     from simulacion.principal import ejecutar_simulacion
     if seed is not None:
         random.seed(seed + j)
     return ejecutar_simulacion(
         T_FINAL=T_FINAL, N=N, M=M,
-        prob_suscripcion_nuevo=prob_suscripcion, verbose=False
+        prob_suscripcion_nuevo=prob_suscripcion, verbose=False,
+        criterios_parada=criterios,
     )
 
 
+def _metricas_worker(worker_args):
+    """Worker para multiprocessing: métricas de la corrida (lo que se agrega y se guarda en el memo)."""
+    from simulacion.benchmark import extraer_metricas
+    return extraer_metricas(_run_single_worker(worker_args))
+
+
+def _mapear(funcion, items, workers, T_FINAL=None):
+    """
+    funcion sobre items, en un Pool si workers > 1 (con progreso cada 5% en serie).
+    Con T_FINAL (workers que devuelven MetricasResumen) los resultados vuelven por memoria compartida.
+    """
+    if workers > 1 and len(items) > 1:
+        from multiprocessing import Pool
+        chunksz = max(1, len(items) // (workers * 4))
+        with Pool(workers) as pool:
+            if T_FINAL is not None:
+                from simulacion.memoria_compartida import mapear_en_buffer
+                return mapear_en_buffer(pool, funcion, items, T_FINAL, chunksize=chunksz)
+            return pool.map(funcion, items, chunksize=chunksz)
+    intervalo = max(1, len(items) // 20)
+    salida = []
+    for k, item in enumerate(items):
+        if (k + 1) % intervalo == 0:
+            print(f"  Corrida {k + 1}/{len(items)}...")
+        salida.append(funcion(item))
+    return salida
+
+
 def _calcular_equilibrio_serie(agregado: dict) -> dict:
     """
     Calcula el punto de equilibrio más temprano y más tardío desde la serie
@@ -153,17 +181,37 @@ def main():
                         help="Semilla para reproducibilidad")
     parser.add_argument("--output-dir", "-o", default="benchmark_10_anos/casos_5_anos",
                         help="Directorio de salida (default: benchmark_10_anos/casos_5_anos)")
+    parser.add_argument("--parar-tras-equilibrio", type=int, default=None, metavar="DIAS",
+                        help="Estudio de equilibrio: cortar cada corrida DIAS días después del equilibrio")
+    parser.add_argument("--umbral-ruina", type=float, default=None, metavar="CREDITOS",
+                        help="Cortar la corrida cuando la pérdida acumulada supera CREDITOS")
+    parser.add_argument("--sin-memo", action="store_true",
+                        help="No reutilizar ni guardar corridas en el memo en disco (.cache_corridas/)")
+    parser.add_argument("--prefijos", action="store_true",
+                        help="Responder desde corridas guardadas de otro horizonte (truncar o reanudar); sin criterios de parada")
     args = parser.parse_args()
 
     output_base = Path(args.output_dir)
     output_base.mkdir(parents=True, exist_ok=True)
 
     from simulacion.benchmark import (
-        ejecutar_benchmark,
         agregar_metricas,
-        generar_graficos_benchmark,
+        trabajos_graficos_benchmark,
     )
-    from simulacion.graficos import generar_graficos
+    from simulacion.memo import MemoCorridas, clave_corrida, con_memo, semilla_configuracion
+    from simulacion.graficos import trabajos_graficos
+    from simulacion.render import renderizar
+    from simulacion.parada import construir_criterios
+
+    criterios = construir_criterios(args.parar_tras_equilibrio, args.umbral_ruina)
+    memo = None if args.sin_memo else MemoCorridas()
+    prefijos = None
+    if args.prefijos:
+        if criterios:
+            print("NOTA: --prefijos no aplica con criterios de parada; se ignora.")
+        else:
+            from simulacion.prefijos import ARCHIVO_PREFIJOS, con_prefijos
+            prefijos = MemoCorridas(archivo=ARCHIVO_PREFIJOS)
 
     print("=" * 70)
     print("BENCHMARK CASOS RELEVANTES")
@@ -172,67 +220,80 @@ def main():
     print(f"Total simulaciones: {len(CASOS_RELEVANTES) * args.runs}")
     print()
 
+    # Gráficos de todos los casos: se describen en el bucle y se renderizan juntos en paralelo
+    trabajos = []
     for i, caso in enumerate(CASOS_RELEVANTES):
         T_FINAL = caso["dias"]
         print(f"\n[{i+1}/{len(CASOS_RELEVANTES)}] {caso['nombre']}")
         print(f"  AB={caso['ab']}, N={caso['N']}, M={caso['M']}, {T_FINAL} días ({T_FINAL//365} años)")
 
-        if args.workers > 1:
-            from multiprocessing import Pool
+        base = semilla_configuracion(args.seed, caso["N"], caso["M"], caso["ab"])
+        worker_args = [
+            (j, T_FINAL, caso["N"], caso["M"], caso["ab"], base, criterios)
+            for j in range(args.runs)
+        ]
 
-            worker_args = [
-                (j, T_FINAL, caso["N"], caso["M"], caso["ab"], args.seed + i * 10000)
-                for j in range(args.runs)
-            ]
-            chunksz = max(1, args.runs // (args.workers * 4))
-            with Pool(args.workers) as pool:
-                resultados = list(pool.imap_unordered(_run_single_worker, worker_args, chunksize=chunksz))
-        else:
-            resultados = ejecutar_benchmark(
-                n_runs=args.runs,
-                T_FINAL=T_FINAL,
-                N=caso["N"],
-                M=caso["M"],
-                prob_suscripcion_nuevo=caso["ab"],
-                verbose=False,
-                seed=args.seed + i * 10000,
-                progress_interval=max(1, args.runs // 20),
-            )
-
-        agregado = agregar_metricas(resultados)
+        def _simular(indices, worker_args=worker_args, T_FINAL=T_FINAL):
+            pendientes = [worker_args[k] for k in indices]
+            if prefijos is not None:
+                tareas = [(a[1], a[2], a[3], a[4], a[5] + a[0]) for a in pendientes]
+                return con_prefijos(prefijos, tareas, lambda f, items: _mapear(f, items, args.workers))
+            return _mapear(_metricas_worker, pendientes, args.workers, T_FINAL=T_FINAL)
+
+        claves = [clave_corrida(T_FINAL, caso["N"], caso["M"], caso["ab"], a[5] + a[0], criterios) for a in worker_args]
+        aciertos_previos = memo.aciertos if memo else 0
+        metricas = con_memo(memo, claves, _simular)
+        if memo and memo.aciertos > aciertos_previos:
+            print(f"  Memo: {memo.aciertos - aciertos_previos} de {args.runs} corridas reutilizadas")
+
+        agregado = agregar_metricas(metricas, parametros={"T_FINAL": T_FINAL, "N": caso["N"], "M": caso["M"]})
 
         # Directorio de salida para este caso
         caso_dir = output_base / caso["id"]
         caso_dir.mkdir(parents=True, exist_ok=True)
 
         # 1. Gráficos de benchmark agregado (boxplot, serie_beneficio_acumulado)
-        generar_graficos_benchmark(agregado, output_dir=str(caso_dir))
+        trabajos.extend(trabajos_graficos_benchmark(agregado, str(caso_dir)))
 
         # Calcular puntos de equilibrio (más temprano y más tardío) desde la serie ±1σ
         equilibrio_info = _calcular_equilibrio_serie(agregado)
         equilibrio_info["caso_id"] = caso["id"]
         equilibrio_info["caso_nombre"] = caso["nombre"]
+        # Con parada anticipada la serie congela las truncadas en su día de parada (censura):
+        # la banda ya no es la de corridas completas
+        equilibrio_info["corridas_truncadas"] = agregado["n_truncadas"]
         with open(caso_dir / "equilibrio_info.json", "w", encoding="utf-8") as f:
             import json
             json.dump(equilibrio_info, f, indent=2, ensure_ascii=False)
 
-        # 2. Gráficos de ejemplo (una corrida representativa: la más cercana a la mediana)
-        metricas = agregado["metricas_por_run"]
+        # 2. Gráficos de ejemplo (una corrida representativa: la más cercana a la mediana,
+        #    re-simulada con su semilla para tener el estado completo)
         beneficios = [m.beneficio_final for m in metricas]
         mediana_val = sorted(beneficios)[len(beneficios) // 2]
         mediana_idx = min(range(len(beneficios)), key=lambda k: abs(beneficios[k] - mediana_val))
-        estado_ejemplo = resultados[mediana_idx]
+        estado_ejemplo = _run_single_worker(worker_args[mediana_idx])
 
         ejemplo_dir = caso_dir / "ejemplo"
         ejemplo_dir.mkdir(parents=True, exist_ok=True)
-        generar_graficos(estado_ejemplo, output_dir=str(ejemplo_dir))
+        trabajos.extend(trabajos_graficos(estado_ejemplo, str(ejemplo_dir)))
 
-        print(f"  Gráficos guardados en: {caso_dir}/")
+        print(f"  Gráficos en: {caso_dir}/")
         if equilibrio_info.get("semana_mas_temprano") is not None:
             print(f"  Equilibrio: más temprano semana {equilibrio_info['semana_mas_temprano']}, "
                   f"más tardío semana {equilibrio_info['semana_mas_tardio']}")
         else:
             print(f"  Equilibrio: no alcanzado en el periodo")
+        if agregado["n_truncadas"]:
+            print(f"  ({agregado['n_truncadas']} corridas truncadas: la banda usa su valor al día de parada)")
+
+    for m in (memo, prefijos):
+        if m is not None:
+            if m.descartadas:
+                print(f"Memo: {m.descartadas} entradas sin guardar por superar el límite (ver python run_memo.py)")
+            m.cerrar()
+
+    generados = renderizar(trabajos)
+    print(f"\nGráficos renderizados: {len(generados)} de {len(trabajos)} (el resto sin cambios)")
 
     # Actualizar informe HTML con los puntos de equilibrio
     _actualizar_informe_equilibrios(output_base)
@@ -12,6 +12,13 @@ Uso:
   python run_benchmark_completo.py          # 5000 corridas por config (default)
   python run_benchmark_completo.py --runs 100 --rapido  # Prueba rapida
   python run_benchmark_completo.py --workers 4          # Paralelo (4 nucleos)
+  python run_benchmark_completo.py --almacen            # + almacen binario por corrida
+  python run_benchmark_completo.py --series-diarias     # + series diarias memory-mapped por config
+  python run_benchmark_completo.py --workers 8 --progreso-puerto 8765  # progreso JSON en http://127.0.0.1:8765/
+  python run_benchmark_completo.py --seleccion ocba --metrica equilibrio_dia --top-k 3 --workers 8
+  python run_benchmark_completo.py --append-runs 5000 --workers 8  # suma corridas nuevas a resultados_benchmark.json
+  python run_benchmark_completo.py --prefijos --workers 8  # reusar/extender corridas guardadas de otro horizonte
+  python run_benchmark_completo.py --modo agregado --runs 5000  # barrido aproximado por lotes (ver README)
 """
 
 import argparse
@@ -23,9 +30,20 @@ from pathlib import Path
 from datetime import datetime
 from multiprocessing import Pool
 
-sys.path.insert(0, ".")
-
-PROGRESO_INTERVALO_SEG = 60  # Imprimir progreso cada 60 segundos
+PROGRESO_INTERVALO_SEG = 60  # Vista de progreso en terminal cada 60 segundos (default)
+# --modo agregado: corridas por lote de simulacion.agregado. Los lotes cubren índices [b·L, (b+1)·L)
+# con semilla base + b·L, así que la corrida j sale igual sin importar cuántas se pidan
+LOTE_AGREGADO = 256
+
+# Métricas para --seleccion y sentido por defecto (equilibrio_dia sin equilibrio cuenta como T_FINAL + 1)
+METRICAS_SELECCION = {
+    "beneficio_final": "max",
+    "beneficio_anualizado": "max",
+    "mejor_trimestre_beneficio": "max",
+    "suscripciones_final": "max",
+    "equilibrio_dia": "min",
+    "drawdown_maximo": "min",
+}
 
 # Configuración del benchmark
 T_ANOS = 10
@@ -52,17 +70,77 @@ MARKETING_CONFIGS = [
 
 
 def _run_single(args):
-    """Worker para multiprocessing: ejecuta una simulacion y retorna el estado."""
-    i, T_FINAL, N, M, prob_suscripcion, seed = args
+    """
+    Worker para multiprocessing: ejecuta una simulacion y retorna sus MetricasResumen
+    (lo que se agrega y se guarda en el memo; más liviano de devolver que el estado).
+    Si archivo_series no es None, escribe la serie diaria en la fila i del archivo memory-mapped.
+    Publica la corrida terminada en la cola de progreso (si el proceso fue inicializado con una).
+    """
+    i, T_FINAL, N, M, prob_suscripcion, seed, archivo_series, config_idx = args
     import random
-    sys.path.insert(0, ".")
     from simulacion.principal import ejecutar_simulacion
+    from simulacion.benchmark import extraer_metricas
+    from simulacion.progreso import notificar_corrida
     if seed is not None:
         random.seed(seed + i)
-    return ejecutar_simulacion(T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion, verbose=False)
+    t_inicio = time.time()
+    est = ejecutar_simulacion(T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion, verbose=False)
+    if archivo_series is not None:
+        from simulacion.series_diarias import escribir_serie
+        escribir_serie(archivo_series, i, est.beneficio_acumulado_por_dia)
+    beneficio_final = est.beneficio_acumulado_por_dia[-1] if est.beneficio_acumulado_por_dia else 0.0
+    notificar_corrida(config_idx, t_inicio, time.time(), beneficio_final)
+    return extraer_metricas(est)
+
+
+def _lote_agregado(args):
+    """
+    Worker de --modo agregado: simula el lote completo de LOTE_AGREGADO corridas que empieza en
+    'inicio' y devuelve las MetricasResumen de los índices pedidos (en ese orden). Cada corrida
+    pedida se publica en la cola de progreso con una fracción igual del tiempo del lote.
+    """
+    inicio, pedidos, T_FINAL, N, M, prob_suscripcion, semilla, archivo_series, config_idx = args
+    from simulacion.agregado import simular_lote
+    from simulacion.benchmark import extraer_metricas
+    from simulacion.progreso import notificar_corrida
+    t_inicio = time.time()
+    estados = simular_lote(T_FINAL, N, M, prob_suscripcion, replicas=LOTE_AGREGADO, semilla=semilla)
+    paso = (time.time() - t_inicio) / max(1, len(pedidos))
+    salida = []
+    for k, j in enumerate(pedidos):
+        est = estados[j - inicio]
+        if archivo_series is not None:
+            from simulacion.series_diarias import escribir_serie
+            escribir_serie(archivo_series, j, est.beneficio_acumulado_por_dia)
+        beneficio_final = est.beneficio_acumulado_por_dia[-1] if est.beneficio_acumulado_por_dia else 0.0
+        notificar_corrida(config_idx, t_inicio + k * paso, t_inicio + (k + 1) * paso, beneficio_final)
+        salida.append(extraer_metricas(est))
+    return salida
+
+
+def _registro_worker(args):
+    """Worker de --prefijos: simular_registro((tarea, previo)) y publicar la corrida en la cola de progreso."""
+    trabajo, config_idx = args
+    from simulacion.prefijos import simular_registro
+    from simulacion.progreso import notificar_corrida
+    t_inicio = time.time()
+    registro = simular_registro(trabajo)
+    notificar_corrida(config_idx, t_inicio, time.time(), registro.beneficio_final)
+    return registro
+
+
+def _valor_metrica(metricas, metrica: str, T_FINAL: int) -> float:
+    """Valor de la métrica de selección en una corrida (equilibrio no alcanzado = T_FINAL + 1)."""
+    valor = getattr(metricas, metrica)
+    if valor is None:
+        return float(T_FINAL + 1) if metrica == "equilibrio_dia" else 0.0
+    return float(valor)
 
 
 def main():
+    from simulacion.memo import ESQUEMA_SEMILLAS
+    from simulacion.principal import MODO_AGREGADO, MODO_DETALLADO, MODOS
+
     parser = argparse.ArgumentParser(
         description="Benchmark completo: AB testing, releases, marketing a 10 años."
     )
@@ -78,7 +156,42 @@ def main():
                         help="Workers en paralelo (default: 1, usar 4-8 para acelerar)")
     parser.add_argument("--solo-graficos", action="store_true",
                         help="Solo generar graficos desde JSON existente (sin ejecutar benchmark)")
+    parser.add_argument("--almacen", action="store_true",
+                        help="Guardar escalares y series semanales por corrida en almacen/<config>/ (binario)")
+    parser.add_argument("--comprimir-almacen", action="store_true",
+                        help="Con --almacen: usar .npz comprimido en lugar de .npy por columna")
+    parser.add_argument("--series-diarias", action="store_true",
+                        help="Guardar beneficio acumulado diario por corrida en series_diarias/<config>.npy (memory-mapped)")
+    parser.add_argument("--progreso-puerto", type=int, default=None,
+                        help="Servir el progreso como JSON en http://127.0.0.1:PUERTO/ (corridas/s, ETA, workers, IC95)")
+    parser.add_argument("--progreso-intervalo", type=float, default=PROGRESO_INTERVALO_SEG,
+                        help=f"Segundos entre vistas de progreso en terminal (0 = desactivar, default: {PROGRESO_INTERVALO_SEG})")
+    parser.add_argument("--sin-memo", action="store_true",
+                        help="No reutilizar ni guardar corridas en el memo en disco (.cache_corridas/)")
+    parser.add_argument("--prefijos", action="store_true",
+                        help="Responder desde corridas guardadas de otro horizonte (truncar o reanudar); no con --series-diarias")
+    parser.add_argument("--modo", choices=MODOS, default=MODO_DETALLADO,
+                        help=f"Motor: detallado (default) o agregado (lotes de {LOTE_AGREGADO} corridas de "
+                             "simulacion.agregado, aproximado; sin --prefijos ni --seleccion; ver README)")
+    parser.add_argument("--append-runs", type=int, default=None, metavar="N",
+                        help="Simular N corridas nuevas por config y combinarlas con resultados_benchmark.json existente")
+    parser.add_argument("--seleccion", choices=["halving", "ocba"], default=None,
+                        help="Solo identificar las mejores configs (successive halving u OCBA) en lugar del barrido completo")
+    parser.add_argument("--metrica", choices=sorted(METRICAS_SELECCION), default="beneficio_final",
+                        help="Con --seleccion: métrica a comparar (default: beneficio_final)")
+    parser.add_argument("--sentido", choices=["max", "min"], default=None,
+                        help="Con --seleccion: maximizar o minimizar la métrica (default: según la métrica)")
+    parser.add_argument("--top-k", type=int, default=1,
+                        help="Con --seleccion: cantidad de configuraciones a identificar (default: 1)")
+    parser.add_argument("--presupuesto-seleccion", type=int, default=None,
+                        help="Con --seleccion: corridas totales (default: 20%% del barrido completo)")
+    parser.add_argument("--n0", type=int, default=20,
+                        help="Con --seleccion: réplicas iniciales por configuración (default: 20)")
+    parser.add_argument("--alfa", type=float, default=0.05,
+                        help="Con --seleccion: 1 - probabilidad de selección correcta garantizada (default: 0.05)")
     args = parser.parse_args()
+    if args.modo == MODO_AGREGADO and (args.prefijos or args.seleccion):
+        parser.error("--modo agregado no admite --prefijos ni --seleccion")
 
     output_dir = Path(args.output_dir)
     if args.solo_graficos:
@@ -102,93 +215,186 @@ def main():
     else:
         configs = _configs_completos()
 
+    if args.seleccion:
+        _ejecutar_seleccion(args, configs, n_runs)
+        return
+
+    previos = None
+    if args.append_runs:
+        json_path = output_dir / "resultados_benchmark.json"
+        if not json_path.exists():
+            print(f"Error: No existe {json_path}. Ejecuta el benchmark primero.")
+            sys.exit(1)
+        if args.almacen or args.series_diarias:
+            print("Error: --append-runs no admite --almacen ni --series-diarias.")
+            sys.exit(1)
+        with open(json_path, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        previos = datos["resultados"]
+        if any("agregadores" not in r for r in previos):
+            print(f"Error: {json_path} no guarda estado de agregadores (generado con una versión anterior).")
+            sys.exit(1)
+        esquema = datos["parametros"].get("esquema_semillas", 1)
+        if esquema != ESQUEMA_SEMILLAS:
+            print(f"Error: {json_path} usa el esquema de semillas {esquema} y este script el {ESQUEMA_SEMILLAS}; "
+                  "las corridas nuevas no serían independientes de las guardadas. Regenerar sin --append-runs.")
+            sys.exit(1)
+        if (datos["parametros"].get("seed", args.seed) != args.seed or datos["parametros"]["T_FINAL"] != DIAS_10_ANOS
+                or datos["parametros"].get("modo", MODO_DETALLADO) != args.modo):
+            print(f"Error: --seed, --modo y T_FINAL deben coincidir con los de {json_path} "
+                  f"(seed={datos['parametros'].get('seed')}, modo={datos['parametros'].get('modo', MODO_DETALLADO)}, "
+                  f"T_FINAL={datos['parametros']['T_FINAL']}).")
+            sys.exit(1)
+        configs = [r["config"] for r in previos]
+        n_runs = max(1, args.append_runs)
+
     print("=" * 70)
     print("BENCHMARK COMPLETO - 10 ANOS")
     print("=" * 70)
     print(f"Corridas por config: {n_runs}")
     print(f"Total configuraciones: {len(configs)}")
     print(f"Simulaciones totales: {len(configs) * n_runs}")
-    print(f"Progreso cada {PROGRESO_INTERVALO_SEG} segundos.")
+    if previos is not None:
+        print(f"Modo --append-runs: se suman a {previos[0]['agregadores']['n_runs']} corridas previas por config")
+    if args.progreso_intervalo:
+        print(f"Progreso cada {args.progreso_intervalo:g} segundos.")
+    if args.progreso_puerto is not None:
+        print(f"Progreso JSON: http://127.0.0.1:{args.progreso_puerto}/")
     print()
 
-    from simulacion.benchmark import ejecutar_benchmark, agregar_metricas
+    from simulacion.agregadores import EstadoBenchmark, estado_desde_metricas
+    from simulacion.benchmark import agregar_metricas
+    from simulacion.memo import MemoCorridas, clave_corrida, con_memo, semilla_configuracion
+    from simulacion.memoria_compartida import mapear_en_buffer
+    from simulacion.progreso import ServicioProgreso, formatear_resumen, inicializar_worker
+
+    # Las series diarias y el almacén necesitan la corrida completa (el memo guarda escalares y
+    # la serie de beneficio): con --series-diarias o --almacen no se usa
+    memo = None if args.sin_memo or args.series_diarias or args.almacen else MemoCorridas()
+    prefijos = None
+    if args.prefijos and not args.series_diarias:
+        from simulacion.prefijos import ARCHIVO_PREFIJOS, con_prefijos
+        prefijos = MemoCorridas(archivo=ARCHIVO_PREFIJOS)
 
-    progress_int = 500 if n_runs >= 100 else None
     n_workers = max(1, args.workers)
     if n_runs >= 1000 and n_workers == 1:
         print("NOTA: Con 5000 corridas, el benchmark puede tardar varias horas.")
         print("      Usa --workers 4 o --workers 8 para acelerar.")
         print()
 
-    def _callback_progreso_minuto(config_actual, total_configs, n_runs):
-        """Retorna callback que imprime progreso cada PROGRESO_INTERVALO_SEG segundos."""
-        last_print = [time.time()]
-
-        def cb(completadas, total):
-            ahora = time.time()
-            if ahora - last_print[0] >= PROGRESO_INTERVALO_SEG:
-                corridas_previas = (config_actual - 1) * n_runs
-                total_corridas = total_configs * n_runs
-                completadas_global = corridas_previas + completadas
-                pct = 100 * completadas_global / total_corridas
-                print(f"  [PROGRESO] Config {config_actual}/{total_configs} | "
-                      f"Corridas {completadas}/{total} ({100*completadas/total:.1f}%) | "
-                      f"Total ~{pct:.1f}% | {datetime.now().strftime('%H:%M:%S')}", flush=True)
-                last_print[0] = ahora
-        return cb
+    servicio = ServicioProgreso(
+        len(configs) * n_runs,
+        puerto=args.progreso_puerto,
+        intervalo_terminal=args.progreso_intervalo or None,
+    ).iniciar()
+    if n_workers == 1:
+        # Corridas en el proceso principal: publican en la misma cola que los workers
+        inicializar_worker(servicio.cola)
 
     resultados = []
     for i, cfg in enumerate(configs):
         print(f"\n[{i+1}/{len(configs)}] AB={cfg['ab_label']}, Releases={cfg['releases_label']}, MKT={cfg['marketing_label']}")
-        if n_workers > 1:
-            worker_args = [
-                (j, DIAS_10_ANOS, cfg["N"], cfg["M"], cfg["ab"], args.seed + i * 10000)
-                for j in range(n_runs)
-            ]
-            chunksz = max(1, n_runs // (n_workers * 4))
-            with Pool(n_workers) as pool:
-                res = []
-                last_print = time.time()
-                for j, est in enumerate(pool.imap_unordered(_run_single, worker_args, chunksize=chunksz)):
-                    res.append(est)
-                    ahora = time.time()
-                    if ahora - last_print >= PROGRESO_INTERVALO_SEG:
-                        corridas_previas = i * n_runs
-                        total_corridas = len(configs) * n_runs
-                        completadas_global = corridas_previas + len(res)
-                        pct = 100 * completadas_global / total_corridas
-                        print(f"  [PROGRESO] Config {i+1}/{len(configs)} | "
-                              f"Corridas {len(res)}/{n_runs} ({100*len(res)/n_runs:.1f}%) | "
-                              f"Total ~{pct:.1f}% | {datetime.now().strftime('%H:%M:%S')}", flush=True)
-                        last_print = ahora
-        else:
-            progress_cb = _callback_progreso_minuto(i + 1, len(configs), n_runs)
-            res = ejecutar_benchmark(
-                n_runs=n_runs,
-                T_FINAL=DIAS_10_ANOS,
-                N=cfg["N"],
-                M=cfg["M"],
-                prob_suscripcion_nuevo=cfg["ab"],
-                verbose=False,
-                seed=args.seed + i * 10000,
-                progress_interval=progress_int,
-                progress_callback=progress_cb,
-            )
-        agregado = agregar_metricas(res)
+        servicio.registrar_config(i, _slug_config(cfg), n_runs)
+        archivo_series = None
+        if args.series_diarias:
+            from simulacion.series_diarias import crear_archivo_series
+            archivo_series = str(crear_archivo_series(
+                output_dir / "series_diarias" / f"{_slug_config(cfg)}.npy", n_runs, DIAS_10_ANOS
+            ))
+        primera = previos[i]["agregadores"]["n_runs"] if previos is not None else 0
+        base = semilla_configuracion(args.seed, cfg["N"], cfg["M"], cfg["ab"])
+        worker_args = [
+            (j, DIAS_10_ANOS, cfg["N"], cfg["M"], cfg["ab"], base, archivo_series, i)
+            for j in range(primera, primera + n_runs)
+        ]
+
+        def _mapear(funcion, items, metricas=False):
+            # metricas=True: funcion devuelve MetricasResumen, que vuelven por memoria compartida
+            if n_workers > 1 and len(items) > 1:
+                chunksz = max(1, len(items) // (n_workers * 4))
+                with Pool(n_workers, initializer=inicializar_worker, initargs=(servicio.cola,)) as pool:
+                    if metricas:
+                        return mapear_en_buffer(pool, funcion, items, DIAS_10_ANOS, chunksize=chunksz)
+                    return pool.map(funcion, items, chunksize=chunksz)
+            return [funcion(a) for a in items]
+
+        def _simular(indices, worker_args=worker_args, i=i, base=base, archivo_series=archivo_series):
+            pendientes = [worker_args[k] for k in indices]
+            if args.modo == MODO_AGREGADO:
+                por_lote = {}
+                for a in pendientes:
+                    por_lote.setdefault(a[0] // LOTE_AGREGADO * LOTE_AGREGADO, []).append(a[0])
+                lotes = [
+                    (inicio, pedidos, DIAS_10_ANOS, cfg["N"], cfg["M"], cfg["ab"], base + inicio, archivo_series, i)
+                    for inicio, pedidos in sorted(por_lote.items())
+                ]
+                por_indice = {
+                    j: m for lote, salida in zip(lotes, _mapear(_lote_agregado, lotes)) for j, m in zip(lote[1], salida)
+                }
+                return [por_indice[a[0]] for a in pendientes]
+            if prefijos is None:
+                return _mapear(_run_single, pendientes, metricas=True)
+            tareas = [(a[1], a[2], a[3], a[4], a[5] + a[0]) for a in pendientes]
+            simuladas = []
+
+            def _mapear_registros(_, trabajos):
+                simuladas.extend(trabajos)
+                return _mapear(_registro_worker, [(t, i) for t in trabajos])
+
+            metricas = con_prefijos(prefijos, tareas, _mapear_registros)
+            # Las que se respondieron truncando un registro más largo no pasaron por el worker
+            servicio.descontar(len(pendientes) - len(simuladas))
+            return metricas
+
+        lote = LOTE_AGREGADO if args.modo == MODO_AGREGADO else 1
+        claves = [clave_corrida(DIAS_10_ANOS, cfg["N"], cfg["M"], cfg["ab"], a[5] + a[0], modo=args.modo, lote=lote)
+                  for a in worker_args]
+        aciertos_previos = memo.aciertos if memo else 0
+        res = con_memo(memo, claves, _simular)
+        if memo and memo.aciertos > aciertos_previos:
+            servicio.descontar(memo.aciertos - aciertos_previos)
+            print(f"  Memo: {memo.aciertos - aciertos_previos} de {len(worker_args)} corridas reutilizadas")
+        agregado = agregar_metricas(res, parametros={"T_FINAL": DIAS_10_ANOS, "N": cfg["N"], "M": cfg["M"]})
         agregado["config"] = cfg
+        estado = estado_desde_metricas(agregado["metricas_por_run"])
+        if previos is not None:
+            estado = EstadoBenchmark.desde_dict(previos[i]["agregadores"]).combinar(estado)
+            agregado["estadisticas"] = estado.estadisticas()
+            agregado["series_agregadas"] = estado.series_agregadas()
+        agregado["estado_agregado"] = estado
+        if args.almacen:
+            from simulacion.almacen import guardar_almacen
+            rel = Path("almacen") / _slug_config(cfg)
+            guardar_almacen(
+                output_dir / rel,
+                agregado["metricas_por_run"],
+                parametros={"T_FINAL": DIAS_10_ANOS, "seed": args.seed, "semilla_base": base, "config": cfg},
+                comprimir=args.comprimir_almacen,
+            )
+            agregado["almacen"] = rel.as_posix()
         resultados.append(agregado)
 
+    print(formatear_resumen(servicio.detener()))
+    for m in (memo, prefijos):
+        if m is not None:
+            if m.descartadas:
+                print(f"Memo: {m.descartadas} entradas sin guardar por superar el límite (ver python run_memo.py)")
+            m.cerrar()
+
     # Guardar resultados
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     export = {
         "fecha": datetime.now().isoformat(),
-        "parametros": {"T_FINAL": DIAS_10_ANOS, "n_runs": n_runs},
+        "parametros": {"T_FINAL": DIAS_10_ANOS, "n_runs": resultados[0]["estado_agregado"].n_runs, "seed": args.seed,
+                       "modo": args.modo, "esquema_semillas": ESQUEMA_SEMILLAS},
         "resultados": [
             {
                 "config": r["config"],
                 "estadisticas": r["estadisticas"],
+                **({"almacen": r["almacen"]} if "almacen" in r else {}),
+                "agregadores": r["estado_agregado"].a_dict(),
             }
             for r in resultados
         ],
@@ -210,6 +416,101 @@ def main():
     print(f"Gráficos y conclusiones en: {output_dir}/")
 
 
+def _ejecutar_seleccion(args, configs: list, n_runs: int) -> None:
+    """Modo --seleccion: lotes chicos para todas las configs, réplicas concentradas en las que compiten."""
+    from simulacion.memo import MemoCorridas, clave_corrida, con_memo, semilla_configuracion
+    from simulacion.memoria_compartida import mapear_en_buffer
+    from simulacion.seleccion import seleccionar
+
+    sentido = args.sentido or METRICAS_SELECCION[args.metrica]
+    presupuesto = args.presupuesto_seleccion or max(len(configs) * args.n0, len(configs) * n_runs // 5)
+    n_workers = max(1, args.workers)
+
+    print("=" * 70)
+    print(f"SELECCIÓN DE CONFIGURACIONES ({args.seleccion.upper()})")
+    print("=" * 70)
+    print(f"Métrica: {args.metrica} ({sentido}) | top-{args.top_k} de {len(configs)} configs")
+    print(f"Presupuesto: {presupuesto} corridas (barrido completo: {len(configs) * n_runs})")
+    print()
+
+    pool = Pool(n_workers) if n_workers > 1 else None
+    memo = None if args.sin_memo else MemoCorridas()
+    bases = [semilla_configuracion(args.seed, c["N"], c["M"], c["ab"]) for c in configs]
+
+    def _evaluar(pares):
+        worker_args = [
+            (j, DIAS_10_ANOS, configs[i]["N"], configs[i]["M"], configs[i]["ab"], bases[i], None, i)
+            for i, j in pares
+        ]
+
+        def _simular(indices):
+            pendientes = [worker_args[k] for k in indices]
+            if pool is not None:
+                return mapear_en_buffer(pool, _run_single, pendientes, DIAS_10_ANOS,
+                                        chunksize=max(1, len(pendientes) // (n_workers * 4)))
+            return [_run_single(a) for a in pendientes]
+
+        claves = [clave_corrida(DIAS_10_ANOS, a[2], a[3], a[4], a[5] + a[0]) for a in worker_args]
+        metricas = con_memo(memo, claves, _simular)
+        return [_valor_metrica(m, args.metrica, DIAS_10_ANOS) for m in metricas]
+
+    def _mostrar(fila):
+        eliminadas = ", ".join(_slug_config(configs[i]) for i in fila["eliminadas"]) or "-"
+        print(f"  Ronda {fila['ronda']}: {fila['corridas']} corridas | activas {len(fila['activas'])} | "
+              f"eliminadas: {eliminadas}")
+
+    try:
+        r = seleccionar(
+            len(configs), _evaluar, presupuesto,
+            k=args.top_k, metodo=args.seleccion, maximizar=sentido == "max",
+            n0=args.n0, alfa=args.alfa, callback=_mostrar,
+        )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if memo is not None:
+            if memo.descartadas:
+                print(f"Memo: {memo.descartadas} entradas sin guardar por superar el límite (ver python run_memo.py)")
+            memo.cerrar()
+
+    print()
+    print(f"Seleccionadas (mejor primero), {r.corridas} corridas:")
+    for i in r.seleccionadas:
+        c = r.por_config[i]
+        print(f"  {_slug_config(configs[i])}: media {c['media']:,.2f} ± {c['error_estandar'] or 0:,.2f} (n={c['n']})")
+    if r.pcs_garantizada is not None:
+        print(f"P(selección correcta) >= {r.pcs_garantizada:.3f} (eliminación por intervalos t, corridas normales)")
+    else:
+        print("P(selección correcta): sin garantía de intervalos (presupuesto agotado o corte de halving)")
+    print(f"P(selección correcta) estimada (cota de Bonferroni): {r.pcs_estimada:.3f}")
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    export = {
+        "fecha": datetime.now().isoformat(),
+        "parametros": {
+            "T_FINAL": DIAS_10_ANOS, "metodo": r.metodo, "metrica": args.metrica, "sentido": sentido,
+            "top_k": r.k, "presupuesto": presupuesto, "n0": args.n0, "alfa": args.alfa, "seed": args.seed,
+        },
+        "seleccionadas": [configs[i] for i in r.seleccionadas],
+        "pcs_garantizada": r.pcs_garantizada,
+        "pcs_estimada": r.pcs_estimada,
+        "corridas": r.corridas,
+        "por_config": [{"config": configs[c["indice"]], **c} for c in r.por_config],
+        "rondas": r.rondas,
+    }
+    json_path = output_dir / f"seleccion_{args.metrica}.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(export, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en: {json_path}")
+
+
+def _slug_config(cfg: dict) -> str:
+    """Nombre de directorio estable para una configuración (ej: ab50-50_Mensuales_mkt1500)."""
+    return f"ab{cfg['ab_label']}_{cfg['releases_label']}_mkt{cfg['marketing_label']}"
+
+
 def _configs_completos():
     """Todas las combinaciones (27 configs)."""
     configs = []
@@ -259,118 +560,179 @@ def _configs_rapido():
     return configs
 
 
-def generar_graficos_comparativos(resultados: list, output_dir: str) -> None:
-    """Genera gráficos comparativos por variable."""
+def generar_graficos_comparativos(resultados: list, output_dir: str, workers=None) -> None:
+    """Genera gráficos comparativos por variable (renderizados en paralelo con simulacion.render)."""
     try:
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
+        import matplotlib  # noqa: F401
         import numpy as np
     except ImportError:
         print("AVISO: matplotlib no instalado. Saltando graficos.")
         return
+    from simulacion.render import renderizar, trabajo
 
     os.makedirs(output_dir, exist_ok=True)
 
-    def _media_std(r, key):
-        s = r["estadisticas"].get(key, {})
-        return s.get("media", 0), s.get("std", 0)
+    def _t(funcion, archivo, **datos):
+        return trabajo(funcion, os.path.join(output_dir, archivo), **datos)
+
+    def _media_por(clave_config, labels):
+        """Promedio de media y std de beneficio_final entre configs con el mismo valor de una variable."""
+        medias_out, stds_out = [], []
+        for lab in labels:
+            vals = [r for r in resultados if r["config"][clave_config] == lab]
+            if vals:
+                medias = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) for r in vals]
+                stds = [r["estadisticas"].get("beneficio_final", {}).get("std", 0) for r in vals]
+                medias_out.append(float(np.mean(medias)))
+                stds_out.append(float(np.mean(stds)) if stds else 0)
+            else:
+                medias_out.append(0)
+                stds_out.append(0)
+        return medias_out, stds_out
+
+    ab_labels = [x[1] for x in AB_CONFIGS]
+    rel_labels = [x[1] for x in RELEASES_CONFIGS]
+    mkt_labels = [x[1] for x in MARKETING_CONFIGS]
+    trabajos = []
 
     # 1. Comparación por AB testing
-    ab_data = {}
+    ab_medias, ab_stds = _media_por("ab_label", ab_labels)
+    trabajos.append(_t(
+        _grafico_barras_error, "comparacion_AB.png",
+        ticklabels=[f"AB {l}" for l in ab_labels], medias=ab_medias, stds=ab_stds,
+        color=["#e74c3c", "#3498db", "#2ecc71"],
+        titulo="Beneficio final por AB Testing (Suscripción vs Prepago)",
+    ))
+
+    # 2. Comparación por Releases
+    rel_medias, rel_stds = _media_por("releases_label", rel_labels)
+    trabajos.append(_t(
+        _grafico_barras_error, "comparacion_Releases.png",
+        ticklabels=rel_labels, medias=rel_medias, stds=rel_stds, color="steelblue",
+        titulo="Beneficio final por Frecuencia de Releases",
+    ))
+
+    # 3. Comparación por Marketing
+    mkt_medias, mkt_stds = _media_por("marketing_label", mkt_labels)
+    trabajos.append(_t(
+        _grafico_barras_error, "comparacion_Marketing.png",
+        ticklabels=[f"{l} créditos" for l in mkt_labels], medias=mkt_medias, stds=mkt_stds, color="coral",
+        titulo="Beneficio final por Presupuesto Marketing",
+    ))
+
+    # 4. Heatmap o tabla comparativa: todas las configs
+    trabajos.append(_t(
+        _grafico_comparacion_todas, "comparacion_todas.png",
+        config_labels=[f"{r['config']['ab_label']}\n{r['config']['releases_label']}\n{r['config']['marketing_label']}" for r in resultados],
+        beneficios=[r["estadisticas"].get("beneficio_final", {}).get("media", 0) for r in resultados],
+    ))
+
+    # 5. Equilibrio por config (heatmap en lugar de barras para evitar etiquetas ilegibles)
+    # Matrices: filas = AB, columnas = Releases; una por presupuesto de marketing
+    eq_dict = {}
     for r in resultados:
-        ab = r["config"]["ab_label"]
-        if ab not in ab_data:
-            ab_data[ab] = []
-        m, std = _media_std(r, "beneficio_final")
-        ab_data[ab].append((m, std))
-
-    # Promediar si hay múltiples configs con mismo AB
-    ab_labels = list(AB_CONFIGS)
-    ab_labels = [x[1] for x in ab_labels]
-    ab_medias = []
-    ab_stds = []
+        c = r["config"]
+        eq_dict[(c["ab_label"], c["releases_label"], c["marketing_label"])] = r["estadisticas"].get("equilibrio_porcentaje", 0)
+    trabajos.append(_t(
+        _grafico_equilibrio_por_config, "equilibrio_por_config.png",
+        ab_labels=ab_labels, rel_labels=rel_labels, mkt_labels=mkt_labels,
+        matrices=[[[eq_dict.get((ab, rel, mkt), 0) for rel in rel_labels] for ab in ab_labels] for mkt in mkt_labels],
+    ))
+
+    # 6. Satisfacción por tipo de release
+    sat_por_release = {r: [] for r in rel_labels}
+    for r in resultados:
+        sat = r["estadisticas"].get("satisfaccion_promedio_general", {}).get("media")
+        if sat is not None:
+            sat_por_release[r["config"]["releases_label"]].append(sat)
+    trabajos.append(_t(
+        _grafico_satisfaccion_por_release, "satisfaccion_por_release.png",
+        rel_labels=rel_labels,
+        sat_medias=[float(np.mean(sat_por_release[r])) if sat_por_release[r] else 0 for r in rel_labels],
+    ))
+
+    # 7. Usuarios finales (prepagos + suscripciones) por config
+    def _usuarios(r):
+        prep = r["estadisticas"].get("prepagos_final", {}).get("media", 0)
+        susc = r["estadisticas"].get("suscripciones_final", {}).get("media", 0)
+        return prep + susc
+    trabajos.append(_t(
+        _grafico_usuarios_finales, "usuarios_finales_por_config.png",
+        config_labels=[f"{r['config']['ab_label']}\n{r['config']['releases_label']}\nMKT{r['config']['marketing_label']}" for r in resultados],
+        usuarios=[_usuarios(r) for r in resultados],
+    ))
+
+    # 8. Entrada inicial: prepago vs suscripción (primeros 6 meses) por AB
+    prep_6m = []
+    susc_6m = []
     for ab in ab_labels:
         vals = [r for r in resultados if r["config"]["ab_label"] == ab]
-        if vals:
-            medias = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) for r in vals]
-            stds = [r["estadisticas"].get("beneficio_final", {}).get("std", 0) for r in vals]
-            ab_medias.append(np.mean(medias))
-            ab_stds.append(np.mean(stds) if stds else 0)
-        else:
-            ab_medias.append(0)
-            ab_stds.append(0)
+        preps = [r["estadisticas"].get("prepago_primeros_6_meses", {}).get("media") for r in vals]
+        suscs = [r["estadisticas"].get("suscripcion_primeros_6_meses", {}).get("media") for r in vals]
+        prep_6m.append(float(np.mean([p for p in preps if p is not None])) if preps else 0)
+        susc_6m.append(float(np.mean([s for s in suscs if s is not None])) if suscs else 0)
+    trabajos.append(_t(
+        _grafico_entrada_inicial, "entrada_inicial_prepago_vs_suscripcion.png",
+        ab_labels=ab_labels, prep_6m=prep_6m, susc_6m=susc_6m,
+    ))
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    x = np.arange(len(ab_labels))
-    ax.bar(x, ab_medias, yerr=ab_stds, capsize=5, color=["#e74c3c", "#3498db", "#2ecc71"], alpha=0.8)
-    ax.set_xticks(x)
-    ax.set_xticklabels([f"AB {l}" for l in ab_labels])
-    ax.set_ylabel("Beneficio final (créditos)")
-    ax.set_title("Beneficio final por AB Testing (Suscripción vs Prepago)")
-    ax.grid(True, alpha=0.3, axis="y")
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_AB.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    # 9. Día de equilibrio por release (solo configs que alcanzan equilibrio)
+    eq_dia_por_release = {r: [] for r in rel_labels}
+    for r in resultados:
+        eq_d = r["estadisticas"].get("equilibrio_dia", {})
+        if isinstance(eq_d, dict) and eq_d.get("media") is not None:
+            eq_dia_por_release[r["config"]["releases_label"]].append(eq_d["media"])
+    eq_medias = [np.mean(eq_dia_por_release[r]) if eq_dia_por_release[r] else np.nan for r in rel_labels]
+    valid = [i for i, v in enumerate(eq_medias) if not np.isnan(v)]
+    if valid:
+        trabajos.append(_t(
+            _grafico_dia_equilibrio_por_release, "dia_equilibrio_por_release.png",
+            x=[rel_labels[i] for i in valid], y=[float(eq_medias[i]) for i in valid],
+        ))
 
-    # 2. Comparación por Releases
-    rel_labels = [x[1] for x in RELEASES_CONFIGS]
-    rel_medias = []
-    rel_stds = []
-    for rel in rel_labels:
-        vals = [r for r in resultados if r["config"]["releases_label"] == rel]
-        if vals:
-            medias = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) for r in vals]
-            stds = [r["estadisticas"].get("beneficio_final", {}).get("std", 0) for r in vals]
-            rel_medias.append(np.mean(medias))
-            rel_stds.append(np.mean(stds) if stds else 0)
-        else:
-            rel_medias.append(0)
-            rel_stds.append(0)
+    # 10. Mejor vs Peor: comparación
+    best = max(resultados, key=lambda r: r["estadisticas"].get("beneficio_final", {}).get("media", 0))
+    worst = min(resultados, key=lambda r: r["estadisticas"].get("beneficio_final", {}).get("media", float("inf")))
+    paneles = []
+    for r, titulo, color in [(best, "Mejor configuración", "#2ecc71"), (worst, "Peor configuración", "#e74c3c")]:
+        c = r["config"]
+        st = r["estadisticas"]
+        bf = st.get("beneficio_final", {}).get("media", 0) / 1e6
+        eq = st.get("equilibrio_porcentaje", 0)
+        sat = st.get("satisfaccion_promedio_general", {}).get("media", 0) or 0
+        usr = _usuarios(r)
+        paneles.append({
+            "titulo": f"{titulo}\n{c['ab_label']} / {c['releases_label']} / MKT{c['marketing_label']}",
+            "color": color,
+            "valores": [bf, eq, sat, usr / 10],  # usuarios/10 para escala
+        })
+    trabajos.append(_t(_grafico_mejor_vs_peor, "mejor_vs_peor_config.png", paneles=paneles))
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    x = np.arange(len(rel_labels))
-    ax.bar(x, rel_medias, yerr=rel_stds, capsize=5, color="steelblue", alpha=0.8)
-    ax.set_xticks(x)
-    ax.set_xticklabels(rel_labels)
-    ax.set_ylabel("Beneficio final (créditos)")
-    ax.set_title("Beneficio final por Frecuencia de Releases")
-    ax.grid(True, alpha=0.3, axis="y")
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_Releases.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    renderizar(trabajos, workers=workers)
+    print(f"Gráficos guardados en: {output_dir}/")
 
-    # 3. Comparación por Marketing
-    mkt_labels = [x[1] for x in MARKETING_CONFIGS]
-    mkt_medias = []
-    mkt_stds = []
-    for mkt in mkt_labels:
-        vals = [r for r in resultados if r["config"]["marketing_label"] == mkt]
-        if vals:
-            medias = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) for r in vals]
-            stds = [r["estadisticas"].get("beneficio_final", {}).get("std", 0) for r in vals]
-            mkt_medias.append(np.mean(medias))
-            mkt_stds.append(np.mean(stds) if stds else 0)
-        else:
-            mkt_medias.append(0)
-            mkt_stds.append(0)
+
+def _grafico_barras_error(ticklabels, medias, stds, color, titulo):
+    import matplotlib.pyplot as plt
+    import numpy as np
 
     fig, ax = plt.subplots(figsize=(8, 5))
-    x = np.arange(len(mkt_labels))
-    ax.bar(x, mkt_medias, yerr=mkt_stds, capsize=5, color="coral", alpha=0.8)
+    x = np.arange(len(ticklabels))
+    ax.bar(x, medias, yerr=stds, capsize=5, color=color, alpha=0.8)
     ax.set_xticks(x)
-    ax.set_xticklabels([f"{l} créditos" for l in mkt_labels])
+    ax.set_xticklabels(ticklabels)
     ax.set_ylabel("Beneficio final (créditos)")
-    ax.set_title("Beneficio final por Presupuesto Marketing")
+    ax.set_title(titulo)
     ax.grid(True, alpha=0.3, axis="y")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_Marketing.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+def _grafico_comparacion_todas(config_labels, beneficios):
+    import matplotlib.pyplot as plt
+    import numpy as np
 
-    # 4. Heatmap o tabla comparativa: todas las configs
     fig, ax = plt.subplots(figsize=(12, 8))
-    config_labels = [f"{r['config']['ab_label']}\n{r['config']['releases_label']}\n{r['config']['marketing_label']}" for r in resultados]
-    beneficios = [r["estadisticas"].get("beneficio_final", {}).get("media", 0) for r in resultados]
     b_min, b_max = min(beneficios), max(beneficios)
     norm = np.array([(b - b_min) / (b_max - b_min) if b_max != b_min else 0.5 for b in beneficios])
     colors = plt.cm.RdYlGn(norm)
@@ -382,25 +744,18 @@ def generar_graficos_comparativos(resultados: list, output_dir: str) -> None:
     ax.set_title("Comparación de todas las configuraciones")
     ax.grid(True, alpha=0.3, axis="x")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "comparacion_todas.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+def _grafico_equilibrio_por_config(ab_labels, rel_labels, mkt_labels, matrices):
+    import matplotlib.pyplot as plt
+    import numpy as np
 
-    # 5. Equilibrio por config (heatmap en lugar de barras para evitar etiquetas ilegibles)
-    ab_labels = [x[1] for x in AB_CONFIGS]
-    rel_labels = [x[1] for x in RELEASES_CONFIGS]
-    mkt_labels = [x[1] for x in MARKETING_CONFIGS]
-    # Construir matriz: filas = AB x Releases, columnas = Marketing
-    eq_dict = {}
-    for r in resultados:
-        ab = r["config"]["ab_label"]
-        rel = r["config"]["releases_label"]
-        mkt = r["config"]["marketing_label"]
-        eq_dict[(ab, rel, mkt)] = r["estadisticas"].get("equilibrio_porcentaje", 0)
     # Tres heatmaps: uno por presupuesto de marketing
     fig, axes = plt.subplots(1, 3, figsize=(12, 5), sharey=True)
     for idx, mkt in enumerate(mkt_labels):
         ax = axes[idx]
-        mat = np.array([[eq_dict.get((ab, rel, mkt), 0) for rel in rel_labels] for ab in ab_labels])
+        mat = np.array(matrices[idx])
         im = ax.imshow(mat, cmap="RdYlGn", vmin=0, vmax=100, aspect="auto")
         ax.set_xticks(range(len(rel_labels)))
         ax.set_xticklabels(rel_labels)
@@ -416,20 +771,16 @@ def generar_graficos_comparativos(resultados: list, output_dir: str) -> None:
     fig.suptitle("Tasa de equilibrio por configuración (% corridas que alcanzaron equilibrio)", fontsize=12, y=1.02)
     fig.colorbar(im, ax=axes, shrink=0.6, label="% equilibrio")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "equilibrio_por_config.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+def _grafico_satisfaccion_por_release(rel_labels, sat_medias):
+    import matplotlib.pyplot as plt
+    import numpy as np
 
-    # 6. Satisfacción por tipo de release
-    rel_labels = [x[1] for x in RELEASES_CONFIGS]
-    sat_por_release = {r: [] for r in rel_labels}
-    for r in resultados:
-        sat = r["estadisticas"].get("satisfaccion_promedio_general", {}).get("media")
-        if sat is not None:
-            sat_por_release[r["config"]["releases_label"]].append(sat)
-    sat_medias = [np.mean(sat_por_release[r]) if sat_por_release[r] else 0 for r in rel_labels]
     fig, ax = plt.subplots(figsize=(8, 5))
     x = np.arange(len(rel_labels))
-    bars = ax.bar(x, sat_medias, color=["#e74c3c", "#3498db", "#2ecc71"], alpha=0.8)
+    ax.bar(x, sat_medias, color=["#e74c3c", "#3498db", "#2ecc71"], alpha=0.8)
     ax.set_xticks(x)
     ax.set_xticklabels(rel_labels)
     ax.set_ylabel("Satisfacción general (%)")
@@ -439,16 +790,13 @@ def generar_graficos_comparativos(resultados: list, output_dir: str) -> None:
         ax.text(i, v + 1, f"{v:.1f}%", ha="center", fontsize=10)
     ax.grid(True, alpha=0.3, axis="y")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "satisfaccion_por_release.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+def _grafico_usuarios_finales(config_labels, usuarios):
+    import matplotlib.pyplot as plt
+    import numpy as np
 
-    # 7. Usuarios finales (prepagos + suscripciones) por config
-    def _usuarios(r):
-        prep = r["estadisticas"].get("prepagos_final", {}).get("media", 0)
-        susc = r["estadisticas"].get("suscripciones_final", {}).get("media", 0)
-        return prep + susc
-    usuarios = [_usuarios(r) for r in resultados]
-    config_labels = [f"{r['config']['ab_label']}\n{r['config']['releases_label']}\nMKT{r['config']['marketing_label']}" for r in resultados]
     fig, ax = plt.subplots(figsize=(10, 7))
     y_pos = np.arange(len(config_labels))
     colors = ["#2ecc71" if u > 100 else "#f39c12" if u > 50 else "#e74c3c" for u in usuarios]
@@ -459,19 +807,13 @@ def generar_graficos_comparativos(resultados: list, output_dir: str) -> None:
     ax.set_title("Base de usuarios al final del periodo (10 años)")
     ax.grid(True, alpha=0.3, axis="x")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "usuarios_finales_por_config.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+def _grafico_entrada_inicial(ab_labels, prep_6m, susc_6m):
+    import matplotlib.pyplot as plt
+    import numpy as np
 
-    # 8. Entrada inicial: prepago vs suscripción (primeros 6 meses) por AB
-    ab_labels = [x[1] for x in AB_CONFIGS]
-    prep_6m = []
-    susc_6m = []
-    for ab in ab_labels:
-        vals = [r for r in resultados if r["config"]["ab_label"] == ab]
-        preps = [r["estadisticas"].get("prepago_primeros_6_meses", {}).get("media") for r in vals]
-        suscs = [r["estadisticas"].get("suscripcion_primeros_6_meses", {}).get("media") for r in vals]
-        prep_6m.append(np.mean([p for p in preps if p is not None]) if preps else 0)
-        susc_6m.append(np.mean([s for s in suscs if s is not None]) if suscs else 0)
     x = np.arange(len(ab_labels))
     width = 0.35
     fig, ax = plt.subplots(figsize=(8, 5))
@@ -484,53 +826,32 @@ def generar_graficos_comparativos(resultados: list, output_dir: str) -> None:
     ax.legend()
     ax.grid(True, alpha=0.3, axis="y")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "entrada_inicial_prepago_vs_suscripcion.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
 
-    # 9. Día de equilibrio por release (solo configs que alcanzan equilibrio)
-    eq_dia_por_release = {r: [] for r in rel_labels}
-    for r in resultados:
-        eq_d = r["estadisticas"].get("equilibrio_dia", {})
-        if isinstance(eq_d, dict) and eq_d.get("media") is not None:
-            eq_dia_por_release[r["config"]["releases_label"]].append(eq_d["media"])
-    eq_medias = [np.mean(eq_dia_por_release[r]) if eq_dia_por_release[r] else np.nan for r in rel_labels]
-    valid = [i for i, v in enumerate(eq_medias) if not np.isnan(v)]
-    if valid:
-        fig, ax = plt.subplots(figsize=(8, 5))
-        x = [rel_labels[i] for i in valid]
-        y = [eq_medias[i] for i in valid]
-        ax.bar(x, y, color="steelblue", alpha=0.8)
-        ax.set_ylabel("Día medio de equilibrio")
-        ax.set_title("Tiempo al equilibrio por frecuencia de releases")
-        ax.grid(True, alpha=0.3, axis="y")
-        fig.tight_layout()
-        fig.savefig(os.path.join(output_dir, "dia_equilibrio_por_release.png"), dpi=150, bbox_inches="tight")
-        plt.close()
 
-    # 10. Mejor vs Peor: comparación
-    best = max(resultados, key=lambda r: r["estadisticas"].get("beneficio_final", {}).get("media", 0))
-    worst = min(resultados, key=lambda r: r["estadisticas"].get("beneficio_final", {}).get("media", float("inf")))
+def _grafico_dia_equilibrio_por_release(x, y):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(x, y, color="steelblue", alpha=0.8)
+    ax.set_ylabel("Día medio de equilibrio")
+    ax.set_title("Tiempo al equilibrio por frecuencia de releases")
+    ax.grid(True, alpha=0.3, axis="y")
+    fig.tight_layout()
+    return fig
+
+
+def _grafico_mejor_vs_peor(paneles):
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-    for ax, r, titulo, color in [
-        (axes[0], best, "Mejor configuración", "#2ecc71"),
-        (axes[1], worst, "Peor configuración", "#e74c3c"),
-    ]:
-        c = r["config"]
-        st = r["estadisticas"]
-        metricas = ["Beneficio\n(M)", "Eq%", "Sat%", "Usuarios"]
-        bf = st.get("beneficio_final", {}).get("media", 0) / 1e6
-        eq = st.get("equilibrio_porcentaje", 0)
-        sat = st.get("satisfaccion_promedio_general", {}).get("media", 0) or 0
-        usr = _usuarios(r)
-        vals = [bf, eq, sat, usr / 10]  # usuarios/10 para escala
-        ax.bar(metricas, vals, color=color, alpha=0.8)
-        ax.set_title(f"{titulo}\n{c['ab_label']} / {c['releases_label']} / MKT{c['marketing_label']}")
+    metricas = ["Beneficio\n(M)", "Eq%", "Sat%", "Usuarios"]
+    for ax, panel in zip(axes, paneles):
+        ax.bar(metricas, panel["valores"], color=panel["color"], alpha=0.8)
+        ax.set_title(panel["titulo"])
         ax.set_ylabel("Valor")
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "mejor_vs_peor_config.png"), dpi=150, bbox_inches="tight")
-    plt.close()
-
-    print(f"Gráficos guardados en: {output_dir}/")
+    return fig
 
 
 def _dias_a_fecha_aprox(dias: int) -> str:
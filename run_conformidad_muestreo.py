@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Conformidad de los muestreadores por lote (simulacion.muestreo, NumPy) contra
+los escalares de config.py (random): KS de dos muestras por distribución.
+
+Uso:
+  python run_conformidad_muestreo.py               # 20000 muestras por distribución
+  python run_conformidad_muestreo.py --n 100000 --semilla 7
+"""
+
+import argparse
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conformidad estadística de simulacion.muestreo contra config.py.")
+    parser.add_argument("--n", type=int, default=20000,
+                        help="Muestras por distribución y versión (default: 20000)")
+    parser.add_argument("--semilla", "-s", type=int, default=12345,
+                        help="Semilla de random y del Generator (default: 12345)")
+    args = parser.parse_args()
+
+    from simulacion.muestreo import verificar_conformidad
+
+    resultados = verificar_conformidad(n=args.n, semilla=args.semilla)
+    print(f"{'Distribución':36s} {'D (KS)':>8s} {'crítico':>8s} {'media escalar':>14s} {'media lote':>12s}")
+    for r in resultados:
+        marca = "ok" if r.aprobado else "FALLA"
+        print(f"{r.nombre:36s} {r.ks:8.4f} {r.ks_critico:8.4f} {r.media_escalar:14.4f} {r.media_lote:12.4f}  {marca}")
+    fallas = [r.nombre for r in resultados if not r.aprobado]
+    print(f"\n{len(resultados) - len(fallas)}/{len(resultados)} distribuciones conformes (α = 0.001)")
+    if fallas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
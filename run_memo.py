@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Administra el memo de corridas (.cache_corridas/) que comparten los benchmarks.
+
+Uso:
+  python run_memo.py                 # estado: entradas, tamaño, versión de código
+  python run_memo.py --invalidar     # borra entradas de versiones anteriores del código
+  python run_memo.py --vaciar        # borra todo
+  python run_memo.py --max-mb 500    # desaloja (LRU) hasta quedar bajo 500 MB
+
+El memo no desaloja mientras corre un benchmark: al llegar al límite deja de guardar.
+"""
+
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estado, invalidación y desalojo del memo de corridas.")
+    parser.add_argument("--invalidar", action="store_true",
+                        help="Borrar entradas generadas con otra versión del paquete simulacion")
+    parser.add_argument("--vaciar", action="store_true",
+                        help="Borrar todas las entradas")
+    parser.add_argument("--max-mb", type=float, default=None,
+                        help="Desalojar las entradas usadas hace más tiempo hasta quedar bajo este tamaño")
+    parser.add_argument("--directorio", default=None,
+                        help="Directorio base del memo (default: directorio actual)")
+    args = parser.parse_args()
+
+    from simulacion.memo import MemoCorridas
+
+    memo = MemoCorridas(base=args.directorio or ".")
+    if args.vaciar or args.invalidar:
+        n = memo.invalidar(todo=args.vaciar)
+        print(f"Entradas borradas: {n}")
+    if args.max_mb is not None:
+        n = memo.desalojar(max_bytes=int(args.max_mb * 1024 * 1024 / 0.9))
+        print(f"Entradas desalojadas: {n}")
+    if args.vaciar or args.invalidar or args.max_mb is not None:
+        memo.recuperar_espacio()
+
+    e = memo.estadisticas()
+    print(f"Memo: {e['directorio']}")
+    print(f"  Entradas: {e['entradas']} ({e['entradas_codigo_actual']} de la versión actual {e['codigo']})")
+    print(f"  Tamaño: {e['mb']:.1f} MB (límite {e['max_mb']:.0f} MB)")
+    memo.cerrar()
+
+
+if __name__ == "__main__":
+    main()
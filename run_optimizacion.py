@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Busca la mejor política (M, N, AB) con optimización bayesiana (modelo sustituto)
+en lugar de barrer la grilla completa.
+
+Objetivos:
+  beneficio   maximizar el beneficio final medio
+  equilibrio  minimizar el día de equilibrio medio (sin equilibrio cuenta como T_FINAL + 1;
+              cada corrida termina al alcanzar el equilibrio)
+
+Uso:
+  python run_optimizacion.py --presupuesto 400
+  python run_optimizacion.py --objetivo equilibrio --presupuesto 300 --dias 1826 --workers 8
+  python run_optimizacion.py -b 200 -T 730 --reps-iniciales 6 --puntos-iniciales 12 --output opt.json
+"""
+
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Optimiza (M, N, AB) con un proceso gaussiano y mejora esperada sobre la simulación."
+    )
+    parser.add_argument("--objetivo", choices=["beneficio", "equilibrio"], default="beneficio",
+                        help="Objetivo a optimizar (default: beneficio)")
+    parser.add_argument("--presupuesto", "-b", type=int, default=400,
+                        help="Corridas de simulación totales (default: 400)")
+    parser.add_argument("--dias", "-T", type=int, default=3653,
+                        help="Días por corrida (default: 3653)")
+    parser.add_argument("--puntos-iniciales", type=int, default=10,
+                        help="Políticas del diseño inicial (hipercubo latino, default: 10)")
+    parser.add_argument("--reps-iniciales", type=int, default=8,
+                        help="Réplicas por política nueva (default: 8)")
+    parser.add_argument("--reps-incremento", type=int, default=8,
+                        help="Réplicas extra al reevaluar una política (default: 8)")
+    parser.add_argument("--n-min", type=int, default=7, help="Mínimo de días entre implementaciones (default: 7)")
+    parser.add_argument("--n-max", type=int, default=90, help="Máximo de días entre implementaciones (default: 90)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Procesos para las réplicas (default: 1)")
+    parser.add_argument("--seed", "-s", type=int, default=42,
+                        help="Semilla base (réplica r usa seed + r en todas las políticas, default: 42)")
+    parser.add_argument("--output", "-o", type=str, default=None,
+                        help="Archivo JSON con resultado, políticas evaluadas e historial")
+    parser.add_argument("--silencioso", "-q", action="store_true",
+                        help="No imprimir cada evaluación")
+    args = parser.parse_args()
+
+    from simulacion.optimizacion import EspacioPolitica, Optimizador
+
+    def _mostrar(fila):
+        marca = " (réplicas)" if fila.get("replica") else ""
+        print(f"  [{fila['corridas']:>5}] {fila['fase']:<12} M={fila['M']:7.0f} N={fila['N']:3d} "
+              f"AB={fila['AB']:.2f} n={fila['n']:3d} media={fila['media']:,.1f}{marca}")
+
+    espacio = EspacioPolitica(n_min=max(1, args.n_min), n_max=max(args.n_min, args.n_max))
+    opt = Optimizador(
+        T_FINAL=max(1, args.dias),
+        objetivo=args.objetivo,
+        espacio=espacio,
+        presupuesto=max(1, args.presupuesto),
+        puntos_iniciales=max(2, args.puntos_iniciales),
+        reps_iniciales=args.reps_iniciales,
+        reps_incremento=args.reps_incremento,
+        seed=args.seed,
+        workers=args.workers,
+        callback=None if args.silencioso else _mostrar,
+    )
+
+    print("=" * 60)
+    print("OPTIMIZACIÓN DE POLÍTICA (M, N, AB)")
+    print("=" * 60)
+    print(f"Objetivo: {args.objetivo} | Presupuesto: {opt.presupuesto} corridas | T_FINAL={opt.T_FINAL}")
+    print()
+
+    r = opt.ejecutar()
+
+    unidad = "créditos" if r.objetivo == "beneficio" else "días"
+    print()
+    print("MEJOR POLÍTICA")
+    print("-" * 40)
+    print(f"  M={r.M:,.0f}  N={r.N}  AB={r.AB:.3f}")
+    print(f"  Media: {r.media:,.2f} {unidad}  IC95 [{r.ic95[0]:,.2f}, {r.ic95[1]:,.2f}]  ({r.n_replicas} réplicas)")
+    print(f"  Corridas usadas: {r.corridas_usadas}")
+    print("Top 5 políticas evaluadas:")
+    for p in r.puntos[:5]:
+        print(f"  M={p['M']:7.0f} N={p['N']:3d} AB={p['AB']:.2f} n={p['n']:3d} media={p['media']:,.1f}")
+    print("=" * 60)
+
+    if args.output:
+        export = {
+            "objetivo": r.objetivo,
+            "parametros": {"T_FINAL": opt.T_FINAL, "presupuesto": opt.presupuesto, "seed": args.seed},
+            "mejor": {"M": r.M, "N": r.N, "AB": r.AB, "media": r.media, "ic95": list(r.ic95),
+                      "n_replicas": r.n_replicas},
+            "corridas_usadas": r.corridas_usadas,
+            "puntos": r.puntos,
+            "historial": r.historial,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(export, f, indent=2, ensure_ascii=False)
+        print(f"\nResultado guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
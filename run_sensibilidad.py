@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Sensibilidad global de beneficio_final (o equilibrio_dia) a las probabilidades de config.py:
+Morris para descartar factores sin efecto y Sobol (Saltelli) con IC bootstrap para los que quedan.
+
+Uso:
+  python run_sensibilidad.py --workers 8
+  python run_sensibilidad.py --salida equilibrio_dia --dias 1826 --trayectorias 20 --n-base 128 -w 8
+  python run_sensibilidad.py --factores PROB_INESTABILIDAD_IMPLEMENTACION PROB_CONVERSION_TA_A_PAQUETE --escala 0.3
+  python run_sensibilidad.py -T 365 --trayectorias 4 --n-base 16 --output sensibilidad.json
+"""
+
+import argparse
+import json
+
+
+def main():
+    from simulacion.sensibilidad import SALIDA_BENEFICIO, SALIDAS, analizar, factores_por_defecto
+
+    parser = argparse.ArgumentParser(description="Análisis de sensibilidad global (Morris + Sobol) sobre config.py.")
+    parser.add_argument("--salida", choices=SALIDAS, default=SALIDA_BENEFICIO,
+                        help="Salida analizada (default: beneficio_final)")
+    parser.add_argument("--dias", "-T", type=int, default=730, help="Días por corrida (default: 730)")
+    parser.add_argument("--implementaciones", "-N", type=int, default=30,
+                        help="Días entre implementaciones (default: 30)")
+    parser.add_argument("--marketing", "-M", type=float, default=2000, help="Presupuesto MKT mensual (default: 2000)")
+    parser.add_argument("--ab-suscripcion", type=float, default=0.5,
+                        help="Probabilidad de suscripción del nuevo CE (default: 0.5)")
+    parser.add_argument("--factores", nargs="+", default=None,
+                        help="Constantes de config a barrer (default: todas las PROB_* que usa la simulación)")
+    parser.add_argument("--escala", type=float, default=0.5,
+                        help="Rango de cada factor: valor · (1 ± escala), acotado a [0, 1] (default: 0.5)")
+    parser.add_argument("--replicas", "-r", type=int, default=2,
+                        help="Corridas promediadas por punto del diseño (default: 2)")
+    parser.add_argument("--trayectorias", type=int, default=10, help="Trayectorias de Morris (default: 10)")
+    parser.add_argument("--niveles", type=int, default=4, help="Niveles de la grilla de Morris (default: 4)")
+    parser.add_argument("--corte", type=float, default=0.1,
+                        help="Pasan a Sobol los factores con μ* >= corte · max μ* (default: 0.1)")
+    parser.add_argument("--max-factores", type=int, default=6, help="Máximo de factores en Sobol (default: 6)")
+    parser.add_argument("--n-base", type=int, default=64, help="Filas de las matrices A y B de Saltelli (default: 64)")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Remuestreos para los IC (default: 1000)")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Procesos en paralelo (default: 1)")
+    parser.add_argument("--seed", "-s", type=int, default=42, help="Semilla base (default: 42)")
+    parser.add_argument("--output", "-o", default=None, help="Archivo JSON con Morris y Sobol")
+    args = parser.parse_args()
+
+    factores = factores_por_defecto(escala=args.escala, nombres=args.factores)
+
+    print("=" * 70)
+    print(f"SENSIBILIDAD GLOBAL DE {args.salida.upper()}")
+    print("=" * 70)
+    print(f"Parámetros: T_FINAL={args.dias}, N={args.implementaciones}, M={args.marketing:g}, "
+          f"AB={args.ab_suscripcion} | {len(factores)} factores, ±{args.escala:.0%}")
+    morris, sobol = analizar(
+        args.dias, args.implementaciones, args.marketing, args.ab_suscripcion,
+        factores=factores,
+        salida=args.salida,
+        replicas=args.replicas,
+        trayectorias=max(2, args.trayectorias),
+        niveles=max(2, args.niveles),
+        corte=args.corte,
+        max_factores=args.max_factores,
+        n_base=max(2, args.n_base),
+        bootstrap=args.bootstrap,
+        semilla=args.seed,
+        workers=args.workers,
+        callback=lambda mensaje: print(f"  {mensaje}"),
+    )
+
+    print("\nMORRIS (efecto por recorrido completo del factor)")
+    print(f"  {'Factor':42s} {'rango':>13s} {'μ*':>12s} {'μ':>12s} {'σ':>12s}")
+    for f in morris.filas():
+        marca = "  → Sobol" if f["seleccionado"] else ""
+        print(f"  {f['factor']:42s} [{f['minimo']:.3f},{f['maximo']:.3f}] {f['mu_estrella']:12,.1f} "
+              f"{f['mu']:12,.1f} {f['sigma']:12,.1f}{marca}")
+    if sobol is not None:
+        nivel = f"IC{sobol.nivel:.0%}"
+        print(f"\nSOBOL (N={sobol.n_base}, varianza de la salida {sobol.varianza:,.1f})")
+        print(f"  {'Factor':42s} {'S1':>7s} {nivel:>17s} {'ST':>7s} {nivel:>17s}")
+        for f in sobol.filas():
+            print(f"  {f['factor']:42s} {f['S1']:7.3f} [{f['S1_ic'][0]:6.3f},{f['S1_ic'][1]:6.3f}] "
+                  f"{f['ST']:7.3f} [{f['ST_ic'][0]:6.3f},{f['ST_ic'][1]:6.3f}]")
+    corridas = morris.corridas + (sobol.corridas if sobol is not None else 0)
+    print(f"\nCorridas: {corridas}")
+    print("=" * 70)
+
+    if args.output:
+        export = {
+            "salida": args.salida,
+            "parametros": {"T_FINAL": args.dias, "N": args.implementaciones, "M": args.marketing,
+                           "AB": args.ab_suscripcion, "replicas": args.replicas, "seed": args.seed},
+            "morris": {"trayectorias": morris.trayectorias, "corridas": morris.corridas, "factores": morris.filas()},
+            "sobol": None if sobol is None else {
+                "n_base": sobol.n_base, "nivel": sobol.nivel, "varianza": sobol.varianza,
+                "corridas": sobol.corridas, "factores": sobol.filas(),
+            },
+            "corridas": corridas,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(export, f, indent=2, ensure_ascii=False)
+        print(f"\nResultado guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
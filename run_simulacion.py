@@ -5,6 +5,8 @@ Punto de entrada para ejecutar la simulación de la Plataforma Técnica SaaS.
 Uso:
   python run_simulacion.py [T_FINAL] [N] [M]
   python run_simulacion.py --dias 3653 --implementaciones 30 --marketing 2000 --ab-suscripcion 0.50
+  python run_simulacion.py --modelo-duracion truncada  # duración APPS/IT sin masa en 0 minutos
+  python run_simulacion.py --modo agregado  # conteos diarios, aproximado
 
 Parámetros:
   T_FINAL : Días a simular (default 3653).
@@ -14,13 +16,12 @@ Parámetros:
 """
 
 import argparse
-import sys
-
-# Permitir ejecutar desde la raíz del proyecto
-sys.path.insert(0, ".")
 
 
 def main():
+    from simulacion.config import MODELO_DURACION_RECORTE, MODELOS_DURACION
+    from simulacion.principal import MODO_DETALLADO, MODOS
+
     parser = argparse.ArgumentParser(
         description="Simulación de Plataforma Técnica SaaS (trabajos diarios, clientes PE/nuevos, suscripción/prepago/TA)."
     )
@@ -48,6 +49,18 @@ def main():
         default=0.50,
         help="Probabilidad de que cliente nuevo elija suscripción vs prepago (0.0-1.0, default: 0.50)",
     )
+    parser.add_argument(
+        "--modelo-duracion",
+        choices=MODELOS_DURACION,
+        default=MODELO_DURACION_RECORTE,
+        help="Duración de trabajos APPS/IT: normal recortada (default), normal truncada o lognormal",
+    )
+    parser.add_argument(
+        "--modo",
+        choices=MODOS,
+        default=MODO_DETALLADO,
+        help="Motor: detallado (llegada por llegada, default) o agregado (conteos diarios, aproximado: a varios años exagera la dispersión del beneficio y subestima pérdidas y técnicos APPS/IT; ver README)",
+    )
     parser.add_argument(
         "--silencioso", "-q",
         action="store_true",
@@ -73,7 +86,10 @@ def main():
 
     from simulacion.principal import ejecutar_simulacion
 
-    estado = ejecutar_simulacion(T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=AB_SUSCRIPCION, verbose=not args.silencioso)
+    estado = ejecutar_simulacion(
+        T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=AB_SUSCRIPCION, verbose=not args.silencioso,
+        modelo_duracion=args.modelo_duracion, modo=args.modo,
+    )
 
     if args.graficos:
         from simulacion.graficos import generar_graficos
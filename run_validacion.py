@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Equivalencia estadística de un motor candidato contra principal.ejecutar_simulacion:
+K réplicas por motor en un conjunto fijo de configuraciones, KS + Anderson-Darling +
+superposición de IC por métrica (simulacion.validacion). Sale con código 1 si falla.
+
+Uso:
+  python run_validacion.py                                  # referencia contra sí misma (control)
+  python run_validacion.py --candidato mi_paquete.motor:simular --replicas 100 --workers 8
+  python run_validacion.py --candidato duracion_truncada --replicas 40 --dias 365
+  python run_validacion.py --output validacion.json --solo-fallas
+"""
+
+import argparse
+import json
+import sys
+
+
+def main():
+    from simulacion.validacion import (
+        CONFIGURACIONES_VALIDACION,
+        MOTORES,
+        SEMANAS_CONTROL_DEFAULT,
+        resolver_motor,
+        validar,
+    )
+
+    parser = argparse.ArgumentParser(description="Validación estadística de un motor candidato contra el de referencia.")
+    parser.add_argument("--candidato", "-c", default="referencia",
+                        help=f"Motor candidato: {', '.join(MOTORES)} o 'modulo:funcion' (default: referencia)")
+    parser.add_argument("--replicas", "-r", type=int, default=60,
+                        help="Réplicas por motor y configuración (default: 60)")
+    parser.add_argument("--seed", "-s", type=int, default=42,
+                        help="Semilla base (default: 42)")
+    parser.add_argument("--alfa", type=float, default=0.05,
+                        help="Nivel global; cada prueba usa alfa / (3 · métricas) (default: 0.05)")
+    parser.add_argument("--semanas-control", type=float, nargs="+", default=list(SEMANAS_CONTROL_DEFAULT),
+                        help="Fracciones del horizonte donde se comparan las series semanales (default: 0.5 1.0)")
+    parser.add_argument("--dias", "-T", type=int, default=None,
+                        help="Reemplaza el horizonte de todas las configuraciones (más rápido con valores chicos)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Procesos en paralelo (default: 1)")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Archivo JSON con todas las comparaciones")
+    parser.add_argument("--solo-fallas", action="store_true",
+                        help="Listar solo las métricas que fallan")
+    args = parser.parse_args()
+
+    candidato = resolver_motor(args.candidato)
+    configuraciones = [
+        (args.dias if args.dias else T_FINAL, N, M, ab) for T_FINAL, N, M, ab in CONFIGURACIONES_VALIDACION
+    ]
+
+    print("=" * 70)
+    print(f"VALIDACIÓN ESTADÍSTICA: referencia vs {args.candidato}")
+    print("=" * 70)
+    informe = validar(
+        candidato,
+        configuraciones=configuraciones,
+        replicas=max(2, args.replicas),
+        semilla=args.seed,
+        alfa=args.alfa,
+        semanas_control=args.semanas_control,
+        workers=args.workers,
+        callback=lambda mensaje: print(f"  {mensaje}"),
+    )
+    print(informe.texto(solo_fallas=args.solo_fallas))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(informe.a_dict(), f, indent=2, ensure_ascii=False)
+        print(f"\nInforme guardado en: {args.output}")
+    if not informe.aprobado:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,34 @@
 """
 Simulación de Plataforma Técnica SaaS.
 Conecta técnicos con clientes; modela suscripción, prepago y trabajo aislado.
+
+Los nombres públicos se cargan a demanda (PEP 562): "import simulacion.config"
+o un worker que solo necesita principal no importan el resto del paquete.
 """
 
-from .estado import EstadoSimulacion, MejorTrimestre
-from .principal import ejecutar_simulacion, imprimir_resultados
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "EstadoSimulacion": ".estado",
+    "Instantanea": ".estado",
+    "MejorTrimestre": ".estado",
+    "ejecutar_simulacion": ".principal",
+    "imprimir_resultados": ".principal",
+    "iterar_simulacion": ".principal",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(nombre: str) -> Any:
+    modulo = _EXPORTS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(modulo, __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
 
-__all__ = [
-    "EstadoSimulacion",
-    "MejorTrimestre",
-    "ejecutar_simulacion",
-    "imprimir_resultados",
-]
+def __dir__():
+    return sorted(list(globals()) + __all__)
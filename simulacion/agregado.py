@@ -0,0 +1,784 @@
+# -*- coding: utf-8 -*-
+"""
+Modo agregado: la simulación a grano diario, sin llegadas individuales.
+Para estudios de varios años que solo miran métricas semanales. En lugar de recorrer
+cada llegada con su TPLL / TPS, cada día se sortean conteos:
+- llegadas por franja (horario laboral / fuera de horario) y segmento de cliente
+  (nuevo TA / CE / asiduo; preexistente asiduo o CE × suscripción / prepago ×
+  conforme / disconforme; PE trabajo aislado), con pesos congelados al inicio del día,
+- por franja y segmento, un multinomial sobre tipo de trabajo × desenlace (perdido por
+  falta de técnico, calendarizado y terminado, insatisfecho cobrado / no cobrado,
+  satisfecho, con o sin falta a la reunión y disconformidad),
+- créditos de cada desenlace como suma normal (media y varianza por tipo de trabajo).
+La capacidad de técnicos sale de Tecnicos_Dev / Tecnicos_AppsIT en lugar de TPS[]: por
+hora laboral, pérdida Erlang-B con la carga de la hora (llegadas esperadas × duración
+media, en minutos de MINUTOS_DIA_APPS_IT); un trabajo de Desarrollo ocupa a su dev el
+resto del día (dura más que la jornada) y los APPS/IT usan primero los devs libres.
+Cada sorteo Beta por llegada de llegada.py se reemplaza por su media (la probabilidad
+marginal es la misma); la suma de Betas de insatisfacción usa E[min(1, suma)].
+
+Las corridas van vectorizadas: un lote de 'replicas' corridas avanza junto, un arreglo
+por contador. La ganancia viene del lote: conviene para barridos de cientos de corridas,
+mientras que una corrida suelta tarda lo mismo que en el modo detallado.
+
+Es una aproximación: el contraste con el modo detallado se hace con simulacion.validacion
+(motor "agregado"); FACTOR_PERDIDA_APPS_IT / FACTOR_PERDIDA_DESARROLLO son los parámetros
+de calibración de la pérdida por falta de técnico. Ver README (Modo agregado).
+"""
+
+import time
+import warnings
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from . import config as cfg
+from . import muestreo
+from .estado import (
+    EVENTOS, EV_ABANDONOS_PREPAGO, EV_ARREPENTIMIENTOS, EV_BAJAS_TECNICOS,
+    EV_BLOQUES_PREPAGO_VENDIDOS, EV_CALENDARIZACIONES, EV_CONVERSIONES_TA, EV_FALTAS_REUNION,
+    EV_INSATISFECHOS, EV_LLEGADAS, EV_NO_COBRADOS, EV_NO_RENOVACIONES_PREPAGO,
+    EV_NO_RENOVACIONES_SUSCRIPCION, EV_SIN_TECNICO, EV_TECNICOS_INCORPORADOS,
+    EV_TRABAJOS_ATENDIDOS,
+    EstadoSimulacion,
+)
+
+# Segmentos de llegada (columna de los conteos por segmento)
+SEG_NUEVO_TA, SEG_NUEVO_CE, SEG_NUEVO_ASIDUO = 0, 1, 2
+SEG_AS_SUSC, SEG_AS_SUSC_DISC, SEG_AS_PREP, SEG_AS_PREP_DISC = 3, 4, 5, 6
+SEG_CE_SUSC, SEG_CE_SUSC_DISC, SEG_CE_PREP, SEG_CE_PREP_DISC = 7, 8, 9, 10
+SEG_PE_TA = 11
+N_SEGMENTOS = 12
+PROPORCIONES_NUEVOS = (0.90, 0.07, 0.03)  # TA / CE / CE asiduo (llegada.procesar_llegada_cliente)
+
+# Desenlaces de una llegada
+(
+    DES_PERDIDO, DES_PERDIDO_FALTA, DES_PERDIDO_FALTA_DISC,
+    DES_CAL_FIN, DES_CAL_FALTA, DES_CAL_FALTA_DISC,
+    DES_INSAT_COBRA, DES_INSAT_NO_COBRA, DES_SATISFECHO,
+) = range(9)
+N_DESENLACES = 9
+CLASES_TRABAJO = ("APPS", "IT", "DESARROLLO")
+
+_ASIDUOS = [SEG_NUEVO_ASIDUO, SEG_AS_SUSC, SEG_AS_SUSC_DISC, SEG_AS_PREP, SEG_AS_PREP_DISC]
+_ASIDUOS_CONFORMES = [SEG_NUEVO_ASIDUO, SEG_AS_SUSC, SEG_AS_PREP]
+_PE_SUSCRIPCION = [SEG_AS_SUSC, SEG_AS_SUSC_DISC, SEG_CE_SUSC, SEG_CE_SUSC_DISC]
+_PE_PREPAGO = [SEG_AS_PREP, SEG_AS_PREP_DISC, SEG_CE_PREP, SEG_CE_PREP_DISC]
+# No asiduos sin prepago: si no se cobra pueden quedar disconformes (CE) o irse (TA)
+_NO_COBRA_SIN_PREPAGO = [SEG_NUEVO_TA, SEG_NUEVO_CE, SEG_CE_SUSC, SEG_CE_SUSC_DISC, SEG_PE_TA]
+
+_PERDIDAS = (
+    "suscripcion_no_renovacion", "prepago_no_renovacion", "prepago_abandono_insatisfecho",
+    "trabajo_aislado_insatisfecho", "calendarizacion_sin_tecnico",
+)
+_P_SUSC, _P_PREP, _P_ABANDONO, _P_TA, _P_SIN_TECNICO = range(5)
+
+_CONTADORES = (
+    "PE_Trabajo_Aislado", "Asiduos_Suscripcion", "Asiduos_Prepago", "CE_Suscripcion", "CE_Prepago",
+    "PE_con_paquetes", "Suscripciones_Totales", "Prepagos_Totales",
+    "Disconformes_Asiduos", "Disconformes_CE", "Disconformes_Prepago", "Disconformes_Suscripcion",
+    "Tecnicos_Dev", "Tecnicos_AppsIT",
+)
+_MONTOS = (
+    "CREDITOS_ENTRANTES", "COSTO_MKT", "CREDITOS_MKT_GASTADOS_MES", "COSTOS_DESARROLLO",
+    "BENEFICIO_NETO_TRABAJOS", "BENEFICIO_NETO_PREPAGO", "BENEFICIO_NETO_SUSCRIPCION", "BENEFICIO_NETO_TOTAL",
+    "creditos_prepago_global", "scoring_IA_semana_anterior", "ajuste_prob_calendarizacion",
+)
+
+# Calibración contra el modo detallado: multiplican la pérdida por falta de técnico de cada
+# clase. Dentro del día el Erlang-B sigue al modo detallado; lo que falta es la ocupación que
+# arrastran de días anteriores los trabajos largos (TPS[] no se modela). Ajustados con
+# validacion sobre (730, 30, 2000): Desarrollo queda a ~1%, APPS/IT ~15% por debajo. A 10 años el
+# desvío de beneficio_final sale 1.4-3 veces el del modo detallado y los técnicos APPS/IT finales
+# ~40% por debajo: la validación no pasa (sesgos documentados en el README).
+FACTOR_PERDIDA_APPS_IT = 1.3
+FACTOR_PERDIDA_DESARROLLO = 1.1
+# Horizonte (días) de la calibración contrastada con validacion; simular_lote avisa por encima
+HORIZONTE_VALIDADO = 730
+MUESTRAS_MOMENTOS = 200_000  # Monte Carlo (semilla fija) para duraciones y E[min(1, suma de Betas)]
+
+
+def media_beta(media: Any, concentracion: float) -> Any:
+    """Media de la Beta que sortea prob_efectiva_beta(media, concentracion) (parámetros con piso 0.01)."""
+    alpha = np.maximum(0.01, np.multiply(media, concentracion))
+    beta = np.maximum(0.01, np.multiply(np.subtract(1.0, media), concentracion))
+    return alpha / (alpha + beta)
+
+
+def erlang_b(servidores: np.ndarray, carga: np.ndarray) -> np.ndarray:
+    """
+    Probabilidad de pérdida Erlang-B B(c, a), vectorizada; c real >= 0 (interpolación
+    lineal entre los enteros vecinos). Recursión B(k) = a·B(k-1) / (k + a·B(k-1)).
+    """
+    servidores, carga = np.broadcast_arrays(np.maximum(servidores, 0.0), np.asarray(carga, dtype=np.float64))
+    piso = np.floor(servidores).astype(np.int64)
+    b = np.ones(carga.shape)
+    b_piso = np.where(piso == 0, 1.0, 0.0)
+    b_techo = b_piso.copy()
+    for k in range(1, int(piso.max(initial=0)) + 2):
+        b = carga * b / (k + carga * b)
+        b_piso = np.where(piso == k, b, b_piso)
+        b_techo = np.where(piso + 1 == k, b, b_techo)
+    return b_piso + (servidores - piso) * (b_techo - b_piso)
+
+
+def _esperanza_min_poisson(media: np.ndarray, tope: np.ndarray) -> np.ndarray:
+    """E[min(K, tope)] con K ~ Poisson(media): suma de P(K > k) para k < tope."""
+    pmf = np.exp(-media)
+    cdf = pmf.copy()
+    total = np.zeros_like(media)
+    for k in range(int(tope.max(initial=0))):
+        total += np.where(k < tope, 1.0 - cdf, 0.0)
+        pmf = pmf * media / (k + 1)
+        cdf = cdf + pmf
+    return total
+
+
+@lru_cache(maxsize=None)
+def _momentos_trabajo(modelo: str, apps: Tuple[float, float], it: Tuple[float, float]) -> Tuple[Tuple[float, ...], ...]:
+    """
+    (duración media APPS, IT en minutos), (media de créditos por clase), (varianza de créditos
+    por clase), clases en el orden de CLASES_TRABAJO. Monte Carlo con los muestreadores por lote.
+    """
+    rng = muestreo.crear_generador(0)
+    n = MUESTRAS_MOMENTOS
+    d_apps = muestreo.duracion_minutos(apps[0], apps[1], 0, cfg.DURACION_APPS_MAX_MINUTOS, n, rng, modelo)
+    d_it = muestreo.duracion_minutos(it[0], it[1], 0, cfg.DURACION_IT_MAX_MINUTOS, n, rng, modelo)
+    h_dev = muestreo.duracion_desarrollo_horas(n, rng)
+    creditos = (d_apps * cfg.COSTO_APPS_POR_MIN, d_it * cfg.COSTO_IT_POR_MIN, h_dev * cfg.COSTO_DESARROLLO_POR_HORA)
+    return (
+        (float(d_apps.mean()), float(d_it.mean())),
+        tuple(float(c.mean()) for c in creditos),
+        tuple(float(c.var()) for c in creditos),
+    )
+
+
+@lru_cache(maxsize=None)
+def _prob_insatisfaccion(medias: Tuple[float, ...]) -> float:
+    """E[min(1, suma de Betas)] con las medias dadas (concentración 8, como llegada.DiaContexto)."""
+    rng = muestreo.crear_generador(0)
+    suma = np.zeros(MUESTRAS_MOMENTOS)
+    for m in medias:
+        suma += muestreo.prob_efectiva_beta(m, MUESTRAS_MOMENTOS, rng, 8)
+    return float(np.minimum(1.0, suma).mean())
+
+
+class ParametrosAgregados:
+    """Probabilidades y momentos constantes durante la corrida (salen de config al empezarla)."""
+
+    def __init__(self, prob_suscripcion_nuevo: float):
+        self.arrepentimiento = float(media_beta(cfg.PROB_ARREPENTIMIENTO_CALENDARIZADO, 8))
+        self.falta = float(media_beta(cfg.PROB_FALTA_REUNION, 8))
+        self.disconformidad_falta = float(media_beta(cfg.PROB_DISCONFORMIDAD_SI_FALTA, 8))
+        base = (cfg.PROB_INSATISFACCION_BASE, cfg.PROB_CONECTIVIDAD_POBRE)
+        inestable = (cfg.PROB_INESTABILIDAD_IMPLEMENTACION,)
+        calendarizado = (cfg.PROB_INSATISFACCION_CALENDARIZADO,)
+        # insatisfaccion[es_inestable][se_calendariza]
+        self.insatisfaccion = tuple(
+            tuple(_prob_insatisfaccion(base + inestable * i + calendarizado * c) for c in (0, 1))
+            for i in (0, 1)
+        )
+        no_desarrollo = 1.0 - float(media_beta(cfg.PROB_NO_COBRAR_NO_DESARROLLO, 8))
+        self.cobra = np.array((no_desarrollo, no_desarrollo, float(media_beta(cfg.PROB_COBRAR_DESARROLLO, 8))))
+        self.conforme_si_no_cobra = float(media_beta(
+            cfg.PROB_CONFORME_SI_NO_COBRA_NO_PREPAGO, cfg.CONCENTRACION_BETA_CONFORME_SI_NO_COBRA))
+        self.abandono_prepago = float(media_beta(cfg.PROB_ABANDONO_PREPAGO_DISCONFORME, 8))
+        self.recuperacion_prepago = float(media_beta(
+            cfg.PROB_RECUPERACION_POR_NO_COBRAR_PREPAGO, cfg.CONCENTRACION_BETA_RECUPERACION_PREPAGO))
+        self.suscripcion_nuevo = float(media_beta(prob_suscripcion_nuevo, cfg.CONCENTRACION_BETA_TIPO_PAGO_NUEVO_CE))
+        self.conversion_ta = float(media_beta(cfg.PROB_CONVERSION_TA_A_PAQUETE, 8))
+        self.asiduo_tras_conversion = float(media_beta(cfg.PROB_ASIDUO_TRAS_CONVERSION, 8))
+        self.no_renovacion_suscripcion = float(media_beta(cfg.PROB_NO_RENOVACION_DISCONFORME, 8))
+        self.no_renovacion_prepago = float(media_beta(cfg.PROB_NO_RENOVACION_PREPAGO_DISCONFORME, 8))
+        duraciones, medias, varianzas = _momentos_trabajo(
+            cfg.MODELO_DURACION,
+            (cfg.DURACION_APPS_MEDIA, cfg.DURACION_APPS_STD), (cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD),
+        )
+        self.duracion_apps, self.duracion_it = duraciones
+        self.creditos_media = np.array(medias)
+        self.creditos_varianza = np.array(varianzas)
+        # Horas con el mismo peso tienen la misma carga: Erlang-B una vez por peso distinto
+        pesos = np.array(cfg.PESOS_HORARIOS, dtype=np.float64)
+        self.pesos_horarios, horas = np.unique(pesos / pesos.sum(), return_counts=True)
+        self.fraccion_horas = self.pesos_horarios * horas
+
+
+class LoteAgregado:
+    """
+    Estado de 'replicas' corridas del modo agregado: los mismos nombres que
+    EstadoSimulacion, con un arreglo por contador y monto (una posición por corrida).
+    """
+
+    def __init__(self, replicas: int, T_FINAL: int, N: int, M: float):
+        base = EstadoSimulacion(T_FINAL=T_FINAL, N=N, M=M)
+        self.replicas = replicas
+        self.T_FINAL = T_FINAL
+        self.DIAS_IMPLEMENTACION = N
+        self.PRESUPUESTO_MKT_MENSUAL = M
+        self.T = 0
+        self.ULTIMO_DIA_IMPLEMENTACION = base.ULTIMO_DIA_IMPLEMENTACION
+        self.DIAS_INESTABILIDAD_RESTANTES = base.DIAS_INESTABILIDAD_RESTANTES
+        for nombre in _CONTADORES:
+            setattr(self, nombre, np.full(replicas, getattr(base, nombre), dtype=np.int64))
+        for nombre in _MONTOS:
+            setattr(self, nombre, np.full(replicas, getattr(base, nombre), dtype=np.float64))
+        self.trabajos_perdidos_por_tipo = np.zeros((replicas, len(CLASES_TRABAJO)), dtype=np.int64)
+        self.perdidas_semana = np.zeros((replicas, len(_PERDIDAS)), dtype=np.int64)
+        self.eventos = np.zeros((replicas, len(EVENTOS)), dtype=np.int64)  # columnas estado.EV_*
+        # (día de llegada, devs, apps/it) en orden de llegada: todas las corridas contratan el mismo día
+        self.contrataciones_pendientes: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self.T_EQUILIBRIO = np.full(replicas, -1, dtype=np.int64)
+        self.beneficio_acumulado_por_dia = np.zeros((replicas, T_FINAL))
+        from .memoria_compartida import _n_series
+        self.metricas_semanales = np.zeros((replicas, T_FINAL // cfg.DIAS_POR_SEMANA, _n_series()))
+
+    def beneficio_acumulado(self) -> np.ndarray:
+        return (
+            self.BENEFICIO_NETO_TRABAJOS + self.BENEFICIO_NETO_PREPAGO + self.BENEFICIO_NETO_SUSCRIPCION
+            - self.COSTOS_DESARROLLO - self.COSTO_MKT
+        )
+
+
+def _cociente(num: np.ndarray, den: np.ndarray, defecto: float) -> np.ndarray:
+    """num / den por posición; 'defecto' donde den <= 0."""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64))
+    return np.divide(num, den, out=np.full(num.shape, defecto), where=den > 0)
+
+
+def _pesos_preexistentes(L: LoteAgregado) -> np.ndarray:
+    """
+    Probabilidad de cada segmento preexistente (columnas SEG_AS_SUSC..SEG_PE_TA): categoría
+    con los pesos de EstadoSimulacion.selector_preexistente, tipo de pago y conformidad con
+    las proporciones de determinar_tipo_pago_paquete y de disconformes.
+    """
+    asiduos = L.Asiduos_Suscripcion + L.Asiduos_Prepago
+    ce = L.CE_Suscripcion + L.CE_Prepago
+    pesos = np.stack((asiduos * 5.0, np.maximum(0, ce - asiduos).astype(np.float64), L.PE_Trabajo_Aislado / 10.0), axis=1)
+    total = pesos.sum(axis=1)
+    pesos = np.where(total[:, None] > 0, pesos / np.where(total > 0, total, 1.0)[:, None], (0.0, 0.0, 1.0))
+    columnas = []
+    for peso, susc, disc, total_cat in (
+        (pesos[:, 0], L.Asiduos_Suscripcion, L.Disconformes_Asiduos, asiduos),
+        (pesos[:, 1], L.CE_Suscripcion, L.Disconformes_CE, ce),
+    ):
+        p_susc = _cociente(susc, total_cat, 1.0)
+        p_disc = np.minimum(1.0, _cociente(disc, total_cat, 0.0))
+        columnas += [
+            peso * p_susc * (1 - p_disc), peso * p_susc * p_disc,
+            peso * (1 - p_susc) * (1 - p_disc), peso * (1 - p_susc) * p_disc,
+        ]
+    columnas.append(pesos[:, 2])
+    return np.stack(columnas, axis=1)
+
+
+def _prob_perdida(L: LoteAgregado, prm: ParametrosAgregados, props: np.ndarray, TDN: np.ndarray) -> np.ndarray:
+    """
+    Probabilidad de no encontrar técnico libre por clase de trabajo (replicas × 3), llegadas
+    TDN repartidas por PESOS_HORARIOS. Desarrollo: los trabajos atendidos ocupan a su dev el
+    resto del día (E[min(K, devs)], K ~ Poisson); un dev sin trabajo de Desarrollo atiende
+    APPS/IT (van primero a los devs), así que el trabajo de Desarrollo también se pierde si
+    esos devs están ocupados. APPS/IT: Erlang-B con devs libres (en promedio la mitad del día
+    para los que toman Desarrollo) + técnicos Apps/IT.
+    """
+    p_apps_it = props[:, 0] + props[:, 1]
+    llegadas_dev = TDN * props[:, 2]
+    devs = L.Tecnicos_Dev.astype(np.float64)
+    atendidos_dev = _esperanza_min_poisson(llegadas_dev, L.Tecnicos_Dev)
+    devs_libres = devs - 0.5 * atendidos_dev
+    duracion = (props[:, 0] * prm.duracion_apps + props[:, 1] * prm.duracion_it) / np.maximum(p_apps_it, 1e-12)
+    carga = (TDN * p_apps_it * duracion / cfg.MINUTOS_POR_HORA)[:, None] * prm.pesos_horarios[None, :]
+    perdida_apps_it = erlang_b((devs_libres + L.Tecnicos_AppsIT)[:, None], carga) @ prm.fraccion_horas
+    devs_ocupados = erlang_b(devs_libres[:, None], carga) @ prm.fraccion_horas
+    atendible = np.where(llegadas_dev > 0, atendidos_dev / np.maximum(llegadas_dev, 1e-12), 1.0)
+    perdida_dev = 1.0 - atendible * (1.0 - devs_ocupados)
+    perdida_apps_it = perdida_apps_it * FACTOR_PERDIDA_APPS_IT
+    return np.clip(np.stack((perdida_apps_it, perdida_apps_it, perdida_dev * FACTOR_PERDIDA_DESARROLLO), axis=1), 0.0, 1.0)
+
+
+def _prob_desenlaces(
+    prm: ParametrosAgregados, props: np.ndarray, perdida: np.ndarray, calendarizar: np.ndarray, es_inestable: bool,
+) -> np.ndarray:
+    """Probabilidad de cada (clase de trabajo, desenlace) por corrida: replicas × (3 · N_DESENLACES)."""
+    pa, pf, pd = prm.arrepentimiento, prm.falta, prm.disconformidad_falta
+    q_directo, q_calendarizado = prm.insatisfaccion[int(es_inestable)]
+    pc = calendarizar[:, None]
+    sigue = 1.0 - perdida                      # replicas × clase
+    atendido_cal = sigue * pc * (1 - pa) * (1 - pf)
+    atendido_directo = sigue * (1 - pc)
+    insatisfecho = atendido_cal * q_calendarizado + atendido_directo * q_directo
+    des = np.empty(perdida.shape + (N_DESENLACES,))
+    des[..., DES_PERDIDO] = perdida * (pa + (1 - pa) * (1 - pf))
+    des[..., DES_PERDIDO_FALTA] = perdida * (1 - pa) * pf * (1 - pd)
+    des[..., DES_PERDIDO_FALTA_DISC] = perdida * (1 - pa) * pf * pd
+    des[..., DES_CAL_FIN] = sigue * pc * pa
+    des[..., DES_CAL_FALTA] = sigue * pc * (1 - pa) * pf * (1 - pd)
+    des[..., DES_CAL_FALTA_DISC] = sigue * pc * (1 - pa) * pf * pd
+    des[..., DES_INSAT_COBRA] = insatisfecho * prm.cobra
+    des[..., DES_INSAT_NO_COBRA] = insatisfecho * (1 - prm.cobra)
+    des[..., DES_SATISFECHO] = atendido_cal * (1 - q_calendarizado) + atendido_directo * (1 - q_directo)
+    return (des * props[:, :, None]).reshape(len(props), -1)
+
+
+def _creditos(rng: np.random.Generator, prm: ParametrosAgregados, conteos: np.ndarray) -> np.ndarray:
+    """Créditos de 'conteos' trabajos por clase (... × 3): suma normal con los momentos de cada clase."""
+    media = conteos @ prm.creditos_media
+    desvio = np.sqrt(conteos @ prm.creditos_varianza)
+    return np.maximum(0.0, media + desvio * rng.standard_normal(media.shape))
+
+
+def _llegadas_por_franja(
+    rng: np.random.Generator, nuevos: np.ndarray, trabajos_asiduos: np.ndarray,
+    TDN: np.ndarray, TDOFF: np.ndarray, es_dia_semana: bool,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (nuevos, preexistentes) por franja, 2 × replicas (fila 0 laboral, 1 fuera de horario):
+    el orden mezclado de simular_dia como extracciones hipergeométricas; si las llegadas
+    superan nuevos + asiduos el resto son preexistentes.
+    """
+    pool = nuevos + trabajos_asiduos
+    if es_dia_semana:
+        n_lab = np.minimum(TDN, pool)
+        nuevos_lab = rng.hypergeometric(nuevos, trabajos_asiduos, n_lab)
+        resto_nuevos = nuevos - nuevos_lab
+        resto_asiduos = trabajos_asiduos - (n_lab - nuevos_lab)
+        pe_lab = TDN - nuevos_lab
+    else:
+        n_lab = nuevos_lab = pe_lab = np.zeros_like(pool)
+        resto_nuevos, resto_asiduos = nuevos, trabajos_asiduos
+    nuevos_off = rng.hypergeometric(resto_nuevos, resto_asiduos, np.minimum(TDOFF, pool - n_lab))
+    pe_off = TDOFF - nuevos_off
+    return np.stack((nuevos_lab, nuevos_off)), np.stack((pe_lab, pe_off))
+
+
+def _procesar_llegadas(
+    L: LoteAgregado, rng: np.random.Generator, prm: ParametrosAgregados, props: np.ndarray,
+    es_inestable: bool, nuevos: np.ndarray, trabajos_asiduos: np.ndarray,
+    TDN: np.ndarray, TDOFF: np.ndarray, es_dia_semana: bool,
+) -> None:
+    """Llegadas del día en conteos: el flujo de llegada.procesar_llegada_cliente por segmento."""
+    R = L.replicas
+    n_nuevos, n_pe = _llegadas_por_franja(rng, nuevos, trabajos_asiduos, TDN, TDOFF, es_dia_semana)
+    cobrados_mkt = n_nuevos.sum(axis=0) * cfg.COSTO_MKT_POR_CLIENTE_NUEVO
+    L.COSTO_MKT += cobrados_mkt
+    L.CREDITOS_MKT_GASTADOS_MES += cobrados_mkt
+
+    ajuste = L.ajuste_prob_calendarizacion
+    cal_lab = media_beta(np.clip(cfg.PROB_CALENDARIZAR_HORARIO_LABORAL + ajuste, 0.0, 1.0), 8)
+    cal_fuera = media_beta(np.clip(cfg.PROB_CALENDARIZAR_FUERA_HORARIO + ajuste, 0.0, 1.0), 8)
+    perdida = _prob_perdida(L, prm, props, TDN) if es_dia_semana else np.zeros((R, 3))
+    prob = np.stack((
+        _prob_desenlaces(prm, props, perdida, cal_lab, es_inestable),
+        _prob_desenlaces(prm, props, np.zeros((R, 3)), cal_fuera, es_inestable),
+    ))
+    # El segmento es independiente de clase y desenlace: primero clase × desenlace por franja
+    # (sin segmento), después el reparto por segmento solo de lo que depende de él
+    llegadas = n_nuevos + n_pe
+    d = rng.multinomial(llegadas, prob).reshape(2, R, 3, N_DESENLACES)  # franja × corrida × clase × desenlace
+    por_desenlace = d.sum(axis=(0, 2))  # corrida × desenlace
+
+    perdidos = d[0, :, :, DES_PERDIDO:DES_CAL_FIN].sum(axis=2)
+    L.trabajos_perdidos_por_tipo += perdidos
+    L.perdidas_semana[:, _P_SIN_TECNICO] += perdidos.sum(axis=1)
+    faltas = d[..., [DES_PERDIDO_FALTA, DES_PERDIDO_FALTA_DISC, DES_CAL_FALTA, DES_CAL_FALTA_DISC]].sum(axis=(0, 2, 3))
+    L.CREDITOS_ENTRANTES += faltas * cfg.PENALIZACION_FALTA_REUNION
+    L.BENEFICIO_NETO_TRABAJOS += faltas * cfg.PENALIZACION_FALTA_REUNION * cfg.BENEFICIO_NETO_PORCENTAJE
+    # DES_PERDIDO junta arrepentidos y calendarizados sin falta: se separan con su cociente
+    pa, pf = prm.arrepentimiento, prm.falta
+    arrepentidos = por_desenlace[:, DES_CAL_FIN] + rng.binomial(
+        por_desenlace[:, DES_PERDIDO], pa / (pa + (1 - pa) * (1 - pf)))
+    # Los atendidos incluyen calendarizados que siguieron: fracción pc(1-pa)(1-pf) / (pc(1-pa)(1-pf) + 1-pc)
+    atendidos_franja = d[..., DES_INSAT_COBRA:].sum(axis=(2, 3))  # franja × corrida
+    atendidos = atendidos_franja.sum(axis=0)
+    siguen = np.stack((cal_lab, cal_fuera)) * (1 - pa) * (1 - pf)
+    eventos = L.eventos
+    eventos[:, EV_LLEGADAS] += llegadas.sum(axis=0)
+    eventos[:, EV_SIN_TECNICO] += perdidos.sum(axis=1)
+    eventos[:, EV_CALENDARIZACIONES] += por_desenlace[:, :DES_INSAT_COBRA].sum(axis=1) + rng.binomial(
+        atendidos_franja, siguen / (siguen + 1 - np.stack((cal_lab, cal_fuera)))).sum(axis=0)
+    eventos[:, EV_ARREPENTIMIENTOS] += arrepentidos
+    eventos[:, EV_FALTAS_REUNION] += faltas
+    eventos[:, EV_TRABAJOS_ATENDIDOS] += atendidos
+    eventos[:, EV_INSATISFECHOS] += por_desenlace[:, DES_INSAT_COBRA] + por_desenlace[:, DES_INSAT_NO_COBRA]
+    eventos[:, EV_NO_COBRADOS] += por_desenlace[:, DES_INSAT_NO_COBRA]
+
+    # Mezcla de segmentos de cada franja: nuevos (PROPORCIONES_NUEVOS) + preexistentes (_pesos_preexistentes)
+    mezcla = np.empty((2, R, N_SEGMENTOS))
+    mezcla[..., :SEG_AS_SUSC] = n_nuevos[..., None] * np.asarray(PROPORCIONES_NUEVOS)
+    mezcla[..., SEG_AS_SUSC:] = n_pe[..., None] * _pesos_preexistentes(L)
+    total = mezcla.sum(axis=2, keepdims=True)
+    mezcla = np.where(total > 0, mezcla / np.where(total > 0, total, 1.0), 1.0 / N_SEGMENTOS)
+    por_clase = d[..., [DES_INSAT_COBRA, DES_INSAT_NO_COBRA, DES_SATISFECHO]].sum(axis=0)  # corrida × clase × 3
+    grupos = np.stack((
+        (d[..., DES_PERDIDO_FALTA_DISC] + d[..., DES_CAL_FALTA_DISC]).sum(axis=2),
+        d[..., DES_INSAT_COBRA].sum(axis=2), d[..., DES_INSAT_NO_COBRA].sum(axis=2), d[..., DES_SATISFECHO].sum(axis=2),
+    ))
+    disc_falta, n_ic, n_in, n_s = rng.multinomial(grupos, mezcla).sum(axis=1)  # cada uno corrida × segmento
+    # Créditos por desenlace (suma normal por clase), repartidos entre segmentos según sus trabajos
+    c_ic, c_in, c_s = (
+        _creditos(rng, prm, por_clase[:, :, k])[:, None] * _cociente(n, n.sum(axis=1, keepdims=True), 0.0)
+        for k, n in enumerate((n_ic, n_in, n_s))
+    )
+
+    # Beneficio por trabajo: satisfechos; asiduos insatisfechos cobrados suman, no cobrados restan
+    L.BENEFICIO_NETO_TRABAJOS += cfg.BENEFICIO_NETO_PORCENTAJE * (c_s.sum(axis=1) + c_ic[:, _ASIDUOS].sum(axis=1))
+    L.BENEFICIO_NETO_TRABAJOS -= c_in[:, _ASIDUOS].sum(axis=1)
+
+    # Cobro (_procesar_cobro)
+    n_cobro, c_cobro = n_ic + n_s, c_ic + c_s
+    factor_suscripcion = (1 - cfg.DESCUENTO_SUSCRIPCION) * cfg.BENEFICIO_NETO_PORCENTAJE
+    L.CREDITOS_ENTRANTES += c_cobro[:, SEG_NUEVO_TA] + c_cobro[:, SEG_PE_TA]
+    nuevos_ta = n_cobro[:, SEG_NUEVO_TA]
+    L.BENEFICIO_NETO_SUSCRIPCION += factor_suscripcion * c_cobro[:, _PE_SUSCRIPCION].sum(axis=1)
+    consumo_prepago = c_cobro[:, _PE_PREPAGO].sum(axis=1)
+    consumo_insatisfecho = c_ic[:, _PE_PREPAGO].sum(axis=1)
+    for seg, susc_attr, prep_attr in (
+        (SEG_NUEVO_CE, "CE_Suscripcion", "CE_Prepago"),
+        (SEG_NUEVO_ASIDUO, "Asiduos_Suscripcion", "Asiduos_Prepago"),
+    ):
+        n = n_cobro[:, seg]
+        susc = rng.binomial(n, prm.suscripcion_nuevo)
+        prep = n - susc
+        c_susc = c_cobro[:, seg] * _cociente(susc, n, 0.0)
+        L.CREDITOS_ENTRANTES += susc * cfg.PRECIO_SUSCRIPCION_MENSUAL + prep * cfg.PRECIO_RENOVACION_PREPAGO
+        L.BENEFICIO_NETO_SUSCRIPCION += susc * cfg.PRECIO_SUSCRIPCION_MENSUAL + factor_suscripcion * c_susc
+        L.BENEFICIO_NETO_PREPAGO += prep * cfg.PRECIO_RENOVACION_PREPAGO
+        L.Suscripciones_Totales += susc
+        L.Prepagos_Totales += prep
+        L.PE_con_paquetes += n
+        setattr(L, susc_attr, getattr(L, susc_attr) + susc)
+        setattr(L, prep_attr, getattr(L, prep_attr) + prep)
+        consumo_prepago = consumo_prepago + c_cobro[:, seg] - c_susc
+
+    # Conversión TA satisfecho → paquete (solo preexistentes)
+    convertidos = rng.binomial(n_s[:, SEG_PE_TA], prm.conversion_ta)
+    eventos[:, EV_CONVERSIONES_TA] += convertidos
+    conv_susc = rng.binomial(convertidos, _cociente(L.CE_Suscripcion, L.CE_Suscripcion + L.CE_Prepago, 1.0))
+    conv_prep = convertidos - conv_susc
+    L.CREDITOS_ENTRANTES += conv_susc * cfg.PRECIO_SUSCRIPCION_MENSUAL + conv_prep * cfg.PRECIO_RENOVACION_PREPAGO
+    L.BENEFICIO_NETO_SUSCRIPCION += conv_susc * cfg.PRECIO_SUSCRIPCION_MENSUAL
+    L.BENEFICIO_NETO_PREPAGO += conv_prep * cfg.PRECIO_RENOVACION_PREPAGO
+    L.Suscripciones_Totales += conv_susc
+    L.Prepagos_Totales += conv_prep
+    L.PE_con_paquetes += convertidos
+    asiduos_nuevos = rng.binomial(convertidos, prm.asiduo_tras_conversion)
+    asiduos_prep = rng.hypergeometric(conv_prep, conv_susc, asiduos_nuevos)
+    asiduos_susc = asiduos_nuevos - asiduos_prep
+    L.Asiduos_Suscripcion += asiduos_susc
+    L.Asiduos_Prepago += asiduos_prep
+    L.CE_Suscripcion += conv_susc - asiduos_susc
+    L.CE_Prepago += conv_prep - asiduos_prep
+
+    # No cobrados sin prepago: la mitad (Beta) queda conforme; el resto, CE conforme → disconforme, TA → se va
+    no_conformes = rng.binomial(n_in[:, _NO_COBRA_SIN_PREPAGO], 1 - prm.conforme_si_no_cobra)
+    ta_perdidos = no_conformes[:, 0] + no_conformes[:, 4]
+    L.perdidas_semana[:, _P_TA] += ta_perdidos
+    L.PE_Trabajo_Aislado = np.maximum(0, L.PE_Trabajo_Aislado + nuevos_ta - ta_perdidos - convertidos)
+
+    # Prepago disconforme no cobrado: abandona o, si no, puede recuperarse
+    abandonos = rng.binomial(n_in[:, SEG_CE_PREP_DISC], prm.abandono_prepago)
+    recuperados = rng.binomial(n_in[:, SEG_CE_PREP_DISC] - abandonos, prm.recuperacion_prepago)
+    abandonos = np.minimum(abandonos, L.Prepagos_Totales)
+    aband_asiduos = rng.binomial(abandonos, np.minimum(1.0, _cociente(L.Asiduos_Prepago, L.Prepagos_Totales, 0.0)))
+    L.perdidas_semana[:, _P_ABANDONO] += abandonos
+    eventos[:, EV_ABANDONOS_PREPAGO] += abandonos
+    L.PE_con_paquetes -= abandonos
+    L.Prepagos_Totales -= abandonos
+    L.Asiduos_Prepago = np.maximum(0, L.Asiduos_Prepago - aband_asiduos)
+    L.CE_Prepago = np.maximum(0, L.CE_Prepago - (abandonos - aband_asiduos))
+
+    # Disconformidad: altas (topeadas por total) y recuperaciones (piso 0)
+    ce_nuevo, ce_susc, ce_prep = SEG_NUEVO_CE, SEG_CE_SUSC, SEG_CE_PREP
+    alta_as = (n_ic + n_in + disc_falta)[:, _ASIDUOS_CONFORMES].sum(axis=1)
+    # Columnas de no_conformes: las de _NO_COBRA_SIN_PREPAGO (1 = CE nuevo, 2 = CE con suscripción)
+    alta_susc = n_ic[:, ce_susc] + disc_falta[:, ce_susc] + no_conformes[:, 1] + no_conformes[:, 2]
+    alta_prep = n_ic[:, ce_prep] + disc_falta[:, ce_prep] + n_in[:, ce_prep]
+    alta_ce = alta_susc + alta_prep + n_ic[:, ce_nuevo] + disc_falta[:, ce_nuevo]
+    baja_as = n_s[:, [SEG_AS_SUSC_DISC, SEG_AS_PREP_DISC]].sum(axis=1) + aband_asiduos
+    baja_ce = n_s[:, SEG_CE_SUSC_DISC] + n_s[:, SEG_CE_PREP_DISC] + recuperados + (abandonos - aband_asiduos)
+    baja_susc = n_s[:, SEG_CE_SUSC_DISC]
+    baja_prep = n_s[:, SEG_CE_PREP_DISC] + recuperados + abandonos
+    L.Disconformes_Asiduos = np.maximum(0, np.minimum(
+        L.Disconformes_Asiduos + alta_as, L.Asiduos_Suscripcion + L.Asiduos_Prepago) - baja_as)
+    L.Disconformes_CE = np.maximum(0, np.minimum(L.Disconformes_CE + alta_ce, L.CE_Suscripcion + L.CE_Prepago) - baja_ce)
+    L.Disconformes_Suscripcion = np.maximum(0, np.minimum(
+        L.Disconformes_Suscripcion + alta_susc, L.Suscripciones_Totales) - baja_susc)
+    L.Disconformes_Prepago = np.maximum(0, np.minimum(L.Disconformes_Prepago + alta_prep, L.Prepagos_Totales) - baja_prep)
+
+    _consumir_prepago(L, rng, prm, consumo_prepago, np.minimum(1.0, _cociente(consumo_insatisfecho, consumo_prepago, 0.0)))
+
+
+def _consumir_prepago(
+    L: LoteAgregado, rng: np.random.Generator, prm: ParametrosAgregados,
+    consumo: np.ndarray, frac_insatisfecho: np.ndarray,
+) -> None:
+    """
+    Consumo del día sobre el bloque global de prepago (_consumir_creditos_prepago en bloque):
+    cada vez que se agota se vende otro bloque. Si lo agotó un trabajo insatisfecho cobrado
+    (fracción frac_insatisfecho del consumo) pasa por _renovar_bloque_prepago: un cliente
+    disconforme puede no renovar (baja, sin ingreso).
+    """
+    L.BENEFICIO_NETO_PREPAGO -= consumo * cfg.FACTOR_COSTO_TECNICO_PREPAGO
+    bloque = cfg.CREDITOS_PREPAGO_BLOQUE
+    faltante = consumo - L.creditos_prepago_global
+    agotamientos = np.where(faltante >= 0, np.floor(faltante / bloque) + 1, 0).astype(np.int64)
+    L.creditos_prepago_global = L.creditos_prepago_global - consumo + agotamientos * bloque
+    prob_baja = np.minimum(1.0, _cociente(L.Disconformes_Prepago, L.Prepagos_Totales, 0.0)) * prm.no_renovacion_prepago
+    bajas = np.minimum(rng.binomial(rng.binomial(agotamientos, frac_insatisfecho), prob_baja), L.Prepagos_Totales)
+    ventas = agotamientos - bajas
+    L.CREDITOS_ENTRANTES += ventas * cfg.PRECIO_RENOVACION_PREPAGO
+    L.BENEFICIO_NETO_PREPAGO += ventas * cfg.PRECIO_RENOVACION_PREPAGO
+    L.perdidas_semana[:, _P_PREP] += bajas
+    L.eventos[:, EV_BLOQUES_PREPAGO_VENDIDOS] += ventas
+    L.eventos[:, EV_NO_RENOVACIONES_PREPAGO] += bajas
+    L.PE_con_paquetes -= bajas
+    L.Prepagos_Totales -= bajas
+    bajas_asiduos = rng.binomial(bajas, np.minimum(1.0, _cociente(L.Asiduos_Prepago, L.Prepagos_Totales, 0.0)))
+    L.Asiduos_Prepago = np.maximum(0, L.Asiduos_Prepago - bajas_asiduos)
+    L.Disconformes_Asiduos = np.maximum(0, L.Disconformes_Asiduos - bajas_asiduos)
+    L.CE_Prepago = np.maximum(0, L.CE_Prepago - (bajas - bajas_asiduos))
+    L.Disconformes_CE = np.maximum(0, L.Disconformes_CE - bajas)
+    L.Disconformes_Prepago = np.maximum(0, L.Disconformes_Prepago - bajas)
+
+
+def _cobrar_suscripciones(L: LoteAgregado, rng: np.random.Generator, prm: ParametrosAgregados) -> None:
+    """principal.cobrar_suscripciones sobre el lote."""
+    no_renovaciones = np.minimum(rng.binomial(L.Disconformes_Suscripcion, prm.no_renovacion_suscripcion),
+                                 L.Suscripciones_Totales)
+    L.perdidas_semana[:, _P_SUSC] += no_renovaciones
+    L.eventos[:, EV_NO_RENOVACIONES_SUSCRIPCION] += no_renovaciones
+    L.Suscripciones_Totales -= no_renovaciones
+    L.PE_con_paquetes -= no_renovaciones
+    total_susc = L.Asiduos_Suscripcion + L.CE_Suscripcion
+    bajas_asiduos = np.minimum(L.Asiduos_Suscripcion, rng.binomial(
+        no_renovaciones, _cociente(L.Asiduos_Suscripcion, total_susc, 0.0)))
+    bajas_ce = np.minimum(no_renovaciones - bajas_asiduos, L.CE_Suscripcion)
+    bajas_asiduos = np.where(total_susc > 0, no_renovaciones - bajas_ce, 0)
+    bajas_ce = np.where(total_susc > 0, bajas_ce, 0)
+    L.Asiduos_Suscripcion -= bajas_asiduos
+    L.CE_Suscripcion -= bajas_ce
+    L.Disconformes_Asiduos = np.maximum(0, L.Disconformes_Asiduos - bajas_asiduos)
+    L.Disconformes_CE = np.maximum(0, L.Disconformes_CE - bajas_ce)
+    L.Disconformes_Suscripcion = np.maximum(0, L.Disconformes_Suscripcion - bajas_ce)
+    ingresos = L.Suscripciones_Totales * cfg.PRECIO_SUSCRIPCION_MENSUAL
+    L.CREDITOS_ENTRANTES += ingresos
+    L.BENEFICIO_NETO_SUSCRIPCION += ingresos
+
+
+def _pct(parte: np.ndarray, total: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(satisfechos %, insatisfechos %) con parte = disconformes topeados por total; 0.0 si total = 0."""
+    parte = np.minimum(parte, total)
+    insatisfechos = _cociente(parte * 100.0, total, 0.0)
+    return np.where(total > 0, 100.0 - insatisfechos, 0.0), insatisfechos
+
+
+def _capturar_semana(L: LoteAgregado) -> None:
+    """principal.capturar_metricas_semana sobre el lote: una fila de metricas_semanales por corrida."""
+    from .memoria_compartida import _indices_series
+
+    prep_sat, prep_insat = _pct(L.Disconformes_Prepago, L.Prepagos_Totales)
+    susc_sat, susc_insat = _pct(L.Disconformes_Suscripcion, L.Suscripciones_Totales)
+    gen_sat, gen_insat = _pct(
+        L.Disconformes_Asiduos + L.Disconformes_CE, L.Suscripciones_Totales + L.Prepagos_Totales)
+    valores = {
+        "semana": L.T // cfg.DIAS_POR_SEMANA,
+        "dia": L.T,
+        "perdidas_total": L.perdidas_semana.sum(axis=1),
+        "satisfaccion.prepago_satisfechos_pct": prep_sat,
+        "satisfaccion.prepago_insatisfechos_pct": prep_insat,
+        "satisfaccion.suscripcion_satisfechos_pct": susc_sat,
+        "satisfaccion.suscripcion_insatisfechos_pct": susc_insat,
+        "satisfaccion.general_satisfechos_pct": gen_sat,
+        "satisfaccion.general_insatisfechos_pct": gen_insat,
+        "clientes.suscripciones_totales": L.Suscripciones_Totales,
+        "clientes.prepagos_totales": L.Prepagos_Totales,
+        "clientes.trabajo_aislado": L.PE_Trabajo_Aislado,
+        "clientes.pe_con_paquetes": L.PE_con_paquetes,
+        "beneficios.trabajos": L.BENEFICIO_NETO_TRABAJOS,
+        "beneficios.prepago": L.BENEFICIO_NETO_PREPAGO,
+        "beneficios.suscripcion": L.BENEFICIO_NETO_SUSCRIPCION,
+        "beneficios.total_acumulado": L.beneficio_acumulado(),
+        "costos.desarrollo": L.COSTOS_DESARROLLO,
+        "costos.marketing": L.COSTO_MKT,
+    }
+    for j, nombre in enumerate(_PERDIDAS):
+        valores[f"perdidas.{nombre}"] = L.perdidas_semana[:, j]
+    fila = L.metricas_semanales[:, L.T // cfg.DIAS_POR_SEMANA - 1]
+    for nombre, j in _indices_series().items():
+        fila[:, j] = valores.get(nombre, 0.0)  # costos.tecnicos / resarcimiento: siempre 0
+    L.perdidas_semana[:] = 0
+
+
+def simular_dia_agregado(L: LoteAgregado, rng: np.random.Generator, prm: ParametrosAgregados) -> None:
+    """Avanza el lote un día: los pasos de principal.simular_dia, con las llegadas en conteos."""
+    L.T += 1
+    T = L.T
+    R = L.replicas
+    props = muestreo.dirichlet_3(cfg.DIRICHLET_ALPHA_APPS, cfg.DIRICHLET_ALPHA_IT, cfg.DIRICHLET_ALPHA_DEV, R, rng)
+
+    # Técnicos: incorporaciones, ciclo de contratación (cada 3 semanas) y rotación semanal
+    pendientes = L.contrataciones_pendientes
+    while pendientes and pendientes[0][0] <= T:
+        _, n_dev, n_apps_it = pendientes.pop(0)
+        L.Tecnicos_Dev += n_dev
+        L.Tecnicos_AppsIT += n_apps_it
+        L.eventos[:, EV_TECNICOS_INCORPORADOS] += n_dev + n_apps_it
+    ciclo_dias = cfg.SEMANAS_CICLO_CONTRATACION * cfg.DIAS_POR_SEMANA
+    if T >= 2 and (T - 1) % ciclo_dias == 0:
+        perdidos = L.trabajos_perdidos_por_tipo
+        n_devs = np.round(perdidos[:, 2] * cfg.FACTOR_DEVS_POR_TRABAJO_DESARROLLO_PERDIDO).astype(np.int64)
+        n_apps_it = np.round(
+            (perdidos[:, 0] + perdidos[:, 1]) * cfg.FACTOR_APPS_IT_POR_TRABAJO_APPS_IT_PERDIDO).astype(np.int64)
+        if n_devs.any() or n_apps_it.any():
+            pendientes.append((T + ciclo_dias, n_devs, n_apps_it))
+        perdidos[:] = 0
+    if T % cfg.DIAS_POR_SEMANA == 0:
+        antes = L.Tecnicos_Dev + L.Tecnicos_AppsIT
+        L.Tecnicos_Dev = np.maximum(1, L.Tecnicos_Dev - rng.binomial(L.Tecnicos_Dev, cfg.PROB_ROTACION_TECNICO_SEMANAL))
+        L.Tecnicos_AppsIT = np.maximum(
+            1, L.Tecnicos_AppsIT - rng.binomial(L.Tecnicos_AppsIT, cfg.PROB_ROTACION_TECNICO_SEMANAL))
+        L.eventos[:, EV_BAJAS_TECNICOS] += antes - L.Tecnicos_Dev - L.Tecnicos_AppsIT
+
+    # Trabajos del día (calcular_trabajos_asiduos / calcular_clientes_nuevos_hoy)
+    media = np.maximum(1.0, (L.Asiduos_Suscripcion + L.Asiduos_Prepago) * cfg.TRABAJO_POR_ASIDUO_DIA)
+    p = cfg.TRABAJOS_BINOMIAL_NEG_P
+    r = np.maximum(1.0, media * p / (1 - p)).astype(np.int64)
+    base = np.minimum(rng.negative_binomial(r, p), cfg.TRABAJOS_DIARIOS_MAX_ABS)
+    trabajos_asiduos = np.clip(base, cfg.TRABAJOS_DIARIOS_MIN_ABS, cfg.TRABAJOS_DIARIOS_MAX_ABS)
+    M = L.PRESUPUESTO_MKT_MENSUAL
+    max_nuevos = np.maximum(0, np.floor((M - L.CREDITOS_MKT_GASTADOS_MES) / cfg.COSTO_MKT_POR_CLIENTE_NUEVO))
+    media_nuevos = M / (cfg.DIAS_POR_MES * cfg.COSTO_MKT_POR_CLIENTE_NUEVO)
+    nuevos = np.minimum(muestreo.poisson(media_nuevos, R, rng), max_nuevos.astype(np.int64))
+    TD = trabajos_asiduos + nuevos
+    TDN = np.ceil(TD * cfg.PROP_HORARIO_LABORAL).astype(np.int64)
+    TDOFF = np.floor(TD * cfg.PROP_FUERA_HORARIO).astype(np.int64)
+
+    # verificar_implementacion: el calendario es el mismo para todo el lote
+    N = L.DIAS_IMPLEMENTACION
+    if T - L.ULTIMO_DIA_IMPLEMENTACION >= N:
+        L.ULTIMO_DIA_IMPLEMENTACION = T
+        L.DIAS_INESTABILIDAD_RESTANTES = int(np.ceil(N * cfg.PORCENTAJE_DIAS_INESTABILIDAD))
+        es_inestable = True
+    elif L.DIAS_INESTABILIDAD_RESTANTES > 0:
+        L.DIAS_INESTABILIDAD_RESTANTES -= 1
+        es_inestable = True
+    else:
+        es_inestable = False
+
+    if T % cfg.DIAS_POR_SEMANA == 0:
+        scoring = (L.Asiduos_Suscripcion + L.Asiduos_Prepago) + L.PE_con_paquetes
+        anterior = L.scoring_IA_semana_anterior
+        L.ajuste_prob_calendarizacion = _cociente(scoring - anterior, anterior, 0.0) / 5.0
+        L.scoring_IA_semana_anterior = scoring.astype(np.float64)
+
+    _procesar_llegadas(
+        L, rng, prm, props, es_inestable, nuevos, trabajos_asiduos, TDN, TDOFF,
+        es_dia_semana=(T % cfg.DIAS_POR_SEMANA) <= 4,
+    )
+
+    if (T - 1) % cfg.DIAS_POR_MES == 0:
+        L.COSTOS_DESARROLLO += cfg.COSTO_DESARROLLO_MENSUAL
+        L.BENEFICIO_NETO_TOTAL -= cfg.COSTO_DESARROLLO_MENSUAL
+    if T % cfg.DIAS_POR_MES == 0:
+        _cobrar_suscripciones(L, rng, prm)
+        L.CREDITOS_MKT_GASTADOS_MES[:] = 0.0
+
+    beneficio = L.beneficio_acumulado()
+    L.T_EQUILIBRIO = np.where((L.T_EQUILIBRIO < 0) & (beneficio > 0), T, L.T_EQUILIBRIO)
+    L.beneficio_acumulado_por_dia[:, T - 1] = beneficio
+    if T % cfg.DIAS_POR_SEMANA == 0:
+        _capturar_semana(L)
+
+
+def _tipos_semana() -> Tuple[int, ...]:
+    """Tipo (float / int / bool de memoria_compartida) de cada serie semanal, según un snapshot de muestra."""
+    from .memoria_compartida import _tipo, estructura_semana
+    from .principal import capturar_metricas_semana
+
+    muestra = capturar_metricas_semana(EstadoSimulacion(T_FINAL=7, N=7, M=0))
+    return tuple(
+        _tipo(muestra[c] if g is None else muestra[g][c])
+        for g, claves in estructura_semana() for c in claves
+    )
+
+
+def _a_estado(L: LoteAgregado, i: int, tipos: Tuple[int, ...], segundos: Optional[float]) -> EstadoSimulacion:
+    """
+    EstadoSimulacion final de la corrida i del lote (metricas_semanales como SemanasCompactas).
+    segundos: SEGUNDOS_SIMULACION de la corrida; None en lotes de varias réplicas, donde el
+    tiempo es del lote (SEGUNDOS_LOTE) y no se puede atribuir a cada corrida.
+    """
+    from .memoria_compartida import SemanasCompactas
+    from .principal import actualizar_mejor_trimestre
+
+    est = EstadoSimulacion(T_FINAL=L.T_FINAL, N=L.DIAS_IMPLEMENTACION, M=L.PRESUPUESTO_MKT_MENSUAL)
+    est.T = L.T
+    est.ULTIMO_DIA_IMPLEMENTACION = L.ULTIMO_DIA_IMPLEMENTACION
+    est.DIAS_INESTABILIDAD_RESTANTES = L.DIAS_INESTABILIDAD_RESTANTES
+    for nombre in _CONTADORES:
+        setattr(est, nombre, int(getattr(L, nombre)[i]))
+    for nombre in _MONTOS:
+        setattr(est, nombre, float(getattr(L, nombre)[i]))
+    est.TPS_Dev = [cfg.HIGH_VALUE] * est.Tecnicos_Dev
+    est.TPS_AppsIT = [cfg.HIGH_VALUE] * est.Tecnicos_AppsIT
+    est.trabajos_perdidos_por_tipo = dict(zip(CLASES_TRABAJO, L.trabajos_perdidos_por_tipo[i].tolist()))
+    est.perdidas_semana = dict(zip(_PERDIDAS, L.perdidas_semana[i].tolist()))
+    est.eventos = L.eventos[i].tolist()
+    est.SEGUNDOS_SIMULACION = segundos
+    est.contrataciones_pendientes = [
+        (dia, int(n_dev[i]), int(n_apps_it[i])) for dia, n_dev, n_apps_it in L.contrataciones_pendientes
+        if n_dev[i] or n_apps_it[i]
+    ]
+    est.T_EQUILIBRIO = int(L.T_EQUILIBRIO[i]) if L.T_EQUILIBRIO[i] >= 0 else None
+    est.beneficio_acumulado_por_dia = L.beneficio_acumulado_por_dia[i, :L.T].tolist()
+    est.metricas_semanales = SemanasCompactas(L.metricas_semanales[i], tipos)
+    actualizar_mejor_trimestre(est)
+    return est
+
+
+def simular_lote(
+    T_FINAL: int,
+    N: int,
+    M: float,
+    prob_suscripcion_nuevo: float = 0.50,
+    replicas: int = 1,
+    semilla: Optional[int] = None,
+    modelo_duracion: Optional[str] = None,
+    callback: Optional[Callable[[int, int], None]] = None,
+) -> List[EstadoSimulacion]:
+    """
+    'replicas' corridas del modo agregado hasta T_FINAL, avanzando juntas; devuelve un
+    EstadoSimulacion final por corrida (para extraer_metricas, gráficos, almacén).
+    El tiempo del lote queda en SEGUNDOS_LOTE de cada estado; SEGUNDOS_SIMULACION solo
+    se llena con una réplica.
+    semilla: del numpy.random.Generator del lote (None: entropía del sistema).
+    modelo_duracion: distribución de duración APPS/IT (cfg.MODELOS_DURACION; None = la de config).
+    callback: opcional, se llama al cerrar cada semana con (día, T_FINAL).
+    Con T_FINAL > HORIZONTE_VALIDADO emite un UserWarning: fuera de lo validado.
+    """
+    if T_FINAL > HORIZONTE_VALIDADO:
+        warnings.warn(
+            f"modo agregado con T_FINAL={T_FINAL} > {HORIZONTE_VALIDADO} días: fuera del horizonte validado "
+            "contra el modo detallado (dispersión y técnicos APPS/IT sesgados; ver README, Modo agregado)",
+            stacklevel=2,
+        )
+    if modelo_duracion is not None:
+        if modelo_duracion not in cfg.MODELOS_DURACION:
+            raise ValueError(f"modelo_duracion debe ser uno de {cfg.MODELOS_DURACION}")
+        cfg.MODELO_DURACION = modelo_duracion
+    cfg.PROB_TIPO_PAGO_SUSCRIPCION_CLIENTE_NUEVO_CE = prob_suscripcion_nuevo
+    rng = muestreo.crear_generador(semilla)
+    prm = ParametrosAgregados(prob_suscripcion_nuevo)
+    lote = LoteAgregado(replicas, T_FINAL, N, M)
+    segundos = 0.0
+    while lote.T < T_FINAL:
+        inicio = time.perf_counter()
+        simular_dia_agregado(lote, rng, prm)
+        segundos += time.perf_counter() - inicio
+        if callback and lote.T % cfg.DIAS_POR_SEMANA == 0:
+            callback(lote.T, T_FINAL)
+    tipos = _tipos_semana()
+    estados = [_a_estado(lote, i, tipos, segundos if replicas == 1 else None) for i in range(replicas)]
+    for est in estados:
+        est.SEGUNDOS_LOTE = segundos
+    return estados
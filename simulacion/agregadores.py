@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Agregadores combinables para métricas de benchmark.
+Permiten sumar corridas nuevas a un benchmark ya exportado sin re-simular las
+anteriores: el JSON guarda, por métrica y por semana, el estado del agregador
+(conteo, suma, M2, mínimo, máximo y un sketch de cuantiles) en lugar de solo
+las estadísticas terminadas.
+
+- Momentos: media y varianza combinables (fórmula de Chan et al.).
+- SketchCuantiles: DDSketch (Masson et al.), buckets logarítmicos con error
+  relativo ALFA_SKETCH en los cuantiles; combinar = sumar conteos por bucket.
+- EstadoBenchmark: los agregadores de todas las métricas de agregar_metricas,
+  con estadisticas() / series_agregadas() en el mismo formato.
+
+Media, std, min y max combinados son exactos; p25/p50/p75 salen del sketch
+(aproximados con error relativo ALFA_SKETCH).
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+ALFA_SKETCH = 0.01
+_MINIMO_INDEXABLE = 1e-9  # |x| menor cuenta en el bucket del cero
+
+
+@dataclass
+class Momentos:
+    """Conteo, suma y M2 (suma de cuadrados de desvíos) más extremos."""
+    n: int = 0
+    suma: float = 0.0
+    m2: float = 0.0
+    minimo: float = math.inf
+    maximo: float = -math.inf
+
+    @property
+    def media(self) -> float:
+        return self.suma / self.n if self.n else 0.0
+
+    def agregar(self, x: float) -> None:
+        media_ant = self.media
+        self.n += 1
+        self.suma += x
+        self.m2 += (x - media_ant) * (x - self.media)
+        self.minimo = min(self.minimo, x)
+        self.maximo = max(self.maximo, x)
+
+    def combinar(self, otro: "Momentos") -> "Momentos":
+        if otro.n == 0:
+            return Momentos(self.n, self.suma, self.m2, self.minimo, self.maximo)
+        if self.n == 0:
+            return Momentos(otro.n, otro.suma, otro.m2, otro.minimo, otro.maximo)
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        return Momentos(
+            n=n,
+            suma=self.suma + otro.suma,
+            m2=self.m2 + otro.m2 + delta * delta * self.n * otro.n / n,
+            minimo=min(self.minimo, otro.minimo),
+            maximo=max(self.maximo, otro.maximo),
+        )
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "suma": self.suma, "m2": self.m2,
+                "min": self.minimo if self.n else None, "max": self.maximo if self.n else None}
+
+    @classmethod
+    def desde_dict(cls, d: Dict[str, Any]) -> "Momentos":
+        return cls(
+            n=int(d["n"]), suma=float(d["suma"]), m2=float(d["m2"]),
+            minimo=math.inf if d.get("min") is None else float(d["min"]),
+            maximo=-math.inf if d.get("max") is None else float(d["max"]),
+        )
+
+
+class SketchCuantiles:
+    """DDSketch: cuantiles con error relativo alfa, combinable sumando buckets."""
+
+    def __init__(self, alfa: float = ALFA_SKETCH):
+        self.alfa = alfa
+        self._gamma = (1 + alfa) / (1 - alfa)
+        self._log_gamma = math.log(self._gamma)
+        self.positivos: Dict[int, int] = {}
+        self.negativos: Dict[int, int] = {}
+        self.ceros = 0
+        self.n = 0
+
+    def _indice(self, x: float) -> int:
+        return int(math.ceil(math.log(x) / self._log_gamma))
+
+    def _valor(self, indice: int) -> float:
+        return 2 * self._gamma ** indice / (self._gamma + 1)
+
+    def agregar(self, x: float) -> None:
+        self.n += 1
+        if x > _MINIMO_INDEXABLE:
+            i = self._indice(x)
+            self.positivos[i] = self.positivos.get(i, 0) + 1
+        elif x < -_MINIMO_INDEXABLE:
+            i = self._indice(-x)
+            self.negativos[i] = self.negativos.get(i, 0) + 1
+        else:
+            self.ceros += 1
+
+    def combinar(self, otro: "SketchCuantiles") -> "SketchCuantiles":
+        if otro.alfa != self.alfa:
+            raise ValueError("No se pueden combinar sketches con distinto alfa")
+        r = SketchCuantiles(self.alfa)
+        for destino, a, b in ((r.positivos, self.positivos, otro.positivos),
+                              (r.negativos, self.negativos, otro.negativos)):
+            destino.update(a)
+            for i, c in b.items():
+                destino[i] = destino.get(i, 0) + c
+        r.ceros = self.ceros + otro.ceros
+        r.n = self.n + otro.n
+        return r
+
+    def cuantil(self, q: float) -> Optional[float]:
+        """Valor en el cuantil q ∈ [0, 1] (rango q·(n-1), de menor a mayor)."""
+        if self.n == 0:
+            return None
+        rango = q * (self.n - 1)
+        acumulado = 0
+        for i in sorted(self.negativos, reverse=True):
+            acumulado += self.negativos[i]
+            if acumulado > rango:
+                return -self._valor(i)
+        acumulado += self.ceros
+        if acumulado > rango:
+            return 0.0
+        for i in sorted(self.positivos):
+            acumulado += self.positivos[i]
+            if acumulado > rango:
+                return self._valor(i)
+        return self._valor(max(self.positivos)) if self.positivos else 0.0
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "alfa": self.alfa, "n": self.n, "ceros": self.ceros,
+            "positivos": {str(i): c for i, c in sorted(self.positivos.items())},
+            "negativos": {str(i): c for i, c in sorted(self.negativos.items())},
+        }
+
+    @classmethod
+    def desde_dict(cls, d: Dict[str, Any]) -> "SketchCuantiles":
+        s = cls(float(d["alfa"]))
+        s.n = int(d["n"])
+        s.ceros = int(d["ceros"])
+        s.positivos = {int(i): int(c) for i, c in d["positivos"].items()}
+        s.negativos = {int(i): int(c) for i, c in d["negativos"].items()}
+        return s
+
+
+@dataclass
+class Agregador:
+    """Momentos + sketch de una métrica."""
+    momentos: Momentos = field(default_factory=Momentos)
+    sketch: SketchCuantiles = field(default_factory=SketchCuantiles)
+
+    @classmethod
+    def desde_valores(cls, valores: List[float]) -> "Agregador":
+        a = cls()
+        for v in valores:
+            a.momentos.agregar(float(v))
+            a.sketch.agregar(float(v))
+        return a
+
+    def combinar(self, otro: "Agregador") -> "Agregador":
+        return Agregador(self.momentos.combinar(otro.momentos), self.sketch.combinar(otro.sketch))
+
+    def resumen(self) -> Dict[str, float]:
+        """Mismo formato que benchmark._estadisticas ({} si no hay valores)."""
+        m = self.momentos
+        if m.n == 0:
+            return {}
+        return {
+            "media": m.media,
+            "std": math.sqrt(m.m2 / (m.n - 1)) if m.n > 1 else 0.0,
+            "min": m.minimo,
+            "max": m.maximo,
+            "p25": self.sketch.cuantil(0.25),
+            "p50": self.sketch.cuantil(0.50),
+            "p75": self.sketch.cuantil(0.75),
+        }
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {"momentos": self.momentos.a_dict(), "sketch": self.sketch.a_dict()}
+
+    @classmethod
+    def desde_dict(cls, d: Dict[str, Any]) -> "Agregador":
+        return cls(Momentos.desde_dict(d["momentos"]), SketchCuantiles.desde_dict(d["sketch"]))
+
+
+@dataclass
+class EstadoBenchmark:
+    """Estado combinable de un benchmark: corridas, truncadas y agregadores por métrica y por semana."""
+    n_runs: int = 0
+    truncadas_por_motivo: Dict[str, int] = field(default_factory=dict)
+    metricas: Dict[str, Agregador] = field(default_factory=dict)
+    semanas: Dict[str, List[Agregador]] = field(default_factory=dict)
+
+    def combinar(self, otro: "EstadoBenchmark") -> "EstadoBenchmark":
+        truncadas = dict(self.truncadas_por_motivo)
+        for motivo, c in otro.truncadas_por_motivo.items():
+            truncadas[motivo] = truncadas.get(motivo, 0) + c
+        metricas = {
+            nombre: self.metricas.get(nombre, Agregador()).combinar(otro.metricas.get(nombre, Agregador()))
+            for nombre in list(self.metricas) + [n for n in otro.metricas if n not in self.metricas]
+        }
+        semanas: Dict[str, List[Agregador]] = {}
+        for nombre in list(self.semanas) + [n for n in otro.semanas if n not in self.semanas]:
+            a, b = self.semanas.get(nombre, []), otro.semanas.get(nombre, [])
+            semanas[nombre] = [
+                (a[w] if w < len(a) else Agregador()).combinar(b[w] if w < len(b) else Agregador())
+                for w in range(max(len(a), len(b)))
+            ]
+        return EstadoBenchmark(self.n_runs + otro.n_runs, truncadas, metricas, semanas)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Mismo formato que agregar_metricas(...)["estadisticas"]."""
+        estadisticas: Dict[str, Any] = {}
+        for nombre, a in self.metricas.items():
+            estadisticas[nombre] = a.resumen()
+            if nombre == "equilibrio_dia":
+                estadisticas["equilibrio_porcentaje"] = a.momentos.n / self.n_runs * 100 if self.n_runs else 0.0
+        return estadisticas
+
+    def series_agregadas(self) -> Dict[str, List[Dict[str, float]]]:
+        return {nombre: [a.resumen() for a in semanas] for nombre, semanas in self.semanas.items()}
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "n_runs": self.n_runs,
+            "truncadas_por_motivo": self.truncadas_por_motivo,
+            "metricas": {n: a.a_dict() for n, a in self.metricas.items()},
+            "semanas": {n: [a.a_dict() for a in s] for n, s in self.semanas.items()},
+        }
+
+    @classmethod
+    def desde_dict(cls, d: Dict[str, Any]) -> "EstadoBenchmark":
+        return cls(
+            n_runs=int(d["n_runs"]),
+            truncadas_por_motivo=dict(d.get("truncadas_por_motivo", {})),
+            metricas={n: Agregador.desde_dict(a) for n, a in d["metricas"].items()},
+            semanas={n: [Agregador.desde_dict(a) for a in s] for n, s in d.get("semanas", {}).items()},
+        )
+
+
+def estado_desde_metricas(metricas_runs: List[Any]) -> EstadoBenchmark:
+    """EstadoBenchmark de una lista de MetricasResumen (las mismas métricas que agregar_metricas)."""
+    from .benchmark import _truncadas_por_motivo, _valores_por_metrica, _valores_por_semana
+
+    return EstadoBenchmark(
+        n_runs=len(metricas_runs),
+        truncadas_por_motivo=_truncadas_por_motivo(metricas_runs),
+        metricas={n: Agregador.desde_valores(v) for n, v in _valores_por_metrica(metricas_runs).items()},
+        semanas={
+            n: [Agregador.desde_valores(v) for v in semanas]
+            for n, semanas in _valores_por_semana(metricas_runs).items()
+        },
+    )
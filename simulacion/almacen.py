@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén columnar binario de resultados por corrida.
+Guarda las métricas escalares de cada run (una columna por métrica) y las
+series semanales (matriz runs × semanas por serie) en .npy memory-mappable
+o en .npz comprimido, para que los lectores carguen solo lo que necesitan.
+
+Estructura del directorio:
+  meta.json                 # n_runs, n_semanas, parámetros, columnas, formato
+  escalares/<columna>.npy   # formato "npy" (memory-mappable)
+  semanales/<serie>.npy
+  escalares.npz             # formato "npz" (comprimido)
+  semanales.npz
+"""
+
+import json
+from dataclasses import fields
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .benchmark import MetricasResumen
+
+VERSION_ALMACEN = 1
+FORMATO_NPY = "npy"
+FORMATO_NPZ = "npz"
+
+# Campos de MetricasResumen que no son escalares numéricos por corrida
+_CAMPOS_NO_ESCALARES = ("metricas_semanales", "motivo_parada")
+# Claves de metricas_semanales que son índice, no serie
+_CLAVES_INDICE_SEMANA = ("semana", "dia")
+
+
+def _columnas_escalares_nombres() -> List[str]:
+    return [f.name for f in fields(MetricasResumen) if f.name not in _CAMPOS_NO_ESCALARES]
+
+
+def columnas_escalares(metricas_runs: List[MetricasResumen]) -> Dict[str, np.ndarray]:
+    """Una columna float64 por métrica escalar (None → NaN)."""
+    columnas: Dict[str, np.ndarray] = {}
+    for nombre in _columnas_escalares_nombres():
+        valores = [getattr(m, nombre) for m in metricas_runs]
+        columnas[nombre] = np.array(
+            [np.nan if v is None else float(v) for v in valores], dtype=np.float64
+        )
+    return columnas
+
+
+def _plan_semana(ms: Dict[str, Any]) -> Tuple[List[tuple], List[str]]:
+    """
+    Cómo leer las hojas de un snapshot semanal: [(clave, itemgetter de sus hojas o None)].
+    Devuelve también los nombres planos ("grupo.clave") en el mismo orden.
+    """
+    plan: List[tuple] = []
+    nombres: List[str] = []
+    for clave, valor in ms.items():
+        if clave in _CLAVES_INDICE_SEMANA:
+            continue
+        if isinstance(valor, dict):
+            hojas = list(valor)
+            plan.append((clave, itemgetter(*hojas) if len(hojas) > 1 else (lambda d, h=hojas[0]: (d[h],))))
+            nombres.extend(f"{clave}.{h}" for h in hojas)
+        else:
+            plan.append((clave, None))
+            nombres.append(clave)
+    return plan, nombres
+
+
+def apilar_series_semanales(metricas_runs: List[MetricasResumen]) -> Dict[str, np.ndarray]:
+    """
+    Apila cada serie semanal en una matriz runs × semanas (float64).
+    Corridas con menos semanas quedan rellenadas con NaN.
+    Todas las semanas tienen la estructura de capturar_metricas_semana: las claves se
+    toman del primer snapshot y cada corrida se copia como un bloque semanas × series.
+    """
+    n_runs = len(metricas_runs)
+    n_semanas = max((len(m.metricas_semanales) for m in metricas_runs), default=0)
+    if n_runs == 0 or n_semanas == 0:
+        return {}
+    plan, nombres = _plan_semana(next(m.metricas_semanales[0] for m in metricas_runs if m.metricas_semanales))
+    tensor = np.full((n_runs, n_semanas, len(nombres)), np.nan, dtype=np.float64)
+    for i, m in enumerate(metricas_runs):
+        if hasattr(m.metricas_semanales, "matriz") and len(m.metricas_semanales):
+            # SemanasCompactas (resultados por memoria compartida): copiar columnas de la matriz
+            columnas = [m.metricas_semanales.columna(nombre) for nombre in nombres]
+            if None not in columnas:
+                bloque = m.metricas_semanales.matriz()
+                tensor[i, :bloque.shape[0]] = bloque[:, columnas]
+                continue
+        filas = []
+        for ms in m.metricas_semanales:
+            fila: List[Any] = []
+            for clave, hojas in plan:
+                if hojas is None:
+                    fila.append(ms[clave])
+                else:
+                    fila.extend(hojas(ms[clave]))
+            filas.append(fila)
+        if filas:
+            tensor[i, :len(filas)] = np.array(filas, dtype=np.float64)
+    return {nombre: np.ascontiguousarray(tensor[:, :, k]) for k, nombre in enumerate(nombres)}
+
+
+def guardar_almacen(
+    directorio: Union[str, Path],
+    metricas_runs: List[MetricasResumen],
+    parametros: Optional[Dict[str, Any]] = None,
+    comprimir: bool = False,
+) -> Path:
+    """
+    Guarda escalares y series semanales de cada corrida en 'directorio'.
+    comprimir=False: un .npy por columna (memory-mappable).
+    comprimir=True: escalares.npz y semanales.npz comprimidos (carga perezosa por columna).
+    """
+    base = Path(directorio)
+    base.mkdir(parents=True, exist_ok=True)
+    escalares = columnas_escalares(metricas_runs)
+    semanales = apilar_series_semanales(metricas_runs)
+
+    formato = FORMATO_NPZ if comprimir else FORMATO_NPY
+    if comprimir:
+        np.savez_compressed(base / "escalares.npz", **escalares)
+        if semanales:
+            np.savez_compressed(base / "semanales.npz", **semanales)
+    else:
+        for grupo, datos in (("escalares", escalares), ("semanales", semanales)):
+            sub = base / grupo
+            sub.mkdir(exist_ok=True)
+            for nombre, arr in datos.items():
+                np.save(sub / f"{nombre}.npy", arr)
+
+    n_semanas = next(iter(semanales.values())).shape[1] if semanales else 0
+    meta = {
+        "version": VERSION_ALMACEN,
+        "formato": formato,
+        "n_runs": len(metricas_runs),
+        "n_semanas": n_semanas,
+        "parametros": parametros or {},
+        "escalares": sorted(escalares),
+        "semanales": sorted(semanales),
+    }
+    with open(base / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return base
+
+
+def leer_meta(directorio: Union[str, Path]) -> Dict[str, Any]:
+    """Lee meta.json del almacén (sin tocar los datos)."""
+    with open(Path(directorio) / "meta.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _cargar_grupo(
+    directorio: Union[str, Path],
+    grupo: str,
+    nombres: Optional[Iterable[str]],
+    mmap: bool,
+) -> Dict[str, np.ndarray]:
+    base = Path(directorio)
+    meta = leer_meta(base)
+    disponibles = meta[grupo]
+    pedidos = list(disponibles) if nombres is None else list(nombres)
+    faltantes = [n for n in pedidos if n not in disponibles]
+    if faltantes:
+        raise KeyError(f"Columnas inexistentes en {base}/{grupo}: {', '.join(faltantes)}")
+    if not pedidos:
+        return {}
+    if meta["formato"] == FORMATO_NPZ:
+        with np.load(base / f"{grupo}.npz") as npz:
+            return {n: npz[n] for n in pedidos}
+    modo = "r" if mmap else None
+    return {n: np.load(base / grupo / f"{n}.npy", mmap_mode=modo) for n in pedidos}
+
+
+def cargar_escalares(
+    directorio: Union[str, Path],
+    columnas: Optional[Iterable[str]] = None,
+    mmap: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Carga columnas escalares (todas si columnas es None).
+    En formato npy, mmap=True devuelve arrays memory-mapped de solo lectura.
+    """
+    return _cargar_grupo(directorio, "escalares", columnas, mmap)
+
+
+def cargar_series(
+    directorio: Union[str, Path],
+    series: Optional[Iterable[str]] = None,
+    mmap: bool = True,
+) -> Dict[str, np.ndarray]:
+    """Carga matrices runs × semanas de las series pedidas (ej: "beneficios.total_acumulado")."""
+    return _cargar_grupo(directorio, "semanales", series, mmap)
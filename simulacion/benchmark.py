@@ -6,8 +6,8 @@ extrae métricas agregadas y genera gráficos de distribuciones y series.
 
 import os
 import statistics
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Union
 
 from . import config as cfg
 
@@ -15,6 +15,10 @@ if TYPE_CHECKING:
     from .estado import EstadoSimulacion
 
 
+# Nombre en series_agregadas de las series semanales con nombre histórico (el resto: "grupo.clave")
+SERIES_RENOMBRADAS = {"beneficios.total_acumulado": "beneficio_acumulado"}
+
+
 def _beneficio_acumulado(est: "EstadoSimulacion") -> float:
     """Beneficio neto acumulado (ingresos netos - costos)."""
     return (
@@ -50,15 +54,45 @@ class MetricasResumen:
     satisfaccion_promedio_prepago: Optional[float] = None
     satisfaccion_promedio_suscripcion: Optional[float] = None
     satisfaccion_promedio_general: Optional[float] = None
+    # Métricas derivadas de beneficio_acumulado_por_dia (postproceso vectorizado)
+    peor_trimestre_beneficio: Optional[float] = None
+    drawdown_maximo: Optional[float] = None
+    racha_perdidas_max_dias: Optional[int] = None
+    # Parada anticipada: las métricas "finales" corresponden al día dias_simulados
+    truncada: bool = False
+    dias_simulados: Optional[int] = None
+    motivo_parada: Optional[str] = None
+    # Telemetría: segundos en simular_dia y contadores de eventos (estado.EVENTOS, "eventos_<nombre>")
+    segundos_simulacion: Optional[float] = None
+    eventos_llegadas: int = 0
+    eventos_nuevos_sin_presupuesto: int = 0
+    eventos_sin_tecnico: int = 0
+    eventos_calendarizaciones: int = 0
+    eventos_arrepentimientos: int = 0
+    eventos_faltas_reunion: int = 0
+    eventos_trabajos_atendidos: int = 0
+    eventos_insatisfechos: int = 0
+    eventos_no_cobrados: int = 0
+    eventos_conversiones_ta: int = 0
+    eventos_abandonos_prepago: int = 0
+    eventos_bloques_prepago_vendidos: int = 0
+    eventos_no_renovaciones_prepago: int = 0
+    eventos_no_renovaciones_suscripcion: int = 0
+    eventos_tecnicos_incorporados: int = 0
+    eventos_bajas_tecnicos: int = 0
     metricas_semanales: List[Dict[str, Any]] = field(default_factory=list)
 
 
 def extraer_metricas(est: "EstadoSimulacion") -> MetricasResumen:
     """Extrae métricas de resumen de un EstadoSimulacion final."""
+    from .estado import EVENTOS
+    from .postproceso import resumen_serie
+
     beneficio_final = _beneficio_acumulado(est)
-    meses_sim = max(1, est.T_FINAL / cfg.DIAS_POR_MES)
+    dias_sim = est.T if est.TRUNCADA else est.T_FINAL
+    meses_sim = max(1, dias_sim / cfg.DIAS_POR_MES)
     beneficio_mensual_promedio = beneficio_final / meses_sim
-    beneficio_anualizado = beneficio_final * (365 / est.T_FINAL) if est.T_FINAL > 0 else 0.0
+    beneficio_anualizado = beneficio_final * (365 / dias_sim) if dias_sim > 0 else 0.0
 
     # Entrada inicial (primeros 6 y 12 meses) y satisfacción
     ms = est.metricas_semanales
@@ -79,6 +113,8 @@ def extraer_metricas(est: "EstadoSimulacion") -> MetricasResumen:
         sat_susc = sum(sat_susc_vals) / len(sat_susc_vals) if sat_susc_vals else None
         sat_gen = sum(sat_gen_vals) / len(sat_gen_vals) if sat_gen_vals else None
 
+    serie = resumen_serie(est.beneficio_acumulado_por_dia, cfg.DIAS_TRIMESTRE)
+
     return MetricasResumen(
         beneficio_final=beneficio_final,
         beneficio_mensual_promedio=beneficio_mensual_promedio,
@@ -100,6 +136,14 @@ def extraer_metricas(est: "EstadoSimulacion") -> MetricasResumen:
         satisfaccion_promedio_prepago=sat_prep,
         satisfaccion_promedio_suscripcion=sat_susc,
         satisfaccion_promedio_general=sat_gen,
+        peor_trimestre_beneficio=serie["peor_ventana_beneficio"],
+        drawdown_maximo=serie["drawdown_maximo"],
+        racha_perdidas_max_dias=serie["racha_perdidas_max_dias"],
+        truncada=est.TRUNCADA,
+        dias_simulados=est.T,
+        motivo_parada=est.MOTIVO_PARADA,
+        segundos_simulacion=est.SEGUNDOS_SIMULACION,
+        **{f"eventos_{nombre}": int(n) for nombre, n in zip(EVENTOS, est.eventos)},
         metricas_semanales=list(est.metricas_semanales),
     )
 
@@ -122,6 +166,46 @@ def _estadisticas(values: List[float]) -> Dict[str, float]:
     }
 
 
+def _estadisticas_por_columna(matriz: Any) -> List[Dict[str, float]]:
+    """
+    _estadisticas de cada columna de una matriz runs × semanas (NaN = corrida que no
+    llegó a esa semana), vectorizado sobre el eje de corridas. Los percentiles usan
+    method="weibull", el mismo que statistics.quantiles (exclusive); con menos de 4
+    valores p25/p75 son el primero y el último en orden de corrida, como en _estadisticas.
+    """
+    import numpy as np
+
+    validos = ~np.isnan(matriz)
+    n = validos.sum(axis=0)
+    con_datos = n > 0
+    if not con_datos.any():
+        return [{} for _ in range(matriz.shape[1])]
+    x = matriz[:, con_datos]
+    nv = n[con_datos]
+    media = np.nansum(x, axis=0) / nv
+    desvio = np.sqrt(np.nansum((x - media) ** 2, axis=0) / np.maximum(nv - 1, 1))
+    desvio[nv < 2] = 0.0
+    completas = nv == x.shape[0]
+    p25, p50, p75 = np.empty((3, x.shape[1]))
+    # nanpercentile es mucho más lento: solo para las semanas que no alcanzaron todas las corridas
+    for cols, percentil in ((completas, np.percentile), (~completas, np.nanpercentile)):
+        if cols.any():
+            p25[cols], p50[cols], p75[cols] = percentil(x[:, cols], [25, 50, 75], axis=0, method="weibull")
+    v = validos[:, con_datos]
+    primero = x[v.argmax(axis=0), np.arange(x.shape[1])]
+    ultimo = x[x.shape[0] - 1 - v[::-1].argmax(axis=0), np.arange(x.shape[1])]
+    pocos = nv < 4
+    p25 = np.where(pocos, primero, p25)
+    p75 = np.where(pocos, ultimo, p75)
+    filas = zip(media.tolist(), desvio.tolist(), np.nanmin(x, axis=0).tolist(), np.nanmax(x, axis=0).tolist(),
+                p25.tolist(), p50.tolist(), p75.tolist())
+    resumenes = iter([
+        {"media": a, "std": b, "min": c, "max": d, "p25": e, "p50": f, "p75": g}
+        for a, b, c, d, e, f, g in filas
+    ])
+    return [next(resumenes) if hay else {} for hay in con_datos.tolist()]
+
+
 def ejecutar_benchmark(
     n_runs: int,
     T_FINAL: int,
@@ -132,17 +216,49 @@ def ejecutar_benchmark(
     seed: Optional[int] = None,
     progress_interval: Optional[int] = None,
     progress_callback: Optional[Any] = None,
+    archivo_series: Optional[str] = None,
+    criterios_parada: Optional[List[Any]] = None,
+    modelo_duracion: str = cfg.MODELO_DURACION_RECORTE,
+    modo: str = "detallado",
 ) -> List["EstadoSimulacion"]:
     """
     Ejecuta n_runs simulaciones con los mismos parámetros.
     Si seed se proporciona, cada run usa seed + i para reproducibilidad.
     progress_interval: si se usa, imprime progreso cada N corridas (para n_runs grandes).
     progress_callback: opcional, se llama cada corrida con (completadas, total).
+    archivo_series: opcional, archivo creado con series_diarias.crear_archivo_series;
+        la corrida i escribe su beneficio_acumulado_por_dia en la fila i.
+    criterios_parada: opcional, criterios de simulacion.parada (parada anticipada por corrida).
+    modelo_duracion: distribución de duración APPS/IT (cfg.MODELOS_DURACION).
+    modo: "detallado" (default) o "agregado": las n_runs van en un solo lote de
+        simulacion.agregado (semilla = seed), sin criterios_parada.
     Retorna lista de EstadoSimulacion.
     """
-    from .principal import ejecutar_simulacion
+    from .principal import MODO_AGREGADO, MODOS, ejecutar_simulacion
     import random
 
+    if modo not in MODOS:
+        raise ValueError(f"modo debe ser uno de {MODOS}")
+    if archivo_series is not None:
+        from .series_diarias import escribir_serie
+
+    if modo == MODO_AGREGADO:
+        if criterios_parada:
+            raise ValueError("el modo agregado no admite criterios_parada")
+        from .agregado import simular_lote
+        if verbose:
+            print(f"  Lote agregado de {n_runs} corridas...")
+        resultados = simular_lote(
+            T_FINAL, N, M, prob_suscripcion_nuevo, replicas=n_runs, semilla=seed,
+            modelo_duracion=modelo_duracion,
+        )
+        for i, est in enumerate(resultados):
+            if archivo_series is not None:
+                escribir_serie(archivo_series, i, est.beneficio_acumulado_por_dia)
+            if progress_callback:
+                progress_callback(i + 1, n_runs)
+        return resultados
+
     resultados: List["EstadoSimulacion"] = []
     interval = progress_interval if progress_interval else (1 if verbose else 0)
     for i in range(n_runs):
@@ -150,147 +266,245 @@ def ejecutar_benchmark(
             random.seed(seed + i)
         if interval and (i + 1) % interval == 0:
             print(f"  Corrida {i + 1}/{n_runs}...")
-        est = ejecutar_simulacion(T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion_nuevo, verbose=False)
+        est = ejecutar_simulacion(
+            T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion_nuevo, verbose=False,
+            criterios_parada=criterios_parada, modelo_duracion=modelo_duracion,
+        )
+        if archivo_series is not None:
+            escribir_serie(archivo_series, i, est.beneficio_acumulado_por_dia)
         resultados.append(est)
         if progress_callback:
             progress_callback(i + 1, n_runs)
     return resultados
 
 
-def agregar_metricas(resultados: List["EstadoSimulacion"]) -> Dict[str, Any]:
+def _valores_por_metrica(metricas_runs: List[MetricasResumen]) -> Dict[str, List[float]]:
+    """
+    Valores por métrica escalar (en el orden de estadisticas).
+    Corridas truncadas (parada anticipada) no llegan a T_FINAL: son censuradas y cuentan
+    con su valor al día de parada (descartarlas sesgaría las métricas hacia las que siguieron).
+    """
+    def _de(runs: List[MetricasResumen], campo: str) -> List[float]:
+        return [getattr(m, campo) for m in runs if getattr(m, campo) is not None]
+
+    return {
+        "beneficio_final": _de(metricas_runs, "beneficio_final"),
+        "beneficio_mensual_promedio": _de(metricas_runs, "beneficio_mensual_promedio"),
+        "beneficio_anualizado": _de(metricas_runs, "beneficio_anualizado"),
+        "equilibrio_dia": [float(x) for x in _de(metricas_runs, "equilibrio_dia")],
+        "mejor_trimestre_beneficio": _de(metricas_runs, "mejor_trimestre_beneficio"),
+        "suscripciones_final": _de(metricas_runs, "suscripciones_final"),
+        "prepagos_final": _de(metricas_runs, "prepagos_final"),
+        "beneficio_primeros_6_meses": _de(metricas_runs, "beneficio_primeros_6_meses"),
+        "beneficio_primeros_12_meses": _de(metricas_runs, "beneficio_primeros_12_meses"),
+        "prepago_primeros_6_meses": _de(metricas_runs, "prepago_primeros_6_meses"),
+        "suscripcion_primeros_6_meses": _de(metricas_runs, "suscripcion_primeros_6_meses"),
+        "satisfaccion_promedio_prepago": _de(metricas_runs, "satisfaccion_promedio_prepago"),
+        "satisfaccion_promedio_suscripcion": _de(metricas_runs, "satisfaccion_promedio_suscripcion"),
+        "satisfaccion_promedio_general": _de(metricas_runs, "satisfaccion_promedio_general"),
+        "peor_trimestre_beneficio": _de(metricas_runs, "peor_trimestre_beneficio"),
+        "drawdown_maximo": _de(metricas_runs, "drawdown_maximo"),
+        "racha_perdidas_max_dias": [float(x) for x in _de(metricas_runs, "racha_perdidas_max_dias")],
+        # Telemetría: por corrida, hasta donde llegó (también las truncadas)
+        "segundos_simulacion": _de(metricas_runs, "segundos_simulacion"),
+        "microsegundos_por_llegada": [
+            m.segundos_simulacion * 1e6 / m.eventos_llegadas
+            for m in metricas_runs if m.segundos_simulacion is not None and m.eventos_llegadas > 0
+        ],
+        **{
+            campo: [float(x) for x in _de(metricas_runs, campo)]
+            for campo in (f.name for f in fields(MetricasResumen)) if campo.startswith("eventos_")
+        },
+    }
+
+
+def _valores_por_semana(metricas_runs: List[MetricasResumen]) -> Dict[str, List[List[float]]]:
+    """Series semanales: por semana, un valor por corrida (las truncadas arrastran su último valor)."""
+    n_semanas = max((len(m.metricas_semanales) for m in metricas_runs), default=0)
+    if n_semanas == 0:
+        return {}
+    totales_por_semana: List[List[float]] = [[] for _ in range(n_semanas)]
+    for m in metricas_runs:
+        if hasattr(m.metricas_semanales, "serie"):  # SemanasCompactas: la columna sin armar snapshots
+            totales = m.metricas_semanales.serie("beneficios.total_acumulado")
+        else:
+            totales = [ms["beneficios"]["total_acumulado"] for ms in m.metricas_semanales]
+        totales = list(totales)
+        if m.truncada and totales:
+            totales += [totales[-1]] * (n_semanas - len(totales))
+        for w, total in enumerate(totales):
+            totales_por_semana[w].append(total)
+    return {"beneficio_acumulado": totales_por_semana}
+
+
+def _arrastrar_truncadas(matriz: Any, metricas_runs: List[MetricasResumen], n_semanas: int = 0) -> Any:
+    """
+    Matriz runs × semanas con las filas de corridas truncadas completadas con su último
+    valor (censura: la corrida cuenta en todas las semanas, congelada en el día de parada).
+    n_semanas: semanas del horizonte, por si todas las corridas pararon antes.
+    """
+    import numpy as np
+
+    if matriz.shape[1] < n_semanas:
+        relleno = np.full((matriz.shape[0], n_semanas - matriz.shape[1]), np.nan)
+        matriz = np.concatenate((matriz, relleno), axis=1)
+    for r, m in enumerate(metricas_runs):
+        if m.truncada:
+            fila = matriz[r]
+            validos = np.flatnonzero(~np.isnan(fila))
+            if len(validos):
+                fila[validos[-1] + 1:] = fila[validos[-1]]
+    return matriz
+
+
+def _correlacion_segundos_llegadas(metricas_runs: List[MetricasResumen]) -> Optional[float]:
+    """
+    Pearson entre segundos de simulación y llegadas por corrida: cerca de 1, el costo lo
+    explica el volumen de llegadas (comparar microsegundos_por_llegada entre configuraciones
+    para ver si crece más que linealmente). None con menos de 3 corridas o varianza nula.
+    """
+    pares = [(m.segundos_simulacion, m.eventos_llegadas) for m in metricas_runs
+             if m.segundos_simulacion is not None]
+    if len(pares) < 3:
+        return None
+    xs, ys = zip(*pares)
+    mx, my = statistics.mean(xs), statistics.mean(ys)
+    sxy = sum((x - mx) * (y - my) for x, y in pares)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    if sxx <= 0 or syy <= 0:
+        return None
+    return sxy / (sxx * syy) ** 0.5
+
+
+def _telemetria_lote(
+    resultados: List[Union["EstadoSimulacion", MetricasResumen]], metricas_runs: List[MetricasResumen]
+) -> Dict[str, Optional[float]]:
+    """
+    Tiempo del lote del modo agregado (SEGUNDOS_LOTE): las corridas avanzan juntas y el
+    tiempo no se reparte entre ellas, así que el costo por llegada se da para el lote entero.
+    """
+    segundos = next((getattr(r, "SEGUNDOS_LOTE", None) for r in resultados
+                     if getattr(r, "SEGUNDOS_LOTE", None) is not None), None)
+    llegadas = sum(m.eventos_llegadas for m in metricas_runs)
+    return {
+        "segundos_lote": segundos,
+        "microsegundos_por_llegada_lote": segundos * 1e6 / llegadas if segundos is not None and llegadas else None,
+    }
+
+
+def _truncadas_por_motivo(metricas_runs: List[MetricasResumen]) -> Dict[str, int]:
+    truncadas: Dict[str, int] = {}
+    for m in metricas_runs:
+        if m.truncada:
+            truncadas[m.motivo_parada] = truncadas.get(m.motivo_parada, 0) + 1
+    return truncadas
+
+
+def agregar_metricas(
+    resultados: List[Union["EstadoSimulacion", MetricasResumen]],
+    parametros: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
     Extrae métricas de cada resultado y calcula estadísticas agregadas.
+    resultados puede mezclar EstadoSimulacion y MetricasResumen ya extraídas
+    (corridas en workers o tomadas del memo); en ese caso conviene pasar
+    parametros ({"T_FINAL", "N", "M"}), que si no se toman del primer estado.
     Retorna un diccionario con métricas por run y estadísticas globales.
     """
-    metricas_runs = [extraer_metricas(est) for est in resultados]
-
-    # Valores numéricos para estadísticas
-    beneficios = [m.beneficio_final for m in metricas_runs]
-    beneficios_mensuales = [m.beneficio_mensual_promedio for m in metricas_runs]
-    beneficios_anualizados = [m.beneficio_anualizado for m in metricas_runs]
-    equilibrios = [m.equilibrio_dia for m in metricas_runs if m.equilibrio_dia is not None]
-    mejores_trim = [m.mejor_trimestre_beneficio for m in metricas_runs if m.mejor_trimestre_beneficio is not None]
-    suscripciones = [m.suscripciones_final for m in metricas_runs]
-    prepagos = [m.prepagos_final for m in metricas_runs]
-    beneficios_6m = [m.beneficio_primeros_6_meses for m in metricas_runs if m.beneficio_primeros_6_meses is not None]
-    beneficios_12m = [m.beneficio_primeros_12_meses for m in metricas_runs if m.beneficio_primeros_12_meses is not None]
-    prepago_6m = [m.prepago_primeros_6_meses for m in metricas_runs if m.prepago_primeros_6_meses is not None]
-    suscripcion_6m = [m.suscripcion_primeros_6_meses for m in metricas_runs if m.suscripcion_primeros_6_meses is not None]
-    sat_prep = [m.satisfaccion_promedio_prepago for m in metricas_runs if m.satisfaccion_promedio_prepago is not None]
-    sat_susc = [m.satisfaccion_promedio_suscripcion for m in metricas_runs if m.satisfaccion_promedio_suscripcion is not None]
-    sat_gen = [m.satisfaccion_promedio_general for m in metricas_runs if m.satisfaccion_promedio_general is not None]
-
-    # Series temporales agregadas (promedio por semana)
-    n_semanas = 0
-    if metricas_runs and metricas_runs[0].metricas_semanales:
-        n_semanas = len(metricas_runs[0].metricas_semanales)
-
-    series_agregadas: Dict[str, List[Dict[str, float]]] = {}
-    if n_semanas > 0:
-        # total_acumulado por semana
-        totales_por_semana: List[List[float]] = [[] for _ in range(n_semanas)]
-        for m in metricas_runs:
-            for w, ms in enumerate(m.metricas_semanales[:n_semanas]):
-                totales_por_semana[w].append(ms["beneficios"]["total_acumulado"])
-
-        series_agregadas["beneficio_acumulado"] = []
-        for w in range(n_semanas):
-            vals = totales_por_semana[w]
-            series_agregadas["beneficio_acumulado"].append(_estadisticas(vals))
+    metricas_runs = [r if isinstance(r, MetricasResumen) else extraer_metricas(r) for r in resultados]
+    if parametros is None:
+        primero = next((r for r in resultados if not isinstance(r, MetricasResumen)), None)
+        parametros = (
+            {"T_FINAL": primero.T_FINAL, "N": primero.DIAS_IMPLEMENTACION, "M": primero.PRESUPUESTO_MKT_MENSUAL}
+            if primero is not None else {}
+        )
+    truncadas_por_motivo = _truncadas_por_motivo(metricas_runs)
+    valores = _valores_por_metrica(metricas_runs)
+
+    estadisticas: Dict[str, Any] = {}
+    for nombre, vals in valores.items():
+        estadisticas[nombre] = _estadisticas(vals)
+        if nombre == "equilibrio_dia":
+            estadisticas["equilibrio_porcentaje"] = len(vals) / len(resultados) * 100
+
+    # Series temporales agregadas: todas las series de metricas_semanales, apiladas una vez
+    # en matrices runs × semanas (las corridas truncadas siguen con su último valor)
+    from .almacen import apilar_series_semanales
+    n_semanas_horizonte = int(parametros.get("T_FINAL", 0)) // cfg.DIAS_POR_SEMANA if truncadas_por_motivo else 0
+    series_agregadas: Dict[str, List[Dict[str, float]]] = {
+        SERIES_RENOMBRADAS.get(nombre, nombre): _estadisticas_por_columna(
+            _arrastrar_truncadas(matriz, metricas_runs, n_semanas_horizonte))
+        for nombre, matriz in apilar_series_semanales(metricas_runs).items()
+    }
 
     return {
         "n_runs": len(resultados),
-        "parametros": {"T_FINAL": resultados[0].T_FINAL, "N": resultados[0].DIAS_IMPLEMENTACION, "M": resultados[0].PRESUPUESTO_MKT_MENSUAL},
+        "n_truncadas": sum(truncadas_por_motivo.values()),
+        "truncadas_por_motivo": truncadas_por_motivo,
+        "parametros": parametros,
         "metricas_por_run": metricas_runs,
-        "estadisticas": {
-            "beneficio_final": _estadisticas(beneficios),
-            "beneficio_mensual_promedio": _estadisticas(beneficios_mensuales),
-            "beneficio_anualizado": _estadisticas(beneficios_anualizados),
-            "equilibrio_dia": _estadisticas([float(x) for x in equilibrios]) if equilibrios else {},
-            "equilibrio_porcentaje": len(equilibrios) / len(resultados) * 100,
-            "mejor_trimestre_beneficio": _estadisticas(mejores_trim) if mejores_trim else {},
-            "suscripciones_final": _estadisticas(suscripciones),
-            "prepagos_final": _estadisticas(prepagos),
-            "beneficio_primeros_6_meses": _estadisticas(beneficios_6m) if beneficios_6m else {},
-            "beneficio_primeros_12_meses": _estadisticas(beneficios_12m) if beneficios_12m else {},
-            "prepago_primeros_6_meses": _estadisticas(prepago_6m) if prepago_6m else {},
-            "suscripcion_primeros_6_meses": _estadisticas(suscripcion_6m) if suscripcion_6m else {},
-            "satisfaccion_promedio_prepago": _estadisticas(sat_prep) if sat_prep else {},
-            "satisfaccion_promedio_suscripcion": _estadisticas(sat_susc) if sat_susc else {},
-            "satisfaccion_promedio_general": _estadisticas(sat_gen) if sat_gen else {},
+        "estadisticas": estadisticas,
+        "telemetria": {
+            "correlacion_segundos_llegadas": _correlacion_segundos_llegadas(metricas_runs),
+            **_telemetria_lote(resultados, metricas_runs),
         },
         "series_agregadas": series_agregadas,
     }
 
 
-def generar_graficos_benchmark(agregado: Dict[str, Any], output_dir: str = "graficos_benchmark") -> None:
+def generar_graficos_benchmark(
+    agregado: Dict[str, Any],
+    output_dir: str = "graficos_benchmark",
+    workers: Optional[int] = None,
+) -> None:
     """
     Genera gráficos de distribuciones (boxplots, histogramas) y series agregadas.
+    workers: procesos para renderizar (None = núcleos disponibles, 1 = secuencial).
     """
     try:
-        import matplotlib
+        import matplotlib  # noqa: F401
     except ImportError:
         raise ImportError(
             "Se requiere matplotlib para generar gráficos. Instálalo con: pip install matplotlib"
         ) from None
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    import numpy as np
+    from .render import renderizar
 
     os.makedirs(output_dir, exist_ok=True)
+    renderizar(trabajos_graficos_benchmark(agregado, output_dir), workers=workers)
+
+
+def trabajos_graficos_benchmark(agregado: Dict[str, Any], output_dir: str) -> List[Any]:
+    """Describe los gráficos del benchmark agregado como trabajos de render (simulacion.render)."""
+    from .render import trabajo
+
     stats = agregado["estadisticas"]
     metricas_runs = agregado["metricas_por_run"]
+    n_runs = agregado["n_runs"]
 
-    # 1. Boxplot de beneficio final
-    beneficios = [m.beneficio_final for m in metricas_runs]
-    fig, ax = plt.subplots(figsize=(8, 5))
-    bp = ax.boxplot(beneficios, vert=True, patch_artist=True)
-    bp["boxes"][0].set_facecolor("lightblue")
-    ax.set_ylabel("Beneficio final (créditos)")
-    ax.set_title(f"Distribución del beneficio final ({agregado['n_runs']} corridas)")
-    ax.set_xticklabels([f"n={agregado['n_runs']}"])
-    ax.grid(True, alpha=0.3, axis="y")
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "boxplot_beneficio_final.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    def _t(funcion, archivo, **datos):
+        return trabajo(funcion, os.path.join(output_dir, archivo), **datos)
 
-    # 2. Histograma de beneficio final
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.hist(beneficios, bins=min(30, max(5, len(beneficios) // 3)), color="steelblue", edgecolor="white", alpha=0.8)
-    if stats.get("beneficio_final"):
-        s = stats["beneficio_final"]
-        ax.axvline(s["media"], color="red", linestyle="--", linewidth=2, label=f"Media: {s['media']:.0f}")
-    ax.set_xlabel("Beneficio final (créditos)")
-    ax.set_ylabel("Frecuencia")
-    ax.set_title(f"Histograma de beneficio final ({agregado['n_runs']} corridas)")
-    ax.legend()
-    ax.grid(True, alpha=0.3, axis="y")
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "histograma_beneficio_final.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    # 1-2. Boxplot e histograma de beneficio final (truncadas: valor al día de parada, como en stats)
+    beneficios = [m.beneficio_final for m in metricas_runs]
+    media = stats["beneficio_final"]["media"] if stats.get("beneficio_final") else None
+    n_truncadas = agregado.get("n_truncadas", 0)
+    trabajos = [
+        _t(_grafico_boxplot_beneficio, "boxplot_beneficio_final.png",
+           beneficios=beneficios, n_runs=n_runs, n_truncadas=n_truncadas),
+        _t(_grafico_histograma_beneficio, "histograma_beneficio_final.png",
+           beneficios=beneficios, media=media, n_runs=n_runs, n_truncadas=n_truncadas),
+    ]
 
     # 3. Serie temporal: beneficio acumulado (media ± desv. estándar)
     if "beneficio_acumulado" in agregado.get("series_agregadas", {}):
         series = agregado["series_agregadas"]["beneficio_acumulado"]
-        semanas = list(range(len(series)))
-        medias = [s["media"] for s in series]
-        stds = [s["std"] for s in series]
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(semanas, medias, color="steelblue", linewidth=2, label="Media")
-        ax.fill_between(semanas, [m - st for m, st in zip(medias, stds)], [m + st for m, st in zip(medias, stds)], alpha=0.3, color="steelblue", label="± 1 σ")
-        ax.axhline(y=0, color="gray", linestyle="--", linewidth=1)
-        ax.set_xlabel("Semana")
-        ax.set_ylabel("Beneficio acumulado (créditos)")
-        ax.set_title(f"Beneficio acumulado medio ± desv. estándar ({agregado['n_runs']} corridas)")
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        fig.tight_layout()
-        fig.savefig(os.path.join(output_dir, "serie_beneficio_acumulado.png"), dpi=150, bbox_inches="tight")
-        plt.close()
+        trabajos.append(_t(
+            _grafico_serie_beneficio, "serie_beneficio_acumulado.png",
+            medias=[s["media"] for s in series], stds=[s["std"] for s in series], n_runs=n_runs,
+        ))
 
-    # 4. Resumen de métricas (tabla como imagen o texto)
-    # Generar un gráfico de barras comparando métricas clave
+    # 4. Resumen de métricas: barras comparando métricas clave
     metricas_nombres = [
         ("Beneficio final", "beneficio_final", "media"),
         ("Suscripciones final", "suscripciones_final", "media"),
@@ -304,29 +518,98 @@ def generar_graficos_benchmark(agregado: Dict[str, Any], output_dir: str = "graf
             labels.append(nom)
             means.append(stats[key].get("media", 0))
             stds.append(stats[key].get("std", 0))
-
     if labels:
-        fig, ax = plt.subplots(figsize=(10, 5))
-        x = np.arange(len(labels))
-        bars = ax.bar(x, means, yerr=stds, capsize=5, color="steelblue", alpha=0.8, edgecolor="navy")
-        ax.set_xticks(x)
-        ax.set_xticklabels(labels, rotation=15, ha="right")
-        ax.set_ylabel("Valor (media ± σ)")
-        ax.set_title(f"Métricas agregadas ({agregado['n_runs']} corridas)")
-        ax.grid(True, alpha=0.3, axis="y")
-        fig.tight_layout()
-        fig.savefig(os.path.join(output_dir, "metricas_agregadas.png"), dpi=150, bbox_inches="tight")
-        plt.close()
+        trabajos.append(_t(
+            _grafico_metricas_agregadas, "metricas_agregadas.png",
+            labels=labels, means=means, stds=stds, n_runs=n_runs,
+        ))
 
     # 5. Distribución de día de equilibrio (si hay datos)
     equilibrios = [m.equilibrio_dia for m in metricas_runs if m.equilibrio_dia is not None]
     if equilibrios:
-        fig, ax = plt.subplots(figsize=(8, 5))
-        ax.hist(equilibrios, bins=min(25, max(5, len(equilibrios) // 2)), color="green", edgecolor="white", alpha=0.7)
-        ax.set_xlabel("Día de equilibrio")
-        ax.set_ylabel("Frecuencia")
-        ax.set_title(f"Día en que se alcanza equilibrio ({len(equilibrios)} de {agregado['n_runs']} corridas)")
-        ax.grid(True, alpha=0.3, axis="y")
-        fig.tight_layout()
-        fig.savefig(os.path.join(output_dir, "histograma_equilibrio.png"), dpi=150, bbox_inches="tight")
-        plt.close()
+        trabajos.append(_t(
+            _grafico_histograma_equilibrio, "histograma_equilibrio.png", equilibrios=equilibrios, n_runs=n_runs,
+        ))
+    return trabajos
+
+
+def _titulo_corridas(n_runs: int, n_truncadas: int) -> str:
+    if not n_truncadas:
+        return f"{n_runs} corridas"
+    return f"{n_runs} corridas, {n_truncadas} truncadas: valor al día de parada"
+
+
+def _grafico_boxplot_beneficio(beneficios: List[float], n_runs: int, n_truncadas: int = 0):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    bp = ax.boxplot(beneficios, vert=True, patch_artist=True)
+    bp["boxes"][0].set_facecolor("lightblue")
+    ax.set_ylabel("Beneficio final (créditos)")
+    ax.set_title(f"Distribución del beneficio final ({_titulo_corridas(n_runs, n_truncadas)})")
+    ax.set_xticklabels([f"n={n_runs}"])
+    ax.grid(True, alpha=0.3, axis="y")
+    fig.tight_layout()
+    return fig
+
+
+def _grafico_histograma_beneficio(beneficios: List[float], media: Optional[float], n_runs: int, n_truncadas: int = 0):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.hist(beneficios, bins=min(30, max(5, len(beneficios) // 3)), color="steelblue", edgecolor="white", alpha=0.8)
+    if media is not None:
+        ax.axvline(media, color="red", linestyle="--", linewidth=2, label=f"Media: {media:.0f}")
+        ax.legend()
+    ax.set_xlabel("Beneficio final (créditos)")
+    ax.set_ylabel("Frecuencia")
+    ax.set_title(f"Histograma de beneficio final ({_titulo_corridas(n_runs, n_truncadas)})")
+    ax.grid(True, alpha=0.3, axis="y")
+    fig.tight_layout()
+    return fig
+
+
+def _grafico_serie_beneficio(medias: List[float], stds: List[float], n_runs: int):
+    import matplotlib.pyplot as plt
+
+    semanas = list(range(len(medias)))
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(semanas, medias, color="steelblue", linewidth=2, label="Media")
+    ax.fill_between(semanas, [m - st for m, st in zip(medias, stds)], [m + st for m, st in zip(medias, stds)], alpha=0.3, color="steelblue", label="± 1 σ")
+    ax.axhline(y=0, color="gray", linestyle="--", linewidth=1)
+    ax.set_xlabel("Semana")
+    ax.set_ylabel("Beneficio acumulado (créditos)")
+    ax.set_title(f"Beneficio acumulado medio ± desv. estándar ({n_runs} corridas)")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def _grafico_metricas_agregadas(labels: List[str], means: List[float], stds: List[float], n_runs: int):
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    x = np.arange(len(labels))
+    ax.bar(x, means, yerr=stds, capsize=5, color="steelblue", alpha=0.8, edgecolor="navy")
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=15, ha="right")
+    ax.set_ylabel("Valor (media ± σ)")
+    ax.set_title(f"Métricas agregadas ({n_runs} corridas)")
+    ax.grid(True, alpha=0.3, axis="y")
+    fig.tight_layout()
+    return fig
+
+
+def _grafico_histograma_equilibrio(equilibrios: List[int], n_runs: int):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.hist(equilibrios, bins=min(25, max(5, len(equilibrios) // 2)), color="green", edgecolor="white", alpha=0.7)
+    ax.set_xlabel("Día de equilibrio")
+    ax.set_ylabel("Frecuencia")
+    ax.set_title(f"Día en que se alcanza equilibrio ({len(equilibrios)} de {n_runs} corridas)")
+    ax.grid(True, alpha=0.3, axis="y")
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Caché de build para la presentación y su PDF.
+Guarda en DIRECTORIO_CACHE (junto al repo, fuera de git):
+  manifiesto.json        # clave -> huella del último build (salidas al día)
+  data_uri/<sha>.txt     # data URIs base64 ya codificados, por contenido
+  data_uri/indice.json   # (path, tamaño, mtime) -> sha, para no releer PNG sin cambios
+  paginas/<sha>.pdf      # páginas de PDF renderizadas, por huella del HTML del slide
+
+Las huellas combinan el contenido de las entradas (JSON/PNG/HTML) con el
+código fuente de los generadores, así un cambio en cualquiera invalida solo
+las salidas que dependen de él.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+DIRECTORIO_CACHE = ".cache_build"
+
+_MIMES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "svg": "image/svg+xml"}
+
+Ruta = Union[str, Path]
+
+
+def huella_texto(*partes: Union[str, bytes]) -> str:
+    """sha256 de una secuencia de textos/bytes (separados para que no colisionen concatenaciones)."""
+    h = hashlib.sha256()
+    for p in partes:
+        datos = p.encode("utf-8") if isinstance(p, str) else p
+        h.update(len(datos).to_bytes(8, "little"))
+        h.update(datos)
+    return h.hexdigest()
+
+
+def huella_archivos(paths: Iterable[Ruta]) -> str:
+    """Huella del contenido de varios archivos (los inexistentes cuentan como vacíos)."""
+    partes = []
+    for p in paths:
+        p = Path(p)
+        partes.append(str(p.name))
+        partes.append(p.read_bytes() if p.exists() else b"")
+    return huella_texto(*partes)
+
+
+class CacheBuild:
+    """Manifiesto de salidas al día + memo de data URIs y páginas de PDF."""
+
+    def __init__(self, base: Ruta = ".", directorio: str = DIRECTORIO_CACHE):
+        self.dir = Path(base) / directorio
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._manifiesto_path = self.dir / "manifiesto.json"
+        self._manifiesto: Dict[str, str] = self._leer_json(self._manifiesto_path)
+        self._dir_uri = self.dir / "data_uri"
+        self._dir_uri.mkdir(exist_ok=True)
+        self._indice_uri_path = self._dir_uri / "indice.json"
+        self._indice_uri: Dict[str, str] = self._leer_json(self._indice_uri_path)
+        self._uris: Dict[str, str] = {}
+        self._dir_paginas = self.dir / "paginas"
+        self._dir_paginas.mkdir(exist_ok=True)
+
+    @staticmethod
+    def _leer_json(path: Path) -> Dict[str, str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _escribir_json(path: Path, datos: Dict[str, str]) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    # --- Salidas completas ---
+
+    def vigente(self, clave: str, huella: str, salida: Optional[Ruta] = None) -> bool:
+        """True si 'clave' se construyó con esta huella (y la salida, si se indica, existe)."""
+        if salida is not None and not Path(salida).exists():
+            return False
+        return self._manifiesto.get(clave) == huella
+
+    def registrar(self, clave: str, huella: str) -> None:
+        self._manifiesto[clave] = huella
+        self._escribir_json(self._manifiesto_path, self._manifiesto)
+
+    # --- Data URIs ---
+
+    def data_uri(self, path: Ruta) -> Optional[str]:
+        """
+        data URI base64 del archivo (None si no existe), memoizado en memoria y en disco.
+        Un archivo con mismo tamaño y mtime no se vuelve a leer; con mismo contenido no se recodifica.
+        """
+        p = Path(path).resolve()
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        clave_stat = f"{p}|{st.st_size}|{st.st_mtime_ns}"
+        if clave_stat in self._uris:
+            return self._uris[clave_stat]
+        sha = self._indice_uri.get(clave_stat)
+        cache_path = self._dir_uri / f"{sha}.txt" if sha else None
+        if cache_path is not None and cache_path.exists():
+            uri = cache_path.read_text(encoding="ascii")
+        else:
+            datos = p.read_bytes()
+            sha = hashlib.sha256(datos).hexdigest()
+            cache_path = self._dir_uri / f"{sha}.txt"
+            if cache_path.exists():
+                uri = cache_path.read_text(encoding="ascii")
+            else:
+                mime = _MIMES.get(p.suffix.lower().lstrip("."), "image/png")
+                uri = f"data:{mime};base64,{base64.b64encode(datos).decode()}"
+                cache_path.write_text(uri, encoding="ascii")
+            self._indice_uri[clave_stat] = sha
+            self._escribir_json(self._indice_uri_path, self._indice_uri)
+        self._uris[clave_stat] = uri
+        return uri
+
+    # --- Páginas de PDF ---
+
+    def pagina(self, huella: str) -> Path:
+        """Path de la página cacheada para esta huella (puede no existir aún)."""
+        return self._dir_paginas / f"{huella}.pdf"
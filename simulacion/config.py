@@ -5,6 +5,7 @@ Basado en: Propuesta de TP Final - Simulación de Plataforma Técnica SaaS.
 """
 
 import math
+import random
 
 # --- Parámetros de control ---
 DIAS_POR_MES = 30
@@ -68,6 +69,14 @@ DURACION_IT_MEDIA = 5
 DURACION_IT_STD = 40
 DESARROLLO_HORAS_MIN = 2
 DESARROLLO_HORAS_MAX = 20
+# Modelo de duración APPS/IT (minutos): "recorte" = Normal recortada a [0, max] (masa en 0 min),
+# "truncada" = Normal truncada de verdad (re-normalizada en [0, max]), "lognormal" = misma media y
+# desvío que la Normal, acotada en max. Modificable vía CLI --modelo-duracion.
+MODELO_DURACION_RECORTE = "recorte"
+MODELO_DURACION_TRUNCADA = "truncada"
+MODELO_DURACION_LOGNORMAL = "lognormal"
+MODELOS_DURACION = (MODELO_DURACION_RECORTE, MODELO_DURACION_TRUNCADA, MODELO_DURACION_LOGNORMAL)
+MODELO_DURACION = MODELO_DURACION_RECORTE
 COSTO_APPS_POR_MIN = 1.0
 COSTO_IT_POR_MIN = 1.25
 COSTO_DESARROLLO_POR_HORA = 30.0
@@ -144,7 +153,6 @@ def generar_inter_arribo(lambda_per_minuto: float, max_minutos: float = None) ->
     lambda_per_minuto: llegadas por minuto (tasa).
     max_minutos: límite superior; si no se indica, usa INTER_ARRIBO_MAX_MINUTOS.
     """
-    import random
     if max_minutos is None:
         max_minutos = INTER_ARRIBO_MAX_MINUTOS
     if lambda_per_minuto <= 0:
@@ -168,11 +176,44 @@ def lambda_por_minuto_en_hora(tdn: int, hora: int) -> float:
 
 def normal_truncada(media: float, std: float, min_val: float, max_val: float) -> float:
     """Muestra de distribución normal truncada en [min_val, max_val]."""
-    import random
     x = random.gauss(media, std)
     return max(min_val, min(max_val, x))
 
 
+def normal_truncada_inversa(media: float, std: float, min_val: float, max_val: float) -> float:
+    """
+    Muestra de Normal(media, std) condicionada a [min_val, max_val] (CDF inversa): a
+    diferencia de normal_truncada no acumula masa en los extremos.
+    """
+    from statistics import NormalDist
+
+    dist = NormalDist(media, std)
+    a, b = dist.cdf(min_val), dist.cdf(max_val)
+    u = a + random.random() * (b - a)
+    return max(min_val, min(max_val, dist.inv_cdf(min(max(u, 1e-300), 1.0 - 1e-16))))
+
+
+def parametros_lognormal(media: float, std: float) -> tuple:
+    """(mu, sigma) de la lognormal con esa media y desvío."""
+    sigma2 = math.log(1.0 + (std / media) ** 2)
+    return math.log(media) - sigma2 / 2, math.sqrt(sigma2)
+
+
+def lognormal_acotada(media: float, std: float, min_val: float, max_val: float) -> float:
+    """Muestra lognormal con media y desvío dados, acotada a [min_val, max_val]."""
+    mu, sigma = parametros_lognormal(media, std)
+    return max(min_val, min(max_val, random.lognormvariate(mu, sigma)))
+
+
+def duracion_minutos(media: float, std: float, min_val: float, max_val: float) -> float:
+    """Duración de un trabajo APPS/IT según MODELO_DURACION."""
+    if MODELO_DURACION == MODELO_DURACION_TRUNCADA:
+        return normal_truncada_inversa(media, std, min_val, max_val)
+    if MODELO_DURACION == MODELO_DURACION_LOGNORMAL:
+        return lognormal_acotada(media, std, min_val, max_val)
+    return normal_truncada(media, std, min_val, max_val)
+
+
 def duracion_desarrollo_horas() -> float:
     """
     Duración de trabajo Desarrollo en horas [DESARROLLO_HORAS_MIN, DESARROLLO_HORAS_MAX].
@@ -185,27 +226,53 @@ def duracion_desarrollo_horas() -> float:
 
 def binomial(n: int, p: float) -> int:
     """Muestra de Binomial(n, p) usando suma de Bernoulli."""
-    import random
     return sum(1 for _ in range(n) if random.random() < p)
 
 
+def binomial_geometrica(n: int, p: float) -> int:
+    """
+    Muestra de Binomial(n, p) saltando entre éxitos con esperas geométricas:
+    consume ~n·min(p, 1-p) + 1 uniformes en lugar de n (misma distribución que binomial).
+    """
+    if n <= 0 or p <= 0:
+        return 0
+    if p >= 1:
+        return n
+    if p > 0.5:
+        return n - binomial_geometrica(n, 1.0 - p)
+    log_q = math.log1p(-p)
+    exitos = 0
+    ensayos = 0
+    while True:
+        ensayos += int(math.log(1.0 - random.random()) / log_q) + 1
+        if ensayos > n:
+            return exitos
+        exitos += 1
+
+
 def prob_efectiva_beta(media: float, concentracion: float = 10.0) -> float:
     """
     Probabilidad efectiva con variabilidad (Beta). Media aproximada 'media'.
     concentracion alto = menos dispersión.
     """
-    import random
     alpha = media * concentracion
     beta = (1.0 - media) * concentracion
     return random.betavariate(max(0.01, alpha), max(0.01, beta))
 
 
+def parametros_beta(media: float, concentracion: float = 10.0) -> tuple:
+    """
+    (alpha, beta) que usa prob_efectiva_beta: random.betavariate(*parametros_beta(m, c))
+    da el mismo valor que prob_efectiva_beta(m, c). Para precalcular cuando la media es fija.
+    """
+    return max(0.01, media * concentracion), max(0.01, (1.0 - media) * concentracion)
+
+
 def poisson(lam: float) -> int:
     """
     Muestra de distribución Poisson(lambda).
     Para lambda grande usa aproximación normal.
     """
-    import random
     if lam <= 0:
         return 0
     if lam > 100:
@@ -227,7 +294,6 @@ def binomial_negativa(r: float, p: float, max_val: int = None) -> int:
     media = r*(1-p)/p. Para conteos con sobredispersión.
     max_val: límite superior; si no se indica, usa TRABAJOS_DIARIOS_MAX_ABS.
     """
-    import random
     if max_val is None:
         max_val = TRABAJOS_DIARIOS_MAX_ABS
     r_int = max(1, int(r))
@@ -249,7 +315,6 @@ def dirichlet_3(alpha1: float, alpha2: float, alpha3: float) -> tuple:
     Devuelve (p1, p2, p3) donde p1 + p2 + p3 = 1.
     Implementación sin numpy usando Gamma.
     """
-    import random
     g1 = random.gammavariate(max(0.01, alpha1), 1)
     g2 = random.gammavariate(max(0.01, alpha2), 1)
     g3 = random.gammavariate(max(0.01, alpha3), 1)
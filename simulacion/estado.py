@@ -4,12 +4,49 @@ Estado global de la simulación. Contadores de clientes, financieros y métricas
 Incluye modelo de técnicos con TPLL, TPS[], HIGH_VALUE.
 """
 
+import random
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any, Tuple
+from operator import attrgetter
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 
 from . import config as cfg
 
 
+# Categorías del cliente preexistente (índices de SelectorCategorico)
+CATEGORIA_ASIDUO = 0
+CATEGORIA_CE_NO_ASIDUO = 1
+CATEGORIA_AISLADO = 2
+
+# Contadores de eventos por corrida: EstadoSimulacion.eventos[EV_*] (nombres en EVENTOS).
+# Explican el costo de una corrida (llegadas) y su resultado (qué pasó con cada llegada).
+EVENTOS = (
+    "llegadas",                     # procesar_llegada_cliente (incluye nuevos sin presupuesto)
+    "nuevos_sin_presupuesto",       # nuevo que no llega: presupuesto de MKT del mes agotado
+    "sin_tecnico",                  # calendarizado por falta de técnico (trabajo perdido)
+    "calendarizaciones",            # con y sin técnico disponible
+    "arrepentimientos",
+    "faltas_reunion",
+    "trabajos_atendidos",
+    "insatisfechos",
+    "no_cobrados",
+    "conversiones_ta",              # TA satisfecho → paquete
+    "abandonos_prepago",            # prepago disconforme no cobrado que se va
+    "bloques_prepago_vendidos",     # renovaciones del bloque global de prepago
+    "no_renovaciones_prepago",
+    "no_renovaciones_suscripcion",
+    "tecnicos_incorporados",
+    "bajas_tecnicos",               # rotación semanal
+)
+(
+    EV_LLEGADAS, EV_NUEVOS_SIN_PRESUPUESTO, EV_SIN_TECNICO, EV_CALENDARIZACIONES,
+    EV_ARREPENTIMIENTOS, EV_FALTAS_REUNION, EV_TRABAJOS_ATENDIDOS, EV_INSATISFECHOS,
+    EV_NO_COBRADOS, EV_CONVERSIONES_TA, EV_ABANDONOS_PREPAGO, EV_BLOQUES_PREPAGO_VENDIDOS,
+    EV_NO_RENOVACIONES_PREPAGO, EV_NO_RENOVACIONES_SUSCRIPCION, EV_TECNICOS_INCORPORADOS,
+    EV_BAJAS_TECNICOS,
+) = range(len(EVENTOS))
+
+
 @dataclass
 class MejorTrimestre:
     """Mejor trimestre (120 días) por beneficio."""
@@ -18,12 +55,81 @@ class MejorTrimestre:
     beneficio: float = float("-inf")
 
 
+@dataclass
+class Instantanea:
+    """
+    Snapshot liviano que emite iterar_simulacion por día o por semana.
+    'estado' es una referencia al estado vivo (no una copia): leer, no modificar.
+    """
+    dia: int
+    beneficio_acumulado: float
+    equilibrio_dia: Optional[int]
+    metricas_semana: Optional[Dict[str, Any]]
+    estado: "EstadoSimulacion"
+
+
+class SelectorCategorico:
+    """
+    Muestreo categórico por pesos acumulados (inmutable: si cambian los pesos se construye otro).
+    La comparación es la misma que la cadena de if de llegada (u * total < límite, en orden),
+    así que con el mismo u devuelve la misma categoría. Con total <= 0 cae en la última.
+    """
+
+    __slots__ = ("limites", "total")
+
+    def __init__(self, pesos: Sequence[float]):
+        acumulado = 0
+        limites = []
+        for peso in pesos[:-1]:
+            acumulado = acumulado + peso
+            limites.append(acumulado)
+        total = acumulado + pesos[-1]
+        self.limites: Tuple[float, ...] = tuple(limites)
+        self.total: float = total if total > 0 else 1.0
+
+    def elegir(self, u: float) -> int:
+        """Categoría para un uniforme u en [0, 1)."""
+        return bisect_right(self.limites, u * self.total)
+
+    def muestrear(self, n: int, rng: Any = None) -> Any:
+        """
+        n categorías de una vez. Sin rng consume random.random() (lista de int);
+        con un numpy.random.Generator devuelve un ndarray (ver simulacion.muestreo).
+        """
+        if rng is None:
+            u = random.random
+            elegir = self.elegir
+            return [elegir(u()) for _ in range(n)]
+        import numpy as np
+        return np.searchsorted(np.asarray(self.limites, dtype=float), rng.random(n) * self.total, side="right")
+
+
+def _contador_con_version(nombre: str) -> property:
+    """
+    Contador de clientes que pondera la elección de preexistentes: se guarda en
+    _<nombre> y cada escritura incrementa version_contadores (la lectura es un attrgetter).
+    """
+    privado = "_" + nombre
+
+    def _fijar(est: "EstadoSimulacion", valor: int) -> None:
+        est.__dict__[privado] = valor
+        est.version_contadores += 1
+
+    return property(attrgetter(privado), _fijar, doc=f"Contador {nombre} (versionado).")
+
+
 class EstadoSimulacion:
     """
     Estado único de la simulación. Todos los módulos reciben y modifican
     esta instancia para mantener consistencia.
     """
 
+    PE_Trabajo_Aislado = _contador_con_version("PE_Trabajo_Aislado")
+    Asiduos_Suscripcion = _contador_con_version("Asiduos_Suscripcion")
+    Asiduos_Prepago = _contador_con_version("Asiduos_Prepago")
+    CE_Suscripcion = _contador_con_version("CE_Suscripcion")
+    CE_Prepago = _contador_con_version("CE_Prepago")
+
     def __init__(self, T_FINAL: int, N: int, M: float):
         # Parámetros de control
         self.T_FINAL = T_FINAL
@@ -32,6 +138,10 @@ class EstadoSimulacion:
         self.T = 0
 
         # --- Contadores de clientes (valores iniciales del enunciado) ---
+        # Los cinco que ponderan la elección de preexistentes están versionados (ver selector_preexistente)
+        self.version_contadores = 0
+        self._selector_pe: Optional[SelectorCategorico] = None
+        self._version_selector_pe = -1
         self.PE_Trabajo_Aislado = 940
         self.Asiduos_Suscripcion = 14
         self.Asiduos_Prepago = 3
@@ -79,14 +189,21 @@ class EstadoSimulacion:
         self.trabajos_perdidos_por_tipo: Dict[str, int] = {
             "APPS": 0, "IT": 0, "DESARROLLO": 0
         }
-        self.contrataciones_pendientes: List[Tuple[int, int, int]] = []  # (dia, n_devs, n_apps_it)
+        self.contrataciones_pendientes: List[Tuple[int, int, int]] = []  # heap de (dia, n_devs, n_apps_it)
 
         # --- Proporciones de tipo de trabajo del día actual (Dirichlet) ---
         self.prop_tipo_trabajo_dia: Tuple[float, float, float] = (0.52, 0.43, 0.05)
 
         # --- Métricas ---
         self.T_EQUILIBRIO: Optional[int] = None
+        # Parada anticipada (criterios_parada en ejecutar_simulacion)
+        self.TRUNCADA = False
+        self.MOTIVO_PARADA: Optional[str] = None
         self.MEJOR_TRIMESTRE = MejorTrimestre()
+        # Telemetría: contadores de eventos (EV_*) y segundos en simular_dia (iterar_simulacion)
+        self.eventos: List[int] = [0] * len(EVENTOS)
+        self.SEGUNDOS_SIMULACION: Optional[float] = 0.0
+        self.SEGUNDOS_LOTE: Optional[float] = None  # modo agregado: tiempo del lote entero (simulacion.agregado)
         self.beneficio_acumulado_por_dia: List[float] = []
         self.metricas_semanales: List[Dict[str, Any]] = []
         # Pérdidas de clientes por semana (se reinicia cada semana)
@@ -108,6 +225,18 @@ class EstadoSimulacion:
         asiduos = self.Asiduos_Suscripcion + self.Asiduos_Prepago
         return asiduos * 2 + self.PE_con_paquetes - asiduos
 
+    def selector_preexistente(self) -> SelectorCategorico:
+        """
+        Selector de categoría del cliente preexistente (CATEGORIA_*): pesos asiduos*5,
+        max(0, CE - asiduos) y aislados/10. Se reconstruye solo si cambió version_contadores.
+        """
+        if self._version_selector_pe != self.version_contadores:
+            asiduos = self.Asiduos_Suscripcion + self.Asiduos_Prepago
+            peso_ce_na = max(0, (self.CE_Suscripcion + self.CE_Prepago) - asiduos)
+            self._selector_pe = SelectorCategorico((asiduos * 5, peso_ce_na, self.PE_Trabajo_Aislado / 10.0))
+            self._version_selector_pe = self.version_contadores
+        return self._selector_pe
+
     def total_asiduos(self) -> int:
         return self.Asiduos_Suscripcion + self.Asiduos_Prepago
 
@@ -5,158 +5,176 @@ Muestra satisfacción (prepago, suscripción, general) y métricas principales.
 """
 
 import os
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional
+
+from .render import TrabajoGrafico, renderizar, trabajo
 
 if TYPE_CHECKING:
     from .estado import EstadoSimulacion
 
+# Estilo común de las figuras semana a semana
+_RC_GRAFICOS = {"figure.figsize": (10, 6), "axes.grid": True}
+
 
-def generar_graficos(est: "EstadoSimulacion", output_dir: str = "graficos") -> None:
+def generar_graficos(
+    est: "EstadoSimulacion",
+    output_dir: str = "graficos",
+    workers: Optional[int] = None,
+) -> None:
     """
     Genera gráficos PNG a partir de las métricas semanales capturadas.
     Crea el directorio de salida si no existe.
+    workers: procesos para renderizar (None = núcleos disponibles, 1 = secuencial).
     Requiere: pip install matplotlib
     """
     try:
-        import matplotlib
+        import matplotlib  # noqa: F401
     except ImportError:
         raise ImportError(
             "Se requiere matplotlib para generar gráficos. Instálalo con: pip install matplotlib"
         ) from None
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
 
     if not est.metricas_semanales:
         return
 
     os.makedirs(output_dir, exist_ok=True)
-    semanas = [m["semana"] for m in est.metricas_semanales]
-
-    # Configuración de estilo
-    plt.rcParams["figure.figsize"] = (10, 6)
-    plt.rcParams["axes.grid"] = True
-
-    # 1. Satisfacción prepago
-    prep_sat = [m["satisfaccion"]["prepago_satisfechos_pct"] for m in est.metricas_semanales]
-    prep_insat = [m["satisfaccion"]["prepago_insatisfechos_pct"] for m in est.metricas_semanales]
-    _grafico_satisfaccion(
-        semanas, prep_sat, prep_insat,
-        "Satisfacción Prepago (Semana a Semana)",
-        "Satisfechos", "Insatisfechos",
-        os.path.join(output_dir, "satisfaccion_prepago.png"),
-    )
-
-    # 2. Satisfacción suscripción
-    susc_sat = [m["satisfaccion"]["suscripcion_satisfechos_pct"] for m in est.metricas_semanales]
-    susc_insat = [m["satisfaccion"]["suscripcion_insatisfechos_pct"] for m in est.metricas_semanales]
-    _grafico_satisfaccion(
-        semanas, susc_sat, susc_insat,
-        "Satisfacción Suscripción (Semana a Semana)",
-        "Satisfechos", "Insatisfechos",
-        os.path.join(output_dir, "satisfaccion_suscripcion.png"),
-    )
-
-    # 3. Satisfacción general
-    gen_sat = [m["satisfaccion"]["general_satisfechos_pct"] for m in est.metricas_semanales]
-    gen_insat = [m["satisfaccion"]["general_insatisfechos_pct"] for m in est.metricas_semanales]
-    _grafico_satisfaccion(
-        semanas, gen_sat, gen_insat,
-        "Satisfacción General - Clientes con Paquetes (Semana a Semana)",
-        "Satisfechos", "Insatisfechos",
-        os.path.join(output_dir, "satisfaccion_general.png"),
-    )
-
-    # 4. Gráfico de beneficios
-    fig, ax = plt.subplots(figsize=(10, 6))
-    trabajos = [m["beneficios"]["trabajos"] for m in est.metricas_semanales]
-    prepago = [m["beneficios"]["prepago"] for m in est.metricas_semanales]
-    suscripcion = [m["beneficios"]["suscripcion"] for m in est.metricas_semanales]
-    total = [m["beneficios"]["total_acumulado"] for m in est.metricas_semanales]
-
-    ax.plot(semanas, trabajos, marker="o", markersize=4, label="Trabajos")
-    ax.plot(semanas, prepago, marker="s", markersize=4, label="Prepago")
-    ax.plot(semanas, suscripcion, marker="^", markersize=4, label="Suscripción")
-    ax.plot(semanas, total, marker="D", markersize=4, label="Total acumulado", linewidth=2)
+    renderizar(trabajos_graficos(est, output_dir), workers=workers)
+
+
+def trabajos_graficos(est: "EstadoSimulacion", output_dir: str) -> List[TrabajoGrafico]:
+    """Describe las figuras semana a semana de una corrida como trabajos de render."""
+    ms = est.metricas_semanales
+    if not ms:
+        return []
+    semanas = [m["semana"] for m in ms]
+
+    def _serie(grupo: str, clave: str) -> list:
+        return [m[grupo][clave] for m in ms]
+
+    def _t(funcion, archivo, **datos) -> TrabajoGrafico:
+        return trabajo(funcion, os.path.join(output_dir, archivo), rc=_RC_GRAFICOS, **datos)
+
+    satisfaccion = {
+        grupo: (_serie("satisfaccion", f"{grupo}_satisfechos_pct"), _serie("satisfaccion", f"{grupo}_insatisfechos_pct"))
+        for grupo in ("prepago", "suscripcion", "general")
+    }
+    trabajos = [
+        # 1-3. Satisfacción prepago, suscripción y general
+        _t(_grafico_satisfaccion, "satisfaccion_prepago.png",
+           semanas=semanas, satisfechos=satisfaccion["prepago"][0], insatisfechos=satisfaccion["prepago"][1],
+           titulo="Satisfacción Prepago (Semana a Semana)", label_sat="Satisfechos", label_insat="Insatisfechos"),
+        _t(_grafico_satisfaccion, "satisfaccion_suscripcion.png",
+           semanas=semanas, satisfechos=satisfaccion["suscripcion"][0], insatisfechos=satisfaccion["suscripcion"][1],
+           titulo="Satisfacción Suscripción (Semana a Semana)", label_sat="Satisfechos", label_insat="Insatisfechos"),
+        _t(_grafico_satisfaccion, "satisfaccion_general.png",
+           semanas=semanas, satisfechos=satisfaccion["general"][0], insatisfechos=satisfaccion["general"][1],
+           titulo="Satisfacción General - Clientes con Paquetes (Semana a Semana)",
+           label_sat="Satisfechos", label_insat="Insatisfechos"),
+        # 4. Beneficios
+        _t(_grafico_beneficios, "beneficios.png",
+           semanas=semanas, trabajos=_serie("beneficios", "trabajos"), prepago=_serie("beneficios", "prepago"),
+           suscripcion=_serie("beneficios", "suscripcion"), total=_serie("beneficios", "total_acumulado")),
+        # 5. Costos (COSTOS_TECNICOS y COSTOS_RESARCIMIENTO no implementados, excluidos)
+        _t(_grafico_costos, "costos.png",
+           semanas=semanas, desarrollo=_serie("costos", "desarrollo"), marketing=_serie("costos", "marketing")),
+        # 6. Clientes
+        _t(_grafico_clientes, "clientes.png",
+           semanas=semanas, suscripciones=_serie("clientes", "suscripciones_totales"),
+           prepagos=_serie("clientes", "prepagos_totales"), trabajo_aislado=_serie("clientes", "trabajo_aislado"),
+           pe_paquetes=_serie("clientes", "pe_con_paquetes")),
+        # 7. Satisfacción combinada (subplots)
+        _t(_grafico_satisfaccion_combinado, "satisfaccion_combinado.png",
+           semanas=semanas, satisfaccion=satisfaccion),
+        # 8. Resultado neto (acumulado con línea de equilibrio)
+        _t(_grafico_resultado_neto, "resultado_neto.png",
+           semanas=semanas, total_acum=_serie("beneficios", "total_acumulado")),
+    ]
+
+    # 9. Pérdidas de clientes por razón y total
+    if "perdidas" in ms[0]:
+        trabajos.append(_t(
+            _grafico_perdidas_clientes, "perdidas_clientes.png",
+            semanas=semanas,
+            perdidas={
+                clave: [m["perdidas"].get(clave, 0) for m in ms]
+                for clave in (
+                    "suscripcion_no_renovacion", "prepago_no_renovacion", "prepago_abandono_insatisfecho",
+                    "trabajo_aislado_insatisfecho", "calendarizacion_sin_tecnico",
+                )
+            },
+            total=[m["perdidas_total"] for m in ms],
+        ))
+    return trabajos
+
+
+def _grafico_lineas(semanas: list, series: list, ylabel: str, titulo: str):
+    """Figura de líneas con marcadores: series = [(valores, label, marker, kwargs)]."""
+    import matplotlib.pyplot as plt
 
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for valores, label, marker, extra in series:
+        ax.plot(semanas, valores, marker=marker, markersize=4, label=label, **extra)
     ax.set_xlabel("Semana")
-    ax.set_ylabel("Beneficio (créditos)")
-    ax.set_title("Beneficios Netos (Semana a Semana)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(titulo)
     ax.legend(loc="best")
     ax.grid(True, alpha=0.3)
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "beneficios.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
 
-    # 5. Gráfico de costos (COSTOS_TECNICOS y COSTOS_RESARCIMIENTO no implementados, excluidos)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    desarrollo = [m["costos"]["desarrollo"] for m in est.metricas_semanales]
-    marketing = [m["costos"]["marketing"] for m in est.metricas_semanales]
 
-    ax.plot(semanas, desarrollo, marker="o", markersize=4, label="Desarrollo")
-    ax.plot(semanas, marketing, marker="s", markersize=4, label="Marketing")
+def _grafico_beneficios(semanas: list, trabajos: list, prepago: list, suscripcion: list, total: list):
+    return _grafico_lineas(semanas, [
+        (trabajos, "Trabajos", "o", {}),
+        (prepago, "Prepago", "s", {}),
+        (suscripcion, "Suscripción", "^", {}),
+        (total, "Total acumulado", "D", {"linewidth": 2}),
+    ], "Beneficio (créditos)", "Beneficios Netos (Semana a Semana)")
 
-    ax.set_xlabel("Semana")
-    ax.set_ylabel("Costo (créditos)")
-    ax.set_title("Costos Acumulados (Semana a Semana)")
-    ax.legend(loc="best")
-    ax.grid(True, alpha=0.3)
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "costos.png"), dpi=150, bbox_inches="tight")
-    plt.close()
 
-    # 6. Gráfico de clientes
-    fig, ax = plt.subplots(figsize=(10, 6))
-    susc_tot = [m["clientes"]["suscripciones_totales"] for m in est.metricas_semanales]
-    prep_tot = [m["clientes"]["prepagos_totales"] for m in est.metricas_semanales]
-    trabajo_aislado = [m["clientes"]["trabajo_aislado"] for m in est.metricas_semanales]
-    pe_paquetes = [m["clientes"]["pe_con_paquetes"] for m in est.metricas_semanales]
+def _grafico_costos(semanas: list, desarrollo: list, marketing: list):
+    return _grafico_lineas(semanas, [
+        (desarrollo, "Desarrollo", "o", {}),
+        (marketing, "Marketing", "s", {}),
+    ], "Costo (créditos)", "Costos Acumulados (Semana a Semana)")
 
-    ax.plot(semanas, susc_tot, marker="o", markersize=4, label="Suscripciones")
-    ax.plot(semanas, prep_tot, marker="s", markersize=4, label="Prepagos")
-    ax.plot(semanas, trabajo_aislado, marker="^", markersize=4, label="Trabajo Aislado")
-    ax.plot(semanas, pe_paquetes, marker="D", markersize=4, label="PE con paquetes")
 
-    ax.set_xlabel("Semana")
-    ax.set_ylabel("Cantidad")
-    ax.set_title("Clientes por Tipo (Semana a Semana)")
-    ax.legend(loc="best")
-    ax.grid(True, alpha=0.3)
-    fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "clientes.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+def _grafico_clientes(semanas: list, suscripciones: list, prepagos: list, trabajo_aislado: list, pe_paquetes: list):
+    return _grafico_lineas(semanas, [
+        (suscripciones, "Suscripciones", "o", {}),
+        (prepagos, "Prepagos", "s", {}),
+        (trabajo_aislado, "Trabajo Aislado", "^", {}),
+        (pe_paquetes, "PE con paquetes", "D", {}),
+    ], "Cantidad", "Clientes por Tipo (Semana a Semana)")
 
-    # 7. Gráfico combinado de satisfacción (subplots)
-    fig, axes = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
 
-    axes[0].plot(semanas, prep_sat, "g-", marker="o", markersize=4, label="Satisfechos")
-    axes[0].plot(semanas, prep_insat, "r-", marker="s", markersize=4, label="Insatisfechos")
-    axes[0].set_ylabel("%")
-    axes[0].set_title("Prepago")
-    axes[0].legend(loc="best")
-    axes[0].grid(True, alpha=0.3)
-
-    axes[1].plot(semanas, susc_sat, "g-", marker="o", markersize=4, label="Satisfechos")
-    axes[1].plot(semanas, susc_insat, "r-", marker="s", markersize=4, label="Insatisfechos")
-    axes[1].set_ylabel("%")
-    axes[1].set_title("Suscripción")
-    axes[1].legend(loc="best")
-    axes[1].grid(True, alpha=0.3)
-
-    axes[2].plot(semanas, gen_sat, "g-", marker="o", markersize=4, label="Satisfechos")
-    axes[2].plot(semanas, gen_insat, "r-", marker="s", markersize=4, label="Insatisfechos")
+def _grafico_satisfaccion_combinado(semanas: list, satisfaccion: dict):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
+    paneles = [
+        ("prepago", "Prepago"),
+        ("suscripcion", "Suscripción"),
+        ("general", "General (clientes con paquetes)"),
+    ]
+    for ax, (grupo, titulo) in zip(axes, paneles):
+        sat, insat = satisfaccion[grupo]
+        ax.plot(semanas, sat, "g-", marker="o", markersize=4, label="Satisfechos")
+        ax.plot(semanas, insat, "r-", marker="s", markersize=4, label="Insatisfechos")
+        ax.set_ylabel("%")
+        ax.set_title(titulo)
+        ax.legend(loc="best")
+        ax.grid(True, alpha=0.3)
     axes[2].set_xlabel("Semana")
-    axes[2].set_ylabel("%")
-    axes[2].set_title("General (clientes con paquetes)")
-    axes[2].legend(loc="best")
-    axes[2].grid(True, alpha=0.3)
 
     fig.suptitle("Satisfacción de Clientes (Semana a Semana)", fontsize=14, y=1.02)
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "satisfaccion_combinado.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
+
+
+def _grafico_resultado_neto(semanas: list, total_acum: list):
+    import matplotlib.pyplot as plt
 
-    # 8. Gráfico de resultado neto (acumulado con línea de equilibrio)
-    total_acum = [m["beneficios"]["total_acumulado"] for m in est.metricas_semanales]
     fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(semanas, total_acum, color="steelblue", linewidth=2, label="Resultado neto acumulado")
     ax.axhline(y=0, color="gray", linestyle="--", linewidth=1.5, label="Equilibrio (cero)")
@@ -168,36 +186,21 @@ def generar_graficos(est: "EstadoSimulacion", output_dir: str = "graficos") -> N
     ax.legend(loc="best")
     ax.grid(True, alpha=0.3)
     fig.tight_layout()
-    fig.savefig(os.path.join(output_dir, "resultado_neto.png"), dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
 
-    # 9. Gráfico de pérdidas de clientes por razón y total
-    _grafico_perdidas_clientes(est.metricas_semanales, output_dir)
 
-
-def _grafico_perdidas_clientes(metricas_semanales: list, output_dir: str) -> None:
+def _grafico_perdidas_clientes(semanas: list, perdidas: dict, total: list):
     import matplotlib.pyplot as plt
 
-    if not metricas_semanales or "perdidas" not in metricas_semanales[0]:
-        return
-
-    semanas = [m["semana"] for m in metricas_semanales]
-    susc = [m["perdidas"].get("suscripcion_no_renovacion", 0) for m in metricas_semanales]
-    prep = [m["perdidas"].get("prepago_no_renovacion", 0) for m in metricas_semanales]
-    prep_abandono = [m["perdidas"].get("prepago_abandono_insatisfecho", 0) for m in metricas_semanales]
-    ta = [m["perdidas"].get("trabajo_aislado_insatisfecho", 0) for m in metricas_semanales]
-    cal_sin_tec = [m["perdidas"].get("calendarizacion_sin_tecnico", 0) for m in metricas_semanales]
-    total = [m["perdidas_total"] for m in metricas_semanales]
-
     fig, axes = plt.subplots(2, 1, figsize=(10, 10), sharex=True)
 
     # Subplot 1: pérdidas por razón (líneas)
     ax1 = axes[0]
-    ax1.plot(semanas, susc, marker="o", markersize=4, label="Suscripción (no renovación)")
-    ax1.plot(semanas, prep, marker="s", markersize=4, label="Prepago (no renovación)")
-    ax1.plot(semanas, prep_abandono, marker="x", markersize=4, label="Prepago (abandono insatisfecho)")
-    ax1.plot(semanas, ta, marker="^", markersize=4, label="Trabajo aislado (insatisfecho)")
-    ax1.plot(semanas, cal_sin_tec, marker="d", markersize=4, label="Calendarización sin técnico")
+    ax1.plot(semanas, perdidas["suscripcion_no_renovacion"], marker="o", markersize=4, label="Suscripción (no renovación)")
+    ax1.plot(semanas, perdidas["prepago_no_renovacion"], marker="s", markersize=4, label="Prepago (no renovación)")
+    ax1.plot(semanas, perdidas["prepago_abandono_insatisfecho"], marker="x", markersize=4, label="Prepago (abandono insatisfecho)")
+    ax1.plot(semanas, perdidas["trabajo_aislado_insatisfecho"], marker="^", markersize=4, label="Trabajo aislado (insatisfecho)")
+    ax1.plot(semanas, perdidas["calendarizacion_sin_tecnico"], marker="d", markersize=4, label="Calendarización sin técnico")
     ax1.set_ylabel("Clientes perdidos")
     ax1.set_title("Pérdidas de Clientes por Razón (Semana a Semana)")
     ax1.legend(loc="upper right")
@@ -214,10 +217,7 @@ def _grafico_perdidas_clientes(metricas_semanales: list, output_dir: str) -> Non
     ax2.grid(True, alpha=0.3, axis="y")
 
     fig.tight_layout()
-    fig.savefig(
-        os.path.join(output_dir, "perdidas_clientes.png"), dpi=150, bbox_inches="tight"
-    )
-    plt.close()
+    return fig
 
 
 def _grafico_satisfaccion(
@@ -227,8 +227,7 @@ def _grafico_satisfaccion(
     titulo: str,
     label_sat: str,
     label_insat: str,
-    path: str,
-) -> None:
+):
     import matplotlib.pyplot as plt
 
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -241,5 +240,4 @@ def _grafico_satisfaccion(
     ax.grid(True, alpha=0.3)
     ax.set_ylim(0, 105)
     fig.tight_layout()
-    fig.savefig(path, dpi=150, bbox_inches="tight")
-    plt.close()
+    return fig
@@ -10,7 +10,12 @@ import math
 from typing import Tuple, Optional
 
 from . import config as cfg
-from .estado import EstadoSimulacion
+from .estado import (
+    CATEGORIA_ASIDUO, CATEGORIA_CE_NO_ASIDUO, EstadoSimulacion,
+    EV_ABANDONOS_PREPAGO, EV_ARREPENTIMIENTOS, EV_BLOQUES_PREPAGO_VENDIDOS, EV_CALENDARIZACIONES,
+    EV_CONVERSIONES_TA, EV_FALTAS_REUNION, EV_INSATISFECHOS, EV_LLEGADAS, EV_NO_COBRADOS,
+    EV_NO_RENOVACIONES_PREPAGO, EV_NUEVOS_SIN_PRESUPUESTO, EV_SIN_TECNICO, EV_TRABAJOS_ATENDIDOS,
+)
 
 
 # --- Constantes de tipos (strings) ---
@@ -24,6 +29,61 @@ TRABAJO_IT = "IT"
 TRABAJO_DESARROLLO = "DESARROLLO"
 
 
+class DiaContexto:
+    """
+    Valores de procesar_llegada_cliente que no cambian durante el día: se arma una vez
+    en simular_dia (después de calcular_ajuste_calendarizacion) y se pasa a cada llegada.
+    Guarda umbrales y parámetros Beta, no sorteos: cada llegada sigue consumiendo los
+    mismos random() y betavariate() en el mismo orden.
+    prob_preexistente depende de contadores que sí cambian en el día: se recalcula
+    solo cuando cambian (version_contadores, PE_con_paquetes).
+    """
+
+    __slots__ = (
+        "es_inestable", "umbral_apps", "umbral_it",
+        "beta_calendarizar_laboral", "beta_calendarizar_fuera",
+        "beta_arrepentimiento", "beta_falta_reunion",
+        "beta_insatisfaccion", "beta_conectividad", "beta_inestabilidad", "beta_insatisfaccion_calendarizado",
+        "_clave_pe", "_prob_pe",
+    )
+
+    def __init__(self, est: EstadoSimulacion, es_inestable: bool):
+        self.es_inestable = es_inestable
+        p_apps, p_it, _ = est.prop_tipo_trabajo_dia
+        self.umbral_apps = p_apps
+        self.umbral_it = p_apps + p_it
+        ajuste = est.ajuste_prob_calendarizacion
+        self.beta_calendarizar_laboral = cfg.parametros_beta(
+            max(0.0, min(1.0, cfg.PROB_CALENDARIZAR_HORARIO_LABORAL + ajuste)), 8)
+        self.beta_calendarizar_fuera = cfg.parametros_beta(
+            max(0.0, min(1.0, cfg.PROB_CALENDARIZAR_FUERA_HORARIO + ajuste)), 8)
+        self.beta_arrepentimiento = cfg.parametros_beta(cfg.PROB_ARREPENTIMIENTO_CALENDARIZADO, 8)
+        self.beta_falta_reunion = cfg.parametros_beta(cfg.PROB_FALTA_REUNION, 8)
+        self.beta_insatisfaccion = cfg.parametros_beta(cfg.PROB_INSATISFACCION_BASE, 8)
+        self.beta_conectividad = cfg.parametros_beta(cfg.PROB_CONECTIVIDAD_POBRE, 8)
+        self.beta_inestabilidad = cfg.parametros_beta(cfg.PROB_INESTABILIDAD_IMPLEMENTACION, 8)
+        self.beta_insatisfaccion_calendarizado = cfg.parametros_beta(cfg.PROB_INSATISFACCION_CALENDARIZADO, 8)
+        self._clave_pe: Optional[Tuple[int, int]] = None
+        self._prob_pe = 0.0
+
+    def prob_preexistente(self, est: EstadoSimulacion) -> float:
+        """Probabilidad de que una llegada no forzada sea PE (según scoring IA)."""
+        clave = (est.version_contadores, est.PE_con_paquetes)
+        if clave != self._clave_pe:
+            scoring_IA = est.scoring_IA_actual()
+            if scoring_IA <= cfg.SCORING_UMBRAL_PE:
+                self._prob_pe = cfg.PROB_PREEXISTENTE_BASE
+            else:
+                exceso = scoring_IA - cfg.SCORING_UMBRAL_PE
+                incremento = min(
+                    cfg.INCREMENTO_PROB_PE_MAX,
+                    math.floor(exceso / 30) * cfg.INCREMENTO_PROB_PE_POR_30,
+                )
+                self._prob_pe = min(cfg.PROB_PREEXISTENTE_MAX, cfg.PROB_PREEXISTENTE_BASE + incremento)
+            self._clave_pe = clave
+        return self._prob_pe
+
+
 def determinar_tipo_pago_paquete(est: EstadoSimulacion, es_asiduo: bool) -> str:
     """Determina SUSCRIPCION o PREPAGO según proporción actual de asiduos/CE."""
     if es_asiduo:
@@ -41,21 +101,20 @@ def determinar_tipo_pago_paquete(est: EstadoSimulacion, es_asiduo: bool) -> str:
     return TIPO_PAGO_SUSCRIPCION if random.random() < prob_suscripcion else TIPO_PAGO_PREPAGO
 
 
-def _determinar_trabajo(prop_tipo: Tuple[float, float, float]) -> Tuple[str, float, float]:
+def _determinar_trabajo(umbral_apps: float, umbral_it: float) -> Tuple[str, float, float]:
     """
     Devuelve (tipo_trabajo, duracion, costo_por_unidad). Duración en minutos salvo Desarrollo en horas.
-    prop_tipo: (p_apps, p_it, p_dev) proporciones del día actual.
+    umbral_apps, umbral_it: p_apps y p_apps + p_it de las proporciones del día (DiaContexto).
     """
-    p_apps, p_it, p_dev = prop_tipo
     r = random.random()
-    if r < p_apps:
-        duracion = cfg.normal_truncada(
+    if r < umbral_apps:
+        duracion = cfg.duracion_minutos(
             cfg.DURACION_APPS_MEDIA, cfg.DURACION_APPS_STD,
             0, cfg.DURACION_APPS_MAX_MINUTOS
         )
         return TRABAJO_APPS, duracion, cfg.COSTO_APPS_POR_MIN
-    if r < p_apps + p_it:
-        duracion = cfg.normal_truncada(
+    if r < umbral_it:
+        duracion = cfg.duracion_minutos(
             cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD,
             0, cfg.DURACION_IT_MAX_MINUTOS
         )
@@ -100,11 +159,17 @@ def procesar_llegada_cliente(
     minuto_arrivo: int = 0,
     forzar_tipo: Optional[str] = None,
     reloj: Optional[float] = None,
+    contexto: Optional[DiaContexto] = None,
 ) -> None:
     """
     Flujo completo de una llegada: tipo cliente, trabajo, asignación, atención, pago, conversiones.
     forzar_tipo: "nuevo", "preexistente" o None (decisión aleatoria según scoring).
+    contexto: DiaContexto del día (simular_dia lo arma una vez); si falta se arma acá.
     """
+    if contexto is None:
+        contexto = DiaContexto(est, es_inestable)
+    eventos = est.eventos
+    eventos[EV_LLEGADAS] += 1
     # Variables de esta llegada (no persistidas como estado global)
     es_nuevo = False
     tipo_cliente = TIPO_CLIENTE_TA
@@ -128,33 +193,17 @@ def procesar_llegada_cliente(
     elif forzar_tipo == "preexistente":
         es_preexistente = True
     else:
-        scoring_IA = est.scoring_IA_actual()
-        if scoring_IA <= cfg.SCORING_UMBRAL_PE:
-            prob_preexistente = cfg.PROB_PREEXISTENTE_BASE
-        else:
-            exceso = scoring_IA - cfg.SCORING_UMBRAL_PE
-            incremento = min(
-                cfg.INCREMENTO_PROB_PE_MAX,
-                math.floor(exceso / 30) * cfg.INCREMENTO_PROB_PE_POR_30,
-            )
-            prob_preexistente = min(cfg.PROB_PREEXISTENTE_MAX, cfg.PROB_PREEXISTENTE_BASE + incremento)
-        es_preexistente = random.random() < prob_preexistente
+        es_preexistente = random.random() < contexto.prob_preexistente(est)
 
     if es_preexistente:
         # ----- CLIENTE PREEXISTENTE -----
-        peso_asiduos = (est.Asiduos_Suscripcion + est.Asiduos_Prepago) * 5
-        peso_ce_na = (est.CE_Suscripcion + est.CE_Prepago) - (est.Asiduos_Suscripcion + est.Asiduos_Prepago)
-        peso_ce_na = max(0, peso_ce_na)
-        peso_aislados = est.PE_Trabajo_Aislado / 10.0
-        peso_total = peso_asiduos + peso_ce_na + peso_aislados
-        if peso_total <= 0:
-            peso_total = 1.0
-        random_prop = random.random() * peso_total
-
-        if random_prop < peso_asiduos:
+        # Pesos asiduos*5 / CE no asiduos / aislados/10, cacheados hasta que cambie un contador
+        categoria = est.selector_preexistente().elegir(random.random())
+
+        if categoria == CATEGORIA_ASIDUO:
             tipo_cliente = TIPO_CLIENTE_CE
             es_asiduo = True
-        elif random_prop < peso_asiduos + peso_ce_na:
+        elif categoria == CATEGORIA_CE_NO_ASIDUO:
             tipo_cliente = TIPO_CLIENTE_CE
             es_asiduo = False
         else:
@@ -186,6 +235,7 @@ def procesar_llegada_cliente(
     else:
         # ----- CLIENTE NUEVO -----
         if est.CREDITOS_MKT_GASTADOS_MES >= est.PRESUPUESTO_MKT_MENSUAL:
+            eventos[EV_NUEVOS_SIN_PRESUPUESTO] += 1
             return  # Presupuesto agotado, cliente no llega
         est.COSTO_MKT += cfg.COSTO_MKT_POR_CLIENTE_NUEVO
         est.CREDITOS_MKT_GASTADOS_MES += cfg.COSTO_MKT_POR_CLIENTE_NUEVO
@@ -205,7 +255,7 @@ def procesar_llegada_cliente(
         # Tipo de pago para nuevo se define en procesar_cobro (A/B 50/50)
 
     # ----- 2. DETERMINACIÓN TIPO DE TRABAJO -----
-    tipo_trabajo, duracion, costo_por_unidad = _determinar_trabajo(est.prop_tipo_trabajo_dia)
+    tipo_trabajo, duracion, costo_por_unidad = _determinar_trabajo(contexto.umbral_apps, contexto.umbral_it)
     if tipo_trabajo == TRABAJO_DESARROLLO:
         creditos_trabajo = duracion * costo_por_unidad  # horas
         duracion_min = duracion * 60
@@ -233,10 +283,14 @@ def procesar_llegada_cliente(
             se_calendariza = True
             est.trabajos_perdidos_por_tipo[tipo_trabajo] += 1
             est.perdidas_semana["calendarizacion_sin_tecnico"] += 1
-            if random.random() < cfg.prob_efectiva_beta(cfg.PROB_ARREPENTIMIENTO_CALENDARIZADO, 8):
+            eventos[EV_SIN_TECNICO] += 1
+            eventos[EV_CALENDARIZACIONES] += 1
+            if random.random() < random.betavariate(*contexto.beta_arrepentimiento):
+                eventos[EV_ARREPENTIMIENTOS] += 1
                 return  # Arrepentimiento
-            if random.random() < cfg.prob_efectiva_beta(cfg.PROB_FALTA_REUNION, 8):
+            if random.random() < random.betavariate(*contexto.beta_falta_reunion):
                 cliente_falta = True
+                eventos[EV_FALTAS_REUNION] += 1
                 est.CREDITOS_ENTRANTES += cfg.PENALIZACION_FALTA_REUNION
                 est.BENEFICIO_NETO_TRABAJOS += cfg.PENALIZACION_FALTA_REUNION * cfg.BENEFICIO_NETO_PORCENTAJE
                 if random.random() < cfg.prob_efectiva_beta(cfg.PROB_DISCONFORMIDAD_SI_FALTA, 8):
@@ -270,17 +324,19 @@ def procesar_llegada_cliente(
             _asignar_tecnico(est, disp[0], disp[1], reloj_val, duracion_min)
 
     if es_horario_laboral and es_dia_semana:
-        prob_calendarizar_base = cfg.PROB_CALENDARIZAR_HORARIO_LABORAL
+        beta_calendarizar = contexto.beta_calendarizar_laboral
     else:
-        prob_calendarizar_base = cfg.PROB_CALENDARIZAR_FUERA_HORARIO
-    prob_calendarizar = max(0.0, min(1.0, prob_calendarizar_base + est.ajuste_prob_calendarizacion))
+        beta_calendarizar = contexto.beta_calendarizar_fuera
 
-    if random.random() < cfg.prob_efectiva_beta(prob_calendarizar, 8):
+    if random.random() < random.betavariate(*beta_calendarizar):
         se_calendariza = True
-        if random.random() < cfg.prob_efectiva_beta(cfg.PROB_ARREPENTIMIENTO_CALENDARIZADO, 8):
+        eventos[EV_CALENDARIZACIONES] += 1
+        if random.random() < random.betavariate(*contexto.beta_arrepentimiento):
+            eventos[EV_ARREPENTIMIENTOS] += 1
             return  # Arrepentimiento, fin del flujo
-        if random.random() < cfg.prob_efectiva_beta(cfg.PROB_FALTA_REUNION, 8):
+        if random.random() < random.betavariate(*contexto.beta_falta_reunion):
             cliente_falta = True
+            eventos[EV_FALTAS_REUNION] += 1
             est.CREDITOS_ENTRANTES += cfg.PENALIZACION_FALTA_REUNION
             est.BENEFICIO_NETO_TRABAJOS += cfg.PENALIZACION_FALTA_REUNION * cfg.BENEFICIO_NETO_PORCENTAJE
             if random.random() < cfg.prob_efectiva_beta(cfg.PROB_DISCONFORMIDAD_SI_FALTA, 8):
@@ -310,12 +366,14 @@ def procesar_llegada_cliente(
         se_calendariza = False
 
     # ----- 4. ATENCIÓN DEL TRABAJO Y SATISFACCIÓN -----
-    prob_insat = cfg.prob_efectiva_beta(cfg.PROB_INSATISFACCION_BASE, 8) + cfg.prob_efectiva_beta(cfg.PROB_CONECTIVIDAD_POBRE, 8)
-    if es_inestable:
-        prob_insat += cfg.prob_efectiva_beta(cfg.PROB_INESTABILIDAD_IMPLEMENTACION, 8)
+    betavariate = random.betavariate
+    prob_insat = betavariate(*contexto.beta_insatisfaccion) + betavariate(*contexto.beta_conectividad)
+    if contexto.es_inestable:
+        prob_insat += betavariate(*contexto.beta_inestabilidad)
     if se_calendariza:
-        prob_insat += cfg.prob_efectiva_beta(cfg.PROB_INSATISFACCION_CALENDARIZADO, 8)
+        prob_insat += betavariate(*contexto.beta_insatisfaccion_calendarizado)
     trabajo_insatisfactorio = random.random() < min(1.0, prob_insat)
+    eventos[EV_TRABAJOS_ATENDIDOS] += 1
 
     # ----- 5. GESTIÓN DE PAGOS Y ATENCIÓN AL CLIENTE -----
     if trabajo_insatisfactorio:
@@ -323,6 +381,9 @@ def procesar_llegada_cliente(
             se_cobra_cliente = random.random() >= cfg.prob_efectiva_beta(cfg.PROB_NO_COBRAR_NO_DESARROLLO, 8)
         else:
             se_cobra_cliente = random.random() < cfg.prob_efectiva_beta(cfg.PROB_COBRAR_DESARROLLO, 8)
+        eventos[EV_INSATISFECHOS] += 1
+        if not se_cobra_cliente:
+            eventos[EV_NO_COBRADOS] += 1
         beneficio_trabajo = creditos_trabajo * cfg.BENEFICIO_NETO_PORCENTAJE
 
         if es_asiduo:
@@ -369,6 +430,7 @@ def procesar_llegada_cliente(
                         # Previamente insatisfecho, trabajo malo y no cobrado -> puede abandonar sin consumir minutos
                         if random.random() < cfg.prob_efectiva_beta(cfg.PROB_ABANDONO_PREPAGO_DISCONFORME, 8):
                             est.perdidas_semana["prepago_abandono_insatisfecho"] += 1
+                            eventos[EV_ABANDONOS_PREPAGO] += 1
                             est.PE_con_paquetes -= 1
                             est.Prepagos_Totales -= 1
                             est.Disconformes_Prepago = max(0, est.Disconformes_Prepago - 1)
@@ -434,6 +496,7 @@ def procesar_llegada_cliente(
     # Ya lo llamamos arriba. Falta: conversiones finales (TA satisfecho → paquete)
     if not es_nuevo and tipo_cliente == TIPO_CLIENTE_TA and not trabajo_insatisfactorio:
         if random.random() < cfg.prob_efectiva_beta(cfg.PROB_CONVERSION_TA_A_PAQUETE, 8):
+            eventos[EV_CONVERSIONES_TA] += 1
             tipo_pago_conv = determinar_tipo_pago_paquete(est, False)
             if tipo_pago_conv == TIPO_PAGO_PREPAGO:
                 est.CREDITOS_ENTRANTES += cfg.PRECIO_RENOVACION_PREPAGO
@@ -523,6 +586,7 @@ def _consumir_creditos_prepago(
                 est.CREDITOS_ENTRANTES += creditos_faltantes
                 est.BENEFICIO_NETO_TRABAJOS += creditos_faltantes * cfg.BENEFICIO_NETO_PORCENTAJE
             else:
+                est.eventos[EV_BLOQUES_PREPAGO_VENDIDOS] += 1
                 est.CREDITOS_ENTRANTES += cfg.PRECIO_RENOVACION_PREPAGO
                 est.BENEFICIO_NETO_PREPAGO += cfg.PRECIO_RENOVACION_PREPAGO
                 est.creditos_prepago_global = cfg.CREDITOS_PREPAGO_BLOQUE - creditos_faltantes
@@ -545,6 +609,7 @@ def _renovar_bloque_prepago(est: EstadoSimulacion) -> None:
         prob_era_disconforme = min(1.0, est.Disconformes_Prepago / est.Prepagos_Totales)
         if random.random() < prob_era_disconforme and random.random() < cfg.prob_efectiva_beta(cfg.PROB_NO_RENOVACION_PREPAGO_DISCONFORME, 8):
             est.perdidas_semana["prepago_no_renovacion"] += 1
+            est.eventos[EV_NO_RENOVACIONES_PREPAGO] += 1
             est.PE_con_paquetes -= 1
             est.Prepagos_Totales -= 1
             prop_asiduo = est.Asiduos_Prepago / est.Prepagos_Totales if est.Prepagos_Totales > 0 else 0
@@ -557,6 +622,7 @@ def _renovar_bloque_prepago(est: EstadoSimulacion) -> None:
             est.Disconformes_Prepago = max(0, est.Disconformes_Prepago - 1)
             est.creditos_prepago_global = cfg.CREDITOS_PREPAGO_BLOQUE
             return
+    est.eventos[EV_BLOQUES_PREPAGO_VENDIDOS] += 1
     est.CREDITOS_ENTRANTES += cfg.PRECIO_RENOVACION_PREPAGO
     est.BENEFICIO_NETO_PREPAGO += cfg.PRECIO_RENOVACION_PREPAGO
     est.creditos_prepago_global = cfg.CREDITOS_PREPAGO_BLOQUE
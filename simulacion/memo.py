@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Memo en disco de corridas individuales.
+Cada corrida se identifica por (código que determina el resultado, parámetros,
+semilla): con el mismo código, T_FINAL, N, M, AB, criterios de parada, modelo
+de duración, modo y semilla el resultado es el mismo, así que su MetricasResumen
+se guarda una vez y cualquier runner lo reutiliza en lugar de volver a simular.
+Para que eso ocurra entre scripts, todos derivan la semilla de la corrida j
+de la configuración con semilla_configuracion(seed, N, M, AB) + j.
+
+Almacenamiento: DIRECTORIO_MEMO/corridas.sqlite (una fila por corrida, pickle
+comprimido). De cada corrida se guarda un ResumenCompacto: los escalares y la
+serie semanal de beneficio acumulado (lo que usan los runners), del orden de
+5 KB a 10 años. Las entradas que no entran en max_mb no se escriben (la caché
+no se desaloja sola: un barrido que recorre siempre las configuraciones en el
+mismo orden desalojaría justo lo que pide primero la próxima vez). desalojar()
+(LRU), invalidar() y recuperar_espacio() son mantenimiento, desde run_memo.py.
+
+Uso:
+  memo = MemoCorridas()
+  base = semilla_configuracion(seed, N, M, ab)
+  claves = [clave_corrida(T, N, M, ab, base + j) for j in range(n)]
+  metricas = con_memo(memo, claves, lambda faltantes: [simular(j) for j in faltantes])
+"""
+
+import ast
+import dataclasses
+import hashlib
+import pickle
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .config import MODELO_DURACION_RECORTE
+from .principal import MODO_DETALLADO
+
+DIRECTORIO_MEMO = ".cache_corridas"
+ARCHIVO_MEMO = "corridas.sqlite"
+MAX_MB_DEFAULT = 2048
+VERSION_MEMO = 2
+_LOTE_SQL = 500  # claves por consulta (límite de variables de SQLite)
+
+_HUELLA_CODIGO: Optional[str] = None
+# Módulos que deciden el resultado de una corrida (gráficos, progreso, render, etc. no entran)
+MODULOS_RESULTADO = (
+    "config.py", "estado.py", "llegada.py", "principal.py", "parada.py",
+    "agregado.py", "muestreo.py", "postproceso.py", "prefijos.py",
+)
+# De benchmark.py solo lo que arma MetricasResumen
+DEFINICIONES_BENCHMARK = ("MetricasResumen", "extraer_metricas", "_beneficio_acumulado")
+
+
+def _fuente_benchmark(directorio: Path) -> bytes:
+    """Código de DEFINICIONES_BENCHMARK en benchmark.py (sin importarlo)."""
+    texto = (directorio / "benchmark.py").read_text(encoding="utf-8")
+    partes = [
+        ast.get_source_segment(texto, nodo) or ""
+        for nodo in ast.parse(texto).body
+        if isinstance(nodo, (ast.ClassDef, ast.FunctionDef)) and nodo.name in DEFINICIONES_BENCHMARK
+    ]
+    return "\n".join(partes).encode("utf-8")
+
+
+def huella_codigo() -> str:
+    """sha256 del código que determina los resultados (MODULOS_RESULTADO y extraer_metricas), memoizado."""
+    global _HUELLA_CODIGO
+    if _HUELLA_CODIGO is None:
+        directorio = Path(__file__).resolve().parent
+        h = hashlib.sha256()
+        fuentes = [(nombre, (directorio / nombre).read_bytes()) for nombre in MODULOS_RESULTADO]
+        fuentes.append(("benchmark.py", _fuente_benchmark(directorio)))
+        for nombre, datos in fuentes:
+            h.update(nombre.encode("utf-8"))
+            h.update(len(datos).to_bytes(8, "little"))
+            h.update(datos)
+        _HUELLA_CODIGO = h.hexdigest()
+    return _HUELLA_CODIGO
+
+
+# Versión del esquema de semillas por corrida que se guarda con los resultados: 1 = seed + i·10000
+# por índice de configuración (anterior, sin registrar), 2 = semilla_configuracion(...) + j
+ESQUEMA_SEMILLAS = 2
+
+
+def semilla_configuracion(seed: int, N: int, M: float, prob_suscripcion: float) -> int:
+    """
+    Semilla base de una configuración: la corrida j usa base + j en todos los runners.
+    Depende solo de seed y (N, M, AB), no de T_FINAL ni del script, así que la misma
+    configuración comparte claves de memo y de prefijos entre runners. Los criterios de
+    parada no entran: una corrida cortada es prefijo de la misma corrida sin cortar.
+    """
+    datos = repr((int(seed), int(N), float(M), float(prob_suscripcion)))
+    return int.from_bytes(hashlib.sha256(datos.encode("utf-8")).digest()[:7], "big")
+
+
+def clave_corrida(
+    T_FINAL: int,
+    N: int,
+    M: float,
+    prob_suscripcion: float,
+    semilla: int,
+    criterios: Optional[Sequence[Any]] = None,
+    modelo_duracion: str = MODELO_DURACION_RECORTE,
+    modo: str = MODO_DETALLADO,
+    lote: int = 1,
+) -> str:
+    """
+    Clave de una corrida: código + parámetros + semilla efectiva (la pasada a random.seed).
+    lote: réplicas del lote del modo agregado (la corrida depende del lote que la simuló).
+    """
+    parametros = repr((VERSION_MEMO, int(T_FINAL), int(N), float(M), float(prob_suscripcion),
+                       tuple(criterios or ()), str(modelo_duracion), str(modo), int(lote), int(semilla)))
+    return hashlib.sha256(f"{huella_codigo()}|{parametros}".encode("utf-8")).hexdigest()
+
+
+def _sin_tiempo(valor: Any) -> Any:
+    """Copia sin segundos_simulacion: el tiempo es de la corrida original, no del runner que la reutiliza."""
+    if getattr(valor, "segundos_simulacion", None) is None:
+        return valor
+    return dataclasses.replace(valor, segundos_simulacion=None)
+
+
+_SERIE_MEMO = "beneficios.total_acumulado"
+
+
+@dataclasses.dataclass
+class ResumenCompacto:
+    """Lo que el memo guarda de una corrida: escalares + serie semanal de beneficio acumulado."""
+    metricas: Any  # MetricasResumen sin metricas_semanales
+    semanas: tuple
+    dias: tuple
+    beneficio_acumulado: tuple
+
+    @classmethod
+    def desde(cls, metricas: Any) -> "ResumenCompacto":
+        ms = metricas.metricas_semanales
+        if hasattr(ms, "serie"):  # SemanasCompactas: columnas sin armar snapshots
+            semanas, dias, valores = ms.serie("semana"), ms.serie("dia"), ms.serie(_SERIE_MEMO)
+        else:
+            semanas = [m["semana"] for m in ms]
+            dias = [m["dia"] for m in ms]
+            valores = [m["beneficios"]["total_acumulado"] for m in ms]
+        return cls(dataclasses.replace(metricas, metricas_semanales=[]), tuple(semanas), tuple(dias), tuple(valores))
+
+    def expandir(self) -> Any:
+        """MetricasResumen con metricas_semanales reducidas a {semana, dia, beneficios.total_acumulado}."""
+        return dataclasses.replace(self.metricas, metricas_semanales=[
+            {"semana": s, "dia": d, "beneficios": {"total_acumulado": v}}
+            for s, d, v in zip(self.semanas, self.dias, self.beneficio_acumulado)
+        ])
+
+
+def reducir(valor: Any) -> Any:
+    """
+    Resultado tal como saldría del memo (series semanales reducidas al beneficio acumulado),
+    conservando segundos_simulacion. con_memo lo aplica a las corridas nuevas para que todas
+    tengan la misma forma; valores sin metricas_semanales pasan sin cambios.
+    """
+    if not hasattr(valor, "metricas_semanales"):
+        return valor
+    return ResumenCompacto.desde(valor).expandir()
+
+
+class MemoCorridas:
+    """Caché LRU de resultados por corrida (MetricasResumen por defecto), en SQLite."""
+
+    def __init__(
+        self,
+        base: Union[str, Path] = ".",
+        directorio: str = DIRECTORIO_MEMO,
+        max_mb: float = MAX_MB_DEFAULT,
+        archivo: str = ARCHIVO_MEMO,
+    ):
+        self.dir = Path(base) / directorio
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.codigo = huella_codigo()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartadas = 0  # entradas no guardadas por superar max_mb
+        self._con = sqlite3.connect(str(self.dir / archivo), timeout=60)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS corridas ("
+            "clave TEXT PRIMARY KEY, codigo TEXT NOT NULL, datos BLOB NOT NULL, "
+            "tamano INTEGER NOT NULL, creado REAL NOT NULL, acceso REAL NOT NULL)"
+        )
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON corridas(acceso)")
+        self._con.commit()
+
+    def cerrar(self) -> None:
+        self._con.close()
+
+    # --- Lectura / escritura ---
+
+    def obtener(self, claves: Sequence[str]) -> Dict[str, Any]:
+        """Entradas presentes entre 'claves' (clave -> MetricasResumen); marca su último acceso."""
+        encontradas: Dict[str, Any] = {}
+        for i in range(0, len(claves), _LOTE_SQL):
+            lote = list(claves[i:i + _LOTE_SQL])
+            filas = self._con.execute(
+                f"SELECT clave, datos FROM corridas WHERE clave IN ({','.join('?' * len(lote))})", lote
+            ).fetchall()
+            for clave, datos in filas:
+                valor = pickle.loads(zlib.decompress(datos))
+                encontradas[clave] = valor.expandir() if isinstance(valor, ResumenCompacto) else valor
+        if encontradas:
+            ahora = time.time()
+            self._con.executemany("UPDATE corridas SET acceso = ? WHERE clave = ?",
+                                  [(ahora, c) for c in encontradas])
+            self._con.commit()
+        self.aciertos += len(encontradas)
+        self.fallos += len(set(claves)) - len(encontradas)
+        return encontradas
+
+    def guardar(self, entradas: Dict[str, Any]) -> None:
+        """
+        Guarda clave -> MetricasResumen como ResumenCompacto (sin segundos_simulacion).
+        Las que harían superar max_mb no se escriben (se cuentan en descartadas).
+        """
+        if not entradas:
+            return
+        ahora = time.time()
+        libre = self.max_bytes - self.tamano_bytes()
+        filas = []
+        for clave, valor in entradas.items():
+            valor = _sin_tiempo(valor)
+            if hasattr(valor, "metricas_semanales"):
+                valor = ResumenCompacto.desde(valor)
+            datos = zlib.compress(pickle.dumps(valor, protocol=4), 6)
+            if len(datos) > libre:
+                self.descartadas += 1
+                continue
+            libre -= len(datos)
+            filas.append((clave, self.codigo, datos, len(datos), ahora, ahora))
+        self._con.executemany("INSERT OR REPLACE INTO corridas VALUES (?, ?, ?, ?, ?, ?)", filas)
+        self._con.commit()
+
+    # --- Mantenimiento ---
+
+    def tamano_bytes(self) -> int:
+        return int(self._con.execute("SELECT COALESCE(SUM(tamano), 0) FROM corridas").fetchone()[0])
+
+    def desalojar(self, max_bytes: Optional[int] = None) -> int:
+        """Borra las entradas menos usadas recientemente hasta quedar en el 90% del límite; devuelve cuántas."""
+        objetivo = int(0.9 * (self.max_bytes if max_bytes is None else max_bytes))
+        exceso = self.tamano_bytes() - objetivo
+        if exceso <= 0:
+            return 0
+        borrar, liberado = [], 0
+        for clave, tamano in self._con.execute("SELECT clave, tamano FROM corridas ORDER BY acceso"):
+            if liberado >= exceso:
+                break
+            borrar.append((clave,))
+            liberado += tamano
+        self._con.executemany("DELETE FROM corridas WHERE clave = ?", borrar)
+        self._con.commit()
+        return len(borrar)
+
+    def invalidar(self, todo: bool = False) -> int:
+        """Borra las entradas de otras versiones del código (o todas); devuelve cuántas."""
+        if todo:
+            cursor = self._con.execute("DELETE FROM corridas")
+        else:
+            cursor = self._con.execute("DELETE FROM corridas WHERE codigo != ?", (self.codigo,))
+        self._con.commit()
+        return cursor.rowcount
+
+    def recuperar_espacio(self) -> None:
+        """VACUUM del archivo (devuelve al disco lo borrado; reescribe todo el archivo)."""
+        self._con.execute("VACUUM")
+
+    def estadisticas(self) -> Dict[str, Any]:
+        total, tamano = self._con.execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM corridas").fetchone()
+        vigentes = self._con.execute("SELECT COUNT(*) FROM corridas WHERE codigo = ?", (self.codigo,)).fetchone()[0]
+        return {
+            "directorio": str(self.dir),
+            "entradas": total,
+            "entradas_codigo_actual": vigentes,
+            "mb": tamano / (1024 * 1024),
+            "max_mb": self.max_bytes / (1024 * 1024),
+            "codigo": self.codigo[:12],
+        }
+
+
+def con_memo(
+    memo: Optional[MemoCorridas],
+    claves: Sequence[str],
+    simular: Callable[[List[int]], List[Any]],
+) -> List[Any]:
+    """
+    Resultados en el orden de 'claves': los presentes salen del memo y el resto
+    se obtiene con simular(índices faltantes) (que devuelve MetricasResumen en ese orden)
+    y se guarda. Con memo, todos vuelven reducidos (reducir: escalares y serie semanal de
+    beneficio acumulado), salgan del memo o no. Con memo=None se simula todo.
+    """
+    if memo is None:
+        return simular(list(range(len(claves))))
+    encontradas = memo.obtener(claves)
+    faltantes = [i for i, c in enumerate(claves) if c not in encontradas]
+    nuevas = [reducir(m) for m in simular(faltantes)] if faltantes else []
+    memo.guardar({claves[i]: m for i, m in zip(faltantes, nuevas)})
+    por_indice = dict(zip(faltantes, nuevas))
+    return [por_indice[i] if i in por_indice else encontradas[c] for i, c in enumerate(claves)]
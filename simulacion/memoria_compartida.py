@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+Resultados de los workers en memoria compartida.
+En lugar de devolver cada MetricasResumen por el pipe del Pool (pickle en el
+worker, copia, unpickle en el padre), el padre reserva un bloque
+multiprocessing.shared_memory con capacidad para BLOQUE_CORRIDAS corridas:
+- escalares: corridas × métricas escalares (float64, None = NaN),
+- semanales: corridas × semanas × series de metricas_semanales (float64),
+- tipos: corridas × columnas (0 float, 1 int, 2 bool) para reconstruir los valores tal cual,
+- estado: corridas × (escrita, semanas de la corrida, motivo de parada).
+Cada worker escribe su corrida en su fila y devuelve solo (índice, None). Si una
+corrida no entra en el formato (motivo de parada desconocido, más semanas que el
+bloque, otro snapshot semanal) se devuelve por el pipe como antes.
+
+El padre no rearma los diccionarios semanales (en Python cuesta más que el unpickle
+que se quiere evitar): metricas_semanales queda como SemanasCompactas, una matriz
+semanas × series que se comporta como la lista y que agregar_metricas, el almacén y
+el memo usan tal cual.
+
+Uso:
+  metricas = mapear_en_buffer(pool, _metricas_worker, worker_args, T_FINAL, chunksize=...)
+  # o, reutilizando el bloque entre lotes:
+  with BufferResultados(n_semanas=T_FINAL // 7) as buffer:
+      metricas = buffer.mapear(pool, _metricas_worker, worker_args, chunksize=...)
+"""
+
+import sys
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass, fields
+from multiprocessing import resource_tracker, shared_memory
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .benchmark import MetricasResumen
+from .parada import MOTIVO_EQUILIBRIO, MOTIVO_RUINA, MOTIVO_SIN_CLIENTES
+
+BLOQUE_CORRIDAS = 512  # corridas por bloque (~55 MB a 10 años); los trabajos se reparten en bloques
+_MOTIVOS = (None, MOTIVO_EQUILIBRIO, MOTIVO_RUINA, MOTIVO_SIN_CLIENTES)
+_TIPO_FLOAT, _TIPO_INT, _TIPO_BOOL = 0, 1, 2
+_CAMPOS_ESCALARES = tuple(
+    f.name for f in fields(MetricasResumen) if f.name not in ("metricas_semanales", "motivo_parada")
+)
+
+_ESTRUCTURA_SEMANA: Optional[Tuple[Tuple[Optional[str], Tuple[str, ...]], ...]] = None
+# Bloques ya adjuntados en este proceso (worker): nombre -> (SharedMemory, vistas)
+_ADJUNTOS: Dict[str, Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]] = {}
+
+
+def estructura_semana() -> Tuple[Tuple[Optional[str], Tuple[str, ...]], ...]:
+    """
+    Estructura del snapshot de capturar_metricas_semana, en orden: (grupo, claves) por
+    diccionario anidado y (None, (clave,)) por valor suelto. Las series son sus hojas.
+    """
+    global _ESTRUCTURA_SEMANA
+    if _ESTRUCTURA_SEMANA is None:
+        from .estado import EstadoSimulacion
+        from .principal import capturar_metricas_semana
+
+        muestra = capturar_metricas_semana(EstadoSimulacion(T_FINAL=7, N=7, M=0))
+        _ESTRUCTURA_SEMANA = tuple(
+            (clave, tuple(valor)) if isinstance(valor, dict) else (None, (clave,))
+            for clave, valor in muestra.items()
+        )
+    return _ESTRUCTURA_SEMANA
+
+
+def _n_series() -> int:
+    return sum(len(claves) for _, claves in estructura_semana())
+
+
+class SemanasCompactas(SequenceABC):
+    """
+    metricas_semanales de una corrida como matriz semanas × series (la fila del bloque
+    compartido, copiada). Se comporta como la lista de snapshots (len, índice, iteración,
+    ==) armando cada diccionario al pedirlo; agregar_metricas y el almacén leen las
+    columnas directamente con serie() / matriz(), sin pasar por los diccionarios.
+    """
+
+    def __init__(self, bloque: np.ndarray, tipos: Tuple[int, ...]):
+        self._bloque = bloque
+        self._tipos = tipos
+
+    def __len__(self) -> int:
+        return self._bloque.shape[0]
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self._snapshot(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._snapshot(i)
+
+    def __eq__(self, otro: Any) -> bool:
+        if isinstance(otro, (SemanasCompactas, list)):
+            return len(self) == len(otro) and all(a == b for a, b in zip(self, otro))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def _snapshot(self, i: int) -> Dict[str, Any]:
+        fila = self._bloque[i].tolist()
+        for j, t in enumerate(self._tipos):
+            if t == _TIPO_INT:
+                fila[j] = int(fila[j])
+        ms: Dict[str, Any] = {}
+        inicio = 0
+        for g, claves in estructura_semana():
+            if g is None:
+                ms[claves[0]] = fila[inicio]
+            else:
+                ms[g] = dict(zip(claves, fila[inicio:inicio + len(claves)]))
+            inicio += len(claves)
+        return ms
+
+    def columna(self, nombre: str) -> Optional[int]:
+        """Índice de la serie "grupo.clave" (o "clave" suelta) en la matriz; None si no existe."""
+        return _indices_series().get(nombre)
+
+    def matriz(self) -> np.ndarray:
+        """Matriz semanas × series (float64), columnas en el orden de estructura_semana."""
+        return self._bloque
+
+    def serie(self, nombre: str) -> List[Any]:
+        """Valores semana a semana de una serie, con su tipo original."""
+        j = _indices_series()[nombre]
+        valores = self._bloque[:, j]
+        return (valores.astype(np.int64) if self._tipos[j] == _TIPO_INT else valores).tolist()
+
+
+def _indices_series() -> Dict[str, int]:
+    indices, j = {}, 0
+    for g, claves in estructura_semana():
+        for c in claves:
+            indices[c if g is None else f"{g}.{c}"] = j
+            j += 1
+    return indices
+
+
+@dataclass(frozen=True)
+class DescriptorBuffer:
+    """Lo que necesita un worker para adjuntarse al bloque (viaja en cada trabajo, es chico)."""
+    nombre: str
+    capacidad: int
+    n_semanas: int
+
+
+def _formas(capacidad: int, n_semanas: int) -> List[Tuple[str, Tuple[int, ...], Any]]:
+    n_series = _n_series()
+    return [
+        ("escalares", (capacidad, len(_CAMPOS_ESCALARES)), np.float64),
+        ("semanales", (capacidad, n_semanas, n_series), np.float64),
+        ("tipos", (capacidad, len(_CAMPOS_ESCALARES) + n_series), np.int8),
+        ("estado", (capacidad, 3), np.int64),
+    ]
+
+
+def _tamano(capacidad: int, n_semanas: int) -> int:
+    return sum(int(np.prod(forma)) * np.dtype(dtype).itemsize for _, forma, dtype in _formas(capacidad, n_semanas))
+
+
+def _vistas(shm: shared_memory.SharedMemory, capacidad: int, n_semanas: int) -> Dict[str, np.ndarray]:
+    vistas, desplazamiento = {}, 0
+    for nombre, forma, dtype in _formas(capacidad, n_semanas):
+        vistas[nombre] = np.ndarray(forma, dtype=dtype, buffer=shm.buf, offset=desplazamiento)
+        desplazamiento += int(np.prod(forma)) * np.dtype(dtype).itemsize
+    return vistas
+
+
+def _tipo(valor: Any) -> int:
+    if isinstance(valor, bool):
+        return _TIPO_BOOL
+    return _TIPO_INT if isinstance(valor, int) else _TIPO_FLOAT
+
+
+def _restaurar(valor: float, tipo: int) -> Any:
+    if valor != valor:  # NaN
+        return None
+    if tipo == _TIPO_BOOL:
+        return bool(valor)
+    return int(valor) if tipo == _TIPO_INT else valor
+
+
+def _adjuntar(nombre: str) -> shared_memory.SharedMemory:
+    """Adjunta el bloque sin registrarlo en el resource_tracker del worker (el dueño es el padre)."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    # Antes de 3.13 adjuntar también registra el bloque: el tracker (propio del worker, o el del
+    # padre heredado con fork) lo daría por perdido o lo borraría antes de tiempo
+    registrar = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=nombre)
+    finally:
+        resource_tracker.register = registrar
+
+
+def escribir(descriptor: DescriptorBuffer, k: int, metricas: MetricasResumen) -> bool:
+    """Escribe la corrida en la fila k del bloque; False si no entra en el formato."""
+    if metricas.motivo_parada not in _MOTIVOS or len(metricas.metricas_semanales) > descriptor.n_semanas:
+        return False
+    adjunto = _ADJUNTOS.get(descriptor.nombre)
+    if adjunto is None:
+        for shm_anterior, _ in _ADJUNTOS.values():
+            shm_anterior.close()
+        _ADJUNTOS.clear()
+        shm = _adjuntar(descriptor.nombre)
+        adjunto = _ADJUNTOS[descriptor.nombre] = (shm, _vistas(shm, descriptor.capacidad, descriptor.n_semanas))
+    v = adjunto[1]
+    lectores = [(g, itemgetter(*claves)) for g, claves in estructura_semana()]
+    try:
+        filas = []
+        for ms in metricas.metricas_semanales:
+            fila: List[Any] = []
+            for g, leer in lectores:
+                hojas = leer(ms if g is None else ms[g])
+                if isinstance(hojas, tuple):
+                    fila.extend(hojas)
+                else:
+                    fila.append(hojas)
+            filas.append(fila)
+    except (KeyError, TypeError):
+        return False
+    escalares = [getattr(metricas, nombre) for nombre in _CAMPOS_ESCALARES]
+    v["escalares"][k] = [np.nan if x is None else float(x) for x in escalares]
+    if filas:
+        v["semanales"][k, :len(filas)] = filas
+    v["tipos"][k] = [_tipo(x) for x in escalares] + [_tipo(x) for x in (filas[0] if filas else [0.0] * _n_series())]
+    v["estado"][k] = (1, len(filas), _MOTIVOS.index(metricas.motivo_parada))
+    return True
+
+
+def ejecutar_en_buffer(trabajo: Tuple[Callable[[Any], MetricasResumen], Any, DescriptorBuffer, int]) -> Tuple[int, Any]:
+    """Worker: funcion(item) y escribe el resultado en la fila k; devuelve (k, None) o (k, métricas) si no entra."""
+    funcion, item, descriptor, k = trabajo
+    metricas = funcion(item)
+    return (k, None) if escribir(descriptor, k, metricas) else (k, metricas)
+
+
+class BufferResultados:
+    """Bloque de memoria compartida reutilizado para todos los lotes de un runner."""
+
+    def __init__(self, n_semanas: int, capacidad: int = BLOQUE_CORRIDAS):
+        self.capacidad = capacidad
+        self.n_semanas = n_semanas
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, _tamano(capacidad, n_semanas)))
+        self._vistas = _vistas(self._shm, capacidad, n_semanas)
+        self.descriptor = DescriptorBuffer(self._shm.name, capacidad, n_semanas)
+
+    def __enter__(self) -> "BufferResultados":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        self._vistas = {}
+        self._shm.close()
+        self._shm.unlink()
+
+    def leer(self, k: int) -> MetricasResumen:
+        """Reconstruye la MetricasResumen escrita en la fila k."""
+        v = self._vistas
+        _, n_semanas, motivo = (int(x) for x in v["estado"][k])
+        tipos = v["tipos"][k].tolist()
+        n_esc = len(_CAMPOS_ESCALARES)
+        escalares = {
+            nombre: _restaurar(x, t)
+            for nombre, x, t in zip(_CAMPOS_ESCALARES, v["escalares"][k].tolist(), tipos[:n_esc])
+        }
+        bloque = v["semanales"][k, :n_semanas].copy()
+        semanas = SemanasCompactas(bloque, tuple(tipos[n_esc:]))
+        return MetricasResumen(**escalares, motivo_parada=_MOTIVOS[motivo], metricas_semanales=semanas)
+
+    def mapear(
+        self,
+        pool: Any,
+        funcion: Callable[[Any], MetricasResumen],
+        items: Sequence[Any],
+        chunksize: Optional[int] = None,
+    ) -> List[MetricasResumen]:
+        """pool.map(funcion, items) con los resultados escritos en el bloque (de a 'capacidad' corridas)."""
+        salida: List[MetricasResumen] = []
+        for inicio in range(0, len(items), self.capacidad):
+            lote = items[inicio:inicio + self.capacidad]
+            self._vistas["estado"][:len(lote)] = 0
+            trabajos = [(funcion, item, self.descriptor, k) for k, item in enumerate(lote)]
+            devueltos = dict(pool.map(ejecutar_en_buffer, trabajos, chunksize=chunksize or 1))
+            salida.extend(
+                devueltos[k] if devueltos[k] is not None else self.leer(k) for k in range(len(lote))
+            )
+        return salida
+
+
+def mapear_en_buffer(
+    pool: Any,
+    funcion: Callable[[Any], MetricasResumen],
+    items: Sequence[Any],
+    T_FINAL: int,
+    chunksize: Optional[int] = None,
+) -> List[MetricasResumen]:
+    """
+    pool.map(funcion, items) para workers que devuelven MetricasResumen, con los resultados
+    por memoria compartida. Si no se puede reservar el bloque (p. ej. /dev/shm chico), por el pipe.
+    """
+    from . import config as cfg
+
+    if not items:
+        return []
+    try:
+        buffer = BufferResultados(T_FINAL // cfg.DIAS_POR_SEMANA, capacidad=min(len(items), BLOQUE_CORRIDAS))
+    except OSError:
+        return pool.map(funcion, items, chunksize=chunksize or 1)
+    with buffer:
+        return buffer.mapear(pool, funcion, items, chunksize=chunksize)
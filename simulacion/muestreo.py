@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Versiones por lote de los muestreadores de config.py sobre numpy.random.Generator.
+Cada función devuelve un array de n muestras con la misma distribución y la misma
+semántica de truncado / acotado que la versión escalar:
+- generar_inter_arribo: Exponencial(λ) acotada en max_minutos (λ <= 0 → max_minutos).
+- normal_truncada: Normal recortada (clamp) a [min_val, max_val], no re-muestreada;
+  normal_truncada_inversa / lognormal_acotada: los otros modelos de duración (cfg.MODELOS_DURACION).
+- binomial_negativa: fracasos antes de int(r) éxitos (r < 1 → 1), acotada en max_val.
+- poisson: λ <= 0 → 0; λ > 100 → aproximación normal redondeada (round-half-even, como round).
+- prob_efectiva_beta / dirichlet_3: parámetros con piso 0.01.
+Los parámetros de tasa / media aceptan arrays (broadcast contra n), para procesar
+días o trabajos en bloque.
+
+Las secuencias no coinciden con random (otro generador): la equivalencia es en
+distribución. verificar_conformidad() lo comprueba con Kolmogorov-Smirnov de dos
+muestras contra las funciones escalares (run_conformidad_muestreo.py).
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import numpy as np
+
+from . import config as cfg
+
+ArrayOFloat = Union[float, np.ndarray]
+
+
+def crear_generador(semilla: Optional[int] = None) -> np.random.Generator:
+    """Generator PCG64 (el de numpy.random.default_rng)."""
+    return np.random.default_rng(semilla)
+
+
+def generar_inter_arribo(
+    lambda_per_minuto: ArrayOFloat, n: int, rng: np.random.Generator, max_minutos: Optional[float] = None
+) -> np.ndarray:
+    """n tiempos hasta la próxima llegada (minutos), Exponencial(λ) acotada en max_minutos."""
+    if max_minutos is None:
+        max_minutos = cfg.INTER_ARRIBO_MAX_MINUTOS
+    lam = np.broadcast_to(np.asarray(lambda_per_minuto, dtype=np.float64), (n,))
+    x = rng.standard_exponential(n)
+    positiva = lam > 0
+    x[positiva] /= lam[positiva]
+    x[~positiva] = max_minutos
+    return np.minimum(x, max_minutos)
+
+
+def normal_truncada(
+    media: ArrayOFloat, std: ArrayOFloat, min_val: float, max_val: float, n: int, rng: np.random.Generator
+) -> np.ndarray:
+    """n muestras de Normal(media, std) recortadas a [min_val, max_val]."""
+    return np.clip(rng.normal(media, std, n), min_val, max_val)
+
+
+def normal_truncada_inversa(
+    media: float, std: float, min_val: float, max_val: float, n: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    n muestras de Normal(media, std) condicionada a [min_val, max_val] (misma distribución que
+    config.normal_truncada_inversa). Por rechazo: se re-muestrean solo las que caen afuera;
+    con las duraciones de config la aceptación es del 55-67 %.
+    """
+    salida = np.empty(n)
+    faltan = np.arange(n)
+    while faltan.size:
+        x = rng.normal(media, std, faltan.size)
+        dentro = (x >= min_val) & (x <= max_val)
+        salida[faltan[dentro]] = x[dentro]
+        faltan = faltan[~dentro]
+    return salida
+
+
+def lognormal_acotada(
+    media: float, std: float, min_val: float, max_val: float, n: int, rng: np.random.Generator
+) -> np.ndarray:
+    """n muestras lognormales con esa media y desvío, acotadas a [min_val, max_val]."""
+    mu, sigma = cfg.parametros_lognormal(media, std)
+    return np.clip(rng.lognormal(mu, sigma, n), min_val, max_val)
+
+
+def duracion_minutos(
+    media: float, std: float, min_val: float, max_val: float, n: int, rng: np.random.Generator,
+    modelo: Optional[str] = None,
+) -> np.ndarray:
+    """n duraciones APPS/IT según 'modelo' (default: cfg.MODELO_DURACION)."""
+    modelo = cfg.MODELO_DURACION if modelo is None else modelo
+    if modelo == cfg.MODELO_DURACION_TRUNCADA:
+        return normal_truncada_inversa(media, std, min_val, max_val, n, rng)
+    if modelo == cfg.MODELO_DURACION_LOGNORMAL:
+        return lognormal_acotada(media, std, min_val, max_val, n, rng)
+    return normal_truncada(media, std, min_val, max_val, n, rng)
+
+
+def binomial_negativa(r: float, p: float, n: int, rng: np.random.Generator, max_val: Optional[int] = None) -> np.ndarray:
+    """n conteos de fracasos antes de max(1, int(r)) éxitos, acotados en max_val (int64)."""
+    if max_val is None:
+        max_val = cfg.TRABAJOS_DIARIOS_MAX_ABS
+    return np.minimum(rng.negative_binomial(max(1, int(r)), p, n), max_val)
+
+
+def duracion_desarrollo_horas(n: int, rng: np.random.Generator) -> np.ndarray:
+    """n duraciones de Desarrollo en horas [DESARROLLO_HORAS_MIN, DESARROLLO_HORAS_MAX]."""
+    span = cfg.DESARROLLO_HORAS_MAX - cfg.DESARROLLO_HORAS_MIN
+    x = binomial_negativa(cfg.DESARROLLO_BINOMIAL_NEG_R, cfg.DESARROLLO_BINOMIAL_NEG_P, n, rng, max_val=int(span))
+    return cfg.DESARROLLO_HORAS_MIN + np.minimum(x, span)
+
+
+def binomial(ensayos: Union[int, np.ndarray], p: float, n: int, rng: np.random.Generator) -> np.ndarray:
+    """n muestras de Binomial(ensayos, p)."""
+    return rng.binomial(ensayos, p, n)
+
+
+def prob_efectiva_beta(media: ArrayOFloat, n: int, rng: np.random.Generator, concentracion: float = 10.0) -> np.ndarray:
+    """n probabilidades Beta con media 'media' (parámetros con piso 0.01)."""
+    media = np.asarray(media, dtype=np.float64)
+    alpha = np.maximum(0.01, media * concentracion)
+    beta = np.maximum(0.01, (1.0 - media) * concentracion)
+    return rng.beta(alpha, beta, n)
+
+
+def poisson(lam: ArrayOFloat, n: int, rng: np.random.Generator) -> np.ndarray:
+    """n muestras de Poisson(λ) (int64) con los mismos casos borde que config.poisson."""
+    lam = np.broadcast_to(np.asarray(lam, dtype=np.float64), (n,))
+    salida = np.zeros(n, dtype=np.int64)
+    exacta = (lam > 0) & (lam <= 100)
+    salida[exacta] = rng.poisson(lam[exacta])
+    grande = lam > 100
+    if grande.any():
+        x = rng.normal(lam[grande], np.sqrt(lam[grande]))
+        salida[grande] = np.maximum(0, np.rint(x)).astype(np.int64)
+    return salida
+
+
+def dirichlet_3(alpha1: float, alpha2: float, alpha3: float, n: int, rng: np.random.Generator) -> np.ndarray:
+    """n × 3 proporciones Dirichlet(alpha1, alpha2, alpha3) (cada fila suma 1)."""
+    g = rng.standard_gamma([max(0.01, alpha1), max(0.01, alpha2), max(0.01, alpha3)], (n, 3))
+    return g / g.sum(axis=1, keepdims=True)
+
+
+# --- Conformidad contra las versiones escalares ---
+
+# Valor crítico de KS de dos muestras: D > c(α)·sqrt((n+m)/(n·m)); c(0.001) = 1.949
+C_KS_ALFA_0001 = 1.949
+
+
+@dataclass
+class ResultadoConformidad:
+    """Comparación de una distribución: escalar (random) vs lote (numpy)."""
+    nombre: str
+    n: int
+    ks: float
+    ks_critico: float
+    media_escalar: float
+    media_lote: float
+    aprobado: bool
+
+
+def _ks_dos_muestras(a: np.ndarray, b: np.ndarray) -> float:
+    """Estadístico D de Kolmogorov-Smirnov de dos muestras (conservador para discretas)."""
+    a, b = np.sort(a), np.sort(b)
+    valores = np.concatenate([a, b])
+    fa = np.searchsorted(a, valores, side="right") / len(a)
+    fb = np.searchsorted(b, valores, side="right") / len(b)
+    return float(np.max(np.abs(fa - fb)))
+
+
+def _casos() -> List[tuple]:
+    """(nombre, muestra escalar, muestras por lote(n, rng)) con parámetros como los de la simulación."""
+    alfas = (cfg.DIRICHLET_ALPHA_APPS, cfg.DIRICHLET_ALPHA_IT, cfg.DIRICHLET_ALPHA_DEV)
+    r_asiduos = 7.3  # r_efectivo no entero, como en calcular_trabajos_asiduos
+    casos = [
+        ("inter_arribo(λ=0.05)", lambda: cfg.generar_inter_arribo(0.05),
+         lambda n, rng: generar_inter_arribo(0.05, n, rng)),
+        ("inter_arribo(λ=0.01, acotada)", lambda: cfg.generar_inter_arribo(0.01),
+         lambda n, rng: generar_inter_arribo(0.01, n, rng)),
+        ("normal_truncada(APPS)",
+         lambda: cfg.normal_truncada(cfg.DURACION_APPS_MEDIA, cfg.DURACION_APPS_STD, 0, cfg.DURACION_APPS_MAX_MINUTOS),
+         lambda n, rng: normal_truncada(cfg.DURACION_APPS_MEDIA, cfg.DURACION_APPS_STD, 0,
+                                        cfg.DURACION_APPS_MAX_MINUTOS, n, rng)),
+        ("normal_truncada(IT)",
+         lambda: cfg.normal_truncada(cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD, 0, cfg.DURACION_IT_MAX_MINUTOS),
+         lambda n, rng: normal_truncada(cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD, 0,
+                                        cfg.DURACION_IT_MAX_MINUTOS, n, rng)),
+        ("normal_truncada_inversa(APPS)",
+         lambda: cfg.normal_truncada_inversa(cfg.DURACION_APPS_MEDIA, cfg.DURACION_APPS_STD, 0,
+                                             cfg.DURACION_APPS_MAX_MINUTOS),
+         lambda n, rng: normal_truncada_inversa(cfg.DURACION_APPS_MEDIA, cfg.DURACION_APPS_STD, 0,
+                                                cfg.DURACION_APPS_MAX_MINUTOS, n, rng)),
+        ("normal_truncada_inversa(IT)",
+         lambda: cfg.normal_truncada_inversa(cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD, 0,
+                                             cfg.DURACION_IT_MAX_MINUTOS),
+         lambda n, rng: normal_truncada_inversa(cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD, 0,
+                                                cfg.DURACION_IT_MAX_MINUTOS, n, rng)),
+        ("lognormal_acotada(IT)",
+         lambda: cfg.lognormal_acotada(cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD, 0, cfg.DURACION_IT_MAX_MINUTOS),
+         lambda n, rng: lognormal_acotada(cfg.DURACION_IT_MEDIA, cfg.DURACION_IT_STD, 0,
+                                          cfg.DURACION_IT_MAX_MINUTOS, n, rng)),
+        ("duracion_desarrollo_horas", cfg.duracion_desarrollo_horas, duracion_desarrollo_horas),
+        ("binomial(20, 0.1)", lambda: cfg.binomial(20, 0.1), lambda n, rng: binomial(20, 0.1, n, rng)),
+        ("binomial_geometrica(300, 0.01)", lambda: cfg.binomial_geometrica(300, cfg.PROB_ROTACION_TECNICO_SEMANAL),
+         lambda n, rng: binomial(300, cfg.PROB_ROTACION_TECNICO_SEMANAL, n, rng)),
+        ("binomial_geometrica(40, 0.7)", lambda: cfg.binomial_geometrica(40, 0.7),
+         lambda n, rng: binomial(40, 0.7, n, rng)),
+        ("prob_efectiva_beta(0.05, 8)", lambda: cfg.prob_efectiva_beta(0.05, 8),
+         lambda n, rng: prob_efectiva_beta(0.05, n, rng, 8)),
+        ("prob_efectiva_beta(0.5, 10)", lambda: cfg.prob_efectiva_beta(0.5, 10),
+         lambda n, rng: prob_efectiva_beta(0.5, n, rng, 10)),
+        ("poisson(3.3)", lambda: cfg.poisson(3.3), lambda n, rng: poisson(3.3, n, rng)),
+        ("poisson(150, normal)", lambda: cfg.poisson(150), lambda n, rng: poisson(150, n, rng)),
+        ("binomial_negativa(r=7.3)", lambda: cfg.binomial_negativa(r_asiduos, cfg.TRABAJOS_BINOMIAL_NEG_P),
+         lambda n, rng: binomial_negativa(r_asiduos, cfg.TRABAJOS_BINOMIAL_NEG_P, n, rng)),
+        ("binomial_negativa(acotada en 20)", lambda: cfg.binomial_negativa(5, 0.2, max_val=20),
+         lambda n, rng: binomial_negativa(5, 0.2, n, rng, max_val=20)),
+    ]
+    for k, nombre in enumerate(("APPS", "IT", "DEV")):
+        casos.append((
+            f"dirichlet_3[{nombre}]",
+            lambda k=k: cfg.dirichlet_3(*alfas)[k],
+            lambda n, rng, k=k: dirichlet_3(*alfas, n, rng)[:, k],
+        ))
+    return casos
+
+
+def verificar_conformidad(n: int = 20000, semilla: int = 12345) -> List[ResultadoConformidad]:
+    """
+    Para cada muestreador: n muestras escalares (random.seed(semilla)) y n por lote
+    (crear_generador(semilla)); aprobado si D de KS no supera el valor crítico con α = 0.001.
+    Deja el estado de random como estaba.
+    """
+    estado_random = random.getstate()
+    random.seed(semilla)
+    rng = crear_generador(semilla)
+    critico = C_KS_ALFA_0001 * math.sqrt(2.0 / n)
+    resultados = []
+    try:
+        for nombre, escalar, lote in _casos():
+            a = np.array([escalar() for _ in range(n)], dtype=np.float64)
+            b = np.asarray(lote(n, rng), dtype=np.float64)
+            ks = _ks_dos_muestras(a, b)
+            resultados.append(ResultadoConformidad(
+                nombre=nombre, n=n, ks=ks, ks_critico=critico,
+                media_escalar=float(a.mean()), media_lote=float(b.mean()), aprobado=ks <= critico,
+            ))
+    finally:
+        random.setstate(estado_random)
+    return resultados
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+Optimización de la política (M, N, AB) con un modelo sustituto.
+Trata ejecutar_simulacion como caja negra ruidosa sobre:
+  M  ∈ [PRESUPUESTO_MKT_MIN, PRESUPUESTO_MKT_MAX] (continuo)
+  N  ∈ [n_min, n_max] (entero, días entre implementaciones)
+  AB ∈ [0, 1] (continuo)
+y busca el máximo de beneficio_final medio (o el mínimo de equilibrio_dia medio).
+
+Esquema (optimización bayesiana con réplicas agregadas):
+1. Diseño inicial por hipercubo latino con reps_iniciales réplicas por punto.
+2. Proceso gaussiano (Matérn 5/2, escalas por dimensión) ajustado a las medias,
+   con ruido por punto = varianza muestral / n (kriging estocástico).
+3. Próximo punto por mejora esperada (EI) sobre candidatos aleatorios y
+   perturbaciones del mejor; si cae sobre un punto ya evaluado se suman réplicas
+   a ese punto en lugar de abrir uno nuevo.
+4. Una fracción final del presupuesto confirma los mejores puntos.
+Las réplicas usan números aleatorios comunes (réplica r → semilla seed + r en
+todos los puntos), lo que reduce la varianza de las comparaciones.
+Solo requiere NumPy.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import config as cfg
+
+OBJETIVO_BENEFICIO = "beneficio"
+OBJETIVO_EQUILIBRIO = "equilibrio"
+
+N_MIN_DEFAULT = 7
+N_MAX_DEFAULT = 90
+
+
+@dataclass(frozen=True)
+class EspacioPolitica:
+    """Límites de la búsqueda; convierte entre (M, N, AB) y el cubo unitario."""
+    m_min: float = cfg.PRESUPUESTO_MKT_MIN
+    m_max: float = cfg.PRESUPUESTO_MKT_MAX
+    n_min: int = N_MIN_DEFAULT
+    n_max: int = N_MAX_DEFAULT
+    ab_min: float = 0.0
+    ab_max: float = 1.0
+
+    def desde_unitario(self, u: np.ndarray) -> Tuple[float, int, float]:
+        M = self.m_min + float(u[0]) * (self.m_max - self.m_min)
+        N = int(round(self.n_min + float(u[1]) * (self.n_max - self.n_min)))
+        AB = self.ab_min + float(u[2]) * (self.ab_max - self.ab_min)
+        return M, max(self.n_min, min(self.n_max, N)), AB
+
+    def a_unitario(self, M: float, N: int, AB: float) -> np.ndarray:
+        return np.array([
+            (M - self.m_min) / (self.m_max - self.m_min),
+            (N - self.n_min) / max(1, self.n_max - self.n_min),
+            (AB - self.ab_min) / (self.ab_max - self.ab_min) if self.ab_max > self.ab_min else 0.0,
+        ])
+
+    def ajustar(self, u: np.ndarray) -> np.ndarray:
+        """Lleva un punto del cubo a una política válida (N entero) y de vuelta al cubo."""
+        return self.a_unitario(*self.desde_unitario(np.clip(u, 0.0, 1.0)))
+
+
+@dataclass
+class PuntoEvaluado:
+    """Réplicas acumuladas de una política."""
+    M: float
+    N: int
+    AB: float
+    valores: List[float] = field(default_factory=list)  # objetivo en sentido "mayor es mejor"
+
+    @property
+    def n(self) -> int:
+        return len(self.valores)
+
+    @property
+    def media(self) -> float:
+        return float(np.mean(self.valores))
+
+    @property
+    def var_media(self) -> float:
+        """Varianza de la media muestral (s² / n)."""
+        if self.n < 2:
+            return float("nan")
+        return float(np.var(self.valores, ddof=1)) / self.n
+
+
+@dataclass
+class ResultadoOptimizacion:
+    objetivo: str
+    M: float
+    N: int
+    AB: float
+    media: float  # en unidades del objetivo (beneficio o día de equilibrio)
+    ic95: Tuple[float, float]
+    n_replicas: int
+    corridas_usadas: int
+    puntos: List[Dict[str, Any]]
+    historial: List[Dict[str, Any]]
+
+
+# --- Proceso gaussiano -------------------------------------------------------
+
+def _matern52(A: np.ndarray, B: np.ndarray, escalas: np.ndarray) -> np.ndarray:
+    d = (A[:, None, :] - B[None, :, :]) / escalas
+    r = np.sqrt(np.maximum((d ** 2).sum(axis=2), 0.0))
+    s5r = math.sqrt(5.0) * r
+    return (1.0 + s5r + 5.0 / 3.0 * r ** 2) * np.exp(-s5r)
+
+
+class ProcesoGaussiano:
+    """
+    GP con kernel Matérn 5/2 y ruido heterocedástico conocido por punto.
+    Las escalas y un ruido extra (pepita) se eligen por máxima verosimilitud
+    marginal entre candidatos aleatorios (sin optimizador externo).
+    """
+
+    def __init__(self, n_candidatos_hiper: int = 64, rng: Optional[np.random.Generator] = None):
+        self.n_candidatos_hiper = n_candidatos_hiper
+        self.rng = rng if rng is not None else np.random.default_rng(0)
+
+    def ajustar(self, X: np.ndarray, y: np.ndarray, var_ruido: np.ndarray) -> "ProcesoGaussiano":
+        self.X = X
+        self.y_media = float(np.mean(y))
+        self.y_escala = float(np.std(y)) or 1.0
+        self.y = (y - self.y_media) / self.y_escala
+        self.ruido = np.nan_to_num(var_ruido / self.y_escala ** 2, nan=np.nanmax(
+            np.append(var_ruido / self.y_escala ** 2, 1e-2)))
+        mejor = None
+        for escalas, pepita in self._candidatos_hiper(X.shape[1]):
+            lml = self._log_verosimilitud(escalas, pepita)
+            if lml is not None and (mejor is None or lml > mejor[0]):
+                mejor = (lml, escalas, pepita)
+        if mejor is None:
+            # Ningún candidato factorizó: reusar los hiperparámetros del ajuste anterior si siguen sirviendo
+            previos = getattr(self, "escalas", None), getattr(self, "pepita", None)
+            if previos[0] is None or self._log_verosimilitud(*previos) is None:
+                raise np.linalg.LinAlgError(
+                    "ProcesoGaussiano.ajustar: la matriz de covarianza no es definida positiva "
+                    "con ningún candidato de escalas y pepita"
+                )
+            mejor = (None,) + previos
+        _, self.escalas, self.pepita = mejor
+        K = _matern52(X, X, self.escalas) + np.diag(self.ruido + self.pepita + 1e-8)
+        self._L = np.linalg.cholesky(K)
+        self._alpha = np.linalg.solve(self._L.T, np.linalg.solve(self._L, self.y))
+        return self
+
+    def _candidatos_hiper(self, d: int):
+        yield np.full(d, 0.3), 1e-4
+        for _ in range(self.n_candidatos_hiper):
+            escalas = np.exp(self.rng.uniform(math.log(0.05), math.log(2.0), size=d))
+            pepita = float(np.exp(self.rng.uniform(math.log(1e-6), math.log(0.3))))
+            yield escalas, pepita
+
+    def _log_verosimilitud(self, escalas: np.ndarray, pepita: float) -> Optional[float]:
+        K = _matern52(self.X, self.X, escalas) + np.diag(self.ruido + pepita + 1e-8)
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return None
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, self.y))
+        return float(-0.5 * self.y @ alpha - np.log(np.diag(L)).sum())
+
+    def predecir(self, Xs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Media y desvío posteriores (en unidades originales de y)."""
+        Ks = _matern52(Xs, self.X, self.escalas)
+        mu = Ks @ self._alpha
+        v = np.linalg.solve(self._L, Ks.T)
+        var = np.maximum(1.0 - (v ** 2).sum(axis=0), 1e-12)
+        return mu * self.y_escala + self.y_media, np.sqrt(var) * self.y_escala
+
+
+_erf = np.vectorize(math.erf)
+
+
+def mejora_esperada(mu: np.ndarray, sigma: np.ndarray, mejor: float, xi: float = 0.0) -> np.ndarray:
+    """EI para maximización."""
+    z = (mu - mejor - xi) / sigma
+    cdf = 0.5 * (1.0 + _erf(z / math.sqrt(2.0)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2.0 * math.pi)
+    return (mu - mejor - xi) * cdf + sigma * pdf
+
+
+def hipercubo_latino(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    """n puntos en [0,1]^d, uno por estrato en cada dimensión."""
+    u = (rng.random((n, d)) + np.arange(n)[:, None]) / n
+    for j in range(d):
+        u[:, j] = u[rng.permutation(n), j]
+    return u
+
+
+# --- Evaluación de políticas ------------------------------------------------
+
+def _replica(args) -> Tuple[float, Optional[int]]:
+    """Worker: una corrida con semilla fija. Devuelve (beneficio_final, equilibrio_dia)."""
+    M, N, AB, T_FINAL, semilla, parar_en_equilibrio = args
+    import random
+    from .principal import ejecutar_simulacion
+    from .parada import PararTrasEquilibrio
+
+    random.seed(semilla)
+    est = ejecutar_simulacion(
+        T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=AB, verbose=False,
+        criterios_parada=[PararTrasEquilibrio(0)] if parar_en_equilibrio else None,
+    )
+    serie = est.beneficio_acumulado_por_dia
+    return (serie[-1] if serie else 0.0), est.T_EQUILIBRIO
+
+
+class Optimizador:
+    """Bucle de optimización bayesiana sobre (M, N, AB) con presupuesto de corridas."""
+
+    def __init__(
+        self,
+        T_FINAL: int,
+        objetivo: str = OBJETIVO_BENEFICIO,
+        espacio: EspacioPolitica = EspacioPolitica(),
+        presupuesto: int = 400,
+        puntos_iniciales: int = 10,
+        reps_iniciales: int = 8,
+        reps_incremento: int = 8,
+        fraccion_confirmacion: float = 0.2,
+        seed: int = 42,
+        workers: int = 1,
+        n_candidatos: int = 2048,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        if objetivo not in (OBJETIVO_BENEFICIO, OBJETIVO_EQUILIBRIO):
+            raise ValueError(f"objetivo debe ser '{OBJETIVO_BENEFICIO}' o '{OBJETIVO_EQUILIBRIO}'")
+        self.T_FINAL = T_FINAL
+        self.objetivo = objetivo
+        self.espacio = espacio
+        self.presupuesto = presupuesto
+        self.puntos_iniciales = puntos_iniciales
+        self.reps_iniciales = max(2, reps_iniciales)
+        self.reps_incremento = max(1, reps_incremento)
+        self.fraccion_confirmacion = fraccion_confirmacion
+        self.seed = seed
+        self.workers = max(1, workers)
+        self.n_candidatos = n_candidatos
+        self.callback = callback
+        self.rng = np.random.default_rng(seed)
+        self.puntos: List[PuntoEvaluado] = []
+        self.historial: List[Dict[str, Any]] = []
+        self.corridas = 0
+        self._pool = None
+        self._gp = ProcesoGaussiano(rng=self.rng)  # reusado: conserva los últimos hiperparámetros válidos
+
+    # --- evaluación ---
+
+    def _valor(self, beneficio: float, equilibrio: Optional[int]) -> float:
+        """Objetivo en sentido 'mayor es mejor' (sin equilibrio cuenta como T_FINAL + 1)."""
+        if self.objetivo == OBJETIVO_BENEFICIO:
+            return beneficio
+        return -float(equilibrio if equilibrio is not None else self.T_FINAL + 1)
+
+    def _evaluar(self, punto: PuntoEvaluado, n_reps: int) -> None:
+        n_reps = min(n_reps, self.presupuesto - self.corridas)
+        if n_reps <= 0:
+            return
+        parar = self.objetivo == OBJETIVO_EQUILIBRIO
+        args = [
+            (punto.M, punto.N, punto.AB, self.T_FINAL, self.seed + r, parar)
+            for r in range(punto.n, punto.n + n_reps)
+        ]
+        if self._pool is not None:
+            salidas = self._pool.map(_replica, args)
+        else:
+            salidas = [_replica(a) for a in args]
+        punto.valores.extend(self._valor(b, e) for b, e in salidas)
+        self.corridas += n_reps
+
+    def _punto_en(self, u: np.ndarray) -> Tuple[PuntoEvaluado, bool]:
+        """Punto existente a distancia < tolerancia de u (True) o uno nuevo (False)."""
+        M, N, AB = self.espacio.desde_unitario(u)
+        for p in self.puntos:
+            if np.linalg.norm(self.espacio.a_unitario(p.M, p.N, p.AB) - self.espacio.a_unitario(M, N, AB)) < 0.02:
+                return p, True
+        return PuntoEvaluado(M=M, N=N, AB=AB), False
+
+    # --- modelo ---
+
+    def _ajustar_modelo(self) -> ProcesoGaussiano:
+        X = np.array([self.espacio.a_unitario(p.M, p.N, p.AB) for p in self.puntos])
+        y = np.array([p.media for p in self.puntos])
+        var = np.array([p.var_media for p in self.puntos])
+        return self._gp.ajustar(X, y, var)
+
+    def _candidatos(self, incumbente: np.ndarray) -> np.ndarray:
+        n_local = self.n_candidatos // 8
+        globales = self.rng.random((self.n_candidatos - n_local, 3))
+        locales = incumbente + self.rng.normal(0.0, 0.05, size=(n_local, 3))
+        return np.array([self.espacio.ajustar(u) for u in np.vstack([globales, locales])])
+
+    def _incumbente(self, gp: ProcesoGaussiano) -> int:
+        X = np.array([self.espacio.a_unitario(p.M, p.N, p.AB) for p in self.puntos])
+        mu, _ = gp.predecir(X)
+        return int(np.argmax(mu))
+
+    def _registrar(self, fase: str, punto: PuntoEvaluado, **extra: Any) -> None:
+        fila = {
+            "fase": fase, "M": punto.M, "N": punto.N, "AB": punto.AB,
+            "n": punto.n, "media": self._a_objetivo(punto.media), "corridas": self.corridas, **extra,
+        }
+        self.historial.append(fila)
+        if self.callback:
+            self.callback(fila)
+
+    def _a_objetivo(self, valor: float) -> float:
+        return valor if self.objetivo == OBJETIVO_BENEFICIO else -valor
+
+    # --- bucle principal ---
+
+    def ejecutar(self) -> ResultadoOptimizacion:
+        if self.workers > 1:
+            from multiprocessing import Pool
+            self._pool = Pool(self.workers)
+        try:
+            return self._ejecutar()
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def _ejecutar(self) -> ResultadoOptimizacion:
+        # 1. Diseño inicial
+        for u in hipercubo_latino(self.puntos_iniciales, 3, self.rng):
+            if self.corridas + self.reps_iniciales > self.presupuesto:
+                break
+            punto, existente = self._punto_en(u)
+            if not existente:
+                self.puntos.append(punto)
+            self._evaluar(punto, self.reps_iniciales)
+            self._registrar("inicial", punto)
+
+        # 2. Búsqueda por mejora esperada
+        reserva = int(self.presupuesto * self.fraccion_confirmacion)
+        while self.corridas + self.reps_iniciales <= self.presupuesto - reserva and len(self.puntos) >= 2:
+            gp = self._ajustar_modelo()
+            inc = self._incumbente(gp)
+            u_inc = self.espacio.a_unitario(self.puntos[inc].M, self.puntos[inc].N, self.puntos[inc].AB)
+            mu_inc, _ = gp.predecir(u_inc[None, :])
+            cand = self._candidatos(u_inc)
+            mu, sigma = gp.predecir(cand)
+            ei = mejora_esperada(mu, sigma, float(mu_inc[0]))
+            k = int(np.argmax(ei))
+            punto, existente = self._punto_en(cand[k])
+            if existente:
+                self._evaluar(punto, self.reps_incremento)
+            else:
+                self.puntos.append(punto)
+                self._evaluar(punto, self.reps_iniciales)
+            self._registrar("ei", punto, ei=float(ei[k]), replica=existente)
+
+        # 3. Confirmación: réplicas extra a los mejores según el modelo
+        if len(self.puntos) >= 2:
+            gp = self._ajustar_modelo()
+            X = np.array([self.espacio.a_unitario(p.M, p.N, p.AB) for p in self.puntos])
+            mu, _ = gp.predecir(X)
+            top = [self.puntos[i] for i in np.argsort(-mu)[:3]]
+            while self.corridas < self.presupuesto:
+                antes = self.corridas
+                for p in top:
+                    self._evaluar(p, self.reps_incremento)
+                    self._registrar("confirmacion", p)
+                if self.corridas == antes:
+                    break
+
+        return self._resultado()
+
+    def _resultado(self) -> ResultadoOptimizacion:
+        # Mejor: mayor media entre los puntos con más réplicas (al menos reps_iniciales)
+        candidatos = [p for p in self.puntos if p.n >= self.reps_iniciales] or self.puntos
+        mejor = max(candidatos, key=lambda p: p.media)
+        se = math.sqrt(mejor.var_media) if mejor.n > 1 else 0.0
+        media = self._a_objetivo(mejor.media)
+        ic = (media - 1.96 * se, media + 1.96 * se)
+        puntos = sorted(
+            ({"M": p.M, "N": p.N, "AB": p.AB, "n": p.n, "media": self._a_objetivo(p.media),
+              "error_estandar": math.sqrt(p.var_media) if p.n > 1 else None} for p in self.puntos),
+            key=lambda d: d["media"], reverse=self.objetivo == OBJETIVO_BENEFICIO,
+        )
+        return ResultadoOptimizacion(
+            objetivo=self.objetivo, M=mejor.M, N=mejor.N, AB=mejor.AB,
+            media=media, ic95=ic, n_replicas=mejor.n, corridas_usadas=self.corridas,
+            puntos=puntos, historial=self.historial,
+        )
+
+
+def optimizar_politica(T_FINAL: int, objetivo: str = OBJETIVO_BENEFICIO, **kwargs: Any) -> ResultadoOptimizacion:
+    """Atajo: Optimizador(T_FINAL, objetivo, **kwargs).ejecutar()."""
+    return Optimizador(T_FINAL, objetivo=objetivo, **kwargs).ejecutar()
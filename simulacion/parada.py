@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Criterios de parada anticipada para ejecutar_simulacion.
+Cada criterio es un objeto invocable criterio(est) -> bool evaluado al cierre
+de cada día; si devuelve True la corrida termina antes de T_FINAL y queda
+marcada como truncada (est.TRUNCADA, est.MOTIVO_PARADA).
+Son dataclasses (no closures) para poder enviarlos a workers de multiprocessing.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .estado import EstadoSimulacion
+
+MOTIVO_EQUILIBRIO = "equilibrio"
+MOTIVO_RUINA = "ruina"
+MOTIVO_SIN_CLIENTES = "sin_clientes"
+
+
+@dataclass(frozen=True)
+class PararTrasEquilibrio:
+    """Para margen_dias después de alcanzar T_EQUILIBRIO."""
+    margen_dias: int = 0
+    motivo: str = MOTIVO_EQUILIBRIO
+
+    def __call__(self, est: "EstadoSimulacion") -> bool:
+        return est.T_EQUILIBRIO is not None and est.T >= est.T_EQUILIBRIO + self.margen_dias
+
+
+@dataclass(frozen=True)
+class PararPorRuina:
+    """Para cuando la pérdida acumulada supera umbral_perdida (créditos, valor positivo)."""
+    umbral_perdida: float
+    motivo: str = MOTIVO_RUINA
+
+    def __call__(self, est: "EstadoSimulacion") -> bool:
+        serie = est.beneficio_acumulado_por_dia
+        return bool(serie) and serie[-1] <= -self.umbral_perdida
+
+
+@dataclass(frozen=True)
+class PararSinClientes:
+    """Para cuando no quedan clientes con paquete (suscripciones + prepagos == 0)."""
+    motivo: str = MOTIVO_SIN_CLIENTES
+
+    def __call__(self, est: "EstadoSimulacion") -> bool:
+        return est.Suscripciones_Totales + est.Prepagos_Totales <= 0
+
+
+def construir_criterios(
+    margen_equilibrio: Optional[int] = None,
+    umbral_ruina: Optional[float] = None,
+    sin_clientes: bool = False,
+) -> List:
+    """Lista de criterios a partir de opciones de CLI (None / False = desactivado)."""
+    criterios: List = []
+    if margen_equilibrio is not None:
+        criterios.append(PararTrasEquilibrio(margen_dias=max(0, margen_equilibrio)))
+    if umbral_ruina is not None:
+        criterios.append(PararPorRuina(umbral_perdida=abs(umbral_ruina)))
+    if sin_clientes:
+        criterios.append(PararSinClientes())
+    return criterios
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Post-proceso vectorizado de beneficio_acumulado_por_dia.
+Cada función acepta una serie (1-D, una corrida) o una matriz runs × días (2-D)
+y resuelve todas las corridas en una sola pasada NumPy. Días no simulados
+(corridas truncadas) se representan con NaN y se ignoran.
+
+Convenciones (iguales a principal.py):
+- Día d es 1-indexado; acum[d - 1] es el beneficio acumulado al cierre del día d.
+- Ventana de w días que termina en el día d: acum[d-1] - acum[d-w-1] (0 si d == w).
+- Equilibrio: primer día con beneficio acumulado > 0.
+"""
+
+from typing import Any, Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import config as cfg
+
+Serie = Union[Sequence[float], np.ndarray]
+
+
+def _como_matriz(acum: Serie) -> Tuple[np.ndarray, bool]:
+    """Devuelve (matriz float64 runs × días, era_1d)."""
+    arr = np.asarray(acum, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[np.newaxis, :], True
+    if arr.ndim != 2:
+        raise ValueError(f"Se espera una serie 1-D o una matriz 2-D, no {arr.ndim}-D")
+    return arr, False
+
+
+def _salida(valores: np.ndarray, era_1d: bool, entero: bool = False) -> Any:
+    """Escalar Python (None si NaN) para entrada 1-D; array para 2-D."""
+    if not era_1d:
+        return valores
+    v = float(valores[0])
+    if np.isnan(v):
+        return None
+    return int(v) if entero else v
+
+
+def ventanas_moviles(acum: Serie, ventana: int = cfg.DIAS_TRIMESTRE) -> np.ndarray:
+    """
+    Beneficio de cada ventana de 'ventana' días: matriz runs × (días - ventana + 1).
+    La columna k corresponde a la ventana que termina en el día k + ventana.
+    """
+    mat, _ = _como_matriz(acum)
+    if ventana < 1:
+        raise ValueError("ventana debe ser >= 1")
+    previo = np.concatenate([np.zeros((mat.shape[0], 1)), mat], axis=1)
+    if previo.shape[1] <= ventana:
+        return np.empty((mat.shape[0], 0))
+    return previo[:, ventana:] - previo[:, :-ventana]
+
+
+def _ventana_extrema(acum: Serie, ventana: int, mejor: bool) -> Dict[str, Any]:
+    mat, era_1d = _como_matriz(acum)
+    difs = ventanas_moviles(mat, ventana)
+    n = mat.shape[0]
+    if difs.shape[1] == 0:
+        vacio = np.full(n, np.nan)
+        return {"inicio": _salida(vacio, era_1d), "fin": _salida(vacio, era_1d), "beneficio": _salida(vacio, era_1d)}
+    validas = ~np.isnan(difs)
+    alguna = validas.any(axis=1)
+    if mejor:
+        idx = np.where(validas, difs, -np.inf).argmax(axis=1)
+    else:
+        idx = np.where(validas, difs, np.inf).argmin(axis=1)
+    fin = (idx + ventana).astype(np.float64)
+    inicio = fin - ventana + 1
+    beneficio = difs[np.arange(n), idx]
+    return {
+        "inicio": _salida(np.where(alguna, inicio, np.nan), era_1d, entero=True),
+        "fin": _salida(np.where(alguna, fin, np.nan), era_1d, entero=True),
+        "beneficio": _salida(np.where(alguna, beneficio, np.nan), era_1d),
+    }
+
+
+def mejor_ventana(acum: Serie, ventana: int = cfg.DIAS_TRIMESTRE) -> Dict[str, Any]:
+    """Ventana de mayor beneficio (primer máximo en caso de empate): inicio, fin, beneficio."""
+    return _ventana_extrema(acum, ventana, mejor=True)
+
+
+def peor_ventana(acum: Serie, ventana: int = cfg.DIAS_TRIMESTRE) -> Dict[str, Any]:
+    """Ventana de menor beneficio (primer mínimo en caso de empate): inicio, fin, beneficio."""
+    return _ventana_extrema(acum, ventana, mejor=False)
+
+
+def dia_equilibrio(acum: Serie) -> Any:
+    """Primer día (1-indexado) con beneficio acumulado > 0; None / NaN si no se alcanza."""
+    mat, era_1d = _como_matriz(acum)
+    if mat.shape[1] == 0:
+        return _salida(np.full(mat.shape[0], np.nan), era_1d)
+    positivo = mat > 0
+    dia = np.where(positivo.any(axis=1), positivo.argmax(axis=1) + 1.0, np.nan)
+    return _salida(dia, era_1d, entero=True)
+
+
+def drawdown_maximo(acum: Serie) -> Any:
+    """Mayor caída desde un pico previo del beneficio acumulado (pico inicial = 0). Siempre >= 0."""
+    mat, era_1d = _como_matriz(acum)
+    if mat.shape[1] == 0:
+        return _salida(np.full(mat.shape[0], np.nan), era_1d)
+    sin_nan = np.where(np.isnan(mat), -np.inf, mat)
+    picos = np.maximum(np.maximum.accumulate(sin_nan, axis=1), 0.0)
+    caidas = np.where(np.isnan(mat), 0.0, picos - mat)
+    return _salida(caidas.max(axis=1), era_1d)
+
+
+def racha_perdidas_mas_larga(acum: Serie) -> Any:
+    """Racha más larga de días consecutivos con resultado diario negativo."""
+    mat, era_1d = _como_matriz(acum)
+    if mat.shape[1] == 0:
+        return _salida(np.zeros(mat.shape[0]), era_1d, entero=True)
+    previo = np.concatenate([np.zeros((mat.shape[0], 1)), mat], axis=1)
+    perdida = np.diff(previo, axis=1) < 0  # NaN → False
+    conteo = np.cumsum(perdida, axis=1)
+    reinicio = np.maximum.accumulate(np.where(perdida, 0, conteo), axis=1)
+    return _salida((conteo - reinicio).max(axis=1).astype(np.float64), era_1d, entero=True)
+
+
+def resumen_serie(acum: Serie, ventana: int = cfg.DIAS_TRIMESTRE) -> Dict[str, Any]:
+    """Todas las métricas derivadas de la serie en un diccionario."""
+    mejor = mejor_ventana(acum, ventana)
+    peor = peor_ventana(acum, ventana)
+    return {
+        "equilibrio_dia": dia_equilibrio(acum),
+        "mejor_ventana_inicio": mejor["inicio"],
+        "mejor_ventana_fin": mejor["fin"],
+        "mejor_ventana_beneficio": mejor["beneficio"],
+        "peor_ventana_inicio": peor["inicio"],
+        "peor_ventana_fin": peor["fin"],
+        "peor_ventana_beneficio": peor["beneficio"],
+        "drawdown_maximo": drawdown_maximo(acum),
+        "racha_perdidas_max_dias": racha_perdidas_mas_larga(acum),
+    }
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Reutilización de corridas que solo difieren en T_FINAL.
+Con la misma semilla y los mismos N, M y AB, una corrida a 5 años es un
+prefijo exacto de la corrida a 10 años (T_FINAL solo decide cuándo termina
+el bucle). Un RegistroPrefijo guarda de una corrida:
+- por día, los contadores que usa extraer_metricas (COLUMNAS y los de eventos), y
+- la instantánea del final del horizonte (estado + estado de random).
+Con eso:
+- un horizonte más corto se responde truncando series, semanas y contadores
+  (mismas métricas que si se hubiera simulado con ese T_FINAL);
+- un horizonte más largo se reanuda desde la instantánea en lugar de
+  empezar de cero.
+
+Los registros se guardan en DIRECTORIO_MEMO/prefijos.sqlite (mismo
+almacenamiento y límite de tamaño que memo), con clave (código, N, M, AB, semilla), sin T_FINAL.
+Solo aplica a corridas sin criterios de parada. Como los runners toman la
+semilla de semilla_configuracion(seed, N, M, AB), los registros de un script
+(ej. casos relevantes a 5-6 años) sirven a otro (benchmark completo a 10 años).
+
+Uso:
+  memo = MemoCorridas(archivo=ARCHIVO_PREFIJOS)
+  base = semilla_configuracion(seed, N, M, ab)
+  metricas = con_prefijos(memo, [(T, N, M, ab, base + j) for j in range(n)], mapear)
+  # mapear(simular_registro, trabajos) -> [RegistroPrefijo] (en serie o en un Pool)
+"""
+
+import copy
+import hashlib
+import pickle
+import random
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .memo import MemoCorridas, VERSION_MEMO, _sin_tiempo, huella_codigo
+
+ARCHIVO_PREFIJOS = "prefijos.sqlite"
+
+# Atributos del estado que extraer_metricas lee como "valor al final" (uno por día en el registro)
+COLUMNAS = (
+    "BENEFICIO_NETO_TRABAJOS",
+    "BENEFICIO_NETO_PREPAGO",
+    "BENEFICIO_NETO_SUSCRIPCION",
+    "COSTOS_DESARROLLO",
+    "COSTO_MKT",
+    "Suscripciones_Totales",
+    "Prepagos_Totales",
+    "PE_Trabajo_Aislado",
+    "Tecnicos_Dev",
+    "Tecnicos_AppsIT",
+    "SEGUNDOS_SIMULACION",
+)
+# Contadores de eventos (EstadoSimulacion.eventos): una tupla por día en columnas[COLUMNA_EVENTOS]
+COLUMNA_EVENTOS = "eventos"
+
+# (T_FINAL, N, M, prob_suscripcion, semilla)
+Tarea = Tuple[int, int, float, float, int]
+
+
+@dataclass
+class RegistroPrefijo:
+    """Corrida simulada hasta el día T con contadores diarios e instantánea final."""
+    N: int
+    M: float
+    prob_suscripcion: float
+    T: int
+    columnas: Dict[str, List[Any]]
+    instantanea: bytes  # zlib(pickle((EstadoSimulacion, random.getstate())))
+    beneficio_final: float = 0.0  # beneficio acumulado al día T (para el progreso, sin descomprimir)
+
+    def estado_final(self) -> Tuple[Any, Any]:
+        """(EstadoSimulacion al día T, estado de random) — copia nueva en cada llamada."""
+        return pickle.loads(zlib.decompress(self.instantanea))
+
+    def metricas(self, T_FINAL: int) -> Any:
+        """MetricasResumen de la corrida con horizonte T_FINAL <= T."""
+        from .benchmark import extraer_metricas
+        from .estado import MejorTrimestre
+        from .principal import actualizar_mejor_trimestre
+
+        if T_FINAL > self.T:
+            raise ValueError(f"El registro llega al día {self.T}; no responde T_FINAL={T_FINAL}")
+        est, _ = self.estado_final()
+        if T_FINAL == self.T:
+            return extraer_metricas(est)
+        vista = copy.copy(est)
+        vista.T = vista.T_FINAL = T_FINAL
+        for nombre in COLUMNAS:
+            setattr(vista, nombre, self.columnas[nombre][T_FINAL - 1])
+        vista.eventos = list(self.columnas[COLUMNA_EVENTOS][T_FINAL - 1])
+        vista.beneficio_acumulado_por_dia = est.beneficio_acumulado_por_dia[:T_FINAL]
+        vista.metricas_semanales = [m for m in est.metricas_semanales if m["dia"] <= T_FINAL]
+        vista.T_EQUILIBRIO = est.T_EQUILIBRIO if est.T_EQUILIBRIO is not None and est.T_EQUILIBRIO <= T_FINAL else None
+        vista.MEJOR_TRIMESTRE = MejorTrimestre()
+        actualizar_mejor_trimestre(vista)
+        return extraer_metricas(vista)
+
+
+def clave_prefijo(N: int, M: float, prob_suscripcion: float, semilla: int) -> str:
+    """Clave de la familia de corridas que solo difieren en T_FINAL."""
+    parametros = repr(("prefijo", VERSION_MEMO, int(N), float(M), float(prob_suscripcion), int(semilla)))
+    return hashlib.sha256(f"{huella_codigo()}|{parametros}".encode("utf-8")).hexdigest()
+
+
+def simular_registro(trabajo: Tuple[Tarea, Optional[RegistroPrefijo]]) -> RegistroPrefijo:
+    """
+    Worker: ((T_FINAL, N, M, AB, semilla), previo) -> RegistroPrefijo hasta T_FINAL.
+    Si previo llega más lejos se devuelve tal cual; si llega menos, se reanuda desde su instantánea.
+    """
+    (T_FINAL, N, M, prob, semilla), previo = trabajo
+    from .principal import iterar_simulacion, GRANULARIDAD_DIA
+
+    if previo is not None and previo.T >= T_FINAL:
+        return previo
+    if previo is not None:
+        est, estado_random = previo.estado_final()
+        random.setstate(estado_random)
+        columnas = {nombre: list(previo.columnas[nombre]) for nombre in COLUMNAS + (COLUMNA_EVENTOS,)}
+    else:
+        random.seed(semilla)
+        est = None
+        columnas = {nombre: [] for nombre in COLUMNAS + (COLUMNA_EVENTOS,)}
+
+    inst = None
+    for inst in iterar_simulacion(T_FINAL, N, M, prob, granularidad=GRANULARIDAD_DIA, estado=est):
+        for nombre in COLUMNAS:
+            columnas[nombre].append(getattr(inst.estado, nombre))
+        columnas[COLUMNA_EVENTOS].append(tuple(inst.estado.eventos))
+    est = inst.estado if inst is not None else est
+    return RegistroPrefijo(
+        N=N, M=M, prob_suscripcion=prob, T=est.T, columnas=columnas,
+        instantanea=zlib.compress(pickle.dumps((est, random.getstate()), protocol=4), 6),
+        beneficio_final=est.beneficio_acumulado_por_dia[-1] if est.beneficio_acumulado_por_dia else 0.0,
+    )
+
+
+def con_prefijos(
+    memo: MemoCorridas,
+    tareas: Sequence[Tarea],
+    mapear: Callable[[Callable[..., Any], List[Any]], List[Any]],
+) -> List[Any]:
+    """
+    MetricasResumen de cada tarea, en orden. Las que tienen un registro guardado
+    que llega a su T_FINAL se responden truncando; el resto se simula con
+    mapear(simular_registro, trabajos) — reanudando si hay un registro más corto —
+    y los registros resultantes se guardan. Solo las simuladas desde el día 0 en
+    esta llamada conservan segundos_simulacion (las demás lo tienen en None).
+    """
+    claves = [clave_prefijo(N, M, prob, semilla) for (_, N, M, prob, semilla) in tareas]
+    registros = memo.obtener(claves)
+    pendientes = [
+        i for i, (t, c) in enumerate(zip(tareas, claves))
+        if c not in registros or registros[c].T < t[0]
+    ]
+    desde_cero = {i for i in pendientes if claves[i] not in registros}
+    nuevos = mapear(simular_registro, [(tareas[i], registros.get(claves[i])) for i in pendientes])
+    memo.guardar({claves[i]: r for i, r in zip(pendientes, nuevos)})
+    registros.update({claves[i]: r for i, r in zip(pendientes, nuevos)})
+    metricas = [registros[c].metricas(t[0]) for t, c in zip(tareas, claves)]
+    return [m if i in desde_cero else _sin_tiempo(m) for i, m in enumerate(metricas)]
@@ -5,14 +5,25 @@ implementaciones, calendarización, procesos mensuales, equilibrio y mejor trime
 Basado en: Algoritmo Principal - Simulación Plataforma Técnica.md
 """
 
+import heapq
 import math
 import random
-from typing import Dict, Any
+import time
+from typing import Any, Callable, Dict, Generator, Optional, Sequence
 
 from . import config as cfg
-from .estado import EstadoSimulacion, MejorTrimestre
+from .estado import (
+    EstadoSimulacion, Instantanea, MejorTrimestre,
+    EV_BAJAS_TECNICOS, EV_NO_RENOVACIONES_SUSCRIPCION, EV_TECNICOS_INCORPORADOS,
+)
 from . import llegada
 
+GRANULARIDAD_DIA = "dia"
+GRANULARIDAD_SEMANA = "semana"
+MODO_DETALLADO = "detallado"  # llegada por llegada (este módulo)
+MODO_AGREGADO = "agregado"  # conteos diarios (simulacion.agregado)
+MODOS = (MODO_DETALLADO, MODO_AGREGADO)
+
 
 def calcular_trabajos_asiduos(est: EstadoSimulacion) -> int:
     """Trabajos del día de clientes asiduos (media proporcional a asiduos)."""
@@ -64,9 +75,22 @@ def calcular_ajuste_calendarizacion(est: EstadoSimulacion) -> None:
 
 
 def reiniciar_tps_dia(est: EstadoSimulacion) -> None:
-    """Al inicio de cada día, reinicia TPS[] (todos los técnicos libres)."""
-    est.TPS_Dev = [cfg.HIGH_VALUE] * est.Tecnicos_Dev
-    est.TPS_AppsIT = [cfg.HIGH_VALUE] * est.Tecnicos_AppsIT
+    """Al inicio de cada día, reinicia TPS[] (todos los técnicos libres), sobre las mismas listas."""
+    est.TPS_Dev[:] = [cfg.HIGH_VALUE] * est.Tecnicos_Dev
+    est.TPS_AppsIT[:] = [cfg.HIGH_VALUE] * est.Tecnicos_AppsIT
+
+
+def redimensionar_tps(est: EstadoSimulacion) -> None:
+    """
+    Lleva TPS[] a Tecnicos_Dev / Tecnicos_AppsIT en el lugar: los nuevos entran libres
+    (HIGH_VALUE) y las bajas salen del final. Los demás conservan su TPS.
+    """
+    for tps, n in ((est.TPS_Dev, est.Tecnicos_Dev), (est.TPS_AppsIT, est.Tecnicos_AppsIT)):
+        faltan = n - len(tps)
+        if faltan > 0:
+            tps.extend([cfg.HIGH_VALUE] * faltan)
+        elif faltan < 0:
+            del tps[n:]
 
 
 def actualizar_proporciones_tipo_trabajo(est: EstadoSimulacion) -> None:
@@ -79,21 +103,25 @@ def actualizar_proporciones_tipo_trabajo(est: EstadoSimulacion) -> None:
 
 
 def incorporar_contrataciones(est: EstadoSimulacion) -> None:
-    """Incorporar técnicos cuya fecha de llegada es hoy."""
+    """
+    Incorporar técnicos cuya fecha de llegada es hoy (o ya pasó).
+    contrataciones_pendientes es un heap por día de llegada: sin nada que vencer hoy
+    alcanza con mirar el primero.
+    """
+    pendientes = est.contrataciones_pendientes
+    if not pendientes or pendientes[0][0] > est.T:
+        return
     incorporados_dev = 0
     incorporados_apps_it = 0
-    pendientes = []
-    for (dia_inc, n_dev, n_apps_it) in est.contrataciones_pendientes:
-        if dia_inc <= est.T:
-            incorporados_dev += n_dev
-            incorporados_apps_it += n_apps_it
-        else:
-            pendientes.append((dia_inc, n_dev, n_apps_it))
-    est.contrataciones_pendientes = pendientes
+    while pendientes and pendientes[0][0] <= est.T:
+        _, n_dev, n_apps_it = heapq.heappop(pendientes)
+        incorporados_dev += n_dev
+        incorporados_apps_it += n_apps_it
     if incorporados_dev > 0 or incorporados_apps_it > 0:
         est.Tecnicos_Dev += incorporados_dev
         est.Tecnicos_AppsIT += incorporados_apps_it
-        reiniciar_tps_dia(est)
+        est.eventos[EV_TECNICOS_INCORPORADOS] += incorporados_dev + incorporados_apps_it
+        redimensionar_tps(est)
 
 
 def ejecutar_ciclo_contratacion(est: EstadoSimulacion) -> None:
@@ -108,24 +136,27 @@ def ejecutar_ciclo_contratacion(est: EstadoSimulacion) -> None:
     ))
     if n_devs > 0 or n_apps_it > 0:
         dia_inc = est.T + cfg.SEMANAS_CICLO_CONTRATACION * cfg.DIAS_POR_SEMANA
-        est.contrataciones_pendientes.append((dia_inc, n_devs, n_apps_it))
+        heapq.heappush(est.contrataciones_pendientes, (dia_inc, n_devs, n_apps_it))
     est.trabajos_perdidos_por_tipo = {"APPS": 0, "IT": 0, "DESARROLLO": 0}
 
 
 def aplicar_rotacion_tecnicos(est: EstadoSimulacion) -> None:
     """
-    Cada semana: aplicar probabilidad de baja por técnico (rotación).
+    Cada semana: aplicar probabilidad de baja por técnico (rotación). Las bajas salen de
+    binomial_geometrica: con p = 1% no hace falta un uniforme por técnico.
     Tecnicos_Dev y Tecnicos_AppsIT pueden disminuir (mín. 1 cada tipo).
     Complementa incorporar_contrataciones para un flujo completo de técnicos.
     """
     if (est.T % cfg.DIAS_POR_SEMANA) != 0:
         return
-    bajas_dev = cfg.binomial(est.Tecnicos_Dev, cfg.PROB_ROTACION_TECNICO_SEMANAL)
-    bajas_apps_it = cfg.binomial(est.Tecnicos_AppsIT, cfg.PROB_ROTACION_TECNICO_SEMANAL)
+    bajas_dev = cfg.binomial_geometrica(est.Tecnicos_Dev, cfg.PROB_ROTACION_TECNICO_SEMANAL)
+    bajas_apps_it = cfg.binomial_geometrica(est.Tecnicos_AppsIT, cfg.PROB_ROTACION_TECNICO_SEMANAL)
     if bajas_dev > 0 or bajas_apps_it > 0:
+        antes = est.Tecnicos_Dev + est.Tecnicos_AppsIT
         est.Tecnicos_Dev = max(1, est.Tecnicos_Dev - bajas_dev)
         est.Tecnicos_AppsIT = max(1, est.Tecnicos_AppsIT - bajas_apps_it)
-        reiniciar_tps_dia(est)
+        est.eventos[EV_BAJAS_TECNICOS] += antes - est.Tecnicos_Dev - est.Tecnicos_AppsIT
+        redimensionar_tps(est)
 
 
 def cobrar_suscripciones(est: EstadoSimulacion) -> None:
@@ -137,6 +168,7 @@ def cobrar_suscripciones(est: EstadoSimulacion) -> None:
         )
         no_renovaciones = min(no_renovaciones, est.Suscripciones_Totales)
         est.perdidas_semana["suscripcion_no_renovacion"] += no_renovaciones
+        est.eventos[EV_NO_RENOVACIONES_SUSCRIPCION] += no_renovaciones
         est.Suscripciones_Totales -= no_renovaciones
         est.PE_con_paquetes -= no_renovaciones
         total_susc = est.Asiduos_Suscripcion + est.CE_Suscripcion
@@ -271,136 +303,244 @@ def capturar_metricas_semana(est: EstadoSimulacion) -> Dict[str, Any]:
     }
 
 
-def calcular_mejor_trimestre(est: EstadoSimulacion) -> None:
-    """Actualiza MEJOR_TRIMESTRE si el último trimestre (120 días) supera el mejor."""
-    T = est.T
-    if T < cfg.DIAS_TRIMESTRE or len(est.beneficio_acumulado_por_dia) < T:
-        return
-    inicio = T - cfg.DIAS_TRIMESTRE + 1  # primer día del trimestre
-    beneficio_antes = est.beneficio_acumulado_por_dia[T - cfg.DIAS_TRIMESTRE - 1] if T > cfg.DIAS_TRIMESTRE else 0.0
-    beneficio_ahora = est.beneficio_acumulado_por_dia[T - 1]
-    beneficio_trimestre = beneficio_ahora - beneficio_antes
-    if beneficio_trimestre > est.MEJOR_TRIMESTRE.beneficio:
-        est.MEJOR_TRIMESTRE = MejorTrimestre(inicio=inicio, fin=T, beneficio=beneficio_trimestre)
+def actualizar_mejor_trimestre(est: EstadoSimulacion) -> None:
+    """
+    Mejor ventana de DIAS_TRIMESTRE días sobre todo beneficio_acumulado_por_dia (una pasada).
+    No usa postproceso.mejor_ventana: para una sola serie, importar NumPy al arrancar el worker
+    cuesta más que el recorrido; la versión vectorizada queda para analizar muchas series.
+    """
+    serie = est.beneficio_acumulado_por_dia
+    w = cfg.DIAS_TRIMESTRE
+    previo = [0.0] + serie
+    for fin in range(w, len(serie) + 1):
+        beneficio = previo[fin] - previo[fin - w]
+        if beneficio > est.MEJOR_TRIMESTRE.beneficio:
+            est.MEJOR_TRIMESTRE = MejorTrimestre(inicio=fin - w + 1, fin=fin, beneficio=beneficio)
+
+
+def verificar_parada(est: EstadoSimulacion, criterios_parada: Sequence[Callable[[EstadoSimulacion], bool]]) -> bool:
+    """True si algún criterio pide terminar antes de T_FINAL; marca TRUNCADA y MOTIVO_PARADA."""
+    if est.T >= est.T_FINAL:
+        return False
+    for criterio in criterios_parada:
+        if criterio(est):
+            est.TRUNCADA = True
+            est.MOTIVO_PARADA = getattr(criterio, "motivo", type(criterio).__name__)
+            return True
+    return False
 
 
-def ejecutar_simulacion(T_FINAL: int, N: int, M: float, prob_suscripcion_nuevo: float = 0.50, verbose: bool = True) -> EstadoSimulacion:
+def simular_dia(est: EstadoSimulacion, guardar_historial: bool = True) -> Optional[Dict[str, Any]]:
     """
-    Ejecuta la simulación hasta el día T_FINAL.
-    N: frecuencia de implementaciones (días).
-    M: presupuesto mensual de marketing (500-4500).
-    prob_suscripcion_nuevo: probabilidad de que cliente nuevo elija suscripción vs prepago (0.0-1.0).
+    Avanza la simulación un día (est.T += 1).
+    Devuelve el snapshot semanal si el día cierra una semana, None en otro caso.
+    guardar_historial=False no acumula los snapshots en est.metricas_semanales.
     """
-    cfg.PROB_TIPO_PAGO_SUSCRIPCION_CLIENTE_NUEVO_CE = prob_suscripcion_nuevo
-    est = EstadoSimulacion(T_FINAL=T_FINAL, N=N, M=M)
-    while est.T < est.T_FINAL:
-        # --- Esquema de eventos (obs. Prof. Mammana) ---
-        # (a) Llegada: TDN/TDOFF en bucle más abajo
-        # (b) Corte mensual: cobrar_suscripciones, reponer_creditos_mkt
-        # (c) Corte semanal: calcular_ajuste_calendarizacion, aplicar_rotacion_tecnicos, metricas_semanales
-        # (d) Implementación + inestabilidad: verificar_implementacion
-        # (e) Agotamiento prepago: llegada._renovar_bloque_prepago cuando creditos_prepago_global<=0
-        est.T += 1
-        actualizar_proporciones_tipo_trabajo(est)
-        reiniciar_tps_dia(est)
-        incorporar_contrataciones(est)
-        ejecutar_ciclo_contratacion(est)
-        aplicar_rotacion_tecnicos(est)
-
-        trabajos_asiduos = calcular_trabajos_asiduos(est)
-        clientes_nuevos = calcular_clientes_nuevos_hoy(est)
-        TD = trabajos_asiduos + clientes_nuevos
-        TDN = math.ceil(TD * cfg.PROP_HORARIO_LABORAL)
-        TDOFF = math.floor(TD * cfg.PROP_FUERA_HORARIO)
-        es_inestable = verificar_implementacion(est)
-        calcular_ajuste_calendarizacion(est)
-
-        es_dia_semana = (est.T % cfg.DIAS_POR_SEMANA) <= 4
-        total_arrivals = TDN + TDOFF if es_dia_semana else TDOFF
-        orden_llegadas = [True] * clientes_nuevos + [False] * trabajos_asiduos
-        random.shuffle(orden_llegadas)
-        if len(orden_llegadas) < total_arrivals:
-            orden_llegadas.extend([False] * (total_arrivals - len(orden_llegadas)))
-        else:
-            orden_llegadas = orden_llegadas[:total_arrivals]
-
-        idx_orden = 0
-
-        # EaE: llegadas TDN en horario laboral (solo días de semana)
-        if es_dia_semana and TDN > 0:
-            minutos_dia = cfg.MINUTOS_DIA_APPS_IT
-            inicio_dia = (est.T - 1) * minutos_dia
-            reloj = inicio_dia
-            tpll = reloj + cfg.generar_inter_arribo(
-                cfg.lambda_por_minuto_en_hora(TDN, 0)
-            )
-            procesados = 0
-            while procesados < TDN:
-                reloj = tpll
-                minuto_del_dia = reloj - inicio_dia
-                hora_actual = min(cfg.HORAS_LABORALES - 1, max(0, int(minuto_del_dia // cfg.MINUTOS_POR_HORA)))
-                lam = cfg.lambda_por_minuto_en_hora(TDN, hora_actual)
-                lam = max(lam, 1e-6)
-                tpll = reloj + cfg.generar_inter_arribo(lam)
-                es_nuevo = orden_llegadas[idx_orden]
-                idx_orden += 1
-                llegada.procesar_llegada_cliente(
-                    est, es_inestable, es_horario_laboral=True, es_dia_semana=True,
-                    reloj=reloj,
-                    forzar_tipo="nuevo" if es_nuevo else "preexistente",
-                )
-                procesados += 1
-
-        # Batch: llegadas TDOFF fuera de horario (días de semana) o todas (fin de semana)
-        n_batch = TDOFF if es_dia_semana else total_arrivals
-        for j in range(n_batch):
-            if idx_orden >= len(orden_llegadas):
-                break
+    # --- Esquema de eventos (obs. Prof. Mammana) ---
+    # (a) Llegada: TDN/TDOFF en bucle más abajo
+    # (b) Corte mensual: cobrar_suscripciones, reponer_creditos_mkt
+    # (c) Corte semanal: calcular_ajuste_calendarizacion, aplicar_rotacion_tecnicos, metricas_semanales
+    # (d) Implementación + inestabilidad: verificar_implementacion
+    # (e) Agotamiento prepago: llegada._renovar_bloque_prepago cuando creditos_prepago_global<=0
+    est.T += 1
+    actualizar_proporciones_tipo_trabajo(est)
+    reiniciar_tps_dia(est)
+    incorporar_contrataciones(est)
+    ejecutar_ciclo_contratacion(est)
+    aplicar_rotacion_tecnicos(est)
+
+    trabajos_asiduos = calcular_trabajos_asiduos(est)
+    clientes_nuevos = calcular_clientes_nuevos_hoy(est)
+    TD = trabajos_asiduos + clientes_nuevos
+    TDN = math.ceil(TD * cfg.PROP_HORARIO_LABORAL)
+    TDOFF = math.floor(TD * cfg.PROP_FUERA_HORARIO)
+    es_inestable = verificar_implementacion(est)
+    calcular_ajuste_calendarizacion(est)
+    contexto = llegada.DiaContexto(est, es_inestable)
+
+    es_dia_semana = (est.T % cfg.DIAS_POR_SEMANA) <= 4
+    total_arrivals = TDN + TDOFF if es_dia_semana else TDOFF
+    orden_llegadas = [True] * clientes_nuevos + [False] * trabajos_asiduos
+    random.shuffle(orden_llegadas)
+    if len(orden_llegadas) < total_arrivals:
+        orden_llegadas.extend([False] * (total_arrivals - len(orden_llegadas)))
+    else:
+        orden_llegadas = orden_llegadas[:total_arrivals]
+
+    idx_orden = 0
+
+    # EaE: llegadas TDN en horario laboral (solo días de semana)
+    if es_dia_semana and TDN > 0:
+        minutos_dia = cfg.MINUTOS_DIA_APPS_IT
+        inicio_dia = (est.T - 1) * minutos_dia
+        reloj = inicio_dia
+        tpll = reloj + cfg.generar_inter_arribo(
+            cfg.lambda_por_minuto_en_hora(TDN, 0)
+        )
+        procesados = 0
+        while procesados < TDN:
+            reloj = tpll
+            minuto_del_dia = reloj - inicio_dia
+            hora_actual = min(cfg.HORAS_LABORALES - 1, max(0, int(minuto_del_dia // cfg.MINUTOS_POR_HORA)))
+            lam = cfg.lambda_por_minuto_en_hora(TDN, hora_actual)
+            lam = max(lam, 1e-6)
+            tpll = reloj + cfg.generar_inter_arribo(lam)
             es_nuevo = orden_llegadas[idx_orden]
             idx_orden += 1
             llegada.procesar_llegada_cliente(
-                est, es_inestable, es_horario_laboral=False, es_dia_semana=es_dia_semana,
-                minuto_arrivo=0,
+                est, es_inestable, es_horario_laboral=True, es_dia_semana=True,
+                reloj=reloj,
                 forzar_tipo="nuevo" if es_nuevo else "preexistente",
+                contexto=contexto,
             )
+            procesados += 1
+
+    # Batch: llegadas TDOFF fuera de horario (días de semana) o todas (fin de semana)
+    n_batch = TDOFF if es_dia_semana else total_arrivals
+    for j in range(n_batch):
+        if idx_orden >= len(orden_llegadas):
+            break
+        es_nuevo = orden_llegadas[idx_orden]
+        idx_orden += 1
+        llegada.procesar_llegada_cliente(
+            est, es_inestable, es_horario_laboral=False, es_dia_semana=es_dia_semana,
+            minuto_arrivo=0,
+            forzar_tipo="nuevo" if es_nuevo else "preexistente",
+            contexto=contexto,
+        )
 
-        # Pago a desarrolladores al principio de cada mes (día 1, 31, 61, ...)
-        if ((est.T - 1) % cfg.DIAS_POR_MES) == 0:
-            pagar_desarrollos(est)
-        # Fin de mes: cobro suscripciones y reposición de créditos MKT
-        if (est.T % cfg.DIAS_POR_MES) == 0:
-            cobrar_suscripciones(est)
-            reponer_creditos_mkt(est)
-
-        if est.T_EQUILIBRIO is None:
-            verificar_equilibrio(est)
-
-        est.beneficio_acumulado_por_dia.append(_beneficio_acumulado(est))
-
-        if (est.T % cfg.DIAS_POR_SEMANA) == 0:
-            est.metricas_semanales.append(capturar_metricas_semana(est))
-
-        if (est.T % cfg.DIAS_TRIMESTRE) == 0 and est.T >= cfg.DIAS_TRIMESTRE:
-            calcular_mejor_trimestre(est)
-
-    # Mejor trimestre: ventana móvil de 120 días sobre el historial
-    n = len(est.beneficio_acumulado_por_dia)
-    for i in range(cfg.DIAS_TRIMESTRE, n + 1):
-        beneficio_antes = est.beneficio_acumulado_por_dia[i - cfg.DIAS_TRIMESTRE - 1] if i > cfg.DIAS_TRIMESTRE else 0.0
-        beneficio_ahora = est.beneficio_acumulado_por_dia[i - 1]
-        beneficio_trimestre = beneficio_ahora - beneficio_antes
-        if beneficio_trimestre > est.MEJOR_TRIMESTRE.beneficio:
-            est.MEJOR_TRIMESTRE = MejorTrimestre(
-                inicio=i - cfg.DIAS_TRIMESTRE + 1,
-                fin=i,
-                beneficio=beneficio_trimestre,
+    # Pago a desarrolladores al principio de cada mes (día 1, 31, 61, ...)
+    if ((est.T - 1) % cfg.DIAS_POR_MES) == 0:
+        pagar_desarrollos(est)
+    # Fin de mes: cobro suscripciones y reposición de créditos MKT
+    if (est.T % cfg.DIAS_POR_MES) == 0:
+        cobrar_suscripciones(est)
+        reponer_creditos_mkt(est)
+
+    if est.T_EQUILIBRIO is None:
+        verificar_equilibrio(est)
+
+    est.beneficio_acumulado_por_dia.append(_beneficio_acumulado(est))
+
+    if (est.T % cfg.DIAS_POR_SEMANA) == 0:
+        metricas_semana = capturar_metricas_semana(est)
+        if guardar_historial:
+            est.metricas_semanales.append(metricas_semana)
+        return metricas_semana
+    return None
+
+
+def iterar_simulacion(
+    T_FINAL: int,
+    N: int,
+    M: float,
+    prob_suscripcion_nuevo: float = 0.50,
+    granularidad: str = GRANULARIDAD_SEMANA,
+    criterios_parada: Optional[Sequence[Callable[[EstadoSimulacion], bool]]] = None,
+    guardar_historial: bool = True,
+    estado: Optional[EstadoSimulacion] = None,
+    modelo_duracion: str = cfg.MODELO_DURACION_RECORTE,
+) -> Generator[Instantanea, None, EstadoSimulacion]:
+    """
+    Variante incremental de ejecutar_simulacion: genera una Instantanea por día
+    (granularidad="dia") o por semana cerrada (granularidad="semana").
+    El consumidor puede cortar la iteración en cualquier momento (break / close()).
+    Al agotarse, el valor de retorno del generador (StopIteration.value) es el estado final.
+    guardar_historial=False no acumula metricas_semanales (solo se entregan en cada Instantanea).
+    estado: reanudar una corrida terminada (mismos N y M) hasta el nuevo T_FINAL; el
+    llamador restaura antes el estado de random guardado junto con ella.
+    modelo_duracion: distribución de duración APPS/IT (cfg.MODELOS_DURACION).
+    est.SEGUNDOS_SIMULACION acumula el tiempo en simular_dia (no el del consumidor entre
+    instantáneas) y est.eventos los contadores de estado.EVENTOS.
+    """
+    if granularidad not in (GRANULARIDAD_DIA, GRANULARIDAD_SEMANA):
+        raise ValueError(f"granularidad debe ser '{GRANULARIDAD_DIA}' o '{GRANULARIDAD_SEMANA}'")
+    if modelo_duracion not in cfg.MODELOS_DURACION:
+        raise ValueError(f"modelo_duracion debe ser uno de {cfg.MODELOS_DURACION}")
+    cfg.PROB_TIPO_PAGO_SUSCRIPCION_CLIENTE_NUEVO_CE = prob_suscripcion_nuevo
+    cfg.MODELO_DURACION = modelo_duracion
+    if estado is None:
+        est = EstadoSimulacion(T_FINAL=T_FINAL, N=N, M=M)
+    else:
+        if estado.TRUNCADA:
+            raise ValueError("No se puede reanudar una corrida truncada por un criterio de parada")
+        est = estado
+        est.T_FINAL = T_FINAL
+    por_dia = granularidad == GRANULARIDAD_DIA
+    reloj = time.perf_counter
+    while est.T < est.T_FINAL:
+        inicio = reloj()
+        metricas_semana = simular_dia(est, guardar_historial)
+        est.SEGUNDOS_SIMULACION += reloj() - inicio
+        if por_dia or metricas_semana is not None:
+            yield Instantanea(
+                dia=est.T,
+                beneficio_acumulado=est.beneficio_acumulado_por_dia[-1],
+                equilibrio_dia=est.T_EQUILIBRIO,
+                metricas_semana=metricas_semana,
+                estado=est,
             )
+        if criterios_parada and verificar_parada(est, criterios_parada):
+            break
+
+    # Mejor trimestre: ventana móvil de DIAS_TRIMESTRE días sobre el historial (una pasada en Python)
+    actualizar_mejor_trimestre(est)
+    return est
+
 
+def ejecutar_simulacion(
+    T_FINAL: int,
+    N: int,
+    M: float,
+    prob_suscripcion_nuevo: float = 0.50,
+    verbose: bool = True,
+    criterios_parada: Optional[Sequence[Callable[[EstadoSimulacion], bool]]] = None,
+    modelo_duracion: str = cfg.MODELO_DURACION_RECORTE,
+    modo: str = MODO_DETALLADO,
+) -> EstadoSimulacion:
+    """
+    Ejecuta la simulación hasta el día T_FINAL (consume iterar_simulacion completo).
+    N: frecuencia de implementaciones (días).
+    M: presupuesto mensual de marketing (500-4500).
+    prob_suscripcion_nuevo: probabilidad de que cliente nuevo elija suscripción vs prepago (0.0-1.0).
+    criterios_parada: opcional, criterios de simulacion.parada evaluados al cierre de cada día;
+        el primero que se cumple termina la corrida antes de T_FINAL (est.TRUNCADA = True).
+    modelo_duracion: "recorte" (default), "truncada" o "lognormal" para la duración APPS/IT.
+    modo: "detallado" (default) o "agregado" (simulacion.agregado: conteos diarios, aproximado;
+        la semilla sale de random, no admite criterios_parada).
+    """
+    if modo not in MODOS:
+        raise ValueError(f"modo debe ser uno de {MODOS}")
+    if modo == MODO_AGREGADO:
+        if criterios_parada:
+            raise ValueError("el modo agregado no admite criterios_parada")
+        from . import agregado
+        est = agregado.simular_lote(
+            T_FINAL, N, M, prob_suscripcion_nuevo,
+            semilla=random.getrandbits(63), modelo_duracion=modelo_duracion,
+        )[0]
+        if verbose:
+            imprimir_resultados(est)
+        return est
+    est = agotar(iterar_simulacion(
+        T_FINAL, N, M, prob_suscripcion_nuevo,
+        granularidad=GRANULARIDAD_SEMANA, criterios_parada=criterios_parada,
+        modelo_duracion=modelo_duracion,
+    ))
     if verbose:
         imprimir_resultados(est)
     return est
 
 
+def agotar(generador: Generator[Any, None, EstadoSimulacion]) -> EstadoSimulacion:
+    """Consume un generador de iterar_simulacion y devuelve su estado final."""
+    while True:
+        try:
+            next(generador)
+        except StopIteration as fin:
+            return fin.value
+
+
 def imprimir_resultados(est: EstadoSimulacion) -> None:
     """Imprime resumen de resultados de la simulación."""
     print("=" * 50)
@@ -409,6 +549,8 @@ def imprimir_resultados(est: EstadoSimulacion) -> None:
     print()
     print("Parámetros:")
     print(f"  - Días simulados: {est.T_FINAL}")
+    if est.TRUNCADA:
+        print(f"  - Corrida truncada en día {est.T} (motivo: {est.MOTIVO_PARADA})")
     print(f"  - Frecuencia implementaciones (N): {est.DIAS_IMPLEMENTACION}")
     print(f"  - Presupuesto MKT mensual (M): {est.PRESUPUESTO_MKT_MENSUAL}")
     print()
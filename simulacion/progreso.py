@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio de progreso en vivo para barridos en paralelo.
+Los workers publican un evento liviano por corrida terminada en una cola de
+multiprocessing (put_nowait, sin esperar al consumidor); un hilo con un loop
+asyncio la drena y mantiene:
+- corridas/seg (global y en ventana reciente) y ETA,
+- utilización por worker (tiempo simulando / tiempo transcurrido),
+- media e IC95 de beneficio_final por configuración (Welford, en línea).
+El estado se expone como JSON por HTTP local (GET / o /estado) y como vista
+de terminal impresa cada intervalo_terminal segundos.
+
+Uso (proceso principal):
+  servicio = ServicioProgreso(total_corridas, puerto=8765)
+  servicio.iniciar()
+  servicio.registrar_config(i, etiqueta, n_runs)
+  Pool(n, initializer=inicializar_worker, initargs=(servicio.cola,))
+  ...
+  servicio.detener()
+
+Uso (worker): notificar_corrida(config_idx, t_inicio, t_fin, beneficio_final)
+"""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+INTERVALO_TERMINAL_DEFAULT = 60.0  # segundos entre impresiones de la vista de terminal
+VENTANA_TASA_SEG = 60.0  # ventana para corridas/seg reciente
+Z_IC95 = 1.96
+
+# Cola de eventos del worker (la asigna inicializar_worker; None = no publicar)
+_COLA: Optional[Any] = None
+
+
+def inicializar_worker(cola: Any) -> None:
+    """Initializer de Pool: guarda la cola de eventos en el proceso worker."""
+    global _COLA
+    _COLA = cola
+
+
+def notificar_corrida(config_idx: int, t_inicio: float, t_fin: float, beneficio_final: float) -> None:
+    """Publica una corrida terminada (no bloquea; si la cola falla se descarta el evento)."""
+    if _COLA is None:
+        return
+    try:
+        _COLA.put_nowait((config_idx, os.getpid(), t_inicio, t_fin, beneficio_final))
+    except (queue.Full, OSError, ValueError):
+        pass
+
+
+@dataclass
+class _EstadisticaEnLinea:
+    """Media y varianza incremental (Welford)."""
+    n: int = 0
+    media: float = 0.0
+    m2: float = 0.0
+
+    def agregar(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+
+    def resumen(self) -> Dict[str, Optional[float]]:
+        if self.n == 0:
+            return {"n": 0, "media": None, "std": None, "ic95": None}
+        std = math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        ic = Z_IC95 * std / math.sqrt(self.n)
+        return {"n": self.n, "media": self.media, "std": std, "ic95": [self.media - ic, self.media + ic]}
+
+
+@dataclass
+class _ConfigProgreso:
+    etiqueta: str
+    n_runs: int
+    beneficio_final: _EstadisticaEnLinea = field(default_factory=_EstadisticaEnLinea)
+
+
+@dataclass
+class _WorkerProgreso:
+    desde: float
+    ocupado: float = 0.0
+    corridas: int = 0
+    ultimo: float = 0.0
+
+
+class ServicioProgreso:
+    """Colector asyncio de eventos de corrida con endpoint HTTP/JSON y vista de terminal."""
+
+    def __init__(
+        self,
+        total_corridas: int,
+        puerto: Optional[int] = None,
+        host: str = "127.0.0.1",
+        intervalo_terminal: Optional[float] = INTERVALO_TERMINAL_DEFAULT,
+    ):
+        self.total_corridas = total_corridas
+        self.puerto = puerto
+        self.host = host
+        self.intervalo_terminal = intervalo_terminal
+        self.cola = multiprocessing.Queue()
+        self._lock = threading.Lock()
+        self._configs: Dict[int, _ConfigProgreso] = {}
+        self._workers: Dict[int, _WorkerProgreso] = {}
+        self._recientes: Deque[float] = deque()
+        self._completadas = 0
+        self._inicio = time.time()
+        self._hilo: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fin: Optional[asyncio.Event] = None
+        self._listo = threading.Event()
+        self._error: Optional[BaseException] = None  # excepción al arrancar el loop (p. ej. puerto ocupado)
+
+    # --- API del proceso principal ---
+
+    def iniciar(self) -> "ServicioProgreso":
+        """Arranca el loop asyncio en un hilo daemon; propaga el error si no pudo arrancar (puerto ocupado)."""
+        self._inicio = time.time()
+        self._hilo = threading.Thread(target=lambda: asyncio.run(self._principal()), daemon=True)
+        self._hilo.start()
+        if not self._listo.wait(timeout=5):
+            raise RuntimeError("El servicio de progreso no arrancó en 5 segundos")
+        if self._error is not None:
+            self._hilo.join(timeout=5)
+            raise OSError(f"No se pudo abrir el puerto de progreso {self.host}:{self.puerto}: {self._error}") from self._error
+        return self
+
+    def registrar_config(self, config_idx: int, etiqueta: str, n_runs: int) -> None:
+        with self._lock:
+            self._configs[config_idx] = _ConfigProgreso(etiqueta=etiqueta, n_runs=n_runs)
+
+    def descontar(self, n: int) -> None:
+        """Resta n corridas del total (resueltas sin simular, p. ej. tomadas del memo)."""
+        with self._lock:
+            self.total_corridas = max(self._completadas, self.total_corridas - n)
+
+    def detener(self) -> Dict[str, Any]:
+        """Drena eventos pendientes, detiene el loop (si sigue vivo) y devuelve el último resumen."""
+        vivo = self._hilo is not None and self._hilo.is_alive()
+        if vivo and self._loop is not None and self._fin is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._fin.set)
+            except RuntimeError:  # el loop se cerró entre la verificación y la llamada
+                pass
+        if vivo:
+            self._hilo.join(timeout=10)
+        self._procesar(self._drenar(0.0))
+        return self.resumen()
+
+    def resumen(self) -> Dict[str, Any]:
+        """Snapshot JSON-serializable del progreso."""
+        ahora = time.time()
+        with self._lock:
+            transcurrido = max(ahora - self._inicio, 1e-9)
+            while self._recientes and self._recientes[0] < ahora - VENTANA_TASA_SEG:
+                self._recientes.popleft()
+            ventana = min(VENTANA_TASA_SEG, transcurrido)
+            tasa_global = self._completadas / transcurrido
+            tasa_reciente = len(self._recientes) / ventana
+            tasa_eta = tasa_reciente if tasa_reciente > 0 else tasa_global
+            restantes = max(0, self.total_corridas - self._completadas)
+            eta = restantes / tasa_eta if tasa_eta > 0 else None
+            workers = {
+                str(pid): {
+                    "corridas": w.corridas,
+                    "utilizacion": min(1.0, w.ocupado / max(ahora - w.desde, 1e-9)),
+                    "inactivo_seg": ahora - w.ultimo,
+                }
+                for pid, w in self._workers.items()
+            }
+            configs = {
+                str(idx): {
+                    "etiqueta": c.etiqueta,
+                    "n_runs": c.n_runs,
+                    "beneficio_final": c.beneficio_final.resumen(),
+                }
+                for idx, c in self._configs.items()
+            }
+            return {
+                "fecha": datetime.now().isoformat(),
+                "completadas": self._completadas,
+                "total": self.total_corridas,
+                "porcentaje": 100 * self._completadas / self.total_corridas if self.total_corridas else 0.0,
+                "transcurrido_seg": transcurrido,
+                "corridas_por_seg": tasa_global,
+                "corridas_por_seg_recientes": tasa_reciente,
+                "eta_seg": eta,
+                "workers": workers,
+                "configs": configs,
+            }
+
+    # --- Loop asyncio ---
+
+    async def _principal(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._fin = asyncio.Event()
+        servidor = None
+        if self.puerto is not None:
+            try:
+                servidor = await asyncio.start_server(self._atender_http, self.host, self.puerto)
+            except OSError as e:
+                self._error = e
+                self._listo.set()
+                return
+        self._listo.set()
+        consumidor = asyncio.create_task(self._consumir())
+        tareas = []
+        if self.intervalo_terminal:
+            tareas.append(asyncio.create_task(self._vista_terminal()))
+        await self._fin.wait()
+        for t in tareas:
+            t.cancel()
+        # El consumidor no se cancela: termina su drenado en curso y vacía la cola antes de salir
+        await asyncio.gather(consumidor, *tareas, return_exceptions=True)
+        if servidor is not None:
+            servidor.close()
+            await servidor.wait_closed()
+
+    async def _consumir(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._fin.is_set():
+            eventos = await loop.run_in_executor(None, self._drenar, 0.25)
+            self._procesar(eventos)
+        self._procesar(self._drenar(0.0))
+
+    def _drenar(self, espera: float) -> List[Tuple]:
+        """Espera hasta 'espera' segundos el primer evento y luego toma todos los disponibles."""
+        eventos: List[Tuple] = []
+        try:
+            eventos.append(self.cola.get(timeout=espera) if espera > 0 else self.cola.get_nowait())
+            while True:
+                eventos.append(self.cola.get_nowait())
+        except (queue.Empty, OSError, ValueError):
+            pass
+        return eventos
+
+    def _procesar(self, eventos: List[Tuple]) -> None:
+        if not eventos:
+            return
+        with self._lock:
+            for config_idx, pid, t_inicio, t_fin, beneficio_final in eventos:
+                self._completadas += 1
+                self._recientes.append(t_fin)
+                w = self._workers.get(pid)
+                if w is None:
+                    w = self._workers[pid] = _WorkerProgreso(desde=t_inicio)
+                w.ocupado += t_fin - t_inicio
+                w.corridas += 1
+                w.ultimo = max(w.ultimo, t_fin)
+                c = self._configs.get(config_idx)
+                if c is None:
+                    c = self._configs[config_idx] = _ConfigProgreso(etiqueta=str(config_idx), n_runs=0)
+                c.beneficio_final.agregar(beneficio_final)
+
+    async def _vista_terminal(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_terminal)
+            print(formatear_resumen(self.resumen()), flush=True)
+
+    async def _atender_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            linea = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            partes = linea.decode("latin-1").split()
+            ruta = partes[1].split("?")[0] if len(partes) > 1 else "/"
+            if ruta in ("/", "/estado"):
+                cuerpo = json.dumps(self.resumen(), ensure_ascii=False).encode("utf-8")
+                estado = "200 OK"
+            else:
+                cuerpo = b'{"error": "no encontrado"}'
+                estado = "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {estado}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(cuerpo)}\r\nConnection: close\r\n\r\n".encode("latin-1") + cuerpo
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def _formatear_duracion(seg: Optional[float]) -> str:
+    if seg is None:
+        return "--:--:--"
+    seg = int(seg)
+    return f"{seg // 3600:02d}:{seg % 3600 // 60:02d}:{seg % 60:02d}"
+
+
+def formatear_resumen(resumen: Dict[str, Any], inactivo_max_seg: float = VENTANA_TASA_SEG) -> str:
+    """Vista de terminal: línea global + utilización + configs en curso con media ± IC95."""
+    activos = [w for w in resumen["workers"].values() if w["inactivo_seg"] <= inactivo_max_seg]
+    util = sum(w["utilizacion"] for w in activos) / len(activos) if activos else 0.0
+    lineas = [
+        f"  [PROGRESO] {resumen['completadas']}/{resumen['total']} corridas ({resumen['porcentaje']:.1f}%) | "
+        f"{resumen['corridas_por_seg_recientes']:.2f} corr/s | ETA {_formatear_duracion(resumen['eta_seg'])} | "
+        f"workers {len(activos)} (util. {100 * util:.0f}%) | {datetime.now().strftime('%H:%M:%S')}"
+    ]
+    for c in resumen["configs"].values():
+        b = c["beneficio_final"]
+        if not b["n"] or (c["n_runs"] and b["n"] >= c["n_runs"]):
+            continue
+        lineas.append(
+            f"    {c['etiqueta']}: {b['n']}/{c['n_runs']} | beneficio_final {b['media']:,.0f} "
+            f"IC95 [{b['ic95'][0]:,.0f}, {b['ic95'][1]:,.0f}]"
+        )
+    return "\n".join(lineas)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de renderizado de gráficos en paralelo.
+Cada figura se describe como un TrabajoGrafico: la función que la dibuja
+("modulo:funcion", devuelve una Figure), sus datos (kwargs picklables) y el
+PNG de salida. renderizar() reparte los trabajos en un pool de procesos y
+guarda con el mismo formato de siempre (dpi=150, bbox_inches="tight").
+
+Las figuras cuya huella (datos + código fuente del módulo que las dibuja)
+coincide con la registrada en el manifiesto del directorio (HUELLAS_ARCHIVO)
+y cuyo PNG existe no se vuelven a generar.
+"""
+
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+VERSION_RENDER = 1
+DPI = 150
+HUELLAS_ARCHIVO = ".huellas_graficos.json"
+
+
+@dataclass
+class TrabajoGrafico:
+    """Una figura a renderizar: renderizador "modulo:funcion", PNG destino y datos."""
+    renderizador: str
+    path: str
+    datos: Dict[str, Any] = field(default_factory=dict)
+    rc: Dict[str, Any] = field(default_factory=dict)  # rcParams de matplotlib para esta figura
+
+
+def trabajo(funcion: Callable[..., Any], path: str, rc: Optional[Dict[str, Any]] = None, **datos: Any) -> TrabajoGrafico:
+    """Construye un TrabajoGrafico a partir de la función que dibuja la figura."""
+    return TrabajoGrafico(
+        renderizador=f"{funcion.__module__}:{funcion.__qualname__}",
+        path=str(path),
+        datos=datos,
+        rc=dict(rc or {}),
+    )
+
+
+_HUELLAS_CODIGO: Dict[str, str] = {}
+
+
+def _huella_codigo(renderizador: str) -> str:
+    """sha256 del archivo fuente del módulo del renderizador (memoizado por módulo)."""
+    modulo = renderizador.split(":", 1)[0]
+    if modulo not in _HUELLAS_CODIGO:
+        mod = sys.modules.get(modulo) or importlib.import_module(modulo)
+        archivo = getattr(mod, "__file__", None)
+        try:
+            with open(archivo, "rb") as f:
+                _HUELLAS_CODIGO[modulo] = hashlib.sha256(f.read()).hexdigest()
+        except (OSError, TypeError):
+            _HUELLAS_CODIGO[modulo] = ""
+    return _HUELLAS_CODIGO[modulo]
+
+
+def huella(t: TrabajoGrafico) -> str:
+    """Hash del trabajo (renderizador y su código + datos + estilo); identifica si el PNG está al día."""
+    contenido = pickle.dumps(
+        (VERSION_RENDER, DPI, t.renderizador, _huella_codigo(t.renderizador), t.datos, sorted(t.rc.items())),
+        protocol=4,
+    )
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _resolver(renderizador: str) -> Callable[..., Any]:
+    modulo, nombre = renderizador.split(":", 1)
+    obj: Any = importlib.import_module(modulo)
+    for parte in nombre.split("."):
+        obj = getattr(obj, parte)
+    return obj
+
+
+def _renderizar_uno(t: TrabajoGrafico) -> str:
+    """Dibuja y guarda una figura (se ejecuta en el worker o en el proceso actual)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    with plt.rc_context(t.rc):
+        fig = _resolver(t.renderizador)(**t.datos)
+        if fig is not None:
+            fig.savefig(t.path, dpi=DPI, bbox_inches="tight")
+        plt.close("all")
+    return t.path
+
+
+def _leer_huellas(directorio: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(directorio, HUELLAS_ARCHIVO), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_huellas(directorio: str, huellas: Dict[str, str]) -> None:
+    with open(os.path.join(directorio, HUELLAS_ARCHIVO), "w", encoding="utf-8") as f:
+        json.dump(huellas, f, indent=2, sort_keys=True)
+
+
+def _workers_efectivos(workers: Optional[int], n_trabajos: int) -> int:
+    if multiprocessing.current_process().daemon:
+        return 1  # dentro de un worker de Pool no se pueden crear procesos hijos
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_trabajos))
+
+
+def renderizar(
+    trabajos: Sequence[TrabajoGrafico],
+    workers: Optional[int] = None,
+    forzar: bool = False,
+) -> List[str]:
+    """
+    Renderiza los trabajos pendientes y devuelve los paths generados.
+    workers: procesos del pool (None = núcleos disponibles; 1 = en este proceso).
+    forzar: regenerar aunque la huella y el PNG coincidan.
+    """
+    por_directorio: Dict[str, Dict[str, str]] = {}
+    pendientes: List[TrabajoGrafico] = []
+    nuevas: Dict[str, str] = {}
+    for t in trabajos:
+        directorio, archivo = os.path.split(os.path.abspath(t.path))
+        os.makedirs(directorio, exist_ok=True)
+        huellas = por_directorio.setdefault(directorio, _leer_huellas(directorio))
+        h = huella(t)
+        if not forzar and huellas.get(archivo) == h and os.path.exists(t.path):
+            continue
+        pendientes.append(t)
+        nuevas[t.path] = h
+
+    n_workers = _workers_efectivos(workers, len(pendientes))
+    if n_workers <= 1:
+        generados = [_renderizar_uno(t) for t in pendientes]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            generados = list(pool.map(_renderizar_uno, pendientes))
+
+    for path in generados:
+        directorio, archivo = os.path.split(os.path.abspath(path))
+        por_directorio[directorio][archivo] = nuevas[path]
+    for directorio in {os.path.dirname(os.path.abspath(p)) for p in generados}:
+        _guardar_huellas(directorio, por_directorio[directorio])
+    return generados
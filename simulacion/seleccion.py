@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Ranking y selección sobre configuraciones del benchmark.
+En lugar de correr R réplicas para todas las configuraciones, corre lotes
+chicos, descarta las claramente dominadas en la métrica elegida y concentra
+las réplicas en las que todavía compiten por el top-k.
+
+Métodos:
+- "halving": successive halving. El presupuesto se reparte en rondas iguales;
+  en cada ronda todas las sobrevivientes reciben las mismas réplicas y al final
+  pasa la mitad mejor (nunca menos de k).
+- "ocba": Optimal Computing Budget Allocation (Chen et al.). Cada lote se
+  reparte en proporción a (s_i / δ_i)², con δ_i la distancia de la media de i
+  a la frontera del top-k; la mejor recibe s_b·sqrt(Σ N_i² / s_i²).
+En ambos, antes de cada ronda se elimina toda configuración cuyo intervalo
+superior queda por debajo del k-ésimo mayor intervalo inferior (intervalos t de
+Student con n_i - 1 grados de libertad y corrección de Bonferroni sobre
+comparaciones y rondas, nivel global alfa).
+
+Garantía reportada:
+- pcs_garantizada = 1 - alfa cuando la selección quedó cerrada solo por
+  eliminaciones (quedaron exactamente k), bajo normalidad de las corridas; los
+  cuantiles t cubren la varianza estimada con pocas réplicas (n0 chico).
+- pcs_estimada: cota de Bonferroni 1 - Σ P(j supera a i) con las medias y
+  varianzas finales de todas las configuraciones (i elegida, j no elegida),
+  con zona de indiferencia delta.
+"""
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+METODO_HALVING = "halving"
+METODO_OCBA = "ocba"
+
+_NORMAL = NormalDist()
+
+# (config_idx, replica_idx) -> valor de la métrica; el evaluador recibe un lote y devuelve los valores en orden
+Evaluador = Callable[[List[Tuple[int, int]]], List[float]]
+
+
+def _beta_incompleta(a: float, b: float, x: float) -> float:
+    """Beta incompleta regularizada I_x(a, b) (fracción continua de Lentz)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1.0) / (a + b + 2.0):
+        return 1.0 - _beta_incompleta(b, a, 1.0 - x)
+    log_frente = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    f = d
+    for m in range(1, 300):
+        for num in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                    -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            f *= c * d
+        if abs(c * d - 1.0) < 1e-14:
+            break
+    return math.exp(log_frente) * f / a
+
+
+def _cola_t(t: float, gl: int) -> float:
+    """P(T > t) para T t de Student con gl grados de libertad, t >= 0."""
+    return 0.5 * _beta_incompleta(gl / 2.0, 0.5, gl / (gl + t * t))
+
+
+@lru_cache(maxsize=None)
+def _cuantil_t(p: float, gl: int) -> float:
+    """Cuantil p (p > 0.5) de la t de Student con gl grados de libertad (bisección sobre la cola)."""
+    cola = 1.0 - p
+    bajo, alto = 0.0, max(1.0, _NORMAL.inv_cdf(p))
+    while _cola_t(alto, gl) > cola:
+        bajo, alto = alto, alto * 2.0
+    for _ in range(200):
+        medio = (bajo + alto) / 2.0
+        if _cola_t(medio, gl) > cola:
+            bajo = medio
+        else:
+            alto = medio
+        if alto - bajo < 1e-10 * alto:
+            break
+    return (bajo + alto) / 2.0
+
+
+@dataclass
+class _Muestras:
+    """Suma, suma de cuadrados y conteo (en sentido 'mayor es mejor')."""
+    n: int = 0
+    suma: float = 0.0
+    suma2: float = 0.0
+    eliminada_en_ronda: Optional[int] = None
+
+    def agregar(self, x: float) -> None:
+        self.n += 1
+        self.suma += x
+        self.suma2 += x * x
+
+    @property
+    def media(self) -> float:
+        return self.suma / self.n if self.n else float("nan")
+
+    @property
+    def var(self) -> float:
+        if self.n < 2:
+            return float("inf")
+        return max(0.0, (self.suma2 - self.suma * self.suma / self.n) / (self.n - 1))
+
+    @property
+    def error_estandar(self) -> float:
+        return math.sqrt(self.var / self.n) if self.n >= 2 else float("inf")
+
+
+@dataclass
+class ResultadoSeleccion:
+    metodo: str
+    k: int
+    seleccionadas: List[int]  # índices de configuración, de mejor a peor
+    pcs_garantizada: Optional[float]
+    pcs_estimada: float
+    corridas: int
+    corridas_exhaustivo: int  # corridas que habría usado el barrido completo con el máximo n alcanzado
+    por_config: List[Dict[str, Any]]
+    rondas: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _asignacion_ocba(
+    muestras: Sequence[_Muestras], activas: List[int], k: int, total: int
+) -> Dict[int, int]:
+    """Réplicas objetivo por configuración activa para un total dado (OCBA / OCBA-m)."""
+    ordenadas = sorted(activas, key=lambda i: muestras[i].media, reverse=True)
+    piso = 1e-12
+    if k == 1:
+        b = ordenadas[0]
+        pesos = {}
+        for i in ordenadas[1:]:
+            d = max(muestras[b].media - muestras[i].media, piso)
+            pesos[i] = muestras[i].var / d ** 2
+        s_b = math.sqrt(muestras[b].var)
+        pesos[b] = s_b * math.sqrt(sum(p ** 2 / max(muestras[i].var, piso) for i, p in pesos.items()))
+    else:
+        # OCBA-m: frontera entre la k-ésima y la (k+1)-ésima
+        c = (muestras[ordenadas[k - 1]].media + muestras[ordenadas[k]].media) / 2
+        pesos = {i: muestras[i].var / max(abs(muestras[i].media - c), piso) ** 2 for i in ordenadas}
+    if not all(math.isfinite(p) for p in pesos.values()) or sum(pesos.values()) <= 0:
+        pesos = {i: 1.0 for i in ordenadas}
+    suma = sum(pesos.values())
+    return {i: int(round(total * p / suma)) for i, p in pesos.items()}
+
+
+def _cota_pcs(muestras: Sequence[_Muestras], seleccionadas: List[int], delta: float) -> float:
+    """1 - Σ_{i elegida, j no elegida} P(μ_j > μ_i + delta), aproximación normal."""
+    resto = [j for j in range(len(muestras)) if j not in seleccionadas]
+    error = 0.0
+    for i in seleccionadas:
+        for j in resto:
+            se = math.sqrt(muestras[i].error_estandar ** 2 + muestras[j].error_estandar ** 2)
+            if not math.isfinite(se):
+                return 0.0
+            diferencia = muestras[i].media - muestras[j].media + delta
+            error += _NORMAL.cdf(-diferencia / se) if se > 0 else float(diferencia <= 0)
+    return max(0.0, 1.0 - error)
+
+
+def seleccionar(
+    n_configs: int,
+    evaluar: Evaluador,
+    presupuesto: int,
+    k: int = 1,
+    metodo: str = METODO_HALVING,
+    maximizar: bool = True,
+    n0: int = 20,
+    lote: Optional[int] = None,
+    alfa: float = 0.05,
+    delta: float = 0.0,
+    callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> ResultadoSeleccion:
+    """
+    Elige las k mejores de n_configs configuraciones con a lo sumo 'presupuesto' corridas.
+    evaluar: recibe [(config_idx, replica_idx), ...] y devuelve el valor de la métrica de cada corrida.
+    n0: réplicas iniciales por configuración. lote: corridas por ronda en OCBA
+    (default n_configs * n0 / 2). delta: zona de indiferencia para pcs_estimada.
+    """
+    if metodo not in (METODO_HALVING, METODO_OCBA):
+        raise ValueError(f"metodo debe ser '{METODO_HALVING}' o '{METODO_OCBA}'")
+    if not 1 <= k < n_configs:
+        raise ValueError("k debe cumplir 1 <= k < n_configs")
+    n0 = max(2, n0)
+    if presupuesto < n0 * n_configs:
+        raise ValueError(f"presupuesto insuficiente: se necesitan al menos n0 * n_configs = {n0 * n_configs} corridas")
+    signo = 1.0 if maximizar else -1.0
+    muestras = [_Muestras() for _ in range(n_configs)]
+    activas = list(range(n_configs))
+    corridas = 0
+    rondas: List[Dict[str, Any]] = []
+    recortadas = set()  # descartadas por el corte de successive halving (sin garantía de intervalo)
+
+    def _correr(objetivo: Dict[int, int]) -> int:
+        pares = [(i, muestras[i].n + r) for i, extra in objetivo.items() for r in range(extra)]
+        for (i, _), v in zip(pares, evaluar(pares)):
+            muestras[i].agregar(signo * float(v))
+        return len(pares)
+
+    # Rondas máximas (para repartir alfa entre las miradas sucesivas)
+    restante = presupuesto - n0 * n_configs
+    if metodo == METODO_HALVING:
+        n_rondas = max(1, math.ceil(math.log2(n_configs / k)))
+    else:
+        lote = lote or max(1, n_configs * n0 // 2)
+        n_rondas = max(1, math.ceil(restante / lote))
+    p = 1.0 - alfa / ((n_configs - 1) * (n_rondas + 1))
+
+    def _semiancho(i: int) -> float:
+        return _cuantil_t(p, muestras[i].n - 1) * muestras[i].error_estandar
+
+    corridas += _correr({i: n0 for i in activas})
+    ronda = 0
+    while True:
+        # Eliminación de dominadas: UCB_i < k-ésimo mayor LCB
+        lcb = sorted((muestras[i].media - _semiancho(i) for i in activas), reverse=True)
+        umbral = lcb[k - 1]
+        eliminadas = [i for i in activas if muestras[i].media + _semiancho(i) < umbral]
+        for i in eliminadas:
+            muestras[i].eliminada_en_ronda = ronda
+        activas = [i for i in activas if i not in eliminadas]
+        fila = {
+            "ronda": ronda, "corridas": corridas, "activas": list(activas), "eliminadas": eliminadas,
+        }
+        rondas.append(fila)
+        if callback:
+            callback(fila)
+        restante = presupuesto - corridas
+        if len(activas) <= k or restante < len(activas):
+            break
+        ronda += 1
+
+        if metodo == METODO_HALVING:
+            # Rondas que faltan con las activas actuales (las eliminaciones por intervalo las acortan)
+            rondas_restantes = max(1, math.ceil(math.log2(len(activas) / k)))
+            por_config = max(1, (restante // rondas_restantes) // len(activas))
+            corridas += _correr({i: por_config for i in activas})
+            sobreviven = max(k, math.ceil(len(activas) / 2))
+            ordenadas = sorted(activas, key=lambda i: muestras[i].media, reverse=True)
+            for i in ordenadas[sobreviven:]:
+                muestras[i].eliminada_en_ronda = ronda
+            recortadas.update(ordenadas[sobreviven:])
+            activas = ordenadas[:sobreviven]
+        else:
+            tamano = min(lote, restante)
+            total = sum(muestras[i].n for i in activas) + tamano
+            objetivo = _asignacion_ocba(muestras, activas, k, total)
+            extra = {i: max(0, objetivo[i] - muestras[i].n) for i in activas}
+            suma_extra = sum(extra.values())
+            if suma_extra == 0:
+                extra = {max(activas, key=lambda i: muestras[i].error_estandar): 1}
+            elif suma_extra > tamano:
+                # Recortar proporcionalmente para respetar el lote
+                extra = {i: e * tamano // suma_extra for i, e in extra.items()}
+                if not any(extra.values()):
+                    extra = {max(activas, key=lambda i: muestras[i].error_estandar): 1}
+            corridas += _correr({i: e for i, e in extra.items() if e > 0})
+
+    seleccionadas = sorted(activas, key=lambda i: muestras[i].media, reverse=True)[:k]
+    # La garantía vale si todas las descartadas lo fueron por intervalos, no por el recorte a la mitad
+    cerrada = len(activas) == k and not recortadas
+    n_max = max(m.n for m in muestras)
+    por_config = [
+        {
+            "indice": j,
+            "n": m.n,
+            "media": signo * m.media,
+            "std": math.sqrt(m.var) if math.isfinite(m.var) else None,
+            "error_estandar": m.error_estandar if math.isfinite(m.error_estandar) else None,
+            "eliminada_en_ronda": m.eliminada_en_ronda,
+            "seleccionada": j in seleccionadas,
+        }
+        for j, m in enumerate(muestras)
+    ]
+    return ResultadoSeleccion(
+        metodo=metodo,
+        k=k,
+        seleccionadas=seleccionadas,
+        pcs_garantizada=1.0 - alfa if cerrada else None,
+        pcs_estimada=_cota_pcs(muestras, seleccionadas, delta),
+        corridas=corridas,
+        corridas_exhaustivo=n_max * n_configs,
+        por_config=por_config,
+        rondas=rondas,
+    )
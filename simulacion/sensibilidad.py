@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Análisis de sensibilidad global de una salida de la simulación (beneficio_final o
+equilibrio_dia) respecto de las probabilidades de config.py.
+
+Dos etapas:
+1. Morris (efectos elementales): r trayectorias de k + 1 puntos en una grilla de p
+   niveles; cada paso mueve un factor en Δ = p / (2(p - 1)). Por factor informa μ*
+   (media de |EE|, importancia), μ y σ (no linealidad / interacciones). Pasan a la
+   segunda etapa los factores con μ* ≥ corte · max μ* (a lo sumo max_factores).
+2. Sobol con el diseño de Saltelli: matrices A y B (N × k) y A_B^i (A con la columna i
+   de B), N(k + 2) puntos. Índices de primer orden (Saltelli 2010) y totales (Jansen),
+   con IC por bootstrap sobre las filas. Los factores descartados quedan en su valor de config.
+
+Cada factor recorre [minimo, maximo] (por defecto el valor de config ± escala·valor,
+acotado a [0, 1]). Un punto del diseño es el promedio de `replicas` corridas; todos
+los puntos de una misma trayectoria (Morris) o fila (Sobol) usan las mismas semillas
+(números aleatorios comunes), así las diferencias miden el efecto del factor y no el
+ruido de la corrida. Los puntos se corren en un Pool y cada worker devuelve solo el
+escalar de salida. Solo requiere NumPy.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import config as cfg
+
+SALIDA_BENEFICIO = "beneficio_final"
+SALIDA_EQUILIBRIO = "equilibrio_dia"
+SALIDAS = (SALIDA_BENEFICIO, SALIDA_EQUILIBRIO)
+
+# Probabilidades de config que no se barren: la A/B la fija cada corrida (prob_suscripcion)
+# y las de preexistente solo intervienen en llegadas sin forzar_tipo (simular_dia siempre lo fuerza).
+_PROB_EXCLUIDAS = (
+    "PROB_TIPO_PAGO_SUSCRIPCION_CLIENTE_NUEVO_CE",
+    "PROB_NUEVO_BASE",
+    "PROB_PREEXISTENTE_BASE",
+    "PROB_PREEXISTENTE_MAX",
+)
+
+
+@dataclass(frozen=True)
+class Factor:
+    """Constante de config.py que se barre en [minimo, maximo]."""
+    nombre: str
+    minimo: float
+    maximo: float
+
+    def valor(self, u: float) -> float:
+        return self.minimo + float(u) * (self.maximo - self.minimo)
+
+
+def factores_por_defecto(escala: float = 0.5, nombres: Optional[Sequence[str]] = None) -> List[Factor]:
+    """
+    Factores PROB_* de config (o los de `nombres`) con rango valor · (1 ± escala),
+    acotado a [0, 1].
+    """
+    if nombres is None:
+        nombres = [n for n in vars(cfg) if n.startswith("PROB_") and n not in _PROB_EXCLUIDAS]
+    factores = []
+    for nombre in nombres:
+        if not hasattr(cfg, nombre):
+            raise ValueError(f"config no tiene {nombre}")
+        v = float(getattr(cfg, nombre))
+        factores.append(Factor(nombre, max(0.0, v * (1.0 - escala)), min(1.0, v * (1.0 + escala))))
+    return factores
+
+
+# --- Evaluación de puntos ----------------------------------------------------------
+
+def _evaluar_punto(args) -> float:
+    """Worker: promedio de la salida sobre las semillas, con los factores fijados en config."""
+    valores, T_FINAL, N, M, prob_suscripcion, salida, semillas = args
+    import random
+    from .parada import PararTrasEquilibrio
+    from .principal import ejecutar_simulacion
+
+    originales = {nombre: getattr(cfg, nombre) for nombre, _ in valores}
+    try:
+        for nombre, v in valores:
+            setattr(cfg, nombre, v)
+        total = 0.0
+        for semilla in semillas:
+            random.seed(semilla)
+            if salida == SALIDA_EQUILIBRIO:
+                est = ejecutar_simulacion(
+                    T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion, verbose=False,
+                    criterios_parada=[PararTrasEquilibrio(0)],
+                )
+                total += est.T_EQUILIBRIO if est.T_EQUILIBRIO is not None else T_FINAL + 1
+            else:
+                est = ejecutar_simulacion(
+                    T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion, verbose=False,
+                )
+                serie = est.beneficio_acumulado_por_dia
+                total += serie[-1] if serie else 0.0
+        return total / len(semillas)
+    finally:
+        for nombre, v in originales.items():
+            setattr(cfg, nombre, v)
+
+
+class Evaluador:
+    """
+    Corre puntos del cubo unitario (filas de una matriz n × k) y devuelve la salida de cada uno.
+    Con workers > 1 mantiene un Pool abierto (usar como context manager o llamar cerrar()).
+    """
+
+    def __init__(
+        self,
+        T_FINAL: int,
+        N: int,
+        M: float,
+        prob_suscripcion: float,
+        salida: str = SALIDA_BENEFICIO,
+        replicas: int = 2,
+        workers: int = 1,
+    ):
+        if salida not in SALIDAS:
+            raise ValueError(f"salida debe ser una de {SALIDAS}")
+        self.T_FINAL = T_FINAL
+        self.N = N
+        self.M = M
+        self.prob_suscripcion = prob_suscripcion
+        self.salida = salida
+        self.replicas = max(1, replicas)
+        self.workers = max(1, workers)
+        self.corridas = 0
+        self._pool = None
+        if self.workers > 1:
+            from multiprocessing import Pool
+            self._pool = Pool(self.workers)
+
+    def __call__(self, factores: Sequence[Factor], unitarios: np.ndarray, grupos: Sequence[int], semilla: int) -> np.ndarray:
+        """
+        grupos[j]: grupo de semillas del punto j (semilla + grupo·replicas + q): puntos del
+        mismo grupo comparten números aleatorios.
+        """
+        items = [
+            (
+                tuple((f.nombre, f.valor(u)) for f, u in zip(factores, fila)),
+                self.T_FINAL, self.N, self.M, self.prob_suscripcion, self.salida,
+                tuple(semilla + int(g) * self.replicas + q for q in range(self.replicas)),
+            )
+            for fila, g in zip(unitarios, grupos)
+        ]
+        if self._pool is not None:
+            valores = self._pool.map(_evaluar_punto, items, chunksize=max(1, len(items) // (self.workers * 4)))
+        else:
+            valores = [_evaluar_punto(it) for it in items]
+        self.corridas += len(items) * self.replicas
+        return np.asarray(valores, dtype=np.float64)
+
+    def cerrar(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "Evaluador":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cerrar()
+
+
+# --- Morris ------------------------------------------------------------------------
+
+@dataclass
+class ResultadoMorris:
+    factores: List[Factor]
+    mu: np.ndarray
+    mu_estrella: np.ndarray
+    sigma: np.ndarray
+    trayectorias: int
+    corridas: int
+    seleccionados: List[Factor] = field(default_factory=list)
+
+    def filas(self) -> List[Dict[str, Any]]:
+        """Una fila por factor, de mayor a menor μ*."""
+        elegidos = {f.nombre for f in self.seleccionados}
+        orden = np.argsort(-self.mu_estrella)
+        return [
+            {"factor": self.factores[i].nombre, "minimo": self.factores[i].minimo, "maximo": self.factores[i].maximo,
+             "mu_estrella": float(self.mu_estrella[i]), "mu": float(self.mu[i]), "sigma": float(self.sigma[i]),
+             "seleccionado": self.factores[i].nombre in elegidos}
+            for i in orden
+        ]
+
+
+def diseno_morris(k: int, trayectorias: int, niveles: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (puntos, pasos): puntos es (r·(k+1)) × k en el cubo unitario; pasos[t, m] = (factor, Δ con signo)
+    del paso m de la trayectoria t.
+    """
+    delta = niveles / (2.0 * (niveles - 1))
+    grilla = np.arange(niveles) / (niveles - 1)
+    puntos = np.empty((trayectorias * (k + 1), k))
+    pasos = np.empty((trayectorias, k, 2))
+    for t in range(trayectorias):
+        x = rng.choice(grilla, size=k)
+        fila = t * (k + 1)
+        puntos[fila] = x
+        for m, i in enumerate(rng.permutation(k)):
+            d = delta if x[i] + delta <= 1.0 + 1e-12 else -delta
+            x = x.copy()
+            x[i] += d
+            puntos[fila + m + 1] = x
+            pasos[t, m] = (i, d)
+    return puntos, pasos
+
+
+def morris(
+    evaluador: Evaluador,
+    factores: Sequence[Factor],
+    trayectorias: int = 10,
+    niveles: int = 4,
+    corte: float = 0.1,
+    max_factores: int = 6,
+    semilla: int = 42,
+) -> ResultadoMorris:
+    """Efectos elementales (unidades de la salida por recorrido completo del factor) y selección por μ*."""
+    factores = list(factores)
+    k = len(factores)
+    rng = np.random.default_rng(semilla)
+    puntos, pasos = diseno_morris(k, trayectorias, niveles, rng)
+    corridas_previas = evaluador.corridas
+    y = evaluador(factores, puntos, np.repeat(np.arange(trayectorias), k + 1), semilla)
+
+    efectos = np.empty((trayectorias, k))
+    for t in range(trayectorias):
+        fila = t * (k + 1)
+        for m in range(k):
+            i, d = int(pasos[t, m, 0]), pasos[t, m, 1]
+            efectos[t, i] = (y[fila + m + 1] - y[fila + m]) / d
+    mu_estrella = np.mean(np.abs(efectos), axis=0)
+    resultado = ResultadoMorris(
+        factores=factores,
+        mu=np.mean(efectos, axis=0),
+        mu_estrella=mu_estrella,
+        sigma=np.std(efectos, axis=0, ddof=1) if trayectorias > 1 else np.zeros(k),
+        trayectorias=trayectorias,
+        corridas=evaluador.corridas - corridas_previas,
+    )
+    tope = float(np.max(mu_estrella)) if k else 0.0
+    orden = [i for i in np.argsort(-mu_estrella) if tope > 0 and mu_estrella[i] >= corte * tope]
+    resultado.seleccionados = [factores[i] for i in orden[:max(1, max_factores)]]
+    return resultado
+
+
+# --- Sobol / Saltelli --------------------------------------------------------------
+
+@dataclass
+class ResultadoSobol:
+    factores: List[Factor]
+    primer_orden: np.ndarray
+    primer_orden_ic: np.ndarray  # k × 2
+    total: np.ndarray
+    total_ic: np.ndarray  # k × 2
+    varianza: float
+    n_base: int
+    nivel: float
+    corridas: int
+
+    def filas(self) -> List[Dict[str, Any]]:
+        """Una fila por factor, de mayor a menor índice total."""
+        orden = np.argsort(-self.total)
+        return [
+            {"factor": self.factores[i].nombre, "minimo": self.factores[i].minimo, "maximo": self.factores[i].maximo,
+             "S1": float(self.primer_orden[i]), "S1_ic": [float(v) for v in self.primer_orden_ic[i]],
+             "ST": float(self.total[i]), "ST_ic": [float(v) for v in self.total_ic[i]]}
+            for i in orden
+        ]
+
+
+def indices_sobol(f_A: np.ndarray, f_B: np.ndarray, f_AB: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    (S1, ST, varianza) con f_AB de forma N × k. S1 = E[f_B (f_ABi - f_A)] / V (Saltelli 2010),
+    ST = E[(f_A - f_ABi)²] / 2V (Jansen), V = varianza de f_A ∪ f_B.
+    """
+    varianza = float(np.var(np.concatenate([f_A, f_B]), ddof=1))
+    if not varianza > 0:
+        k = f_AB.shape[1]
+        return np.zeros(k), np.zeros(k), 0.0
+    s1 = np.mean(f_B[:, None] * (f_AB - f_A[:, None]), axis=0) / varianza
+    st = 0.5 * np.mean((f_A[:, None] - f_AB) ** 2, axis=0) / varianza
+    return s1, st, varianza
+
+
+def sobol(
+    evaluador: Evaluador,
+    factores: Sequence[Factor],
+    n_base: int = 64,
+    bootstrap: int = 1000,
+    nivel: float = 0.95,
+    semilla: int = 42,
+) -> ResultadoSobol:
+    """Índices de Sobol de primer orden y totales con IC bootstrap (percentiles) sobre las N filas."""
+    factores = list(factores)
+    k = len(factores)
+    rng = np.random.default_rng(semilla + 1)
+    A = rng.random((n_base, k))
+    B = rng.random((n_base, k))
+    AB = np.repeat(A[None, :, :], k, axis=0)  # k × N × k
+    for i in range(k):
+        AB[i, :, i] = B[:, i]
+    puntos = np.concatenate([A, B, AB.reshape(k * n_base, k)])
+    grupos = np.tile(np.arange(n_base), k + 2)
+    corridas_previas = evaluador.corridas
+    y = evaluador(factores, puntos, grupos, semilla)
+    f_A, f_B = y[:n_base], y[n_base:2 * n_base]
+    f_AB = y[2 * n_base:].reshape(k, n_base).T
+
+    s1, st, varianza = indices_sobol(f_A, f_B, f_AB)
+    muestras_s1 = np.empty((bootstrap, k))
+    muestras_st = np.empty((bootstrap, k))
+    for b in range(bootstrap):
+        idx = rng.integers(0, n_base, n_base)
+        muestras_s1[b], muestras_st[b], _ = indices_sobol(f_A[idx], f_B[idx], f_AB[idx])
+    cola = 50.0 * (1.0 - nivel)
+    return ResultadoSobol(
+        factores=factores,
+        primer_orden=s1,
+        primer_orden_ic=np.percentile(muestras_s1, [cola, 100.0 - cola], axis=0).T,
+        total=st,
+        total_ic=np.percentile(muestras_st, [cola, 100.0 - cola], axis=0).T,
+        varianza=varianza,
+        n_base=n_base,
+        nivel=nivel,
+        corridas=evaluador.corridas - corridas_previas,
+    )
+
+
+def analizar(
+    T_FINAL: int,
+    N: int,
+    M: float,
+    prob_suscripcion: float,
+    factores: Optional[Sequence[Factor]] = None,
+    salida: str = SALIDA_BENEFICIO,
+    replicas: int = 2,
+    trayectorias: int = 10,
+    niveles: int = 4,
+    corte: float = 0.1,
+    max_factores: int = 6,
+    n_base: int = 64,
+    bootstrap: int = 1000,
+    nivel: float = 0.95,
+    semilla: int = 42,
+    workers: int = 1,
+    callback: Optional[Callable[[str], None]] = None,
+) -> Tuple[ResultadoMorris, Optional[ResultadoSobol]]:
+    """Morris sobre todos los factores y Sobol sobre los seleccionados (None si ninguno tuvo efecto)."""
+    factores = list(factores) if factores is not None else factores_por_defecto()
+    with Evaluador(T_FINAL, N, M, prob_suscripcion, salida=salida, replicas=replicas, workers=workers) as evaluador:
+        if callback:
+            callback(f"Morris: {len(factores)} factores, {trayectorias} trayectorias, "
+                     f"{trayectorias * (len(factores) + 1) * evaluador.replicas} corridas")
+        r_morris = morris(evaluador, factores, trayectorias, niveles, corte, max_factores, semilla)
+        if not r_morris.seleccionados:
+            return r_morris, None
+        k = len(r_morris.seleccionados)
+        if callback:
+            callback(f"Sobol: {k} factores, N={n_base}, {n_base * (k + 2) * evaluador.replicas} corridas")
+        r_sobol = sobol(evaluador, r_morris.seleccionados, n_base, bootstrap, nivel, semilla)
+    return r_morris, r_sobol
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Archivo memory-mapped de series diarias por corrida (runs × días, float32).
+Cada worker escribe beneficio_acumulado_por_dia de su corrida directamente en
+su fila; el análisis posterior recorre el archivo por bloques de filas sin
+cargarlo completo en RAM.
+Una corrida truncada por un criterio de parada arrastra su último valor hasta el final
+de la fila (como las series semanales en benchmark), así las estadísticas por día
+cuentan todas las corridas y no solo las que siguieron; filas sin escribir quedan en NaN.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import config as cfg
+from . import postproceso
+
+DTYPE_SERIES = np.float32
+TAM_BLOQUE_DEFAULT = 1024  # filas por bloque en el análisis
+
+
+def crear_archivo_series(path: Union[str, Path], n_runs: int, n_dias: int) -> Path:
+    """Preasigna el archivo .npy (n_runs × n_dias) relleno con NaN."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mm = np.lib.format.open_memmap(path, mode="w+", dtype=DTYPE_SERIES, shape=(n_runs, n_dias))
+    mm[:] = np.nan
+    mm.flush()
+    del mm
+    return path
+
+
+def escribir_serie(path: Union[str, Path], idx: int, serie: Sequence[float]) -> None:
+    """
+    Escribe la serie de la corrida idx en su fila (seguro entre procesos: filas disjuntas).
+    Si la serie es más corta que la fila (corrida truncada), repite su último valor hasta el final.
+    """
+    mm = np.load(path, mmap_mode="r+")
+    n = min(len(serie), mm.shape[1])
+    mm[idx, :n] = np.asarray(serie[:n], dtype=DTYPE_SERIES)
+    if 0 < n < mm.shape[1]:
+        mm[idx, n:] = serie[n - 1]
+    mm.flush()
+    del mm
+
+
+def abrir_archivo_series(path: Union[str, Path]) -> np.memmap:
+    """Abre el archivo en solo lectura (memory-mapped)."""
+    return np.load(path, mmap_mode="r")
+
+
+def iterar_bloques(
+    path: Union[str, Path],
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Itera (fila_inicio, bloque float64) de a tam_bloque corridas."""
+    mm = abrir_archivo_series(path)
+    for inicio in range(0, mm.shape[0], tam_bloque):
+        yield inicio, np.asarray(mm[inicio:inicio + tam_bloque], dtype=np.float64)
+
+
+def estadisticas_por_dia(
+    path: Union[str, Path],
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> Dict[str, np.ndarray]:
+    """
+    Media, desv. estándar (muestral), min y max por día sobre todas las corridas.
+    Combina bloques con la fórmula de Chan (n, media, M2), ignorando NaN.
+    """
+    n_dias = abrir_archivo_series(path).shape[1]
+    n = np.zeros(n_dias)
+    media = np.zeros(n_dias)
+    m2 = np.zeros(n_dias)
+    minimo = np.full(n_dias, np.inf)
+    maximo = np.full(n_dias, -np.inf)
+    for _, bloque in iterar_bloques(path, tam_bloque):
+        valido = ~np.isnan(bloque)
+        n_b = valido.sum(axis=0).astype(np.float64)
+        if not n_b.any():
+            continue
+        suma_b = np.where(valido, bloque, 0.0).sum(axis=0)
+        media_b = np.divide(suma_b, n_b, out=np.zeros(n_dias), where=n_b > 0)
+        m2_b = np.where(valido, (bloque - media_b) ** 2, 0.0).sum(axis=0)
+        n_tot = n + n_b
+        delta = media_b - media
+        con_datos = n_tot > 0
+        media = np.where(con_datos, media + delta * np.divide(n_b, n_tot, out=np.zeros(n_dias), where=con_datos), media)
+        m2 = m2 + m2_b + delta ** 2 * np.divide(n * n_b, n_tot, out=np.zeros(n_dias), where=con_datos)
+        n = n_tot
+        minimo = np.minimum(minimo, np.where(valido, bloque, np.inf).min(axis=0))
+        maximo = np.maximum(maximo, np.where(valido, bloque, -np.inf).max(axis=0))
+    sin_datos = n == 0
+    std = np.sqrt(np.divide(m2, n - 1, out=np.zeros(n_dias), where=n > 1))
+    return {
+        "n": n,
+        "media": np.where(sin_datos, np.nan, media),
+        "std": np.where(sin_datos, np.nan, std),
+        "min": np.where(sin_datos, np.nan, minimo),
+        "max": np.where(sin_datos, np.nan, maximo),
+    }
+
+
+def dia_equilibrio_por_corrida(
+    path: Union[str, Path],
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> np.ndarray:
+    """Primer día (1-indexado) con beneficio acumulado > 0 por corrida; NaN si no se alcanza."""
+    partes = [postproceso.dia_equilibrio(bloque) for _, bloque in iterar_bloques(path, tam_bloque)]
+    return np.concatenate(partes) if partes else np.empty(0)
+
+
+def cuantiles_equilibrio(
+    path: Union[str, Path],
+    cuantiles: Sequence[float] = (0.25, 0.50, 0.75),
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> Dict[str, Optional[float]]:
+    """Porcentaje de corridas en equilibrio y cuantiles del día de equilibrio."""
+    dias = dia_equilibrio_por_corrida(path, tam_bloque)
+    validos = dias[~np.isnan(dias)]
+    resultado: Dict[str, Optional[float]] = {
+        "equilibrio_porcentaje": float(len(validos) / len(dias) * 100) if len(dias) else 0.0,
+    }
+    for q in cuantiles:
+        resultado[f"p{int(round(q * 100))}"] = float(np.quantile(validos, q)) if len(validos) else None
+    return resultado
+
+
+def mejor_ventana_por_corrida(
+    path: Union[str, Path],
+    ventana: int = cfg.DIAS_TRIMESTRE,
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> Dict[str, np.ndarray]:
+    """
+    Mejor ventana móvil de 'ventana' días por corrida (misma definición que MEJOR_TRIMESTRE).
+    Devuelve arrays inicio, fin (días 1-indexados) y beneficio; NaN si la corrida es más corta.
+    """
+    return _por_bloques(path, tam_bloque, lambda b: postproceso.mejor_ventana(b, ventana))
+
+
+def peor_ventana_por_corrida(
+    path: Union[str, Path],
+    ventana: int = cfg.DIAS_TRIMESTRE,
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> Dict[str, np.ndarray]:
+    """Peor ventana móvil de 'ventana' días por corrida: arrays inicio, fin y beneficio."""
+    return _por_bloques(path, tam_bloque, lambda b: postproceso.peor_ventana(b, ventana))
+
+
+def resumen_por_corrida(
+    path: Union[str, Path],
+    ventana: int = cfg.DIAS_TRIMESTRE,
+    tam_bloque: int = TAM_BLOQUE_DEFAULT,
+) -> Dict[str, np.ndarray]:
+    """postproceso.resumen_serie por corrida (equilibrio, ventanas, drawdown, racha de pérdidas)."""
+    return _por_bloques(path, tam_bloque, lambda b: postproceso.resumen_serie(b, ventana))
+
+
+def _por_bloques(
+    path: Union[str, Path],
+    tam_bloque: int,
+    funcion: Callable[[np.ndarray], Dict[str, np.ndarray]],
+) -> Dict[str, np.ndarray]:
+    """Aplica una función de postproceso (dict de arrays por corrida) bloque a bloque y concatena."""
+    partes: Dict[str, list] = {}
+    for _, bloque in iterar_bloques(path, tam_bloque):
+        for clave, valores in funcion(bloque).items():
+            partes.setdefault(clave, []).append(valores)
+    return {clave: np.concatenate(v) for clave, v in partes.items()}
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+Equivalencia estadística entre el motor de referencia (principal.ejecutar_simulacion)
+y un motor candidato (vectorizado, por eventos, con muestreo por lote, ...).
+Un motor más rápido cambia el flujo de números aleatorios, así que no se puede pedir
+igualdad bit a bit: se corren K réplicas de cada motor sobre un conjunto fijo de
+configuraciones y se comparan las distribuciones.
+
+Motor: callable (T_FINAL, N, M, prob_suscripcion, semilla) -> MetricasResumen o
+EstadoSimulacion. Tiene que ser importable desde un worker si se usa workers > 1
+(función de módulo o functools.partial de una). La réplica r usa semilla + r en la
+referencia y semilla + DESFASE_SEMILLA_CANDIDATO + r en el candidato: comparar la
+referencia consigo misma es un control real, no la misma muestra dos veces.
+
+Métricas por configuración:
+- beneficio_final, equilibrio_dia (sin equilibrio cuenta como T_FINAL + 1, como en
+  optimizacion), contadores finales de clientes y técnicos;
+- cada serie semanal (las de almacen.apilar_series_semanales) en las semanas de control
+  (fracciones del horizonte, default 50% y 100%).
+
+Pruebas por métrica:
+- KS de dos muestras (p asintótico de Kolmogorov con la corrección de Stephens);
+- Anderson-Darling k-muestras de Scholz y Stephens (1987) con empates (versión midrank),
+  p interpolado en la tabla de valores críticos para k = 2;
+- superposición de los intervalos de confianza de la media.
+Cada prueba usa alfa / (3 · comparaciones) (Bonferroni): si los motores son
+equivalentes, la probabilidad de que el informe falle es a lo sumo alfa.
+Una métrica falla si falla cualquiera de las tres pruebas.
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import config as cfg
+from .muestreo import _ks_dos_muestras
+
+DESFASE_SEMILLA_CANDIDATO = 1_000_000
+SEMANAS_CONTROL_DEFAULT = (0.5, 1.0)
+PRUEBAS_POR_METRICA = 3
+
+# (T_FINAL, N, M, prob_suscripcion): horizontes cortos y largos, extremos de N, M y AB.
+# Las de 5 y 10 años quedan fuera de agregado.HORIZONTE_VALIDADO: con --candidato agregado la de
+# 10 años no pasa (se mantiene para medir el sesgo).
+CONFIGURACIONES_VALIDACION: Tuple[Tuple[int, int, float, float], ...] = (
+    (730, 30, 2000.0, 0.5),
+    (730, 90, 4500.0, 0.0),
+    (730, 7, 500.0, 1.0),
+    (1825, 90, 10000.0, 0.5),
+    (3650, 30, 2000.0, 0.5),
+)
+
+# Escalares de MetricasResumen que se comparan (equilibrio_dia se agrega aparte)
+METRICAS_ESCALARES = (
+    "beneficio_final",
+    "suscripciones_final",
+    "prepagos_final",
+    "pe_trabajo_aislado_final",
+    "tecnicos_dev_final",
+    "tecnicos_apps_it_final",
+)
+
+# Valores críticos de Anderson-Darling k-muestras estandarizado para k = 2
+# (b0 + b1/sqrt(k-1) + b2/(k-1), Scholz y Stephens 1987, tabla 1)
+_AD_NIVELES = np.array([0.25, 0.1, 0.05, 0.025, 0.01, 0.005, 0.001])
+_AD_CRITICOS = np.array([0.325, 1.226, 1.961, 2.718, 3.752, 4.592, 6.546])
+
+Motor = Callable[[int, int, float, float, int], Any]
+
+
+def motor_referencia(T_FINAL: int, N: int, M: float, prob_suscripcion: float, semilla: int,
+                     **kwargs: Any) -> Any:
+    """ejecutar_simulacion con random.seed(semilla); kwargs pasa a ejecutar_simulacion (p. ej. modelo_duracion)."""
+    import random
+    from .benchmark import extraer_metricas
+    from .principal import ejecutar_simulacion
+
+    random.seed(semilla)
+    return extraer_metricas(ejecutar_simulacion(
+        T_FINAL=T_FINAL, N=N, M=M, prob_suscripcion_nuevo=prob_suscripcion, verbose=False, **kwargs
+    ))
+
+
+# Motores con nombre: la referencia (control: debe aprobar), variantes del modelo de
+# duración de config (cambian el comportamiento: sirven para ver que el informe las detecta)
+# y el modo agregado (simulacion.agregado: aproximación a grano diario, se calibra con esto)
+MOTORES: Dict[str, Motor] = {
+    "referencia": motor_referencia,
+    "duracion_truncada": partial(motor_referencia, modelo_duracion=cfg.MODELO_DURACION_TRUNCADA),
+    "duracion_lognormal": partial(motor_referencia, modelo_duracion=cfg.MODELO_DURACION_LOGNORMAL),
+    "agregado": partial(motor_referencia, modo="agregado"),
+}
+
+
+def resolver_motor(nombre: str) -> Motor:
+    """Motor por nombre (MOTORES) o 'modulo:funcion' importable."""
+    if nombre in MOTORES:
+        return MOTORES[nombre]
+    if ":" not in nombre:
+        raise ValueError(f"Motor desconocido: {nombre!r} (usar {', '.join(MOTORES)} o 'modulo:funcion')")
+    import importlib
+    modulo, funcion = nombre.split(":", 1)
+    return getattr(importlib.import_module(modulo), funcion)
+
+
+def _replica(args) -> Any:
+    """Worker: una corrida de un motor; devuelve MetricasResumen."""
+    motor, T_FINAL, N, M, prob_suscripcion, semilla = args
+    from .benchmark import MetricasResumen, extraer_metricas
+
+    r = motor(T_FINAL, N, M, prob_suscripcion, semilla)
+    return r if isinstance(r, MetricasResumen) else extraer_metricas(r)
+
+
+# --- Pruebas de dos muestras ---------------------------------------------------
+
+def p_kolmogorov(d: float, n: int, m: int) -> float:
+    """p asintótico de KS de dos muestras: Q_KS((√ne + 0.12 + 0.11/√ne)·D), ne = nm/(n+m)."""
+    ne = math.sqrt(n * m / (n + m))
+    lam = (ne + 0.12 + 0.11 / ne) * d
+    if lam < 0.2:
+        return 1.0
+    suma = 0.0
+    for j in range(1, 101):
+        termino = 2.0 * (-1) ** (j - 1) * math.exp(-2.0 * j * j * lam * lam)
+        suma += termino
+        if abs(termino) < 1e-12:
+            break
+    return min(1.0, max(0.0, suma))
+
+
+def anderson_darling_dos_muestras(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float]:
+    """
+    (T, p) de Anderson-Darling k-muestras (k = 2) con empates. T es el estadístico
+    estandarizado (A²akN - 1) / σ; p se interpola en log sobre la tabla de críticos
+    (topado en 0.25 por arriba; por debajo de 0.001 se extrapola con la última pendiente).
+    La varianza es la de muestras sin empates: con muchos empates (conteos chicos) la
+    prueba queda algo liberal.
+    Con un único valor en la muestra combinada devuelve (0.0, 1.0).
+    """
+    muestras = [np.sort(np.asarray(a, dtype=np.float64)), np.sort(np.asarray(b, dtype=np.float64))]
+    N = sum(len(x) for x in muestras)
+    valores, l = np.unique(np.concatenate(muestras), return_counts=True)
+    if len(valores) < 2 or min(len(x) for x in muestras) < 2 or N < 4:
+        return 0.0, 1.0
+    B_a = np.cumsum(l) - l / 2.0
+    denominador = B_a * (N - B_a) - N * l / 4.0
+    A2 = 0.0
+    for x in muestras:
+        n_i = len(x)
+        f = np.searchsorted(x, valores, side="right") - np.searchsorted(x, valores, side="left")
+        M_a = np.cumsum(f) - f / 2.0
+        A2 += float(np.sum(l / N * (N * M_a - n_i * B_a) ** 2 / denominador)) / n_i
+    A2 *= (N - 1) / N
+
+    k = 2
+    H = sum(1.0 / len(x) for x in muestras)
+    armonicos = np.cumsum(1.0 / np.arange(1, N))  # armonicos[j - 1] = h_j, j = 1..N-1
+    h = float(armonicos[-1])
+    i = np.arange(1, N - 1)
+    g = float(np.sum((h - armonicos[i - 1]) / (N - i)))
+    coef_a = (4 * g - 6) * (k - 1) + (10 - 6 * g) * H
+    coef_b = (2 * g - 4) * k ** 2 + 8 * h * k + (2 * g - 14 * h - 4) * H - 8 * h + 4 * g - 6
+    coef_c = (6 * h + 2 * g - 2) * k ** 2 + (4 * h - 4 * g + 6) * k + (2 * h - 6) * H + 4 * h
+    coef_d = (2 * h + 6) * k ** 2 - 4 * h * k
+    var = (coef_a * N ** 3 + coef_b * N ** 2 + coef_c * N + coef_d) / ((N - 1.0) * (N - 2.0) * (N - 3.0))
+    T = (A2 - (k - 1)) / math.sqrt(var)
+    return T, _p_anderson_darling(T)
+
+
+def _p_anderson_darling(T: float) -> float:
+    log_niveles = np.log(_AD_NIVELES)
+    if T <= _AD_CRITICOS[0]:
+        return float(_AD_NIVELES[0])
+    if T >= _AD_CRITICOS[-1]:
+        pendiente = (log_niveles[-1] - log_niveles[-2]) / (_AD_CRITICOS[-1] - _AD_CRITICOS[-2])
+        return float(math.exp(log_niveles[-1] + pendiente * (T - _AD_CRITICOS[-1])))
+    return float(math.exp(np.interp(T, _AD_CRITICOS, log_niveles)))
+
+
+def intervalo_media(x: np.ndarray, z: float) -> Tuple[float, float]:
+    """Media ± z·s/√n."""
+    media = float(np.mean(x))
+    if len(x) < 2:
+        return media, media
+    semi = z * float(np.std(x, ddof=1)) / math.sqrt(len(x))
+    return media - semi, media + semi
+
+
+# --- Informe ---------------------------------------------------------------------
+
+@dataclass
+class ComparacionMetrica:
+    """Resultado de las tres pruebas para una métrica en una configuración."""
+    config: Tuple[int, int, float, float]
+    metrica: str
+    n_referencia: int
+    n_candidato: int
+    media_referencia: float
+    media_candidato: float
+    ks: float
+    p_ks: float
+    ad: float
+    p_ad: float
+    ic_referencia: Tuple[float, float]
+    ic_candidato: Tuple[float, float]
+    alfa_prueba: float
+
+    @property
+    def ic_superpuestos(self) -> bool:
+        return self.ic_referencia[0] <= self.ic_candidato[1] and self.ic_candidato[0] <= self.ic_referencia[1]
+
+    @property
+    def fallas(self) -> List[str]:
+        salida = []
+        if self.p_ks < self.alfa_prueba:
+            salida.append("KS")
+        if self.p_ad < self.alfa_prueba:
+            salida.append("AD")
+        if not self.ic_superpuestos:
+            salida.append("IC")
+        return salida
+
+    @property
+    def aprobada(self) -> bool:
+        return not self.fallas
+
+
+@dataclass
+class InformeValidacion:
+    alfa: float
+    alfa_prueba: float
+    replicas: int
+    semilla: int
+    configuraciones: List[Tuple[int, int, float, float]]
+    comparaciones: List[ComparacionMetrica] = field(default_factory=list)
+
+    @property
+    def fallidas(self) -> List[ComparacionMetrica]:
+        return [c for c in self.comparaciones if not c.aprobada]
+
+    @property
+    def aprobado(self) -> bool:
+        return not self.fallidas
+
+    def texto(self, solo_fallas: bool = False) -> str:
+        """Informe legible: una línea por métrica (o solo las que fallan) y el veredicto."""
+        lineas = [
+            f"Réplicas por motor y configuración: {self.replicas} | alfa global {self.alfa} "
+            f"(por prueba {self.alfa_prueba:.2e}, Bonferroni sobre {len(self.comparaciones)} métricas × "
+            f"{PRUEBAS_POR_METRICA} pruebas)"
+        ]
+        for config in self.configuraciones:
+            filas = [c for c in self.comparaciones if c.config == config]
+            if solo_fallas:
+                filas = [c for c in filas if not c.aprobada]
+            T_FINAL, N, M, ab = config
+            lineas.append(f"\nT={T_FINAL} N={N} M={M:g} AB={ab:g}: "
+                          f"{sum(c.aprobada for c in self.comparaciones if c.config == config)}/"
+                          f"{sum(1 for c in self.comparaciones if c.config == config)} métricas conformes")
+            for c in filas:
+                marca = "ok" if c.aprobada else "FALLA " + ",".join(c.fallas)
+                lineas.append(
+                    f"  {c.metrica:48s} ref={c.media_referencia:14,.2f} cand={c.media_candidato:14,.2f} "
+                    f"p_KS={c.p_ks:.3g} p_AD={c.p_ad:.3g}  {marca}"
+                )
+        veredicto = "APROBADO" if self.aprobado else f"FALLA ({len(self.fallidas)} métricas)"
+        lineas.append(f"\nVeredicto: {veredicto}")
+        return "\n".join(lineas)
+
+    def a_dict(self) -> Dict[str, Any]:
+        comparaciones = []
+        for c in self.comparaciones:
+            fila = asdict(c)
+            fila["aprobada"] = c.aprobada
+            fila["fallas"] = c.fallas
+            comparaciones.append(fila)
+        return {
+            "aprobado": self.aprobado,
+            "alfa": self.alfa,
+            "alfa_prueba": self.alfa_prueba,
+            "replicas": self.replicas,
+            "semilla": self.semilla,
+            "configuraciones": [list(c) for c in self.configuraciones],
+            "comparaciones": comparaciones,
+        }
+
+
+def _muestras_por_metrica(
+    metricas_runs: List[Any], T_FINAL: int, semanas_control: Sequence[float]
+) -> Dict[str, np.ndarray]:
+    """nombre -> vector con una entrada por réplica (series semanales: NaN fuera de horizonte se descarta)."""
+    from .almacen import apilar_series_semanales
+
+    salida: Dict[str, np.ndarray] = {
+        nombre: np.array([float(getattr(m, nombre)) for m in metricas_runs]) for nombre in METRICAS_ESCALARES
+    }
+    salida["equilibrio_dia"] = np.array([
+        float(m.equilibrio_dia if m.equilibrio_dia is not None else T_FINAL + 1) for m in metricas_runs
+    ])
+    for nombre, matriz in apilar_series_semanales(metricas_runs).items():
+        if nombre in ("semana", "dia"):
+            continue
+        n_semanas = matriz.shape[1]
+        for q in semanas_control:
+            s = max(1, min(n_semanas, int(round(q * n_semanas))))
+            columna = matriz[:, s - 1]
+            salida[f"{nombre}@semana{s}"] = columna[~np.isnan(columna)]
+    return salida
+
+
+def comparar_muestras(
+    config: Tuple[int, int, float, float], metrica: str, ref: np.ndarray, cand: np.ndarray, alfa_prueba: float
+) -> ComparacionMetrica:
+    """KS, AD e IC de la media para un par de muestras."""
+    z = NormalDist().inv_cdf(1.0 - alfa_prueba / 2.0)
+    if len(ref) and len(cand):
+        ks = _ks_dos_muestras(ref, cand)
+        p_ks = p_kolmogorov(ks, len(ref), len(cand))
+    else:
+        ks, p_ks = 0.0, 1.0
+    ad, p_ad = anderson_darling_dos_muestras(ref, cand)
+    return ComparacionMetrica(
+        config=config,
+        metrica=metrica,
+        n_referencia=len(ref),
+        n_candidato=len(cand),
+        media_referencia=float(np.mean(ref)) if len(ref) else float("nan"),
+        media_candidato=float(np.mean(cand)) if len(cand) else float("nan"),
+        ks=ks,
+        p_ks=p_ks,
+        ad=ad,
+        p_ad=p_ad,
+        ic_referencia=intervalo_media(ref, z) if len(ref) else (float("-inf"), float("inf")),
+        ic_candidato=intervalo_media(cand, z) if len(cand) else (float("-inf"), float("inf")),
+        alfa_prueba=alfa_prueba,
+    )
+
+
+def validar(
+    candidato: Motor,
+    referencia: Motor = motor_referencia,
+    configuraciones: Sequence[Tuple[int, int, float, float]] = CONFIGURACIONES_VALIDACION,
+    replicas: int = 60,
+    semilla: int = 42,
+    alfa: float = 0.05,
+    semanas_control: Sequence[float] = SEMANAS_CONTROL_DEFAULT,
+    workers: int = 1,
+    callback: Optional[Callable[[str], None]] = None,
+) -> InformeValidacion:
+    """
+    Corre referencia y candidato (replicas cada uno) en cada configuración y arma el informe.
+    callback(mensaje) recibe el avance por configuración y motor.
+    """
+    configuraciones = [tuple(c) for c in configuraciones]
+    pool = None
+    if workers > 1:
+        from multiprocessing import Pool
+        pool = Pool(workers)
+
+    def _correr(motor: Motor, config: Tuple[int, int, float, float], desfase: int) -> List[Any]:
+        T_FINAL, N, M, ab = config
+        args = [(motor, T_FINAL, N, M, ab, semilla + desfase + r) for r in range(replicas)]
+        if pool is not None:
+            return pool.map(_replica, args, chunksize=max(1, replicas // (workers * 4)))
+        return [_replica(a) for a in args]
+
+    muestras = []
+    try:
+        for config in configuraciones:
+            if callback:
+                callback(f"T={config[0]} N={config[1]} M={config[2]:g} AB={config[3]:g}: referencia")
+            ref = _muestras_por_metrica(_correr(referencia, config, 0), config[0], semanas_control)
+            if callback:
+                callback(f"T={config[0]} N={config[1]} M={config[2]:g} AB={config[3]:g}: candidato")
+            cand = _muestras_por_metrica(
+                _correr(candidato, config, DESFASE_SEMILLA_CANDIDATO), config[0], semanas_control
+            )
+            for nombre in ref:
+                muestras.append((config, nombre, ref[nombre], cand.get(nombre, np.array([]))))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    alfa_prueba = alfa / (PRUEBAS_POR_METRICA * max(1, len(muestras)))
+    informe = InformeValidacion(
+        alfa=alfa, alfa_prueba=alfa_prueba, replicas=replicas, semilla=semilla,
+        configuraciones=configuraciones,
+    )
+    informe.comparaciones = [comparar_muestras(c, n, r, k, alfa_prueba) for c, n, r, k in muestras]
+    return informe